@@ -0,0 +1,226 @@
+"""
+Compare the two ways of loading the production schedule of a large TV show.
+
+The schedule view used to call the task type route, then one route per task
+type (asset types, episodes, sequences or edits). The all route gives the
+same items in a single pass. This script builds a throwaway production
+(by default 5 episodes, 250 sequences, 4,000 shots and 1,000 assets, with
+4 task types each: 20,000 tasks), times both ways with their schedule items
+missing (first load) and present (next loads), then deletes it.
+
+Usage:
+python scripts/benchmark_schedule_items.py
+python scripts/benchmark_schedule_items.py --shots-per-sequence 40 --runs 5
+
+It runs against the database zou is configured with (DB_HOST, DB_PORT,
+DB_USERNAME, DB_PASSWORD, DB_DATABASE): use a development database.
+"""
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import insert
+
+from zou.app import app, db
+from zou.app.models.department import Department
+from zou.app.models.entity import Entity
+from zou.app.models.entity_type import EntityType
+from zou.app.models.project import Project
+from zou.app.models.project_status import ProjectStatus
+from zou.app.models.schedule_item import ScheduleItem
+from zou.app.models.task import Task
+from zou.app.models.task_status import TaskStatus
+from zou.app.models.task_type import TaskType
+from zou.app.services import (
+    deletion_service,
+    schedule_service,
+    shots_service,
+)
+
+
+def build_production(args):
+    """
+    Create the benchmark production and return the ids of what has to be
+    deleted afterwards.
+    """
+    suffix = uuid.uuid4().hex[:8]
+    project_status = ProjectStatus.create(
+        name=f"Benchmark {suffix}", color="#000000"
+    )
+    project = Project.create(
+        name=f"Schedule benchmark {suffix}",
+        project_status_id=project_status.id,
+        production_type="tvshow",
+    )
+    department = Department.create(name=f"Benchmark {suffix}", color="#000000")
+    task_status = TaskStatus.create(
+        name=f"Benchmark {suffix}", short_name=f"b{suffix}", color="#000000"
+    )
+    asset_type = EntityType.create(name=f"Benchmark Props {suffix}")
+    task_types = [
+        TaskType.create(
+            name=f"Benchmark {for_entity} {index} {suffix}",
+            for_entity=for_entity,
+            department_id=department.id,
+        )
+        for for_entity in ["Asset", "Shot"]
+        for index in range(args.task_types)
+    ]
+
+    def insert_entities(entity_type_id, names, parent_ids=None, source=None):
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "name": name,
+                "project_id": project.id,
+                "entity_type_id": entity_type_id,
+                "parent_id": None if parent_ids is None else parent_ids[i],
+                "source_id": source,
+            }
+            for i, name in enumerate(names)
+        ]
+        db.session.execute(insert(Entity), rows)
+        return [row["id"] for row in rows]
+
+    episode_ids = insert_entities(
+        shots_service.get_episode_type()["id"],
+        [f"E{index:02}" for index in range(args.episodes)],
+    )
+    nb_sequences = args.episodes * args.sequences_per_episode
+    sequence_ids = insert_entities(
+        shots_service.get_sequence_type()["id"],
+        [f"SQ{index:03}" for index in range(nb_sequences)],
+        [episode_ids[index % args.episodes] for index in range(nb_sequences)],
+    )
+    nb_shots = nb_sequences * args.shots_per_sequence
+    shot_ids = insert_entities(
+        shots_service.get_shot_type()["id"],
+        [f"SH{index:05}" for index in range(nb_shots)],
+        [sequence_ids[index % nb_sequences] for index in range(nb_shots)],
+    )
+    asset_ids = insert_entities(
+        asset_type.id, [f"Asset {index}" for index in range(args.assets)]
+    )
+
+    tasks = []
+    for task_type in task_types:
+        entity_ids = asset_ids if task_type.for_entity == "Asset" else shot_ids
+        tasks += [
+            {
+                "id": uuid.uuid4(),
+                "name": "main",
+                "project_id": project.id,
+                "task_type_id": task_type.id,
+                "task_status_id": task_status.id,
+                "entity_id": entity_id,
+            }
+            for entity_id in entity_ids
+        ]
+    db.session.execute(insert(Task), tasks)
+    db.session.commit()
+    print(
+        f"Production: {len(episode_ids)} episodes, {len(sequence_ids)} "
+        f"sequences, {len(shot_ids)} shots, {len(asset_ids)} assets, "
+        f"{len(tasks)} tasks"
+    )
+    return {
+        "project_id": str(project.id),
+        "project_status": project_status,
+        "department": department,
+        "task_status": task_status,
+        "asset_type": asset_type,
+        "task_types": task_types,
+    }
+
+
+def load_by_task_type(project_id):
+    """
+    Load the schedule the way the view did it: the task types, then one
+    call per task type.
+    """
+    project = Project.get(project_id)
+    is_tvshow = project.production_type == "tvshow"
+    for item in schedule_service.get_task_types_schedule_items(project_id):
+        task_type = TaskType.get(item["task_type_id"]).serialize()
+        for kind in schedule_service._get_schedule_item_kinds(
+            task_type, is_tvshow
+        ):
+            if kind == "asset_types":
+                schedule_service.get_asset_types_schedule_items(
+                    project_id, task_type["id"]
+                )
+            elif kind == "episodes":
+                schedule_service.get_episodes_schedule_items(
+                    project_id, task_type["id"]
+                )
+            elif kind == "sequences":
+                schedule_service.get_sequences_schedule_items(
+                    project_id, task_type["id"]
+                )
+            else:
+                schedule_service.get_edits_schedule_items(
+                    project_id, task_type["id"]
+                )
+
+
+def load_at_once(project_id):
+    schedule_service.get_all_schedule_items(project_id)
+
+
+def drop_schedule_items(project_id):
+    ScheduleItem.query.filter(ScheduleItem.project_id == project_id).delete()
+    db.session.commit()
+
+
+def measure(name, function, project_id, runs):
+    drop_schedule_items(project_id)
+    start = time.perf_counter()
+    function(project_id)
+    first = time.perf_counter() - start
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(project_id)
+        timings.append(time.perf_counter() - start)
+    print(
+        f"{name:<14} first load {first * 1000:8.1f} ms, "
+        f"next loads {min(timings) * 1000:8.1f} ms (best of {runs})"
+    )
+
+
+def remove_production(production):
+    deletion_service.remove_project(production["project_id"])
+    for task_type in production["task_types"]:
+        task_type.delete()
+    for key in ["asset_type", "task_status", "department", "project_status"]:
+        production[key].delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--episodes", type=int, default=5)
+    parser.add_argument("--sequences-per-episode", type=int, default=50)
+    parser.add_argument("--shots-per-sequence", type=int, default=16)
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument(
+        "--task-types",
+        type=int,
+        default=4,
+        help="Number of task types for the assets, and for the shots",
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with app.app_context():
+        production = build_production(args)
+        try:
+            project_id = production["project_id"]
+            measure("by task type", load_by_task_type, project_id, args.runs)
+            measure("all at once", load_at_once, project_id, args.runs)
+        finally:
+            remove_production(production)
+
+
+if __name__ == "__main__":
+    main()
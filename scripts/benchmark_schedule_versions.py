@@ -0,0 +1,198 @@
+"""
+Time the copy of a large production into a production schedule version and
+the application of that version back onto the production.
+
+This script builds a throwaway production (by default 5,000 shots with
+4 task types each: 20,000 tasks, each with an assignee), then times, for
+each chunk size given, the copy of the tasks into a new version and the
+application of that version to the production. Everything is deleted
+afterwards.
+
+Usage:
+python scripts/benchmark_schedule_versions.py
+python scripts/benchmark_schedule_versions.py --shots 20000 --chunk-sizes 1000 5000
+
+It runs against the database zou is configured with (DB_HOST, DB_PORT,
+DB_USERNAME, DB_PASSWORD, DB_DATABASE): use a development database.
+"""
+
+import argparse
+import datetime
+import time
+import uuid
+
+from sqlalchemy import insert
+
+from zou.app import app, db
+from zou.app.models.department import Department
+from zou.app.models.entity import Entity
+from zou.app.models.person import Person
+from zou.app.models.production_schedule_version import (
+    ProductionScheduleVersion,
+    ProductionScheduleVersionTaskLink,
+)
+from zou.app.models.project import Project
+from zou.app.models.project_status import ProjectStatus
+from zou.app.models.task import Task, TaskPersonLink
+from zou.app.models.task_status import TaskStatus
+from zou.app.models.task_type import TaskType
+from zou.app.services import (
+    deletion_service,
+    schedule_service,
+    shots_service,
+)
+
+
+def build_production(args):
+    """
+    Create the benchmark production and return the ids of what has to be
+    deleted afterwards.
+    """
+    suffix = uuid.uuid4().hex[:8]
+    project_status = ProjectStatus.create(
+        name=f"Benchmark {suffix}", color="#000000"
+    )
+    project = Project.create(
+        name=f"Schedule version benchmark {suffix}",
+        project_status_id=project_status.id,
+    )
+    department = Department.create(name=f"Benchmark {suffix}", color="#000000")
+    task_status = TaskStatus.create(
+        name=f"Benchmark {suffix}", short_name=f"b{suffix}", color="#000000"
+    )
+    person = Person.create(
+        first_name="Benchmark",
+        last_name=suffix,
+        email=f"benchmark.{suffix}@example.com",
+    )
+    task_types = [
+        TaskType.create(
+            name=f"Benchmark {index} {suffix}",
+            for_entity="Shot",
+            department_id=department.id,
+        )
+        for index in range(args.task_types)
+    ]
+
+    sequence = Entity.create(
+        name="SQ01",
+        project_id=project.id,
+        entity_type_id=shots_service.get_sequence_type()["id"],
+    )
+    shots = [
+        {
+            "id": uuid.uuid4(),
+            "name": f"SH{index:05}",
+            "project_id": project.id,
+            "entity_type_id": shots_service.get_shot_type()["id"],
+            "parent_id": sequence.id,
+        }
+        for index in range(args.shots)
+    ]
+    db.session.execute(insert(Entity), shots)
+
+    start_date = datetime.datetime(2026, 1, 5)
+    tasks = [
+        {
+            "id": uuid.uuid4(),
+            "name": "main",
+            "project_id": project.id,
+            "task_type_id": task_type.id,
+            "task_status_id": task_status.id,
+            "entity_id": shot["id"],
+            "start_date": start_date,
+            "due_date": start_date + datetime.timedelta(days=5),
+            "estimation": 5,
+        }
+        for task_type in task_types
+        for shot in shots
+    ]
+    db.session.execute(insert(Task), tasks)
+    db.session.execute(
+        insert(TaskPersonLink),
+        [{"task_id": task["id"], "person_id": person.id} for task in tasks],
+    )
+    db.session.commit()
+    print(f"Production: {len(shots)} shots, {len(tasks)} tasks")
+    return {
+        "project_id": str(project.id),
+        "project_status": project_status,
+        "department": department,
+        "task_status": task_status,
+        "person": person,
+        "task_types": task_types,
+    }
+
+
+def measure(project_id, chunk_size):
+    """
+    Copy the production into a new version, shift every date of the version
+    by a week, then apply it back onto the production.
+    """
+    schedule_service.TASK_LINKS_CHUNK_SIZE = chunk_size
+    version = ProductionScheduleVersion.create(
+        name=f"Benchmark {chunk_size}", project_id=project_id
+    )
+    version_id = str(version.id)
+
+    start = time.perf_counter()
+    summary = schedule_service.set_production_schedule_version_task_links_from_production(
+        version_id
+    )
+    copy_time = time.perf_counter() - start
+
+    tl = ProductionScheduleVersionTaskLink
+    db.session.query(tl).filter(
+        tl.production_schedule_version_id == version_id
+    ).update(
+        {
+            tl.start_date: tl.start_date + datetime.timedelta(days=7),
+            tl.due_date: tl.due_date + datetime.timedelta(days=7),
+        },
+        synchronize_session=False,
+    )
+    db.session.commit()
+
+    start = time.perf_counter()
+    result = schedule_service.apply_production_schedule_version_to_production(
+        version_id
+    )
+    apply_time = time.perf_counter() - start
+    print(
+        f"chunks of {chunk_size:>6}: copy of {summary['task_link_count']} "
+        f"links {copy_time * 1000:8.1f} ms, apply to "
+        f"{result['task_count']} tasks {apply_time * 1000:8.1f} ms"
+    )
+
+
+def remove_production(production):
+    deletion_service.remove_project(production["project_id"])
+    for task_type in production["task_types"]:
+        task_type.delete()
+    for key in ["person", "task_status", "department", "project_status"]:
+        production[key].delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--shots", type=int, default=5000)
+    parser.add_argument("--task-types", type=int, default=4)
+    parser.add_argument(
+        "--chunk-sizes",
+        type=int,
+        nargs="+",
+        default=[schedule_service.TASK_LINKS_CHUNK_SIZE],
+    )
+    args = parser.parse_args()
+
+    with app.app_context():
+        production = build_production(args)
+        try:
+            for chunk_size in args.chunk_sizes:
+                measure(production["project_id"], chunk_size)
+        finally:
+            remove_production(production)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import datetime
 import unittest
+from contextlib import contextmanager
 import orjson as json
 import os
 import ntpath
@@ -43,8 +44,16 @@ from zou.app.models.task_status import TaskStatus
 from zou.app.models.task_type import TaskType
 from zou.app.models.software import Software
 from zou.app.models.working_file import WorkingFile
-from zou.app.stores import auth_tokens_store, config_store
+from zou.app.stores import (
+    auth_tokens_store,
+    config_store,
+    entity_names_store,
+    notification_counts_store,
+    playlist_payloads_store,
+    preview_cache_store,
+)
 
+from sqlalchemy import event
 from sqlalchemy.orm import scoped_session
 from sqlalchemy.orm import sessionmaker
 from flask import current_app
@@ -78,6 +87,18 @@ auth_tokens_store.revoked_tokens_store = fakeredis.FakeStrictRedis(
     decode_responses=True
 )
 config_store.config_store = fakeredis.FakeStrictRedis(decode_responses=True)
+notification_counts_store.notification_counts_store = (
+    fakeredis.FakeStrictRedis(decode_responses=True)
+)
+entity_names_store.entity_names_store = fakeredis.FakeStrictRedis(
+    decode_responses=True
+)
+playlist_payloads_store.playlist_payloads_store = fakeredis.FakeStrictRedis(
+    decode_responses=True
+)
+preview_cache_store.preview_cache_store = fakeredis.FakeStrictRedis(
+    decode_responses=True
+)
 
 # Pre-compute the bcrypt hash once for the default test password.
 # Avoids calling bcrypt.generate_password_hash per user per test.
@@ -132,6 +153,14 @@ class ApiTestCase(unittest.TestCase):
         # tokens and config entries leak from one test to the next.
         self.addCleanup(auth_tokens_store.revoked_tokens_store.flushall)
         self.addCleanup(config_store.config_store.flushall)
+        self.addCleanup(
+            notification_counts_store.notification_counts_store.flushall
+        )
+        self.addCleanup(entity_names_store.entity_names_store.flushall)
+        self.addCleanup(
+            playlist_payloads_store.playlist_payloads_store.flushall
+        )
+        self.addCleanup(preview_cache_store.preview_cache_store.flushall)
 
         from zou.app.utils import cache
 
@@ -260,6 +289,17 @@ class ApiTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, code)
         return json.loads(response.data.decode("utf-8"))
 
+    def patch(self, path, data, code=200):
+        """
+        Run a patch request at given path while making sure it sends data at
+        JSON format.
+        """
+        response = self.app.patch(
+            path, data=json.dumps(data), headers=self.post_headers
+        )
+        self.assertEqual(response.status_code, code)
+        return json.loads(response.data.decode("utf-8"))
+
     def put_404(self, path, data):
         """
         Make sure that given path returns a 404 error for PUT requests.
@@ -408,6 +448,24 @@ class ApiDBTestCase(ApiTestCase):
         self._db_connection.close()
         self._db_session.remove()
 
+    @contextmanager
+    def collect_statements(self):
+        """
+        Record every statement sent to the database until the context
+        exits, in the list it yields. Used to count the queries a call runs,
+        or to catch the ones it must not run.
+        """
+        statements = []
+
+        def collect(conn, cursor, statement, *args, **kwargs):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", collect)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", collect)
+
     def generate_data(self, cls, number, **kwargs):
         """
         Generate random data for a given data model.
@@ -86,6 +86,109 @@ class BreakdownRoutesTestCase(ApiDBTestCase):
             403,
         )
 
+    def test_patch_entities_casting(self):
+        self.generate_fixture_shot("P02")
+        other_shot_id = str(self.shot.id)
+        self._set_shot_casting()
+        path = f"/data/projects/{self.project_id}/entities/casting"
+        captured = self.capture_events("shot:casting-update")
+
+        result = self.patch(
+            path,
+            {
+                "deltas": [
+                    # Updated, removed, and cast in a second shot.
+                    {
+                        "entity_id": self.shot_id,
+                        "asset_id": self.asset_id,
+                        "nb_occurences": 3,
+                    },
+                    {
+                        "entity_id": self.shot_id,
+                        "asset_id": self.asset_character_id,
+                        "nb_occurences": 0,
+                    },
+                    {
+                        "entity_id": other_shot_id,
+                        "asset_id": self.asset_character_id,
+                        "nb_occurences": 1,
+                        "label": "fixed",
+                    },
+                ]
+            },
+        )
+
+        self.assertEqual(
+            [result["created"], result["updated"], result["deleted"]],
+            [1, 1, 1],
+        )
+        self.assertEqual(
+            result["nb_entities_out"],
+            {self.shot_id: 1, other_shot_id: 1},
+        )
+        shot_casting = self.get(
+            f"/data/projects/{self.project_id}/entities/{self.shot_id}/casting"
+        )
+        self.assertEqual(
+            [
+                (cast["asset_id"], cast["nb_occurences"])
+                for cast in shot_casting
+            ],
+            [(self.asset_id, 3)],
+        )
+        other_casting = self.get(
+            f"/data/projects/{self.project_id}"
+            f"/entities/{other_shot_id}/casting"
+        )
+        self.assertEqual(other_casting[0]["label"], "fixed")
+        self.assertEqual(
+            {
+                event["shot_id"]: event["removed_asset_ids"]
+                for event in captured
+            },
+            {self.shot_id: [self.asset_character_id], other_shot_id: []},
+        )
+        # The character is still cast in a shot of the episode.
+        episode_links = breakdown_service.get_entity_casting(self.episode_id)
+        self.assertEqual(
+            {asset["id"] for asset in episode_links},
+            {self.asset_id, self.asset_character_id},
+        )
+
+    def test_patch_entities_casting_updates_the_episode(self):
+        self._set_shot_casting()
+        path = f"/data/projects/{self.project_id}/entities/casting"
+
+        self.patch(
+            path,
+            {
+                "deltas": [
+                    {
+                        "entity_id": self.shot_id,
+                        "asset_id": self.asset_character_id,
+                        "nb_occurences": 0,
+                    }
+                ]
+            },
+        )
+
+        episode_links = breakdown_service.get_entity_casting(self.episode_id)
+        self.assertEqual(
+            [asset["id"] for asset in episode_links], [self.asset_id]
+        )
+
+    def test_patch_entities_casting_rejects_other_projects(self):
+        self.generate_fixture_project_standard()
+        path = f"/data/projects/{self.project_standard.id}/entities/casting"
+        delta = {
+            "entity_id": self.shot_id,
+            "asset_id": self.asset_id,
+            "nb_occurences": 1,
+        }
+        self.patch(path, {"deltas": [delta]}, 400)
+        self.patch(path, {"deltas": []}, 400)
+        self.patch(path, {"deltas": [dict(delta, nb_occurences=-1)]}, 400)
+
     def test_get_episodes_casting(self):
         self._set_shot_casting()
         result = self.get(f"/data/projects/{self.project_id}/episodes/casting")
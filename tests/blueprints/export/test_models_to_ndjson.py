@@ -0,0 +1,83 @@
+import json
+
+from tests.base import ApiDBTestCase
+
+
+class ModelNdjsonExportTestCase(ApiDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_project_closed()
+        self.generate_fixture_asset_type()
+        self.generate_fixture_asset()
+        self.generate_fixture_sequence()
+        self.generate_fixture_shot()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_task()
+        self.generate_fixture_shot_task()
+
+    def get_rows(self, path, code=200):
+        response = self.app.get(path, headers=self.base_headers)
+        self.assertEqual(response.status_code, code)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        return [
+            json.loads(line)
+            for line in response.data.decode("utf-8").split("\n")
+            if line
+        ]
+
+    def test_export_model(self):
+        rows = self.get_rows("/export/ndjson/projects")
+        self.assertEqual(
+            sorted(row["name"] for row in rows),
+            sorted(["Cosmos Landromat", "Old Project"]),
+        )
+        self.assertIn("team", rows[0])
+
+    def test_export_persons_keeps_the_password_hash_only(self):
+        rows = self.get_rows("/export/ndjson/persons")
+        self.assertEqual(len(rows), 3)
+        self.assertIn("password", rows[0])
+        self.assertNotIn("totp_secret", rows[0])
+
+    def test_export_project_model(self):
+        project_id = self.project.id
+        rows = self.get_rows(f"/export/ndjson/projects/{project_id}/tasks")
+        self.assertEqual(len(rows), 2)
+        self.assertIn("assignees", rows[0])
+        rows = self.get_rows(f"/export/ndjson/projects/{project_id}/shots")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["type"], "Shot")
+        rows = self.get_rows(f"/export/ndjson/projects/{project_id}/assets")
+        self.assertEqual([row["type"] for row in rows], ["Asset"])
+
+    def test_export_by_chunks(self):
+        project_id = self.project.id
+        rows = self.get_rows(
+            f"/export/ndjson/projects/{project_id}/tasks?chunk_size=1"
+        )
+        self.assertEqual(len(set(row["id"] for row in rows)), 2)
+
+    def test_export_unknown_model(self):
+        self.get("/export/ndjson/chat-messages", 400)
+        self.get(
+            f"/export/ndjson/projects/{self.project.id}/chat-messages", 400
+        )
+
+    def test_export_unknown_project(self):
+        self.get(
+            "/export/ndjson/projects/ce2d3e2e-e8e6-4a4e-8c6c-1a6a6d1a2b3c"
+            "/tasks",
+            404,
+        )
+
+    def test_export_admin_only(self):
+        self.generate_fixture_user_cg_artist()
+        self.log_in_cg_artist()
+        self.get("/export/ndjson/persons", 403)
+        self.get(f"/export/ndjson/projects/{self.project.id}/tasks", 403)
@@ -1,3 +1,8 @@
+import gzip
+import io
+
+import pyarrow.parquet
+
 from tests.base import ApiDBTestCase
 
 
@@ -14,3 +19,32 @@ class TasksCsvExportTestCase(ApiDBTestCase):
 Cosmos Landromat;Shaders;;;Props;Tree;Ema Peel;John Doe;50.0;40.0;2017-02-20;2017-02-28;2017-02-22;;Open\r
 """
         self.assertEqual(csv_tasks, expected_result)
+
+    def test_export_gzip(self):
+        response = self.app.get(
+            "/export/csv/tasks.csv",
+            headers={**self.base_headers, "Accept-Encoding": "gzip"},
+        )
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(response.data).decode("utf-8"),
+            self.get_raw("/export/csv/tasks.csv"),
+        )
+
+    def test_export_parquet(self):
+        response = self.app.get(
+            "/export/csv/tasks.csv?format=parquet", headers=self.base_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        table = pyarrow.parquet.read_table(io.BytesIO(response.data))
+        self.assertEqual(table.num_rows, 1)
+        row = table.to_pylist()[0]
+        self.assertEqual(row["Entity"], "Tree")
+        self.assertEqual(row["Assignees"], "John Doe")
+        self.assertEqual(row["Duration"], 50.0)
+        self.assertEqual(row["Start date"].strftime("%Y-%m-%d"), "2017-02-20")
+        self.assertIsNone(row["Validation date"])
+
+    def test_export_unknown_format(self):
+        self.get("/export/csv/tasks.csv?format=xlsx", 400)
+        self.get("/export/csv/projects.csv?format=arrow", 400)
@@ -1,3 +1,7 @@
+import datetime
+
+import pyarrow
+
 from tests.base import ApiDBTestCase
 
 from zou.app.services import tasks_service
@@ -16,6 +20,10 @@ class TasksCsvExportTestCase(ApiDBTestCase):
         tasks_service.create_or_update_time_spent(
             task_id, person_id, "2023-03-04", 500
         )
+        self.generate_fixture_shot_task()
+        tasks_service.create_or_update_time_spent(
+            str(self.shot_task.id), person_id, "2023-03-05", 300
+        )
         self.generate_fixture_project_closed()
 
         self.project = self.project_closed
@@ -30,5 +38,20 @@ class TasksCsvExportTestCase(ApiDBTestCase):
         csv_tasks = self.get_raw("/export/csv/time-spents.csv")
         expected_result = """Project;Person;Entity Type Name;Entity;Task Type;Date;Time spent\r
 Cosmos Landromat;John Doe;Props;Tree;Shaders;2023-03-04;500.0\r
+Cosmos Landromat;John Doe;Shot;S01 / P01;Animation;2023-03-05;300.0\r
 """
         self.assertEqual(csv_tasks, expected_result)
+
+    def test_export_arrow(self):
+        response = self.app.get(
+            "/export/csv/time-spents.csv?format=arrow",
+            headers=self.base_headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        table = pyarrow.ipc.open_stream(response.data).read_all()
+        self.assertEqual(table.column("Date").type, pyarrow.date32())
+        self.assertEqual(
+            table.column("Date").to_pylist(),
+            [datetime.date(2023, 3, 4), datetime.date(2023, 3, 5)],
+        )
+        self.assertEqual(table.column("Time spent").to_pylist(), [500, 300])
@@ -99,6 +99,37 @@ class FolderPathTestCase(ApiDBTestCase):
             "shaders/3ds_max",
         )
 
+    def test_get_file_paths(self):
+        self.generate_fixture_working_file("hotfix", revision=4)
+        tasks = [self.shot_task, self.scene_task, self.episode_task, self.task]
+        project_id = self.shot_task.project_id
+
+        result = self.post(
+            f"/data/projects/{project_id}/file-paths",
+            {
+                "paths": [{"task_id": str(task.id)} for task in tasks]
+                + [{"task_id": str(self.task.id), "name": "hotfix"}]
+            },
+            200,
+        )
+
+        expected = [
+            self.post(f"/data/tasks/{task.id}/working-file-path", data, 200)
+            for task, data in [(task, {}) for task in tasks]
+            + [(self.task, {"name": "hotfix"})]
+        ]
+        self.assertEqual(
+            [(path["folder_path"], path["file_name"]) for path in result],
+            [(path["path"], path["name"]) for path in expected],
+        )
+        self.assertEqual(result[-1]["revision"], 5)
+
+        self.post(
+            f"/data/projects/{project_id}/file-paths",
+            {"paths": [{"task_id": str(self.asset.id)}]},
+            400,
+        )
+
     def instance_output_file_path(self, entity, output_type, task_type):
         """
         Ask for the path of an output published on an asset instance seen
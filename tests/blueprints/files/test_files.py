@@ -125,6 +125,47 @@ class FileRoutesTestCase(ApiDBTestCase):
             alias, self.post("/data/entities/guess-from-path", body, 200)
         )
 
+    def test_guess_from_paths(self):
+        self.generate_fixture_task()
+        path = (
+            "/simple/productions/cosmos_landromat/assets/Props/Tree/"
+            "Shaders/blender"
+        )
+
+        result = self.post(
+            "/data/entities/guess-from-paths",
+            {
+                "project_id": str(self.project.id),
+                "file_paths": [path, "/some/test/path"],
+            },
+            200,
+        )
+
+        self.assertEqual(
+            result,
+            [
+                self.post(
+                    "/data/entities/guess-from-path",
+                    {"project_id": str(self.project.id), "file_path": path},
+                    200,
+                ),
+                [],
+            ],
+        )
+        self.post(
+            "/data/entities/guess-from-paths",
+            {"project_id": str(self.project.id), "file_paths": []},
+            400,
+        )
+        self.post(
+            "/data/entities/guess-from-paths",
+            {
+                "project_id": str(self.project.id),
+                "file_paths": [path] * 1001,
+            },
+            400,
+        )
+
     def test_set_file_tree(self):
         result = self.post(
             f"/actions/projects/{self.project.id}/set-file-tree",
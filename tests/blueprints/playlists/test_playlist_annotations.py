@@ -60,3 +60,98 @@ class PlaylistTestCase(ApiDBTestCase):
             {"additions": self.annotations},
             403,
         )
+
+    def test_patch_annotations(self):
+        preview_file = self.generate_fixture_preview_file().serialize()
+        result = self.put(
+            f"actions/preview-files/{preview_file['id']}/patch-annotations",
+            {"additions": self.annotations},
+        )
+        self.assertEqual(result["annotations_version"], 1)
+        self.assertEqual(result["frames"], self.annotations)
+        self.assertEqual(result["removed_times"], [])
+
+        result = self.put(
+            f"actions/preview-files/{preview_file['id']}/patch-annotations",
+            {"deletions": [{"time": 0, "objects": ["obj-1"]}]},
+        )
+        self.assertEqual(result["annotations_version"], 2)
+        self.assertEqual(result["frames"], [])
+        self.assertEqual(result["removed_times"], [0])
+        self.put(
+            "actions/preview-files/unknown/patch-annotations",
+            {"additions": self.annotations},
+            404,
+        )
+
+    def test_get_annotations_of_preview_files(self):
+        preview_file = self.generate_fixture_preview_file().serialize()
+        other_preview_file = self.generate_fixture_preview_file(
+            revision=2
+        ).serialize()
+        self.put(
+            f"actions/preview-files/{preview_file['id']}/update-annotations",
+            {"additions": self.annotations},
+        )
+
+        result = self.post(
+            "data/preview-files/annotations",
+            {
+                "preview_files": [
+                    {"id": preview_file["id"]},
+                    {"id": other_preview_file["id"], "annotations_version": 0},
+                ]
+            },
+            200,
+        )
+        self.assertEqual(
+            result,
+            {
+                preview_file["id"]: {
+                    "annotations_version": 1,
+                    "annotations": self.annotations,
+                }
+            },
+        )
+        result = self.post(
+            "data/preview-files/annotations",
+            {
+                "preview_files": [
+                    {"id": preview_file["id"], "annotations_version": 1}
+                ]
+            },
+            200,
+        )
+        self.assertEqual(result, {})
+
+        self.generate_fixture_user_cg_artist()
+        self.log_in_cg_artist()
+        self.post(
+            "data/preview-files/annotations",
+            {"preview_files": [{"id": preview_file["id"]}]},
+            403,
+        )
+
+    def test_get_annotations_of_preview_files_checks_the_batch(self):
+        preview_file = self.generate_fixture_preview_file().serialize()
+        self.put(
+            f"actions/preview-files/{preview_file['id']}/update-annotations",
+            {"additions": self.annotations},
+        )
+
+        result = self.post(
+            "data/preview-files/annotations",
+            {"preview_files": [{"id": preview_file["id"].upper()}]},
+            200,
+        )
+        self.assertEqual(list(result), [preview_file["id"]])
+        self.post(
+            "data/preview-files/annotations",
+            {"preview_files": [{"id": "not-an-id"}]},
+            400,
+        )
+        self.post(
+            "data/preview-files/annotations",
+            {"preview_files": [{"id": preview_file["id"]}] * 1001},
+            400,
+        )
@@ -4,6 +4,7 @@ from zou.app.models.notification import Notification
 from zou.app.models.person import Person
 from zou.app.models.playlist_share_link import PlaylistShareLink
 from zou.app.services import (
+    notifications_service,
     playlist_sharing_service,
     playlists_service,
     projects_service,
@@ -143,6 +144,32 @@ class PlaylistTestCase(ApiDBTestCase):
             lambda playlist_id: self.delete(f"data/playlists/{playlist_id}")
         )
 
+    def test_the_delete_route_lowers_the_unread_count(self):
+        self.generate_fixture_playlist("Playlist 1")
+        playlist_id = str(self.playlist.id)
+        person_id = self.user["id"]
+        self.assertEqual(
+            notifications_service.get_unread_notifications_count(person_id),
+            0,
+        )
+        notifications_service.create_notification(
+            person_id,
+            author_id=person_id,
+            playlist_id=playlist_id,
+            type="playlist-ready",
+        )
+        self.assertEqual(
+            notifications_service.get_unread_notifications_count(person_id),
+            1,
+        )
+
+        self.delete(f"data/playlists/{playlist_id}")
+
+        self.assertEqual(
+            notifications_service.get_unread_notifications_count(person_id),
+            0,
+        )
+
     def test_remove_playlist_takes_the_dependents_with_it(self):
         """
         PlaylistResource.pre_delete and playlists_service.remove_playlist are
@@ -144,3 +144,67 @@ class ProjectScheduleRouteTestCase(ApiDBTestCase):
         items = self.get(f"{base_path}?episode_id={episode_2_id}")
         object_ids = {item["object_id"] for item in items}
         self.assertEqual(object_ids, {asset_type_character_id})
+
+    def test_get_all_schedule_items(self):
+        path = f"/data/projects/{self.project_id}/schedule-items/all"
+        items = self.get(path)
+
+        self.assertEqual(
+            {item["task_type_id"] for item in items},
+            {self.task_type_id, self.task_type_animation_id},
+        )
+        items = {item["task_type_id"]: item for item in items}
+        # The asset task type shows its asset types, the shot one the
+        # sequences and, in a TV show, the episodes.
+        self.assertEqual(
+            [
+                child["object_id"]
+                for child in items[self.task_type_id]["children"][
+                    "asset_types"
+                ]
+            ],
+            [self.asset_type_id],
+        )
+        children = items[self.task_type_animation_id]["children"]
+        self.assertEqual(
+            [child["object_id"] for child in children["sequences"]],
+            [self.sequence_id],
+        )
+        self.assertEqual(children["sequences"][0]["name"], "S01")
+
+        # They are the items the per kind routes return.
+        sequence_items = self.get(
+            f"/data/projects/{self.project_id}/schedule-items/"
+            f"{self.task_type_animation_id}/sequences"
+        )
+        self.assertEqual(
+            [child["id"] for child in children["sequences"]],
+            [item["id"] for item in sequence_items],
+        )
+
+    def test_get_all_schedule_items_creates_them_once(self):
+        path = f"/data/projects/{self.project_id}/schedule-items/all"
+        captured = self.capture_events("schedule-item:new")
+
+        first = self.get(path)
+        nb_created = len(captured)
+        second = self.get(path)
+
+        self.assertGreater(nb_created, 0)
+        self.assertEqual(len(captured), nb_created)
+        self.assertEqual(first, second)
+
+    def test_get_all_schedule_items_for_episode(self):
+        episode_2 = self.generate_fixture_episode(name="E02")
+        self.generate_fixture_sequence(name="S02", episode_id=episode_2.id)
+        path = f"/data/projects/{self.project_id}/schedule-items/all"
+
+        items = self.get(f"{path}?episode_id={self.episode_id}")
+
+        children = {item["task_type_id"]: item for item in items}[
+            self.task_type_animation_id
+        ]["children"]
+        self.assertEqual(
+            [child["object_id"] for child in children["sequences"]],
+            [self.sequence_id],
+        )
@@ -91,3 +91,29 @@ class ImportCsvCastingTestCase(ApiDBTestCase):
         )
         self.assertEqual(link.label, "fixed")
         self.assertEqual(get_shot(self.e01seq01sh01_id)["nb_entities_out"], 2)
+
+    def test_import_casting_dry_run(self):
+        path = f"/import/csv/projects/{self.project_id}/casting"
+        file_path_fixture = self.get_fixture_file_path("csv/casting.csv")
+        report = self.upload_file(
+            f"{path}?dry_run=true", file_path_fixture, 200
+        )
+        self.assertEqual(EntityLink.query.all(), [])
+        self.assertEqual(report["created"], 12)
+        self.assertEqual(report["skipped"], 2)
+        self.assertEqual(report["rows"][0]["name"], "Environment / Lake")
+        self.assertEqual(report["rows"][10]["action"], "skipped")
+
+        self.upload_csv(path, "casting")
+        report = self.upload_file(
+            f"{path}?dry_run=true", file_path_fixture, 200
+        )
+        self.assertEqual(report["unchanged"], 12)
+        report = self.upload_file(
+            f"{path}?dry_run=true",
+            self.get_fixture_file_path("csv/casting_02.csv"),
+            200,
+        )
+        self.assertEqual(report["created"], 0)
+        self.assertGreater(report["updated"], 0)
+        self.assertEqual(len(EntityLink.query.all()), 18)
@@ -1,7 +1,11 @@
 import os
 
+import fakeredis
+from rq import Queue
+from unittest.mock import patch
+
 from tests.base import ApiDBTestCase
-from zou.app import db
+from zou.app import config, db
 
 from zou.app.models.comment import Comment
 from zou.app.models.entity_type import EntityType
@@ -9,6 +13,7 @@ from zou.app.models.metadata_descriptor import MetadataDescriptor
 from zou.app.models.project import ProjectTaskTypeLink
 from zou.app.models.task import Task
 from zou.app.services import projects_service, shots_service
+from zou.app.stores import queue_store
 
 
 class ImportCsvShotsTestCase(ApiDBTestCase):
@@ -127,6 +132,27 @@ class ImportCsvShotsTestCase(ApiDBTestCase):
         shot = shots[0]
         self.assertEqual(shot["data"].get("contractor", None), "contractor 1")
 
+    def test_import_shots_dry_run(self):
+        path = f"/import/csv/projects/{self.project.id}/shots"
+        self.project.update({"production_type": "tvshow"})
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "shots.csv")
+        )
+        before = self._tmp_csv_files()
+        report = self.upload_file(
+            f"{path}?dry_run=true", file_path_fixture, 200
+        )
+        self.assertEqual(self._tmp_csv_files(), before)
+        self.assertEqual(shots_service.get_shots(), [])
+        self.assertEqual(report["created"], 4)
+        self.assertEqual(report["errors"], [])
+
+        self.upload_file(path, file_path_fixture)
+        report = self.upload_file(
+            f"{path}?dry_run=true&update=true", file_path_fixture, 200
+        )
+        self.assertEqual(report["unchanged"], 4)
+
     def test_import_shots_assignations(self):
         db.session.add(
             ProjectTaskTypeLink(
@@ -220,3 +246,44 @@ class ImportCsvShotsTestCase(ApiDBTestCase):
         self.assertEqual(filled["data"]["frame_out"], 1100)
         self.assertIsInstance(filled["data"]["frame_in"], int)
         self.assertIsInstance(filled["data"]["frame_out"], int)
+
+    def test_import_shots_job_without_a_job_queue(self):
+        path = f"/import/csv/projects/{self.project.id}/shots/jobs"
+        self.project.update({"production_type": "tvshow"})
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "shots.csv")
+        )
+        before = self._tmp_csv_files()
+        job = self.upload_file(path, file_path_fixture)
+        self.assertEqual(self._tmp_csv_files(), before)
+        self.assertEqual(job["status"], "finished")
+        self.assertEqual(job["result"]["created"], 4)
+        self.assertEqual(len(shots_service.get_shots()), 4)
+        shot = shots_service.get_shots()[0]
+        self.assertEqual(shot["data"].get("contractor", None), "contractor 1")
+
+    def test_import_shots_job(self):
+        path = f"/import/csv/projects/{self.project.id}/shots/jobs"
+        self.project.update({"production_type": "tvshow"})
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "shots.csv")
+        )
+        connection = fakeredis.FakeStrictRedis()
+        with patch.object(config, "ENABLE_JOB_QUEUE", True), patch.object(
+            queue_store, "queue_store", connection
+        ), patch.object(
+            queue_store, "job_queue", Queue(connection=connection)
+        ):
+            job = self.upload_file(path, file_path_fixture, 202)
+            self.assertEqual(job["status"], "queued")
+            # The job waits for a worker: nothing is written yet.
+            self.assertEqual(shots_service.get_shots(), [])
+
+            followed = self.get(f"/import/csv/jobs/{job['id']}")
+            self.assertEqual(followed["status"], "queued")
+            self.assertEqual(followed["project_id"], str(self.project.id))
+            self.get("/import/csv/jobs/unknown", 404)
+
+            self.generate_fixture_user_manager()
+            self.log_in_manager()
+            self.get(f"/import/csv/jobs/{job['id']}", 403)
@@ -1,5 +1,8 @@
 import datetime
 import io
+import os
+import shutil
+import tempfile
 from contextlib import redirect_stdout
 from unittest.mock import patch
 
@@ -10,7 +13,7 @@ from tests.base import ApiDBTestCase
 from zou.app.models.person import Person
 from zou.app.services import preview_files_service
 from zou.app.stores import auth_tokens_store, file_store
-from zou.app.utils import commands
+from zou.app.utils import batch, commands
 from zou.app.models.entity_type import EntityType
 from zou.app.models.task_type import TaskType
 from zou.cli import cli
@@ -286,6 +289,103 @@ class RenormalizeMoviePreviewFilesTestCase(ApiDBTestCase):
         self.assertIn(self.preview_file_id, seen_ids)
         self.assertNotIn(non_mp4_id, seen_ids)
 
+    def test_a_restarted_run_skips_the_renormalized_files(self):
+        checkpoint_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, checkpoint_dir)
+        checkpoint_path = os.path.join(checkpoint_dir, "checkpoint")
+        source_path = os.path.join(checkpoint_dir, "source.mp4")
+        with open(source_path, "wb") as source:
+            source.write(b"\x00" * 1024)
+
+        buf = io.StringIO()
+        with redirect_stdout(buf), patch.object(
+            file_store, "exists_movie", return_value=True
+        ), patch.object(
+            file_store, "get_local_movie_path", return_value=source_path
+        ), patch(
+            "zou.app.utils.commands.config.FS_BACKEND", "local"
+        ), patch(
+            "zou.app.utils.commands.config.ENABLE_JOB_QUEUE", False
+        ), patch.object(
+            preview_files_service, "prepare_and_store_movie"
+        ) as mock_prepare:
+            for _ in range(2):
+                commands.renormalize_movie_preview_files(
+                    all_broken=True, checkpoint_path=checkpoint_path
+                )
+
+        mock_prepare.assert_called_once()
+        with open(checkpoint_path) as checkpoint_file:
+            self.assertEqual(
+                checkpoint_file.read().split(), [self.preview_file_id]
+            )
+        output = buf.getvalue()
+        self.assertIn("1 preview files already renormalized, skipped.", output)
+        self.assertIn("Throughput - download: 1 files", output)
+        self.assertIn("Throughput - normalize: 1 files", output)
+
+    def test_a_queued_normalization_is_not_checkpointed(self):
+        checkpoint_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, checkpoint_dir)
+        checkpoint_path = os.path.join(checkpoint_dir, "checkpoint")
+        source_path = os.path.join(checkpoint_dir, "source.mp4")
+        with open(source_path, "wb") as source:
+            source.write(b"\x00" * 1024)
+
+        buf = io.StringIO()
+        with redirect_stdout(buf), patch.object(
+            file_store, "exists_movie", return_value=True
+        ), patch.object(
+            file_store, "get_local_movie_path", return_value=source_path
+        ), patch(
+            "zou.app.utils.commands.config.FS_BACKEND", "local"
+        ), patch(
+            "zou.app.utils.commands.config.ENABLE_JOB_QUEUE", True
+        ), patch(
+            "zou.app.utils.commands.queue_store.job_queue"
+        ) as job_queue:
+            commands.renormalize_movie_preview_files(
+                all_broken=True, checkpoint_path=checkpoint_path
+            )
+
+        job_queue.enqueue.assert_called_once()
+        self.assertFalse(os.path.exists(checkpoint_path))
+        self.assertIn("the checkpoint file does not record", buf.getvalue())
+
+    def test_a_failed_file_is_not_checkpointed(self):
+        checkpoint_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, checkpoint_dir)
+        checkpoint_path = os.path.join(checkpoint_dir, "checkpoint")
+
+        buf = io.StringIO()
+        with redirect_stdout(buf), patch.object(
+            file_store, "exists_movie", return_value=False
+        ):
+            commands.renormalize_movie_preview_files(
+                all_broken=True, checkpoint_path=checkpoint_path
+            )
+
+        self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_files_are_handed_to_a_pool_of_processes(self):
+        calls = []
+
+        def run_in_pool(function, items, processes=1):
+            calls.append((function, items, processes))
+            return []
+
+        with patch.object(batch, "run_in_pool", side_effect=run_in_pool):
+            commands.renormalize_movie_preview_files(
+                all_broken=True, processes=3
+            )
+
+        [(function, items, processes)] = calls
+        self.assertEqual(
+            function, commands._renormalize_movie_preview_file_in_worker
+        )
+        self.assertEqual(items, [(self.preview_file_id, "mp4", 1, 1)])
+        self.assertEqual(processes, 3)
+
     def test_cli_accepts_repeated_preview_file_id_option(self):
         runner = CliRunner()
         with patch.object(
@@ -822,3 +822,67 @@ class CastingReadyStatsTestCase(ApiDBTestCase):
         assets_service.remove_asset(temp_asset_id)
 
         self.assert_ready_counts(1, 1, 1)
+
+    def test_the_stats_follow_the_python_rule(self):
+        """
+        The counts are computed in the database: they must agree with
+        _is_asset_ready for every task, shared and canceled assets included.
+        """
+        self.cast_in_the_shot(self.asset_id, self.asset_character_id)
+        self.set_ready_for(self.asset_id, self.layout_id)
+        self.generate_fixture_project_standard()
+        borrowed = self.generate_fixture_asset(
+            "Borrowed", project_id=self.project_standard.id
+        )
+        borrowed.update({"is_shared": True})
+        canceled = self.generate_fixture_asset("Canceled")
+        canceled.update({"canceled": True, "ready_for": self.compositing_id})
+        self.cast_in_the_shot(
+            self.asset_id,
+            self.asset_character_id,
+            borrowed.id,
+            canceled.id,
+        )
+
+        breakdown_service.refresh_shot_casting_stats({"id": self.shot_id})
+
+        casting = breakdown_service.get_entity_casting(self.shot_id)
+        expected = [
+            sum(
+                breakdown_service._is_asset_ready(
+                    asset, task, self.priority_map
+                )
+                for asset in casting
+            )
+            for task in [
+                self.task_layout,
+                self.task_animation,
+                self.task_compositing,
+            ]
+        ]
+        self.assertEqual(expected, [2, 1, 1])
+        self.assert_ready_counts(*expected)
+
+    def test_refresh_project_casting_stats(self):
+        self.cast_in_the_shot(self.asset_id, self.asset_character_id)
+        self.set_ready_for(self.asset_id, self.animation_id)
+        self.set_ready_for(self.asset_character_id, self.compositing_id)
+        captured = self.capture_events("task:update-casting-stats")
+        with self.collect_statements() as statements:
+            updated = breakdown_service.refresh_project_casting_stats(
+                self.project_id
+            )
+
+        self.assert_ready_counts(2, 2, 1)
+        self.assertEqual(updated, 3)
+        self.assertEqual(
+            len([s for s in statements if s.startswith("UPDATE task")]), 1
+        )
+        self.assertEqual(len(captured), 3)
+
+        # Nothing changed: nothing is written nor announced.
+        self.assertEqual(
+            breakdown_service.refresh_project_casting_stats(self.project_id),
+            0,
+        )
+        self.assertEqual(len(captured), 3)
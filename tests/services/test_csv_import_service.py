@@ -0,0 +1,175 @@
+from unittest.mock import MagicMock, patch
+
+from tests.base import ApiDBTestCase
+
+from zou.app import db
+from zou.app.models.comment import Comment
+from zou.app.models.entity import Entity
+from zou.app.models.project import ProjectTaskTypeLink
+from zou.app.models.task import Task
+from zou.app.services import (
+    csv_import_service,
+    names_service,
+    shots_service,
+)
+
+
+def lines(*rows):
+    """
+    Number given rows the way read_csv_rows does, the header being line 1.
+    """
+    return [(index + 2, row) for index, row in enumerate(rows)]
+
+
+def shot_row(episode, sequence, name, **cells):
+    return {"Episode": episode, "Sequence": sequence, "Name": name, **cells}
+
+
+class ImportShotsTestCase(ApiDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.generate_fixture_project()
+        self.project.update({"production_type": "tvshow"})
+        self.project_id = str(self.project.id)
+        self.generate_fixture_metadata_descriptor(entity_type="Shot")
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_task_status_wip()
+        db.session.add(
+            ProjectTaskTypeLink(
+                project_id=self.project_id,
+                task_type_id=self.task_type_animation.id,
+            )
+        )
+        self.generate_fixture_person()
+        self.person_id = str(self.person.id)
+
+    def import_shots(self, *rows, **kwargs):
+        return csv_import_service.import_shots(
+            self.project_id, lines(*rows), user_id=self.user["id"], **kwargs
+        )
+
+    def test_read_csv_rows(self):
+        file_path = self.get_fixture_file_path("csv/shots.csv")
+        columns, rows = csv_import_service.read_csv_rows(file_path)
+        self.assertEqual(columns[:3], ["Episode", "Sequence", "Name"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0][0], 2)
+        self.assertEqual(rows[0][1]["Contractor"], "contractor 1")
+
+    def test_import_shots(self):
+        report = self.import_shots(
+            shot_row("E01", "SE01", "S01", **{"Frame In": "1", "Out": "10"}),
+            shot_row("E01", "SE01", "S02", Description="Second"),
+            shot_row("E02", "SE01", "S01", Contractor="contractor 1"),
+        )
+        self.assertEqual(report["created"], 3)
+        self.assertEqual(report["errors"], [])
+        self.assertEqual(len(shots_service.get_episodes()), 2)
+        self.assertEqual(len(shots_service.get_sequences()), 2)
+
+        shots = {
+            names_service.get_full_entity_name(shot["id"])[0]: shot
+            for shot in shots_service.get_shots()
+        }
+        self.assertEqual(len(shots), 3)
+        shot = shots["E01 / SE01 / S01"]
+        self.assertEqual(shot["data"]["frame_in"], 1)
+        self.assertEqual(shot["nb_frames"], 10)
+        self.assertEqual(shots["E01 / SE01 / S02"]["description"], "Second")
+        self.assertEqual(
+            shots["E02 / SE01 / S01"]["data"]["contractor"],
+            "contractor 1",
+        )
+        # Every new shot gets a task per shot task type of the production.
+        self.assertEqual(
+            {str(task.entity_id) for task in Task.query.all()},
+            {shot["id"] for shot in shots.values()},
+        )
+
+    def test_import_is_announced_in_one_round_trip_per_event(self):
+        with patch.object(csv_import_service.events, "emit_many") as emit_many:
+            self.import_shots(
+                shot_row("E01", "SE01", "S01"),
+                shot_row("E01", "SE01", "S02"),
+            )
+        calls = {
+            call.args[0]: len(call.args[1])
+            for call in emit_many.call_args_list
+        }
+        self.assertEqual(calls["episode:new"], 1)
+        self.assertEqual(calls["sequence:new"], 1)
+        self.assertEqual(calls["shot:new"], 2)
+        self.assertEqual(calls["task:new"], 2)
+
+    def test_an_invalid_file_writes_nothing(self):
+        report = self.import_shots(
+            shot_row("E01", "SE01", "S01"),
+            shot_row("E01", "SE01", "S02", Frames="many"),
+            shot_row("E01", "SE01", "S03", Animation="unknown status"),
+        )
+        self.assertEqual(
+            [error["line_number"] for error in report["errors"]], [3, 4]
+        )
+        self.assertEqual(Entity.query.all(), [])
+
+    def test_a_missing_column_is_reported_once(self):
+        report = self.import_shots({"Sequence": "SE01", "Name": "S01"})
+        self.assertEqual(len(report["errors"]), 1)
+        self.assertIn("Episode", report["errors"][0]["message"])
+
+    def test_update(self):
+        self.import_shots(
+            shot_row("E01", "SE01", "S01", Description="First"),
+            shot_row("E01", "SE01", "S02", Description="Second"),
+        )
+        rows = (
+            shot_row("E01", "SE01", "S01", Description="Changed"),
+            shot_row("E01", "SE01", "S02", Description="Second"),
+            shot_row("E01", "SE01", "S03"),
+        )
+
+        report = self.import_shots(*rows)
+        self.assertEqual(
+            [row["action"] for row in report["rows"]],
+            ["unchanged", "unchanged", "created"],
+        )
+
+        report = self.import_shots(*rows, is_update=True)
+        self.assertEqual(
+            [row["action"] for row in report["rows"]],
+            ["updated", "unchanged", "unchanged"],
+        )
+        descriptions = sorted(
+            shot["description"] or "" for shot in shots_service.get_shots()
+        )
+        self.assertEqual(descriptions, ["", "Changed", "Second"])
+
+    def test_assignations_and_statuses(self):
+        self.import_shots(
+            shot_row(
+                "E01",
+                "SE01",
+                "S01",
+                Animation=self.task_status_wip.short_name,
+                **{"Animation assignations": "John Doe"},
+            ),
+            shot_row("E01", "SE01", "S02"),
+        )
+        task = Task.query.join(Entity, Entity.id == Task.entity_id).filter(
+            Entity.name == "S01"
+        )[0]
+        self.assertEqual(
+            [str(person.id) for person in task.assignees], [self.person_id]
+        )
+        self.assertEqual(
+            str(task.task_status_id), str(self.task_status_wip.id)
+        )
+        self.assertEqual(len(Comment.query.all()), 1)
+
+    def test_progress_is_reported(self):
+        progress = MagicMock()
+        self.import_shots(shot_row("E01", "SE01", "S01"), progress=progress)
+        stages = [call.args[0] for call in progress.call_args_list]
+        for stage in ["resolve", "validate", "write", "publish", "tasks"]:
+            self.assertIn(stage, stages)
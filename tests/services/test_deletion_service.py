@@ -363,6 +363,8 @@ class RemoveProjectTestCase(DeletionTestCase):
             production_schedule_version_id=version.id,
             task_id=self.task.id,
         )
+        # Applying a version records it on the project.
+        self.project.update({"from_schedule_version_id": derived.id})
         version_id = str(version.id)
         derived_id = str(derived.id)
 
@@ -5,11 +5,17 @@ import tempfile
 from tests.base import ApiDBTestCase
 
 from zou.app.models.entity import Entity
-from zou.app.services import file_tree_service, files_service
+from zou.app.models.output_type import OutputType
+from zou.app.services import (
+    file_tree_service,
+    files_service,
+    projects_service,
+)
 from zou.app.services.exception import (
     MalformedFileTreeException,
     TaskNotFoundException,
     WrongFileTreeFileException,
+    WrongParameterException,
     WrongPathFormatException,
 )
 
@@ -551,6 +557,118 @@ class OutputPathTestCase(FileTreeTestCase):
         )
 
 
+class FilePathsTestCase(FileTreeTestCase):
+    """
+    The batch a pipeline tool asks for when it prepares a whole sequence:
+    every path is the one the single call renders, whatever it mixes.
+    """
+
+    def test_each_path_is_the_one_of_the_single_calls(self):
+        scene_task = self.generate_fixture_scene_task()
+        software = self.software_max.serialize()
+        tasks = [self.task, self.shot_task, scene_task]
+
+        paths = file_tree_service.get_file_paths(
+            str(self.project.id),
+            [
+                {
+                    "task_id": task.id,
+                    "software_id": self.software_max.id,
+                    "revision": 3,
+                }
+                for task in tasks
+            ]
+            + [
+                {
+                    "task_id": self.shot_task.id,
+                    "output_type_id": self.output_type_cache["id"],
+                    "revision": 3,
+                }
+            ],
+            sep="/",
+        )
+
+        self.assertEqual(
+            [
+                file_tree_service.join_path(
+                    path["folder_path"], path["file_name"], "/"
+                )
+                for path in paths
+            ],
+            [
+                file_tree_service.get_working_file_path(
+                    task.serialize(),
+                    software=software,
+                    name="main",
+                    revision=3,
+                    sep="/",
+                )
+                for task in tasks
+            ]
+            + [
+                file_tree_service.get_output_file_path(
+                    self.shot.serialize(),
+                    output_type=self.output_type_cache,
+                    task_type=self.task_type_animation.serialize(),
+                    name="main",
+                    revision=3,
+                    sep="/",
+                )
+            ],
+        )
+        self.assertEqual(paths[1]["entity_id"], str(self.shot.id))
+
+    def test_a_revision_of_zero_takes_the_next_free_one(self):
+        self.generate_fixture_working_file(revision=2)
+        self.generate_fixture_output_file(
+            output_type=OutputType.get(self.output_type_materials["id"]),
+            revision=4,
+            task=self.task,
+        )
+
+        paths = file_tree_service.get_file_paths(
+            str(self.project.id),
+            [
+                {"task_id": self.task.id},
+                {"task_id": self.task.id, "name": "other"},
+                {
+                    "task_id": self.task.id,
+                    "output_type_id": self.output_type_materials["id"],
+                },
+                {"task_id": self.task.id, "revision": 7},
+            ],
+        )
+
+        self.assertEqual([path["revision"] for path in paths], [3, 1, 5, 7])
+
+    def test_a_task_of_another_production_is_refused(self):
+        self.generate_fixture_project_standard()
+        self.generate_fixture_shot_task_standard()
+        with self.assertRaises(WrongParameterException):
+            file_tree_service.get_file_paths(
+                str(self.project.id),
+                [{"task_id": self.shot_task_standard.id}],
+            )
+
+    def test_the_queries_do_not_grow_with_the_number_of_tasks(self):
+        project_id = str(self.project.id)
+        items = [{"task_id": self.shot_task.id, "revision": 1}]
+        for index in range(2, 30):
+            shot = self.generate_fixture_shot(f"P{index:02}")
+            task = self.generate_fixture_shot_task(
+                name=f"Master {index}", shot_id=shot.id
+            )
+            items.append({"task_id": task.id, "revision": 1})
+        file_tree_service.get_file_paths(project_id, items[:1])
+        with self.collect_statements() as statements_for_one:
+            file_tree_service.get_file_paths(project_id, items[:1])
+        with self.collect_statements() as statements:
+            paths = file_tree_service.get_file_paths(project_id, items)
+
+        self.assertEqual(len(statements), len(statements_for_one))
+        self.assertEqual(len({path["folder_path"] for path in paths}), 29)
+
+
 class InstancePathTestCase(FileTreeTestCase):
     """
     The path of what an instance of an asset publishes. The asset comes
@@ -972,6 +1090,84 @@ class GuessFromPathTestCase(FileTreeTestCase):
         )
 
 
+class GuessFromPathsTestCase(FileTreeTestCase):
+    """
+    The batch a DCC sends when it scans a whole publish: every path is read
+    as guess_from_path would, but the lookups are shared between them.
+    """
+
+    paths = [
+        "/simple/productions/cosmos landromat/assets/props/tree/shaders/"
+        "blender",
+        "/simple/productions/cosmos landromat/shots/s01/p01/animation/max",
+        "/simple/productions/cosmos landromat/scenes/s01/sc01/animation/max",
+        "/simple/productions/cosmos landromat/shots/nowhere/p01/animation",
+        "/elsewhere/cosmos landromat/assets",
+    ]
+
+    def test_each_path_gets_the_matches_of_guess_from_path(self):
+        project_id = str(self.project.id)
+
+        results = file_tree_service.guess_from_paths(project_id, self.paths)
+
+        self.assertEqual(
+            results,
+            [
+                file_tree_service.guess_from_path(project_id, path)
+                for path in self.paths
+            ],
+        )
+        self.assertEqual(results[-1], [])
+
+    def test_the_queries_do_not_grow_with_the_number_of_paths(self):
+        """
+        Thousands of paths resolve with one query per template level and
+        kind of data, not one per token.
+        """
+        project_id = str(self.project.id)
+        for index in range(2, 30):
+            self.generate_fixture_shot(f"P{index:02}")
+        shot_paths = [
+            "/simple/productions/cosmos landromat/shots/s01/"
+            f"p{index:02}/animation/max"
+            for index in range(1, 30)
+        ]
+        file_tree_service.guess_from_paths(project_id, self.paths)
+
+        with self.collect_statements() as statements_for_one:
+            file_tree_service.guess_from_paths(project_id, shot_paths[:1])
+        with self.collect_statements() as statements:
+            results = file_tree_service.guess_from_paths(
+                project_id, shot_paths
+            )
+
+        self.assertEqual(len(statements), len(statements_for_one))
+        self.assertEqual(
+            len({result[0]["Shot"] for result in results}), len(shot_paths)
+        )
+
+    def test_a_changed_tree_is_compiled_again(self):
+        project_id = str(self.project.id)
+        path = "/simple/productions/cosmos landromat/e01/s01/p01"
+        matches = file_tree_service.guess_from_paths(project_id, [path])[0]
+        self.assertFalse(any("Episode" in match for match in matches))
+        tree = copy.deepcopy(self.project.file_tree)
+        tree["working"]["folder_path"][
+            "shot"
+        ] = "<Project>/<Episode>/<Sequence>/<Shot>"
+        projects_service.update_project(project_id, {"file_tree": tree})
+
+        matches = {
+            match["Template"]: match
+            for match in file_tree_service.guess_from_paths(
+                project_id, [path]
+            )[0]
+        }
+
+        self.assertEqual(matches["shot"]["Shot"], str(self.shot.id))
+        self.assertEqual(matches["shot"]["Episode"], str(self.episode.id))
+
+
 class HelpersTestCase(ApiDBTestCase):
     """
     The string helpers the rendering is built on.
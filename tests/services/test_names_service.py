@@ -1,7 +1,19 @@
+from unittest.mock import patch
+
 from tests.base import ApiDBTestCase
 
 from zou.app.models.entity import Entity
-from zou.app.services import files_service, names_service
+from zou.app.services import (
+    assets_service,
+    breakdown_service,
+    deletion_service,
+    entities_service,
+    files_service,
+    names_service,
+    shots_service,
+)
+from zou.app.services.exception import EntityNotFoundException
+from zou.app.stores import entity_names_store
 
 
 class NamesServiceTestCase(ApiDBTestCase):
@@ -90,6 +102,99 @@ class NamesServiceTestCase(ApiDBTestCase):
     def test_get_full_entity_names_of_nothing(self):
         self.assertEqual(names_service.get_full_entity_names([]), {})
 
+    def test_get_full_entity_name_of_an_unknown_entity(self):
+        with self.assertRaises(EntityNotFoundException):
+            names_service.get_full_entity_name(
+                "00000000-0000-0000-0000-000000000000"
+            )
+
+    def test_warm_lookups_run_no_query(self):
+        entity_ids = [str(self.shot.id), str(self.asset.id)]
+        sequence_id = str(self.sequence.id)
+        expected = names_service.get_full_entity_names(entity_ids)
+        with self.collect_statements() as statements:
+            names = names_service.get_full_entity_names(entity_ids)
+            # The whole project was stored by the first lookup.
+            sequence_name = names_service.get_full_entity_name(sequence_id)
+
+        self.assertEqual(statements, [])
+        self.assertEqual(names, expected)
+        self.assertEqual(sequence_name[0], "E01 / S01")
+
+    def test_renaming_a_parent_renames_its_children(self):
+        names_service.get_full_entity_names([str(self.shot.id)])
+
+        self.put(f"/data/entities/{self.sequence.id}", {"name": "S99"})
+
+        self.assertEqual(
+            names_service.get_full_entity_name(self.shot.id)[0],
+            "E01 / S99 / P01",
+        )
+
+    def test_moving_an_asset_to_another_episode_drops_its_names(self):
+        names_service.get_full_entity_names([str(self.asset.id)])
+        episode = self.generate_fixture_episode("E02")
+
+        assets_service.update_asset(
+            str(self.asset.id), {"source_id": episode.id}
+        )
+
+        self.assertEqual(
+            names_service.get_full_entity_name(self.asset.id)[1],
+            str(episode.id),
+        )
+
+    def test_names_are_kept_when_no_name_field_changes(self):
+        names_service.get_full_entity_names([str(self.shot.id)])
+
+        shots_service.update_shot(str(self.shot.id), {"nb_frames": 12})
+        breakdown_service.update_casting(
+            str(self.shot.id),
+            [{"asset_id": str(self.asset.id), "nb_occurences": 1}],
+        )
+        self.assertIn(
+            str(self.shot.id),
+            entity_names_store.get_names([str(self.shot.id)]),
+        )
+
+        shots_service.update_shot(str(self.shot.id), {"preview_file_id": None})
+        self.assertEqual(entity_names_store.get_names([self.shot.id]), {})
+
+    def test_removing_the_main_preview_drops_the_names(self):
+        preview_file = files_service.create_preview_file(
+            "main", 1, self.shot_task["id"], self.user["id"], source="webgui"
+        )
+        entities_service.update_entity_preview(
+            str(self.shot.id), preview_file["id"]
+        )
+        self.assertEqual(
+            names_service.get_full_entity_name(self.shot.id)[2],
+            preview_file["id"],
+        )
+
+        deletion_service.remove_preview_file_by_id(preview_file["id"])
+
+        self.assertIsNone(names_service.get_full_entity_name(self.shot.id)[2])
+
+    def test_a_new_entity_is_named_once_its_project_is_stored(self):
+        names_service.get_full_entity_names([str(self.shot.id)])
+
+        shot = self.generate_fixture_shot("P02")
+
+        self.assertEqual(
+            names_service.get_full_entity_name(shot.id)[0], "E01 / S01 / P02"
+        )
+
+    def test_names_are_built_from_the_database_without_the_store(self):
+        with patch.object(entity_names_store, "get_names", return_value=None):
+            names = names_service.get_full_entity_names(
+                [str(self.shot.id), str(self.asset.id)]
+            )
+
+        self.assertEqual(names[str(self.shot.id)][0], "E01 / S01 / P01")
+        self.assertEqual(names[str(self.asset.id)][0], "Props / Tree")
+        self.assertEqual(entity_names_store.get_names([self.shot.id]), {})
+
     def test_get_preview_file_name(self):
         preview_file = files_service.create_preview_file(
             "main", 3, self.shot_task["id"], self.user["id"], source="webgui"
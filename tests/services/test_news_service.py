@@ -13,6 +13,7 @@ from zou.app.services import (
     news_service,
     projects_service,
 )
+from zou.app.services.exception import WrongParameterException
 
 UNKNOWN = "00000000-0000-0000-0000-000000000000"
 
@@ -59,6 +60,42 @@ class NewsWritingTestCase(ApiDBTestCase):
         # are counted by the stats.
         self.assertFalse(news_list[0].change)
 
+    def test_the_news_carries_what_the_feed_filters_on(self):
+        news = news_service.create_news_for_task_and_comment(
+            self.task_dict, self.comment
+        )
+
+        stored = News.get(news["id"])
+        self.assertEqual(
+            (
+                str(stored.project_id),
+                str(stored.task_type_id),
+                str(stored.entity_id),
+                str(stored.task_status_id),
+            ),
+            (
+                self.task_dict["project_id"],
+                self.task_dict["task_type_id"],
+                self.task_dict["entity_id"],
+                self.comment["task_status_id"],
+            ),
+        )
+
+    def test_update_news_status_for_comment(self):
+        self.generate_fixture_task_status_wip()
+        news = news_service.create_news_for_task_and_comment(
+            self.task_dict, self.comment
+        )
+
+        news_service.update_news_status_for_comment(
+            self.comment["id"], self.task_status_wip.id
+        )
+
+        self.assertEqual(
+            str(News.get(news["id"]).task_status_id),
+            str(self.task_status_wip.id),
+        )
+
     def test_creating_from_a_comment_announces_the_news(self):
         captured = self.capture_events("news:new")
 
@@ -243,6 +280,68 @@ class NewsListingTestCase(ApiDBTestCase):
             [entry["id"] for entry in news[:4]],
         )
 
+    def test_the_listing_pages_by_cursor(self):
+        # Two news share their creation date: the id tells them apart.
+        news = [
+            self.a_news(f"comment {day}", created_at=self.days_ago(day))
+            for day in [0, 1, 1, 2, 3]
+        ]
+        expected = sorted(
+            news,
+            key=lambda entry: (entry["created_at"], entry["id"]),
+            reverse=True,
+        )
+
+        received = []
+        cursor = {}
+        while cursor is not None:
+            result = self.listing(limit=2, **cursor)
+            received += [entry["id"] for entry in result["data"]]
+            cursor = result["cursor"]
+            self.assertEqual(result["total"], 5)
+
+        self.assertEqual(received, [entry["id"] for entry in expected])
+
+    def test_the_listing_pages_within_the_same_second(self):
+        # A bulk change: all the news are created within one second.
+        second = datetime(2024, 1, 1, 10, 0, 0)
+        news = [
+            self.a_news(
+                f"comment {microseconds}",
+                created_at=second.replace(microsecond=microseconds),
+            )
+            for microseconds in [250000, 750000, 500000, 500000, 0]
+        ]
+        expected = self.listing(limit=5)["data"]
+
+        received = []
+        cursor = {}
+        while cursor is not None:
+            result = self.listing(limit=2, **cursor)
+            received += [entry["id"] for entry in result["data"]]
+            cursor = result["cursor"]
+
+        self.assertEqual(len(expected), len(news))
+        self.assertEqual(received, [entry["id"] for entry in expected])
+
+    def test_the_listing_cursor_needs_a_date(self):
+        with self.assertRaises(WrongParameterException):
+            self.listing(before_id=str(self.task.id))
+
+    def test_the_listing_total_can_be_estimated_or_skipped(self):
+        for day in range(3):
+            self.a_news(f"comment {day}", created_at=self.days_ago(day))
+
+        estimated = self.listing(total_mode="approximate")
+        skipped = self.listing(total_mode="none")
+
+        self.assertIsInstance(estimated["total"], int)
+        self.assertEqual(len(estimated["data"]), 3)
+        self.assertEqual((skipped["total"], skipped["nb_pages"]), (None, None))
+        self.assertEqual(len(skipped["data"]), 3)
+        with self.assertRaises(WrongParameterException):
+            self.listing(total_mode="guess")
+
     def test_the_listing_holds_one_named_news(self):
         news = self.a_news("wanted")
         self.a_news("other")
@@ -382,6 +382,53 @@ class CommentNotificationTestCase(NotificationsTestCase):
         )
         self.assertIsNotNone(Notification.get(notification["id"]))
 
+    def test_create_notifications(self):
+        notifications = notifications_service.create_notifications(
+            [self.assignee_id, self.outsider_id, self.assignee_id],
+            comment_id=self.comment["id"],
+            author_id=self.comment["person_id"],
+            task_id=self.comment["object_id"],
+        )
+        self.assertEqual(
+            [notification["person_id"] for notification in notifications],
+            [self.assignee_id, self.outsider_id],
+        )
+        self.assertEqual(
+            self.kinds(),
+            sorted(
+                [
+                    ("comment", self.assignee_id),
+                    ("comment", self.outsider_id),
+                ]
+            ),
+        )
+
+    def test_create_notifications_skips_unknown_people(self):
+        notifications = notifications_service.create_notifications(
+            [self.assignee_id, "d24b3d5a-7c84-4a39-8a21-5b1b9f0c1a2e"],
+            comment_id=self.comment["id"],
+            author_id=self.comment["person_id"],
+            task_id=self.comment["object_id"],
+        )
+        self.assertEqual(len(notifications), 1)
+        self.assertEqual(self.kinds(), [("comment", self.assignee_id)])
+
+    def test_comment_notifications_are_published_at_once(self):
+        self.comment["mentions"] = [self.outsider_id]
+        with patch.object(
+            notifications_service.events, "emit_many"
+        ) as emit_many:
+            notifications_service.create_notifications_for_task_and_comment(
+                self.task_dict, self.comment
+            )
+        emit_many.assert_called_once()
+        event, payloads = emit_many.call_args.args
+        self.assertEqual(event, "notification:new")
+        self.assertEqual(
+            sorted(payload["person_id"] for payload in payloads),
+            sorted([self.assignee_id, self.outsider_id]),
+        )
+
     def test_create_notifications_for_task_and_comment(self):
         notifications_service.create_notifications_for_task_and_comment(
             self.task_dict, self.comment
@@ -7,11 +7,18 @@ from zou.app import db
 from zou.app.models.build_job import BuildJob
 from zou.app.models.playlist import Playlist
 from zou.app.services import (
+    deletion_service,
+    files_service,
     playlists_service,
     entities_service,
+    preview_files_service,
     projects_service,
 )
-from zou.app.services.exception import PlaylistLockTimeoutException
+from zou.app.stores import playlist_payloads_store
+from zou.app.services.exception import (
+    PlaylistLockTimeoutException,
+    PlaylistNotFoundException,
+)
 
 
 class PlaylistsServiceTestCase(ApiDBTestCase):
@@ -231,6 +238,34 @@ class PlaylistsServiceTestCase(ApiDBTestCase):
         self.assertEqual(asset["parent_name"], "Props")
         self.assertEqual(asset["preview_files"], {})
 
+    def test_generate_temp_playlist_with_a_fixed_number_of_queries(self):
+        self.generate_fixture_preview_files()
+        task_ids = [self.task.id]
+        for index in range(6):
+            shot = self.generate_fixture_shot(f"P1{index}")
+            task = self.generate_fixture_shot_task(shot_id=shot.id)
+            self.generate_fixture_preview_file(revision=1, task_id=task.id)
+            task_ids.append(task.id)
+
+        counts = []
+        playlists_service.generate_temp_playlist(task_ids[:2])
+        for selection in [task_ids[:2], task_ids]:
+            with self.collect_statements() as statements:
+                entities = playlists_service.generate_temp_playlist(selection)
+            self.assertEqual(len(entities), len(selection))
+            counts.append(len(statements))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(
+            [entity["name"] for entity in entities],
+            ["P01"] + [f"P1{index}" for index in range(6)],
+        )
+        self.assertTrue(
+            all(entity["sequence_name"] == "S01" for entity in entities)
+        )
+        self.assertTrue(
+            all("preview_file_id" in entity for entity in entities)
+        )
+
     def test_get_preview_files_for_task(self):
         self.generate_fixture_preview_files()
         task_id = self.task.id
@@ -520,3 +555,170 @@ class PlaylistsServiceTestCase(ApiDBTestCase):
         self.assertEqual(
             playlists_service.end_build_job(playlist, job, True), {}
         )
+
+
+class PlaylistPayloadCacheTestCase(ApiDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_episode()
+        self.generate_fixture_sequence()
+        self.generate_fixture_shot()
+        self.generate_fixture_department()
+        self.generate_fixture_task_status()
+        self.generate_fixture_task_type()
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.task = self.generate_fixture_shot_task()
+        self.preview_file = self.generate_fixture_preview_file(revision=1)
+        self.playlist = Playlist.create(
+            name="Playlist",
+            shots=[
+                {
+                    "entity_id": str(self.shot.id),
+                    "preview_file_id": str(self.preview_file.id),
+                }
+            ],
+            project_id=self.project.id,
+        )
+        self.playlist_id = str(self.playlist.id)
+
+    def get_revisions(self):
+        playlist = playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        return [
+            preview["revision"]
+            for previews in playlist["shots"][0]["preview_files"].values()
+            for preview in previews
+        ]
+
+    def test_a_second_open_is_served_from_the_cache(self):
+        with self.collect_statements() as first_statements:
+            first = playlists_service.get_playlist_with_preview_file_revisions(
+                self.playlist_id
+            )
+        with self.collect_statements() as second_statements:
+            second = (
+                playlists_service.get_playlist_with_preview_file_revisions(
+                    self.playlist_id
+                )
+            )
+        self.assertGreater(len(first_statements), 0)
+        self.assertEqual(second_statements, [])
+        self.assertEqual(first, second)
+        self.assertEqual(
+            second["shots"][0]["preview_file_id"], str(self.preview_file.id)
+        )
+
+    def test_the_payloads_with_and_without_annotations_are_apart(self):
+        full = playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        light = playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id, with_annotations=False
+        )
+        self.assertIn("preview_file_annotations", full["shots"][0])
+        self.assertNotIn("preview_file_annotations", light["shots"][0])
+
+    def test_a_new_preview_invalidates_the_playlists_of_its_entity(self):
+        self.assertEqual(self.get_revisions(), [1])
+        files_service.create_preview_file(
+            "new", 2, str(self.task.id), str(self.person.id)
+        )
+        self.assertEqual(self.get_revisions(), [2, 1])
+
+    def test_a_removed_preview_invalidates_the_playlists_of_its_entity(self):
+        preview_file = files_service.create_preview_file(
+            "new", 2, str(self.task.id), str(self.person.id)
+        )
+        self.assertEqual(self.get_revisions(), [2, 1])
+        deletion_service.remove_preview_file_by_id(preview_file["id"])
+        self.assertEqual(self.get_revisions(), [1])
+
+    def test_an_updated_preview_invalidates_the_playlists_of_its_entity(self):
+        playlist = playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        self.assertEqual(playlist["shots"][0]["preview_file_width"], 0)
+        preview_files_service.update_preview_file(
+            str(self.preview_file.id), {"width": 1920}
+        )
+        playlist = playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        self.assertEqual(playlist["shots"][0]["preview_file_width"], 1920)
+
+    def test_a_reordered_preview_invalidates_the_playlists_of_its_entity(
+        self,
+    ):
+        second = self.generate_fixture_preview_file(revision=1, name="second")
+        playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        revision = playlist_payloads_store.get_revision(self.playlist_id)
+
+        preview_files_service.update_preview_file_position(str(second.id), 1)
+        self.assertEqual(
+            playlist_payloads_store.get_revision(self.playlist_id),
+            revision + 1,
+        )
+
+    def test_an_edit_of_the_playlist_invalidates_it(self):
+        playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        shot = self.generate_fixture_shot("SH02")
+        playlists_service.add_entity_to_playlist(
+            self.playlist_id, str(shot.id)
+        )
+        playlist = playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        self.assertEqual(len(playlist["shots"]), 2)
+
+        playlists_service.start_build_job(playlist)
+        playlist = playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        self.assertEqual(len(playlist["build_jobs"]), 1)
+
+    def test_a_renamed_or_reordered_task_type_invalidates_the_playlists(
+        self,
+    ):
+        task_type_id = str(self.task.task_type_id)
+        playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        revision = playlist_payloads_store.get_revision(self.playlist_id)
+
+        self.put(f"/data/task-types/{task_type_id}", {"color": "#000000"})
+        self.assertEqual(
+            playlist_payloads_store.get_revision(self.playlist_id), revision
+        )
+        self.put(f"/data/task-types/{task_type_id}", {"name": "Animation 2"})
+        self.assertEqual(
+            playlist_payloads_store.get_revision(self.playlist_id),
+            revision + 1,
+        )
+        self.post(
+            "/actions/task-types/reorder",
+            {"task_type_ids": [task_type_id]},
+            200,
+        )
+        self.assertEqual(
+            playlist_payloads_store.get_revision(self.playlist_id),
+            revision + 2,
+        )
+
+    def test_a_removed_playlist_is_not_served_anymore(self):
+        playlists_service.get_playlist_with_preview_file_revisions(
+            self.playlist_id
+        )
+        playlists_service.remove_playlist(self.playlist_id)
+        self.assertRaises(
+            PlaylistNotFoundException,
+            playlists_service.get_playlist_with_preview_file_revisions,
+            self.playlist_id,
+        )
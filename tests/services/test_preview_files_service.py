@@ -1,20 +1,25 @@
+import datetime
 import os
 import shutil
 import tempfile
+import threading
 import unittest
+import uuid
 from contextlib import contextmanager
 from types import SimpleNamespace
 from unittest.mock import patch
 
+from flask_fs.errors import FileNotFound
 from sqlalchemy.orm.exc import StaleDataError
 
 from tests.base import ApiDBTestCase
 
 
+from zou.app import config
 from zou.app.models.preview_file import PreviewFile
 from zou.app.services import files_service, preview_files_service
-from zou.app.stores import file_store
-from zou.app.utils import thumbnail as thumbnail_utils
+from zou.app.stores import file_store, preview_cache_store
+from zou.app.utils import batch, thumbnail as thumbnail_utils
 from zou.utils import movie
 from zou.app.services.exception import (
     AnnotationLockTimeoutException,
@@ -272,6 +277,8 @@ class PreviewFileServiceTestCase(PreviewFileTestCase):
             [2, 1],
         )
 
+    @patch("zou.app.services.preview_files_service.movie.get_tile_layout")
+    @patch("zou.app.services.preview_files_service.file_store.add_picture")
     @patch("zou.app.services.preview_files_service.movie.generate_tile")
     @patch("zou.app.services.preview_files_service.save_variants")
     @patch(
@@ -289,6 +296,8 @@ class PreviewFileServiceTestCase(PreviewFileTestCase):
         mock_turn_thumbnail,
         mock_save_variants,
         mock_gen_tile,
+        mock_add_picture,
+        mock_tile_layout,
     ):
         preview_file = self.generate_fixture_preview_file(status="processing")
         preview_file_id = str(preview_file.id)
@@ -306,9 +315,15 @@ class PreviewFileServiceTestCase(PreviewFileTestCase):
             with open(p, "wb") as f:
                 f.write(b"\x00" * 512)
 
+        tile_path = uploaded_path + "_tile.png"
+        with open(tile_path, "wb") as f:
+            f.write(b"\x00" * 512)
+        tile_layout = {"columns": 8, "rows": 2, "frame_step": 1}
+
         mock_normalize.return_value = (norm_path, norm_low_path, None)
         mock_gen_thumbnail.return_value = norm_path
-        mock_gen_tile.return_value = norm_path
+        mock_gen_tile.return_value = tile_path
+        mock_tile_layout.return_value = tile_layout
 
         original_width = 720
         original_height = 1280
@@ -367,9 +382,12 @@ class PreviewFileServiceTestCase(PreviewFileTestCase):
             persisted["data"]["original_duration"], original_duration
         )
         self.assertEqual(persisted["data"]["original_file_size"], 1024)
+        # The frame index of the tile sheet built at upload
+        self.assertEqual(mock_gen_tile.call_args.kwargs["layout"], tile_layout)
+        self.assertEqual(persisted["data"]["tile"], tile_layout)
 
         # Clean up
-        for p in (uploaded_path, norm_path, norm_low_path):
+        for p in (uploaded_path, norm_path, norm_low_path, tile_path):
             if os.path.exists(p):
                 os.remove(p)
 
@@ -701,6 +719,31 @@ class PreviewFileServiceTestCase(PreviewFileTestCase):
         self.assertIsNone(extract_frame_from_preview_file(preview_file, 1))
         self.assertIsNone(extract_tile_from_preview_file(preview_file))
 
+    @patch("zou.app.services.preview_files_service.movie.generate_tile")
+    @patch("zou.app.services.preview_files_service.movie.get_tile_layout")
+    @patch("zou.app.services.preview_files_service.fs.get_file_path_and_file")
+    def test_extract_tile_saves_its_layout(
+        self, mock_get_file, mock_tile_layout, mock_gen_tile
+    ):
+        preview_file = self.generate_fixture_preview_file()
+        tile_layout = {"columns": 8, "rows": 2, "frame_step": 1}
+        mock_get_file.return_value = "movie.mp4"
+        mock_tile_layout.return_value = tile_layout
+        mock_gen_tile.return_value = "tile.png"
+
+        self.assertEqual(
+            extract_tile_from_preview_file(preview_file.serialize()),
+            "tile.png",
+        )
+
+        mock_gen_tile.assert_called_once_with("movie.mp4", layout=tile_layout)
+        self.assertEqual(
+            files_service.get_preview_file(str(preview_file.id))["data"][
+                "tile"
+            ],
+            tile_layout,
+        )
+
 
 class PreviewFileAnnotationsTestCase(PreviewFileTestCase):
     """
@@ -860,6 +903,87 @@ class PreviewFileAnnotationsTestCase(PreviewFileTestCase):
             )
         )
 
+    def test_a_patch_sends_back_the_frames_it_touches(self):
+        self.annotate(additions=self.at_zero + self.at_two)
+
+        result = preview_files_service.patch_preview_file_annotations(
+            self.user_id,
+            self.project_id,
+            self.preview_file_id,
+            additions=self.also_at_zero,
+            deletions=[{"time": "2", "objects": ["obj2"]}],
+        )
+
+        self.assertEqual(result["annotations_version"], 2)
+        self.assertEqual(
+            result["frames"],
+            [
+                {
+                    "time": "0",
+                    "drawing": {
+                        "objects": [
+                            self.at_zero[0]["drawing"]["objects"][0],
+                            self.also_at_zero[0]["drawing"]["objects"][0],
+                        ]
+                    },
+                }
+            ],
+        )
+        self.assertEqual(result["removed_times"], ["2"])
+        self.assertEqual(
+            files_service.get_preview_file(self.preview_file_id)[
+                "annotations"
+            ],
+            result["frames"],
+        )
+
+    def test_only_the_annotations_that_changed_are_sent_back(self):
+        self.annotate(additions=self.at_zero)
+        untouched_id = str(self.generate_fixture_preview_file(revision=2).id)
+        unknown_id = str(uuid.uuid4())
+
+        result = preview_files_service.get_changed_annotations(
+            {
+                self.preview_file_id: 0,
+                untouched_id: 0,
+                unknown_id: 0,
+            }
+        )
+
+        self.assertEqual(
+            result,
+            {
+                self.preview_file_id: {
+                    "annotations_version": 1,
+                    "annotations": self.at_zero,
+                },
+                unknown_id: None,
+            },
+        )
+        self.assertEqual(
+            preview_files_service.get_changed_annotations(
+                {self.preview_file_id: 1}
+            ),
+            {},
+        )
+
+    def test_the_ids_are_read_whatever_their_case(self):
+        self.annotate(additions=self.at_zero)
+
+        result = preview_files_service.get_changed_annotations(
+            {self.preview_file_id.upper(): 0}
+        )
+
+        self.assertEqual(
+            result,
+            {
+                self.preview_file_id: {
+                    "annotations_version": 1,
+                    "annotations": self.at_zero,
+                }
+            },
+        )
+
 
 class NormalizeAnnotationTimesTestCase(unittest.TestCase):
     """
@@ -1530,6 +1654,154 @@ class ResetPictureFilesMetadataTestCase(ApiDBTestCase):
         )
 
 
+class GeneratePreviewExtraTestCase(ApiDBTestCase):
+    """
+    The backfill of tiles, thumbnails and metadata, one preview after
+    another or through a pool of worker processes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.generate_base_context()
+        self.generate_fixture_asset()
+        self.generate_fixture_task()
+        self.preview_file = self.generate_fixture_preview_file()
+        path = file_store.get_local_movie_path(
+            "previews", str(self.preview_file.id)
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as movie_file:
+            movie_file.write(b"\x00" * 1024)
+        self.addCleanup(os.remove, path)
+
+    @patch("zou.app.services.preview_files_service.file_store.add_picture")
+    @patch("zou.app.services.preview_files_service.movie.generate_tile")
+    @patch("zou.app.services.preview_files_service.movie.get_tile_layout")
+    def test_tiles_are_stored_with_their_frame_index(
+        self, mock_layout, mock_generate_tile, mock_add_picture
+    ):
+        layout = {
+            "columns": 8,
+            "rows": 480,
+            "width": 178,
+            "height": 100,
+            "frame_step": 7,
+            "nb_frames": 3572,
+        }
+        mock_layout.return_value = layout
+        tile = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
+        tile.close()
+        mock_generate_tile.return_value = tile.name
+
+        total = preview_files_service.generate_preview_extra(
+            with_tiles=True, force_regenerate_tiles=True
+        )
+
+        self.assertEqual(total, 1)
+        mock_generate_tile.assert_called_once()
+        self.assertEqual(mock_generate_tile.call_args.kwargs["layout"], layout)
+        mock_add_picture.assert_called_once()
+        self.assertFalse(os.path.exists(tile.name))
+        preview_file = PreviewFile.get(self.preview_file.id)
+        self.assertEqual(preview_file.data["tile"], layout)
+
+    def test_previews_are_handed_to_a_pool_of_processes(self):
+        calls = []
+
+        def run_in_pool(function, items, processes=1):
+            calls.append((function, items, processes))
+            return []
+
+        with patch.object(batch, "run_in_pool", side_effect=run_in_pool):
+            total = preview_files_service.generate_preview_extra(
+                with_tiles=True, processes=4
+            )
+
+        self.assertEqual(total, 1)
+        [(function, items, processes)] = calls
+        self.assertEqual(
+            function,
+            preview_files_service._generate_preview_file_extra_in_worker,
+        )
+        self.assertEqual(processes, 4)
+        [(preview_file_id, index, nb_items, options)] = items
+        self.assertEqual(preview_file_id, str(self.preview_file.id))
+        self.assertEqual((index, nb_items), (1, 1))
+        self.assertTrue(options["with_tiles"])
+
+    @patch("zou.app.services.preview_files_service.file_store.add_picture")
+    @patch("zou.app.services.preview_files_service.movie.generate_tile")
+    @patch("zou.app.services.preview_files_service.movie.get_tile_layout")
+    def test_a_restarted_run_skips_the_previews_done(
+        self, mock_layout, mock_generate_tile, mock_add_picture
+    ):
+        mock_layout.return_value = {"rows": 1}
+
+        def generate_tile(movie_path, layout=None):
+            tile = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
+            tile.close()
+            return tile.name
+
+        mock_generate_tile.side_effect = generate_tile
+        checkpoint_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, checkpoint_dir)
+        checkpoint_path = os.path.join(checkpoint_dir, "checkpoint")
+
+        for _ in range(2):
+            preview_files_service.generate_preview_extra(
+                with_tiles=True,
+                force_regenerate_tiles=True,
+                checkpoint_path=checkpoint_path,
+            )
+
+        mock_generate_tile.assert_called_once()
+        with open(checkpoint_path) as checkpoint_file:
+            self.assertEqual(
+                checkpoint_file.read().split(), [str(self.preview_file.id)]
+            )
+
+    @patch("zou.app.services.preview_files_service.movie.get_tile_layout")
+    def test_a_failed_preview_is_not_checkpointed(self, mock_layout):
+        mock_layout.side_effect = RuntimeError("no ffprobe")
+        checkpoint_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, checkpoint_dir)
+        checkpoint_path = os.path.join(checkpoint_dir, "checkpoint")
+
+        preview_files_service.generate_preview_extra(
+            with_tiles=True,
+            force_regenerate_tiles=True,
+            checkpoint_path=checkpoint_path,
+        )
+
+        self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_recent_priority_puts_the_last_commented_tasks_first(self):
+        first = self.preview_file
+        newer = self.generate_fixture_preview_file(revision=2)
+        other_task = self.generate_fixture_task(name="Other")
+        commented = self.generate_fixture_preview_file(
+            revision=1, task_id=other_task.id
+        )
+        other_task.update({"last_comment_date": datetime.datetime(2030, 1, 1)})
+
+        ids = [
+            str(preview_file.id)
+            for preview_file in PreviewFile.query.order_by(
+                *preview_files_service.get_preview_files_priority_order(
+                    "recent"
+                )
+            )
+        ]
+        self.assertEqual(
+            ids, [str(commented.id), str(newer.id), str(first.id)]
+        )
+        self.assertRaises(
+            WrongParameterException,
+            preview_files_service.get_preview_files_priority_order,
+            "random",
+        )
+
+
 class ResetMovieFilesMetadataTestCase(ApiDBTestCase):
     """
     Same backfill as the picture one, reading the movie dimensions and
@@ -1561,3 +1833,158 @@ class ResetMovieFilesMetadataTestCase(ApiDBTestCase):
         )
         self.assertEqual(preview_file.file_size, os.path.getsize(path))
         self.assertGreater(preview_file.duration, 0)
+
+
+class PreviewCacheWarmupTestCase(ApiDBTestCase):
+    """
+    With a remote storage, the files of a processed movie preview are
+    downloaded into the cache of each node before anyone asks for them.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.preview_file_id = str(uuid.uuid4())
+
+    @contextmanager
+    def remote_storage(self):
+        with patch.object(config, "FS_BACKEND", "s3"), patch.object(
+            config, "TMP_DIR", self.tmp_dir
+        ), patch.object(config, "PREVIEW_CACHE_WARMUP", True):
+            yield
+
+    def test_warm_preview_cache(self):
+        stored = {
+            ("lowdef", self.preview_file_id): [b"low", b"def"],
+            ("thumbnails", self.preview_file_id): [b"thumbnail"],
+            ("tiles", self.preview_file_id): [b"tile"],
+        }
+
+        def open_file(prefix, instance_id):
+            if (prefix, instance_id) not in stored:
+                raise FileNotFound
+            return iter(stored[(prefix, instance_id)])
+
+        with self.remote_storage(), patch.object(
+            file_store, "open_movie", side_effect=open_file
+        ) as open_movie, patch.object(
+            file_store, "open_picture", side_effect=open_file
+        ), patch(
+            "zou.app.utils.fs.time.sleep"
+        ):
+            file_paths = preview_files_service.warm_preview_cache(
+                self.preview_file_id
+            )
+
+        self.assertEqual(
+            [os.path.basename(path) for path in file_paths],
+            [
+                f"cache-lowdef-{self.preview_file_id}.mp4",
+                f"cache-thumbnails-{self.preview_file_id}.png",
+                f"cache-tiles-{self.preview_file_id}.png",
+            ],
+        )
+        with open(file_paths[0], "rb") as f:
+            self.assertEqual(f.read(), b"lowdef")
+        # The high def movie is only a fallback for a missing low def one.
+        self.assertEqual(
+            [call.args[0] for call in open_movie.call_args_list], ["lowdef"]
+        )
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir)),
+            sorted(os.path.basename(path) for path in file_paths),
+        )
+
+    def test_warm_preview_cache_with_local_storage(self):
+        with patch.object(file_store, "open_movie") as open_movie:
+            self.assertEqual(
+                preview_files_service.warm_preview_cache(self.preview_file_id),
+                [],
+            )
+        open_movie.assert_not_called()
+
+    def test_warmup_is_broadcast_and_claimed_once_per_host(self):
+        received = []
+        stop_event = threading.Event()
+
+        def handle(preview_file_id):
+            received.append(preview_file_id)
+            stop_event.set()
+
+        pubsub = preview_cache_store.preview_cache_store.pubsub(
+            ignore_subscribe_messages=True
+        )
+        pubsub.subscribe(preview_cache_store.CHANNEL)
+        preview_files_service.request_preview_cache_warmup(
+            self.preview_file_id
+        )
+        self.assertIsNone(pubsub.get_message(timeout=0.1))
+        pubsub.close()
+
+        listener = threading.Thread(
+            target=preview_cache_store.listen,
+            args=(handle, stop_event, 0.1),
+        )
+        listener.start()
+        with self.remote_storage():
+            for _ in range(50):
+                preview_files_service.request_preview_cache_warmup(
+                    self.preview_file_id
+                )
+                if stop_event.wait(0.1):
+                    break
+        stop_event.set()
+        listener.join()
+        self.assertEqual(received, [self.preview_file_id])
+
+        self.assertTrue(
+            preview_cache_store.claim_warmup("node-1", self.preview_file_id)
+        )
+        self.assertFalse(
+            preview_cache_store.claim_warmup("node-1", self.preview_file_id)
+        )
+        self.assertTrue(
+            preview_cache_store.claim_warmup("node-2", self.preview_file_id)
+        )
+
+    def test_failed_warmup_is_retried(self):
+        with self.remote_storage(), patch.object(
+            preview_files_service, "warm_preview_cache", return_value=[]
+        ) as warm:
+            preview_files_service.handle_preview_cache_warmup(
+                "node-1", self.preview_file_id
+            )
+            preview_files_service.handle_preview_cache_warmup(
+                "node-1", self.preview_file_id
+            )
+        self.assertEqual(warm.call_count, 2)
+
+        with self.remote_storage(), patch.object(
+            preview_files_service,
+            "warm_preview_cache",
+            return_value=["cache-lowdef.mp4"],
+        ) as warm:
+            preview_files_service.handle_preview_cache_warmup(
+                "node-1", self.preview_file_id
+            )
+            preview_files_service.handle_preview_cache_warmup(
+                "node-1", self.preview_file_id
+            )
+        warm.assert_called_once()
+
+    def test_listener_starts_with_the_first_request(self):
+        from flask import Flask
+        from zou.app import start_preview_cache_warmup
+
+        app = Flask(__name__)
+        app.add_url_rule("/", "index", lambda: "")
+        with self.remote_storage(), patch.object(
+            preview_files_service, "start_preview_cache_warmup_listener"
+        ) as start_listener:
+            start_preview_cache_warmup(app, config)
+            start_listener.assert_not_called()
+            client = app.test_client()
+            client.get("/")
+            client.get("/")
+        start_listener.assert_called_once_with(app)
@@ -1,8 +1,13 @@
 from datetime import datetime
+from unittest.mock import patch
+
+import fakeredis
+from rq import Queue
 
 from tests.base import ApiDBTestCase
 
-from zou.app import db
+from zou.app import config, db
+from zou.app.models.event import ApiEvent
 from zou.app.models.entity import Entity
 from zou.app.models.milestone import Milestone
 from zou.app.models.schedule_item import ScheduleItem
@@ -18,6 +23,7 @@ from zou.app.services.exception import (
     ProductionScheduleVersionNotFoundException,
     WrongParameterException,
 )
+from zou.app.stores import queue_store
 
 
 class ScheduleTestCase(ApiDBTestCase):
@@ -873,6 +879,129 @@ class ProductionScheduleVersionTestCase(ScheduleTestCase):
             [event["task_id"] for event in events], [str(self.task.id)]
         )
 
+    def test_apply_production_schedule_version_by_chunks(self):
+        other_task = self._make_task("second", self.shot.id, [])
+        psv = ProductionScheduleVersion.create(
+            name="v1", project_id=self.project.id
+        )
+        schedule_service.set_production_schedule_version_task_links_from_production(
+            str(psv.id)
+        )
+        ProductionScheduleVersionTaskLink.query.filter_by(
+            production_schedule_version_id=psv.id
+        ).update({"estimation": 12})
+        db.session.commit()
+        task_events = self.capture_events("task:update")
+        progress = []
+
+        with patch.object(schedule_service, "TASK_LINKS_CHUNK_SIZE", 1):
+            result = schedule_service.apply_production_schedule_version_to_production(
+                str(psv.id),
+                progress=lambda *args: progress.append(args),
+            )
+
+        self.assertEqual(result, {"success": True, "task_count": 2})
+        self.assertEqual(Task.get(self.task.id).estimation, 12)
+        self.assertEqual(Task.get(other_task.id).estimation, 12)
+        self.assertEqual(
+            progress,
+            [("apply-to-production", 1, 2), ("apply-to-production", 2, 2)],
+        )
+        self.assertEqual(
+            {event["task_id"] for event in task_events},
+            {str(self.task.id), str(other_task.id)},
+        )
+        # The progress events are only sent, the task updates are stored.
+        self.assertEqual(
+            ApiEvent.query.filter_by(
+                name="production_schedule_version:progress"
+            ).count(),
+            0,
+        )
+        self.assertEqual(
+            ApiEvent.query.filter_by(name="task:update").count(), 2
+        )
+
+    def test_set_production_schedule_version_task_links_by_chunks(self):
+        other_task = self._make_task("second", self.shot.id, [self.assigner])
+        psv = ProductionScheduleVersion.create(
+            name="v1", project_id=self.project.id
+        )
+        progress = []
+
+        with patch.object(schedule_service, "TASK_LINKS_CHUNK_SIZE", 1):
+            summary = schedule_service.set_production_schedule_version_task_links_from_production(
+                str(psv.id), progress=lambda *args: progress.append(args)
+            )
+
+        self.assertEqual(summary["task_link_count"], 2)
+        self.assertEqual(
+            [done for _, done, _ in progress],
+            [1, 2],
+        )
+        self.assertEqual(
+            self._assignees_by_task(psv.id)[str(other_task.id)],
+            {str(self.assigner.id)},
+        )
+
+    def test_production_schedule_version_job(self):
+        psv = ProductionScheduleVersion.create(
+            name="v1", project_id=self.project.id
+        )
+        connection = fakeredis.FakeStrictRedis()
+        with patch.object(config, "ENABLE_JOB_QUEUE", True), patch.object(
+            queue_store, "queue_store", connection
+        ), patch.object(
+            queue_store, "job_queue", Queue(connection=connection)
+        ):
+            job = self.post(
+                f"/actions/production-schedule-versions/{psv.id}"
+                "/set-task-links-from-production?background=true",
+                {},
+                202,
+            )
+            self.assertEqual(job["status"], "queued")
+            self.assertEqual(
+                job["operation"], "set-task-links-from-production"
+            )
+            # The job waits for a worker: nothing is copied yet.
+            self.assertEqual(
+                ProductionScheduleVersionTaskLink.query.filter_by(
+                    production_schedule_version_id=psv.id
+                ).count(),
+                0,
+            )
+
+            followed = self.get(
+                f"/data/production-schedule-versions/jobs/{job['id']}"
+            )
+            self.assertEqual(followed["project_id"], self.project_id)
+            self.get("/data/production-schedule-versions/jobs/unknown", 404)
+
+        result = schedule_service.run_production_schedule_version_job(
+            "set-task-links-from-production", str(psv.id)
+        )
+        self.assertEqual(result["task_link_count"], 1)
+
+    def test_production_schedule_version_job_without_a_job_queue(self):
+        psv = ProductionScheduleVersion.create(
+            name="v1", project_id=self.project.id
+        )
+        schedule_service.set_production_schedule_version_task_links_from_production(
+            str(psv.id)
+        )
+
+        job = self.post(
+            f"/actions/production-schedule-versions/{psv.id}"
+            "/apply-to-production?background=true",
+            {},
+            200,
+        )
+
+        self.assertEqual(job["status"], "finished")
+        self.assertEqual(job["result"], {"success": True, "task_count": 1})
+        self.assertTrue(ProductionScheduleVersion.get(psv.id).locked)
+
     def test_get_production_schedule_version_task_links_route(self):
         psv = ProductionScheduleVersion.create(
             name="v1", project_id=self.project.id
@@ -8,6 +8,7 @@ from sqlalchemy.exc import IntegrityError
 from tests.base import ApiDBTestCase
 
 from zou.app.models.entity import Entity, EntityLink
+from zou.app.models.studio import Studio
 from zou.app.models.task import Task
 from zou.app.services import (
     breakdown_service,
@@ -937,6 +938,70 @@ class QuotaTestCase(ShotsTestCase):
             [],
         )
 
+    def test_weighted_quotas_split_a_shot_by_the_time_spent_on_it(self):
+        """
+        Summed by the database: each person gets the share of the frames
+        matching the share of the task time they logged that day.
+        """
+        self.generate_shot_task()
+        self.shot.update({"nb_frames": 100})
+        self.shot_task.update(
+            {"end_date": fields.get_date_object("2018-06-10")}
+        )
+        tasks_service.create_or_update_time_spent(
+            str(self.shot_task.id), str(self.person.id), "2018-06-04", 250
+        )
+        tasks_service.create_or_update_time_spent(
+            str(self.shot_task.id), self.user["id"], "2018-06-04", 750
+        )
+
+        quotas = shots_service.get_weighted_quotas(
+            str(self.project.id), str(self.task_type_animation.id)
+        )
+
+        day = "2018-06-04"
+        self.assertEqual(quotas[str(self.person.id)]["day"]["frames"][day], 25)
+        self.assertEqual(quotas[self.user["id"]]["day"]["frames"][day], 75)
+        self.assertEqual(quotas["total"]["day"]["frames"], {day: 100})
+        self.assertEqual(quotas["total"]["day"]["count"], {day: 2})
+        self.assertEqual(quotas["total"]["week"]["count"], {"2018-23": 2})
+
+    def test_raw_quotas_land_on_the_local_day_of_the_studio_tasks(self):
+        """
+        The feedback date is truncated to the user's day by the database,
+        and a studio only counts the tasks one of its people is assigned to.
+        """
+        self.generate_shot_task()
+        self.shot.update({"nb_frames": 100})
+        tasks_service.assign_task(str(self.shot_task.id), str(self.person.id))
+        self.shot_task.update(
+            {
+                "end_date": fields.get_date_object(
+                    "2024-12-16T18:00:00", "%Y-%m-%dT%H:%M:%S"
+                )
+            }
+        )
+        studio = Studio.create(name="Blue Spirit", color="#000000")
+        args = dict(
+            project_id=str(self.project.id),
+            task_type_id=str(self.task_type_animation.id),
+            studio_id=str(studio.id),
+        )
+
+        with patch.object(
+            shots_service.user_service,
+            "get_timezone",
+            return_value="Asia/Kuala_Lumpur",
+        ):
+            self.assertEqual(shots_service.get_raw_quotas(**args), {})
+            self.person.update({"studio_id": studio.id})
+            quotas = shots_service.get_raw_quotas(**args)
+
+        self.assertEqual(
+            quotas[str(self.person.id)]["day"]["frames"], {"2024-12-17": 100}
+        )
+        self.assertEqual(quotas["total"]["year"]["count"], {"2024": 1})
+
 
 class FramesFromPreviewTestCase(ShotsTestCase):
     """
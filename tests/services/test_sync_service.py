@@ -19,10 +19,27 @@ from zou.app.models.entity_type import EntityType
 from zou.app.models.playlist import Playlist
 from zou.app.models.project import Project
 from zou.app.models.studio import Studio
+from zou.app.models.task import Task
 from zou.app.models.task_status import TaskStatus
 from zou.app.services import news_service, sync_service
 
 
+def older_source(test_case):
+    """
+    Make the source answer 404 on the NDJSON exports, as an instance
+    predating them does: the sync falls back to the paginated routes.
+    """
+    patcher = mock.patch.object(
+        sync_service,
+        "fetch_ndjson",
+        side_effect=sync_service.gazu.exception.RouteNotFoundException(
+            "export/ndjson"
+        ),
+    )
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+
+
 class EventMapTestCase(unittest.TestCase):
     """
     The maps every listener reads before it runs. They are plain module
@@ -293,6 +310,195 @@ class EntryCallbackTestCase(ApiDBTestCase):
         self.assertIsNone(Project.get(self.remote_project_id))
 
 
+class SyncEventBufferTestCase(unittest.TestCase):
+    """
+    The queue of the change daemon: one entry per object, whatever the
+    number of events received for it.
+    """
+
+    def test_changes_on_the_same_object_are_merged(self):
+        buffer = sync_service.SyncEventBuffer()
+        task_id = str(uuid.uuid4())
+        buffer.push("task", "update", {"task_id": task_id, "name": "a"})
+        buffer.push("task", "update", {"task_id": task_id, "name": "b"})
+        buffer.push("task", "update", {"task_id": str(uuid.uuid4())})
+        self.assertEqual(len(buffer), 2)
+        changes = buffer.pop_batch(timeout=0)
+        self.assertEqual(changes[0]["data"]["name"], "b")
+        self.assertEqual(len(buffer), 0)
+
+    def test_an_updated_creation_stays_a_creation(self):
+        buffer = sync_service.SyncEventBuffer()
+        task_id = str(uuid.uuid4())
+        buffer.push("task", "new", {"task_id": task_id})
+        buffer.push("task", "update", {"task_id": task_id})
+        self.assertEqual(buffer.pop_batch(timeout=0)[0]["event_type"], "new")
+
+    def test_a_deletion_wins_over_the_previous_changes(self):
+        buffer = sync_service.SyncEventBuffer()
+        task_id = str(uuid.uuid4())
+        buffer.push("task", "new", {"task_id": task_id})
+        buffer.push("task", "delete", {"task_id": task_id})
+        self.assertEqual(
+            buffer.pop_batch(timeout=0)[0]["event_type"], "delete"
+        )
+
+    def test_a_full_batch_is_returned_without_waiting(self):
+        buffer = sync_service.SyncEventBuffer(batch_size=2, flush_interval=60)
+        buffer.push("task", "new", {"task_id": str(uuid.uuid4())})
+        buffer.push("task", "new", {"task_id": str(uuid.uuid4())})
+        self.assertEqual(len(buffer.pop_batch()), 2)
+
+    def test_a_full_queue_blocks_the_listener_until_the_next_flush(self):
+        buffer = sync_service.SyncEventBuffer(batch_size=1, max_size=1)
+        buffer.push("task", "new", {"task_id": str(uuid.uuid4())})
+        pushed = threading.Event()
+
+        def push():
+            buffer.push("task", "new", {"task_id": str(uuid.uuid4())})
+            pushed.set()
+
+        thread = threading.Thread(target=push)
+        thread.start()
+        self.assertFalse(pushed.wait(0.2))
+        self.assertEqual(len(buffer.pop_batch(timeout=0)), 1)
+        thread.join(timeout=5)
+        self.assertTrue(pushed.is_set())
+        self.assertEqual(len(buffer), 1)
+
+
+class ApplySyncChangesTestCase(ApiDBTestCase):
+    """
+    A flushed batch: one fetch per model through the list routes, one
+    deletion per model, every change announced locally.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_asset()
+
+    def remote_project(self, name):
+        return {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "project_status_id": str(self.open_status.id),
+            "team": [],
+            "type": "Project",
+        }
+
+    def test_the_changes_of_a_model_are_fetched_at_once(self):
+        projects = [self.remote_project(f"Remote {i}") for i in range(3)]
+        buffer = sync_service.SyncEventBuffer()
+        for project in projects:
+            buffer.push("project", "new", {"project_id": project["id"]})
+        captured = self.capture_events("project:new")
+        with mock.patch.object(
+            sync_service.gazu.client,
+            "fetch_all",
+            return_value=[dict(project) for project in projects],
+        ) as fetch_all:
+            sync_service.apply_sync_changes(buffer.pop_batch(timeout=0))
+        fetch_all.assert_called_once()
+        self.assertEqual(fetch_all.call_args[0][0], "projects")
+        for project in projects:
+            self.assertIsNotNone(Project.get(project["id"]))
+        self.assertEqual(len(captured), 3)
+
+    def test_entities_are_fetched_from_the_entity_route(self):
+        with mock.patch.object(
+            sync_service.gazu.client, "fetch_all", return_value=[]
+        ) as fetch_all:
+            sync_service.fetch_instances("shot", [str(uuid.uuid4())])
+        self.assertEqual(fetch_all.call_args[0][0], "entities")
+
+    def test_the_ids_are_sent_by_chunks(self):
+        ids = [str(uuid.uuid4()) for _ in range(5)]
+        with mock.patch.object(
+            sync_service.gazu.client, "fetch_all", return_value=[]
+        ) as fetch_all:
+            sync_service.fetch_instances("task", ids, chunk_size=2)
+        self.assertEqual(fetch_all.call_count, 3)
+
+    def test_deleted_rows_are_dropped_without_fetching(self):
+        asset_id = str(self.asset.id)
+        captured = self.capture_events("asset:delete")
+        with mock.patch.object(
+            sync_service.gazu.client, "fetch_all"
+        ) as fetch_all:
+            sync_service.apply_sync_changes(
+                [
+                    {
+                        "event_name": "asset",
+                        "event_type": "delete",
+                        "id": asset_id,
+                        "data": {"asset_id": asset_id},
+                        "received_at": 0,
+                    }
+                ]
+            )
+        fetch_all.assert_not_called()
+        self.assertIsNone(Entity.get(asset_id))
+        self.assertEqual(len(captured), 1)
+
+    def test_a_failed_model_is_skipped_and_not_forwarded(self):
+        project = self.remote_project("Remote")
+        asset_id = str(self.asset.id)
+        captured_projects = self.capture_events("project:new")
+        captured_assets = self.capture_events("asset:delete")
+        with mock.patch.object(
+            sync_service.gazu.client,
+            "fetch_all",
+            side_effect=sync_service.gazu.exception.RouteNotFoundException(
+                "no such route"
+            ),
+        ):
+            sync_service.apply_sync_changes(
+                [
+                    {
+                        "event_name": "project",
+                        "event_type": "new",
+                        "id": project["id"],
+                        "data": {"project_id": project["id"]},
+                        "received_at": 0,
+                    },
+                    {
+                        "event_name": "asset",
+                        "event_type": "delete",
+                        "id": asset_id,
+                        "data": {"asset_id": asset_id},
+                        "received_at": 0,
+                    },
+                ]
+            )
+        self.assertIsNone(Project.get(project["id"]))
+        self.assertEqual(captured_projects, [])
+        self.assertIsNone(Entity.get(asset_id))
+        self.assertEqual(len(captured_assets), 1)
+
+    def test_an_error_on_a_model_keeps_the_rest_of_the_batch(self):
+        projects = [self.remote_project(f"Remote {i}") for i in range(2)]
+        buffer = sync_service.SyncEventBuffer()
+        for project in projects:
+            buffer.push("project", "new", {"project_id": project["id"]})
+        buffer.push("task", "update", {"task_id": str(uuid.uuid4())})
+        captured = self.capture_events("project:new")
+
+        def fetch_all(path, params=None):
+            if path == "tasks":
+                raise ValueError("broken payload")
+            return [dict(project) for project in projects]
+
+        with mock.patch.object(
+            sync_service.gazu.client, "fetch_all", side_effect=fetch_all
+        ):
+            sync_service.apply_sync_changes(buffer.pop_batch(timeout=0))
+        for project in projects:
+            self.assertIsNotNone(Project.get(project["id"]))
+        self.assertEqual(len(captured), 2)
+
+
 class ForwardEventTestCase(ApiDBTestCase):
     """
     Events that carry no data to import: they are only rebroadcast to the
@@ -422,9 +628,14 @@ class FileCallbackTestCase(ApiDBTestCase):
 
 class SyncEntriesTestCase(ApiDBTestCase):
     """
-    The cross-production bulk import.
+    The cross-production bulk import, from a source without streamed
+    exports.
     """
 
+    def setUp(self):
+        super().setUp()
+        older_source(self)
+
     def test_every_page_is_walked(self):
         pages = [
             {
@@ -543,6 +754,7 @@ class SyncProjectEntriesTestCase(ApiDBTestCase):
 
     def setUp(self):
         super().setUp()
+        older_source(self)
         self.generate_fixture_project_status()
         self.generate_fixture_project()
         self.project = self.project.serialize()
@@ -600,6 +812,98 @@ class SyncProjectEntriesTestCase(ApiDBTestCase):
         self.assertEqual(Playlist.query.count(), 2)
 
 
+class StreamedSyncTestCase(ApiDBTestCase):
+    """
+    The bulk imports from a source serving NDJSON exports: rows are
+    imported by batches as they arrive.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.project = self.project.serialize()
+
+    def stream(self, rows):
+        return mock.patch.object(
+            sync_service, "fetch_ndjson", return_value=iter(rows)
+        )
+
+    def test_a_cross_production_model_is_streamed(self):
+        rows = [
+            {"id": str(uuid.uuid4()), "name": name, "color": "#000000"}
+            for name in ["Blue", "Red", "Green"]
+        ]
+        with self.stream(rows) as fetch_ndjson, mock.patch.object(
+            sync_service.gazu.client, "fetch_all"
+        ) as fetch_all:
+            sync_service.sync_entries("studios", Studio)
+        fetch_ndjson.assert_called_once_with("export/ndjson/studios")
+        fetch_all.assert_not_called()
+        self.assertEqual(Studio.query.count(), 3)
+
+    def test_the_streamed_concept_task_statuses_are_dropped(self):
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": name,
+                "short_name": name.lower(),
+                "color": "#000000",
+                "for_concept": name == "Concept",
+            }
+            for name in ["Concept", "Todo"]
+        ]
+        with self.stream(rows):
+            sync_service.sync_entries("task-status", TaskStatus)
+        self.assertEqual(
+            [status.name for status in TaskStatus.get_all()], ["Todo"]
+        )
+
+    def test_a_single_production_is_not_streamed(self):
+        with self.stream([]) as fetch_ndjson, mock.patch.object(
+            sync_service.gazu.project,
+            "get_project_by_name",
+            return_value={"id": self.project["id"]},
+        ), mock.patch.object(
+            sync_service.gazu.client,
+            "fetch_all",
+            return_value={"data": [], "nb_pages": 1},
+        ):
+            sync_service.sync_entries("projects", Project, project="Cosmos")
+        fetch_ndjson.assert_not_called()
+
+    def test_a_production_model_is_imported_by_batches(self):
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": f"Playlist {i}",
+                "project_id": self.project["id"],
+            }
+            for i in range(5)
+        ]
+        with self.stream(rows) as fetch_ndjson, mock.patch.object(
+            Playlist,
+            "create_from_import_list",
+            wraps=Playlist.create_from_import_list,
+        ) as import_list:
+            total = sync_service.import_ndjson(
+                f"export/ndjson/projects/{self.project['id']}/playlists",
+                Playlist,
+                batch_size=2,
+            )
+        self.assertEqual(total, 5)
+        self.assertEqual(import_list.call_count, 3)
+        self.assertEqual(Playlist.query.count(), 5)
+        fetch_ndjson.assert_called_once()
+
+    def test_the_production_path_is_streamed(self):
+        with self.stream([]) as fetch_ndjson:
+            sync_service.sync_project_entries(self.project, "tasks", Task)
+        fetch_ndjson.assert_called_once_with(
+            f"export/ndjson/projects/{self.project['id']}/tasks"
+        )
+
+
 class RunMainDataSyncTestCase(ApiDBTestCase):
     """
     The pass importing everything that is not scoped to a production, the
@@ -608,6 +912,7 @@ class RunMainDataSyncTestCase(ApiDBTestCase):
 
     def setUp(self):
         super().setUp()
+        older_source(self)
         self.generate_fixture_project_status()
         self.remote_project_id = str(uuid.uuid4())
 
@@ -1,7 +1,10 @@
+import datetime
+
 from tests.base import ApiDBTestCase
 
 from zou.app import db
 from zou.app.models.studio import Studio
+from zou.app.models.time_spent import TimeSpent, TimeSpentDay
 from zou.app.services import tasks_service, time_spents_service
 from zou.app.services.exception import WrongDateFormatException
 
@@ -118,6 +121,74 @@ class TimeSpentTableTestCase(TimeSpentsTestCase):
         )
 
 
+class TimeSpentDayTestCase(TimeSpentsTestCase):
+    """
+    The daily rollups the tables read, kept in step with the time spents.
+    """
+
+    def days(self):
+        return {
+            (str(day.person_id), str(day.task_type_id), str(day.date)): (
+                day.duration
+            )
+            for day in TimeSpentDay.query.all()
+        }
+
+    def test_the_rollups_follow_the_time_spents(self):
+        task_type_id = str(self.task_type.id)
+        key = (self.person_id, task_type_id, "2018-06-04")
+        self.assertEqual(self.days()[key], 500)
+
+        self.log(self.task_id, "2018-06-04", 200)
+        self.assertEqual(self.days()[key], 200)
+
+        tasks_service.create_or_update_time_spent(
+            self.task_id, self.person_id, "2018-06-04", 100, add=True
+        )
+        self.assertEqual(self.days()[key], 300)
+
+        tasks_service.delete_time_spent(
+            self.task_id, self.person_id, "2018-06-04"
+        )
+        self.assertNotIn(key, self.days())
+        self.assertEqual(len(self.days()), 5)
+
+    def test_the_rollups_follow_the_imported_time_spents(self):
+        task_type_id = str(self.task_type.id)
+        key = (self.person_id, task_type_id, "2018-06-04")
+        time_spent = TimeSpent.get_by(
+            task_id=self.task_id,
+            person_id=self.person_id,
+            date=datetime.date(2018, 6, 4),
+        ).serialize()
+
+        TimeSpent.create_from_import({**time_spent, "duration": 200})
+        self.assertEqual(self.days()[key], 200)
+
+        # Moved to another day by the source instance.
+        TimeSpent.create_from_import_list(
+            [{**time_spent, "date": "2018-06-09", "duration": 300}]
+        )
+        self.assertNotIn(key, self.days())
+        self.assertEqual(
+            self.days()[(self.person_id, task_type_id, "2018-06-09")], 300
+        )
+
+        TimeSpent.delete_from_import(time_spent["id"])
+        self.assertNotIn(
+            (self.person_id, task_type_id, "2018-06-09"), self.days()
+        )
+
+    def test_rebuild_the_rollups(self):
+        expected = self.days()
+        TimeSpentDay.query.delete()
+        db.session.commit()
+        self.assertEqual(time_spents_service.get_year_table(), {})
+
+        time_spents_service.refresh_time_spent_days()
+        self.assertEqual(self.days(), expected)
+
+
 class TimeSpentScopeTestCase(TimeSpentsTestCase):
     """
     Which hours a reading is allowed to sum. The resources hand these
@@ -8,6 +8,7 @@ from tests.base import ApiDBTestCase
 
 from zou.app import app
 from zou.app.models.entity import Entity
+from zou.app.models.notification import Notification
 from zou.app.models.person import Person
 from zou.app.models.project import Project
 from zou.app.models.search_filter import SearchFilter
@@ -15,6 +16,9 @@ from zou.app.models.search_filter_group import SearchFilterGroup
 from zou.app.models.task import Task
 from zou.app.services import (
     comments_service,
+    deletion_service,
+    notifications_service,
+    persons_service,
     projects_service,
     tasks_service,
     user_service,
@@ -26,6 +30,7 @@ from zou.app.services.exception import (
     SearchFilterGroupNotFoundException,
     WrongParameterException,
 )
+from zou.app.stores import notification_counts_store
 
 UNKNOWN = "00000000-0000-0000-0000-000000000000"
 
@@ -200,6 +205,58 @@ class NotificationTestCase(UserContextTestCase):
         self.assertEqual(self.texts(read=False), [])
         self.assertEqual(self.texts(read=True), ["Lets go"])
 
+    def test_the_bell_is_paged_by_date_and_id(self):
+        """
+        Notifications sharing a creation date are told apart by their id,
+        so walking the pages neither skips nor repeats any.
+        """
+        for text in ["one", "two", "three", "four"]:
+            self.a_comment(text=text)
+        notifications = (
+            Notification.query.filter_by(person_id=self.artist["id"])
+            .order_by(Notification.id)
+            .all()
+        )
+        # Two share a date, the others fall within the same second: the
+        # cursor must keep the microseconds.
+        for notification, created_at in zip(
+            notifications,
+            [
+                "2024-01-01T10:00:00.250000",
+                "2024-01-01T10:00:00.750000",
+                "2024-01-01T10:00:00.500000",
+                "2024-01-01T10:00:00.500000",
+            ],
+        ):
+            notification.created_at = created_at
+        Notification.commit()
+        first_page = self.bell()
+        self.assertEqual(len(first_page), 4)
+        self.assertEqual(
+            [notification["id"] for notification in first_page],
+            [
+                str(notification.id)
+                for notification in [
+                    notifications[1],
+                    notifications[3],
+                    notifications[2],
+                    notifications[0],
+                ]
+            ],
+        )
+
+        seen = []
+        before, before_id = None, None
+        while True:
+            page = self.bell(before=before, before_id=before_id)
+            if len(page) == 0:
+                break
+            seen.append(page[0]["id"])
+            before, before_id = page[0]["created_at"], page[0]["id"]
+        self.assertEqual(
+            seen, [notification["id"] for notification in first_page]
+        )
+
     def test_the_bell_holds_what_is_being_watched(self):
         self.a_comment(text="Lets go")
 
@@ -217,7 +274,12 @@ class NotificationTestCase(UserContextTestCase):
         These reach the query as raw values, so the driver used to reject
         them and the route answered 500 where the caller made the mistake.
         """
-        for field in ["notification_id", "task_type_id", "task_status_id"]:
+        for field in [
+            "notification_id",
+            "task_type_id",
+            "task_status_id",
+            "before_id",
+        ]:
             with self.subTest(field=field):
                 with self.assertRaises(WrongParameterException):
                     self.bell(**{field: "notanid"})
@@ -293,6 +355,45 @@ class NotificationTestCase(UserContextTestCase):
             user_service.mark_notifications_as_read()
             self.assertEqual(user_service.get_unread_notifications_count(), 0)
 
+    def test_the_unread_count_is_served_from_the_store(self):
+        self.a_comment(text="Lets go")
+        with self.as_user(self.artist):
+            self.assertEqual(user_service.get_unread_notifications_count(), 1)
+            person_id = persons_service.get_current_user()["id"]
+        self.assertEqual(notification_counts_store.get(person_id), 1)
+
+        Notification.query.delete()
+        with self.as_user(self.artist):
+            self.assertEqual(user_service.get_unread_notifications_count(), 1)
+        notifications_service.reconcile_unread_notifications_counts()
+        with self.as_user(self.artist):
+            self.assertEqual(user_service.get_unread_notifications_count(), 0)
+
+    def test_the_unread_count_follows_the_notifications(self):
+        self.a_comment(text="Lets go")
+        with self.as_user(self.artist):
+            self.assertEqual(user_service.get_unread_notifications_count(), 1)
+        self.a_comment(text="And again")
+        notification = self.bell()[0]
+
+        with self.as_user(self.artist):
+            self.assertEqual(user_service.get_unread_notifications_count(), 2)
+            user_service.update_notification(notification["id"], True)
+            user_service.update_notification(notification["id"], True)
+            self.assertEqual(user_service.get_unread_notifications_count(), 1)
+            user_service.update_notification(notification["id"], False)
+            self.assertEqual(user_service.get_unread_notifications_count(), 2)
+
+    def test_the_unread_count_follows_deleted_notifications(self):
+        comment = self.a_comment(text="Lets go")
+        self.a_comment(text="And again")
+        with self.as_user(self.artist):
+            self.assertEqual(user_service.get_unread_notifications_count(), 2)
+
+        deletion_service.remove_comment(comment["id"])
+        with self.as_user(self.artist):
+            self.assertEqual(user_service.get_unread_notifications_count(), 1)
+
 
 class SavedSearchTestCase(UserContextTestCase):
     """
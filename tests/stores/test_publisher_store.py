@@ -0,0 +1,63 @@
+import fakeredis
+
+from unittest.mock import patch
+
+from flask_socketio import SocketIO
+
+from tests.base import ApiTestCase
+
+from zou.app.stores import publisher_store
+
+
+class PublisherStoreTestCase(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.socketio = SocketIO(message_queue="redis://localhost:6379/15")
+        self.manager = self.socketio.server.manager
+        self.redis = fakeredis.FakeStrictRedis(decode_responses=True)
+        self.pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(self.manager.channel)
+        patcher = patch.multiple(
+            publisher_store,
+            socketio=self.socketio,
+            publisher_store=self.redis,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.pubsub.close)
+
+    def get_published(self):
+        # The first read only gets the subscription confirmation.
+        messages = []
+        for _ in range(10):
+            message = self.pubsub.get_message(timeout=0.01)
+            if message is not None:
+                messages.append(message["data"])
+        return messages
+
+    def test_publish_many_publishes_what_emit_does(self):
+        events = [
+            ("notification:new", {"notification_id": "1"}),
+            ("notification:new", {"notification_id": "2"}),
+        ]
+        emitted = []
+        with patch.object(
+            self.manager,
+            "_publish",
+            side_effect=lambda message: emitted.append(
+                self.manager.json.dumps(message)
+            ),
+        ):
+            for event, data in events:
+                self.socketio.emit(event, data, namespace="/events")
+
+        publisher_store.publish_many(events)
+
+        self.assertEqual(self.get_published(), emitted)
+
+    def test_publish_many_leaves_the_manager_connection_alone(self):
+        with patch.object(self.manager, "_publish") as publish:
+            publisher_store.publish_many([("task:update", {"id": "1"})])
+        publish.assert_not_called()
+        self.assertIsNone(self.manager.redis)
+        self.assertEqual(len(self.get_published()), 1)
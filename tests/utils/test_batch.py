@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from zou.app.utils import batch
+
+
+def square(value):
+    return os.getpid(), value * value
+
+
+class BatchTestCase(unittest.TestCase):
+    def test_run_in_pool(self):
+        results = list(batch.run_in_pool(square, range(20)))
+        self.assertEqual(
+            [value for _, value in results],
+            [value * value for value in range(20)],
+        )
+        self.assertEqual({pid for pid, _ in results}, {os.getpid()})
+
+        results = list(
+            batch.run_in_pool(square, range(20), processes=2, initializer=None)
+        )
+        self.assertEqual(
+            sorted(value for _, value in results),
+            [value * value for value in range(20)],
+        )
+        self.assertNotIn(os.getpid(), {pid for pid, _ in results})
+
+    def test_checkpoint(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, "checkpoint")
+
+        checkpoint = batch.Checkpoint(path)
+        self.assertNotIn("a", checkpoint)
+        checkpoint.add("a")
+        checkpoint.add("b")
+        self.assertIn("a", checkpoint)
+
+        checkpoint = batch.Checkpoint(path)
+        self.assertEqual(len(checkpoint), 2)
+        self.assertIn("b", checkpoint)
+
+        checkpoint = batch.Checkpoint()
+        checkpoint.add("a")
+        self.assertIn("a", checkpoint)
+
+    def test_throughput(self):
+        throughput = batch.Throughput()
+        for _ in range(2):
+            timer = batch.StageTimer()
+            with timer.stage("download"):
+                pass
+            timer.add_size("download", 1024**2)
+            throughput.add(timer.stages)
+        throughput.add({"normalize": (4.0, 0)})
+
+        self.assertEqual(throughput.nb_items, 3)
+        self.assertEqual(throughput.stages["download"][0], 2)
+        self.assertEqual(throughput.stages["download"][2], 2 * 1024**2)
+        lines = throughput.report()
+        self.assertEqual(lines[1], "normalize: 1 files in 4.0s, 0.25 files/s")
+        self.assertTrue(lines[2].startswith("total: 3 files in "))
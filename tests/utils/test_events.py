@@ -51,3 +51,14 @@ class EventsTestCase(ApiDBTestCase):
         event_models = events_service.get_last_events()
         self.assertEqual(len(event_models), 4)
         self.assertEqual(event_models[0]["name"], "task:new")
+
+    def test_emit_many(self):
+        events.register("task:start", "inc_counter", self)
+        events.emit_many("task:start", [{"a": 1}, {"a": 2}])
+        self.assertEqual(self.counter, 3)
+        event_models = events_service.get_last_events()
+        self.assertEqual(len(event_models), 2)
+        events.emit_many("task:start", [{"a": 3}], persist=False)
+        self.assertEqual(self.counter, 4)
+        event_models = events_service.get_last_events()
+        self.assertEqual(len(event_models), 2)
@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+import fakeredis
+from rq import Queue
+
+from tests.base import ApiDBTestCase
+
+from zou.app.models.event import ApiEvent
+from zou.app.services.exception import ImportJobNotFoundException
+from zou.app.stores import queue_store
+from zou.app.utils import events, jobs
+
+
+def emit_an_event(name, progress=None):
+    progress("emit", 1, 1)
+    events.emit("job-test:done", {"name": name})
+    return name
+
+
+class JobsTestCase(ApiDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.connection = fakeredis.FakeStrictRedis()
+        patcher = patch.multiple(
+            queue_store,
+            queue_store=self.connection,
+            job_queue=Queue(connection=self.connection),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_start_and_fetch_job(self):
+        job = jobs.start_job(
+            emit_an_event,
+            ("one",),
+            {"name": "one", "person_id": self.user["id"]},
+        )
+
+        status = jobs.get_job_status(
+            jobs.fetch_job(job.id, ImportJobNotFoundException), ["name"]
+        )
+        self.assertEqual(status["id"], job.id)
+        self.assertEqual(status["name"], "one")
+        self.assertEqual(status["person_id"], self.user["id"])
+        self.assertEqual(status["status"], "queued")
+        with self.assertRaises(ImportJobNotFoundException):
+            jobs.fetch_job("unknown", ImportJobNotFoundException)
+
+    def test_run_job_as_the_person_who_started_it(self):
+        job = jobs.start_job(
+            emit_an_event, ("one",), {"person_id": self.user["id"]}
+        )
+
+        with patch("rq.get_current_job", return_value=job):
+            result = jobs.run_job(emit_an_event, "one")
+
+        self.assertEqual(result, "one")
+        self.assertEqual(
+            job.meta["progress"], {"stage": "emit", "done": 1, "total": 1}
+        )
+        event = ApiEvent.query.filter_by(name="job-test:done").one()
+        self.assertEqual(str(event.user_id), self.user["id"])
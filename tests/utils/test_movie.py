@@ -221,3 +221,33 @@ class MovieTestCase(unittest.TestCase):
 
         self.assertEqual(img_width, target_width * 8)
         self.assertEqual(img_height, 100 * rows)
+
+
+class TileLayoutTestCase(unittest.TestCase):
+    def get_video_track(self, duration, fps=25):
+        return {
+            "duration": str(duration),
+            "r_frame_rate": f"{fps}/1",
+            "width": 1920,
+            "height": 1080,
+        }
+
+    def test_tile_layout_of_a_short_movie(self):
+        layout = movie.get_tile_layout(video_track=self.get_video_track(10))
+        self.assertEqual(
+            layout,
+            {
+                "columns": 8,
+                "rows": 32,
+                "width": 178,
+                "height": 100,
+                "frame_step": 1,
+                "nb_frames": 250,
+            },
+        )
+
+    def test_tile_layout_of_a_long_movie_is_subsampled(self):
+        layout = movie.get_tile_layout(video_track=self.get_video_track(1000))
+        self.assertEqual(layout["rows"], movie.TILE_MAX_ROWS)
+        self.assertEqual(layout["frame_step"], 7)
+        self.assertEqual(layout["nb_frames"], 3572)
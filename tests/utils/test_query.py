@@ -1,5 +1,8 @@
 import unittest
 
+from sqlalchemy.dialects import postgresql
+from sqlalchemy_utils import UUIDType
+
 from zou.app.utils import query
 from zou.app.utils.query import check_criterion_id_format
 from zou.app.services.exception import WrongParameterException
@@ -51,3 +54,16 @@ class CheckCriterionIdFormatTestCase(unittest.TestCase):
                 {"episode_id": "not-a-uuid"}, ["id", "project_id"]
             )
         )
+
+
+class GetRandomUuidExpressionTestCase(unittest.TestCase):
+    def test_the_expression_avoids_gen_random_uuid(self):
+        # gen_random_uuid() is missing from PostgreSQL 12.
+        statement = str(
+            query.get_random_uuid_expression(UUIDType(binary=False)).compile(
+                dialect=postgresql.dialect()
+            )
+        )
+        self.assertNotIn("gen_random_uuid", statement)
+        self.assertIn("md5(concat(CAST(random() AS TEXT)", statement)
+        self.assertIn("CAST(clock_timestamp() AS TEXT)", statement)
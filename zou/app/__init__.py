@@ -1,3 +1,5 @@
+import os
+import threading
 import traceback
 
 from flask import Flask, jsonify, current_app, request
@@ -288,7 +290,7 @@ def load_api(app):
     configure_auth(app)
 
 
-def create_app(config_object=config):
+def create_app(config_object=config, with_preview_cache_warmup=True):
     """
     Build and wire a Zou Flask application: extensions, JSON provider,
     error handlers, auth, storages and API routes. Nothing is built at
@@ -299,6 +301,9 @@ def create_app(config_object=config):
     Assigns the module-level `app` early (before the API is loaded)
     because blueprints and services imported during load_api still do
     `from zou.app import app` at import time.
+
+    Servers which never serve previews, like the event stream, pass
+    with_preview_cache_warmup=False.
     """
     global app, swagger
 
@@ -350,10 +355,44 @@ def create_app(config_object=config):
     config_store.sync_config()
     load_api(app)
     warn_about_overridden_settings(app, config_object)
+    if with_preview_cache_warmup:
+        start_preview_cache_warmup(app, config_object)
 
     return app
 
 
+def start_preview_cache_warmup(app, config_object):
+    """
+    Listen for the movie previews processed on any node and download their
+    files into the local cache. Only useful with a remote storage: the
+    local one is read directly.
+
+    The listener starts with the first request a process serves, so only
+    the API workers run it: CLI commands, job workers and batch pools build
+    the application without serving it. Threads do not survive a fork, so
+    each worker forked from a preloaded application starts its own.
+    """
+    from zou.app.services import preview_files_service
+
+    if not (
+        config_object.PREVIEW_CACHE_WARMUP
+        and config_object.FS_BACKEND != "local"
+    ):
+        return
+
+    started_pids = set()
+    lock = threading.Lock()
+
+    @app.before_request
+    def start_preview_cache_warmup_listener():
+        if os.getpid() in started_pids:
+            return
+        with lock:
+            if os.getpid() not in started_pids:
+                started_pids.add(os.getpid())
+                preview_files_service.start_preview_cache_warmup_listener(app)
+
+
 def warn_about_overridden_settings(app, config_object):
     """
     Report the settings the runtime silently overrides, so they are not read
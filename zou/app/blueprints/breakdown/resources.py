@@ -17,6 +17,7 @@ from zou.app.utils import permissions, validation
 from zou.app.blueprints.breakdown.schemas import (
     AddAssetInstanceSchema,
     AddSceneAssetInstanceSchema,
+    CastingPatchSchema,
 )
 
 
@@ -243,6 +244,88 @@ class EntitiesCastingResource(MethodView):
             for entity_id, casting in castings.items()
         }
 
+    @jwt_required()
+    def patch(self, project_id):
+        """
+        Patch several entity castings
+        ---
+        description: Change the casting of several entities of a project
+          with a list of deltas, each setting the number of occurences of
+          an asset in a shot or an asset (0 removes it). Only the links
+          named by the deltas are touched, and all of them are written at
+          once. Assets cast in or removed from shots are cast in or removed
+          from their episode the same way the entity casting route does.
+        tags:
+          - Breakdown
+        parameters:
+          - in: path
+            name: project_id
+            required: true
+            type: string
+            format: uuid
+            example: a24a6ea4-ce75-4665-a070-57453082c25
+            description: Unique identifier of the project
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: object
+                required:
+                  - deltas
+                properties:
+                  deltas:
+                    type: array
+                    items:
+                      type: object
+                      required:
+                        - entity_id
+                        - asset_id
+                        - nb_occurences
+                      properties:
+                        entity_id:
+                          type: string
+                          format: uuid
+                          description: Shot or asset identifier
+                        asset_id:
+                          type: string
+                          format: uuid
+                          description: Asset identifier
+                        nb_occurences:
+                          type: integer
+                          description: Number of occurences, 0 removes the
+                            asset
+                          example: 2
+                        label:
+                          type: string
+                          description: Label of the link, kept when omitted
+        responses:
+          200:
+            description: Number of links created, updated and deleted, and
+              the number of assets of each entity touched
+            content:
+              application/json:
+                schema:
+                  type: object
+                  properties:
+                    created:
+                      type: integer
+                    updated:
+                      type: integer
+                    deleted:
+                      type: integer
+                    nb_entities_out:
+                      type: object
+                      example: {"a24a6ea4-ce75-4665-a070-57453082c25": 3}
+          400:
+            description: Invalid deltas, or entities outside the project
+        """
+        body = validation.validate_request_body(CastingPatchSchema)
+        permissions_service.check_manager_project_access(project_id)
+        return breakdown_service.patch_casting(
+            project_id, [delta.model_dump() for delta in body.deltas]
+        )
+
 
 class EpisodesCastingResource(MethodView):
     @jwt_required()
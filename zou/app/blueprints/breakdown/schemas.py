@@ -2,7 +2,7 @@
 Pydantic schemas for request body validation in the breakdown blueprint.
 """
 
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import Field
@@ -27,3 +27,27 @@ class AddSceneAssetInstanceSchema(BaseSchema):
 
     asset_id: UUID = Field(..., description="Asset unique identifier")
     description: Optional[str] = None
+
+
+class CastingDeltaSchema(BaseSchema):
+    """
+    One change of a casting: the number of occurences of an asset in an
+    entity, 0 removing the asset.
+    """
+
+    entity_id: UUID = Field(..., description="Shot or asset unique identifier")
+    asset_id: UUID = Field(..., description="Asset unique identifier")
+    nb_occurences: int = Field(
+        ..., ge=0, description="Number of occurences, 0 removes the asset"
+    )
+    label: Optional[str] = Field(None, max_length=80)
+
+
+class CastingPatchSchema(BaseSchema):
+    """
+    Body for changing the casting of several entities of a project at once.
+    """
+
+    deltas: List[CastingDeltaSchema] = Field(
+        ..., min_length=1, description="Casting changes to apply"
+    )
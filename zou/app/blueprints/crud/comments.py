@@ -7,6 +7,7 @@ from zou.app.models.attachment_file import AttachmentFile
 from zou.app.services import (
     comments_service,
     deletion_service,
+    news_service,
     notifications_service,
     persons_service,
     tasks_service,
@@ -401,6 +402,9 @@ class CommentResource(BaseModelResource):
         task = tasks_service.get_task(task_id)
         if self.task_status_change:
             task = tasks_service.reset_task_data(task_id)
+            news_service.update_news_status_for_comment(
+                comment["id"], comment["task_status_id"]
+            )
             events.emit(
                 "task:status-changed",
                 {
@@ -29,6 +29,11 @@ def _remove_time_spents_covered_by(day_off):
         TimeSpent.date <= day_off.end_date,
         person_id=day_off.person_id,
     )
+    time_spents_service.refresh_time_spent_days(
+        person_id=day_off.person_id,
+        start_date=day_off.date,
+        end_date=day_off.end_date,
+    )
 
 
 class DayOffsResource(BaseModelsResource):
@@ -544,6 +544,7 @@ class EntityResource(BaseModelResource, EntityEventMixin):
                     breakdown_service.refresh_casting_stats(entity_dict)
                 assets_service.clear_asset_cache(entity_dict["id"])
             entities_service.clear_entity_cache(entity_dict["id"])
+            entities_service.clear_entity_names_cache(entity_dict["id"], data)
 
             self.emit_update_event(entity_dict)
             return entity_dict, 200
@@ -1,6 +1,7 @@
 from flask_jwt_extended import jwt_required
 
 from zou.app.models.notification import Notification
+from zou.app.stores import notification_counts_store
 
 from zou.app.blueprints.crud.base import BaseModelResource, BaseModelsResource
 
@@ -9,6 +10,11 @@ class NotificationsResource(BaseModelsResource):
     def __init__(self):
         BaseModelsResource.__init__(self, Notification)
 
+    def post_creation(self, instance):
+        if not instance.read:
+            notification_counts_store.increment([instance.person_id])
+        return instance.serialize(relations=True)
+
     @jwt_required()
     def get(self):
         """
@@ -150,6 +156,29 @@ class NotificationResource(BaseModelResource):
     def __init__(self):
         BaseModelResource.__init__(self, Notification)
 
+    def pre_update(self, instance_dict, data):
+        self.previous_notification = instance_dict
+        return data
+
+    def post_update(self, instance_dict, data):
+        previous = self.previous_notification
+        if (
+            previous["read"] != instance_dict["read"]
+            or previous["person_id"] != instance_dict["person_id"]
+        ):
+            if not previous["read"]:
+                notification_counts_store.decrement([previous["person_id"]])
+            if not instance_dict["read"]:
+                notification_counts_store.increment(
+                    [instance_dict["person_id"]]
+                )
+        return instance_dict
+
+    def post_delete(self, instance_dict):
+        if not instance_dict["read"]:
+            notification_counts_store.decrement([instance_dict["person_id"]])
+        return instance_dict
+
     @jwt_required()
     def get(self, instance_id):
         """
@@ -2,9 +2,9 @@ from flask_jwt_extended import jwt_required
 
 from zou.app.models.playlist import Playlist
 from zou.app.models.build_job import BuildJob
-from zou.app.models.notification import Notification
 from zou.app.models.playlist_share_link import PlaylistShareLink
 from zou.app.services import (
+    notifications_service,
     permissions_service,
     persons_service,
     playlists_service,
@@ -393,11 +393,7 @@ class PlaylistResource(BaseModelResource):
         return super().delete(instance_id)
 
     def pre_delete(self, playlist):
-        notifications = Notification.query.filter_by(
-            playlist_id=playlist["id"]
-        ).all()
-        for notification in notifications:
-            notification.delete()
+        notifications_service.delete_notifications(playlist_id=playlist["id"])
         query = BuildJob.query.filter_by(playlist_id=playlist["id"])
         for job in query.all():
             playlists_service.remove_build_job(playlist, job.id)
@@ -424,5 +420,13 @@ class PlaylistResource(BaseModelResource):
             data["shots"] = shots
         return data
 
+    def post_update(self, instance_dict, data):
+        playlists_service.clear_playlist_payloads(instance_dict["id"])
+        return instance_dict
+
     def check_delete_permissions(self, playlist):
         return permissions_service.check_playlist_update_access(playlist)
+
+    def post_delete(self, instance_dict):
+        playlists_service.clear_playlist_payloads(instance_dict["id"])
+        return instance_dict
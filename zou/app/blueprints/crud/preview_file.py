@@ -8,6 +8,7 @@ from zou.app.models.task import Task
 from zou.app.models.project import Project
 from zou.app.models.project_status import ProjectStatus
 from zou.app.services import (
+    files_service,
     permissions_service,
     user_service,
     tasks_service,
@@ -355,6 +356,16 @@ class PreviewFileResource(BaseModelResource):
                 ).filter(PreviewFile.id != instance_dict["id"]).update(
                     {"revision": new_revision}
                 )
+        if "annotations" in data:
+            data["annotations_version"] = (
+                instance_dict.get("annotations_version") or 0
+            ) + 1
+        return instance_dict
+
+    def post_update(self, instance_dict, data):
+        files_service.clear_playlist_payloads_for_task(
+            instance_dict["task_id"]
+        )
         return instance_dict
 
     def check_delete_permissions(self, preview_file):
@@ -6,7 +6,7 @@ from zou.app.models.task_type import TaskType
 from zou.app.models.schedule_item import ScheduleItem
 from zou.app.models.project import ProjectTaskTypeLink
 from zou.app.services.exception import WrongParameterException
-from zou.app.services import tasks_service
+from zou.app.services import playlists_service, tasks_service
 from zou.app.utils import permissions
 
 from zou.app.blueprints.crud.base import BaseModelResource, BaseModelsResource
@@ -364,6 +364,10 @@ class TaskTypeResource(BaseModelResource):
 
     def post_update(self, instance_dict, data):
         tasks_service.clear_task_type_cache(instance_dict["id"])
+        if "name" in data or "priority" in data:
+            playlists_service.clear_task_types_playlist_payloads(
+                [instance_dict["id"]]
+            )
         return instance_dict
 
     def post_delete(self, instance_dict):
@@ -418,4 +422,8 @@ class TaskTypesReorderResource(MethodView):
                 task_type.update({"priority": priority})
                 tasks_service.clear_task_type_cache(str(task_type.id))
                 updated.append(task_type.serialize())
+        if len(updated) > 0:
+            playlists_service.clear_task_types_playlist_payloads(
+                [task_type["id"] for task_type in updated]
+            )
         return updated
@@ -5,7 +5,12 @@ from sqlalchemy import func
 from zou.app.utils import events
 
 from zou.app.blueprints.crud.base import BaseModelsResource, BaseModelResource
-from zou.app.services import permissions_service, tasks_service, user_service
+from zou.app.services import (
+    permissions_service,
+    tasks_service,
+    time_spents_service,
+    user_service,
+)
 
 from zou.app.models.time_spent import TimeSpent
 from zou.app.models.task import Task
@@ -207,6 +212,7 @@ class TimeSpentsResource(BaseModelsResource):
             for time_spent in TimeSpent.get_all_by(task_id=task_id)
         )
         task.save()
+        time_spents_service.refresh_time_spent_day_of(instance.serialize())
         tasks_service.clear_task_cache(task_id)
         events.emit(
             "task:update",
@@ -388,7 +394,15 @@ class TimeSpentResource(BaseModelResource):
         """
         return super().delete(instance_id)
 
+    def pre_update(self, instance_dict, data):
+        self.previous_time_spent = instance_dict
+        return data
+
     def post_update(self, instance_dict, data):
+        # The date, the person or the task may have changed: both the day
+        # it left and the day it joined are refreshed.
+        time_spents_service.refresh_time_spent_day_of(self.previous_time_spent)
+        time_spents_service.refresh_time_spent_day_of(instance_dict)
         task = Task.get(instance_dict["task_id"])
         task.duration = sum(
             time_spent.duration
@@ -406,6 +420,7 @@ class TimeSpentResource(BaseModelResource):
         return instance_dict
 
     def post_delete(self, instance_dict):
+        time_spents_service.refresh_time_spent_day_of(instance_dict)
         task = Task.get(instance_dict["task_id"])
         task.duration = sum(
             time_spent.duration
@@ -16,6 +16,10 @@ from zou.app.blueprints.export.csv.task_types import TaskTypesCsvExport
 from zou.app.blueprints.export.csv.tasks import TasksCsvExport
 from zou.app.blueprints.export.csv.time_spents import TimeSpentsCsvExport
 from zou.app.blueprints.export.csv.edits import EditsCsvExport
+from zou.app.blueprints.export.ndjson.models import (
+    ModelNdjsonExport,
+    ProjectModelNdjsonExport,
+)
 
 routes = [
     ("/export/csv/projects/<project_id>/assets.csv", AssetsCsvExport),
@@ -28,6 +32,11 @@ routes = [
     ("/export/csv/tasks.csv", TasksCsvExport),
     ("/export/csv/time-spents.csv", TimeSpentsCsvExport),
     ("/export/csv/task-types.csv", TaskTypesCsvExport),
+    ("/export/ndjson/<model_name>", ModelNdjsonExport),
+    (
+        "/export/ndjson/projects/<project_id>/<model_name>",
+        ProjectModelNdjsonExport,
+    ),
 ]
 
 blueprint = Blueprint("export", "export")
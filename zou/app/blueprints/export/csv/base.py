@@ -1,11 +1,16 @@
-from flask import abort
+from flask import abort, request
 from flask_jwt_extended import jwt_required
 
 from flask.views import MethodView
-from zou.app.utils import csv_utils, permissions
+from zou.app.services.exception import WrongParameterException
+from zou.app.utils import arrow_utils, csv_utils, permissions
 
 
 class BaseCsvExport(MethodView):
+    # Type of each column (string, int, float, bool, date or datetime) for
+    # the exports also offered as Arrow or Parquet.
+    column_types = None
+
     def __init__(self):
         MethodView.__init__(self)
         self.file_name = "export"
@@ -28,6 +33,22 @@ class BaseCsvExport(MethodView):
           formatted data based on the resource type.
         produces:
           - text/csv
+        parameters:
+          - in: header
+            name: Accept-Encoding
+            required: false
+            type: string
+            example: gzip
+            description: When it accepts gzip, the CSV file is streamed
+              gzipped with a gzip Content-Encoding
+          - in: query
+            name: format
+            required: false
+            type: string
+            enum: [csv, arrow, parquet]
+            default: csv
+            description: Export typed columns as an Arrow IPC stream or a
+              Parquet file instead, for the exports that offer it
         responses:
             200:
               description: CSV file exported successfully
@@ -43,11 +64,42 @@ class BaseCsvExport(MethodView):
         except permissions.PermissionDenied:
             raise
 
+        export_format = request.args.get("format", "csv")
+        if export_format != "csv":
+            return self.build_columnar_response(export_format)
+
         def row_generator():
             yield self.build_headers()
             for result in self.build_query().yield_per(500):
                 yield self.build_row(result)
 
         return csv_utils.build_csv_stream_response(
-            row_generator(), file_name=self.file_name
+            row_generator(),
+            file_name=self.file_name,
+            compress=csv_utils.accepts_gzip(request),
+        )
+
+    def build_record(self, result):
+        """
+        Return the typed values of the row of given result, for the columnar
+        formats. CSV rows are the same values as text by default.
+        """
+        return self.build_row(result)
+
+    def build_columnar_response(self, export_format):
+        if self.column_types is None:
+            raise WrongParameterException(
+                "This export is only offered as CSV."
+            )
+        arrow_utils.check_format(export_format)
+        records = (
+            self.build_record(result)
+            for result in self.build_query().yield_per(500)
+        )
+        return arrow_utils.build_arrow_stream_response(
+            records,
+            self.build_headers(),
+            self.column_types,
+            export_format=export_format,
+            file_name=self.file_name,
         )
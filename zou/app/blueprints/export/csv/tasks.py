@@ -1,10 +1,12 @@
 from zou.app.blueprints.export.csv.base import BaseCsvExport
 from flask_jwt_extended import jwt_required
-from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
 
+from zou.app import db
 from zou.app.models.task_status import TaskStatus
 from zou.app.models.task_type import TaskType
-from zou.app.models.task import Task
+from zou.app.models.task import Task, TaskPersonLink
 from zou.app.models.person import Person
 from zou.app.models.project import Project
 from zou.app.models.entity import Entity
@@ -14,10 +16,15 @@ from zou.app.services import projects_service
 
 
 class TasksCsvExport(BaseCsvExport):
+    column_types = (
+        ["string"] * 8 + ["float"] * 2 + ["datetime"] * 4 + ["string"]
+    )
+
     def __init__(self):
         BaseCsvExport.__init__(self)
 
         self.file_name = "tasks_export"
+        self.person_names = {}
 
     @jwt_required()
     def get(self):
@@ -65,82 +72,78 @@ class TasksCsvExport(BaseCsvExport):
         Sequence = aliased(Entity, name="sequence")
         Episode = aliased(Entity, name="episode")
         open_status = projects_service.get_open_status()
+        self.person_names = {
+            person_id: full_name
+            for person_id, full_name in Person.query.with_entities(
+                Person.id, Person.full_name
+            )
+        }
+        assignees = (
+            db.session.query(
+                TaskPersonLink.task_id,
+                func.array_agg(TaskPersonLink.person_id).label("person_ids"),
+            )
+            .group_by(TaskPersonLink.task_id)
+            .subquery()
+        )
 
-        query = Task.query.order_by(Project.name, TaskType.name, Task.name)
-        query = query.join(Project, Task.project_id == Project.id)
-        query = query.join(TaskType, Task.task_type_id == TaskType.id)
-        query = query.join(TaskStatus, Task.task_status_id == TaskStatus.id)
-        query = query.join(Entity, Task.entity_id == Entity.id)
-        query = query.join(EntityType)
         query = (
-            query.outerjoin(Person, Task.assigner_id == Person.id)
+            Task.query.with_entities(
+                Project.name,
+                TaskType.name,
+                Episode.name,
+                Sequence.name,
+                EntityType.name,
+                Entity.name,
+                Task.assigner_id,
+                assignees.c.person_ids,
+                Task.duration,
+                Task.estimation,
+                Task.start_date,
+                Task.due_date,
+                Task.real_start_date,
+                Task.end_date,
+                TaskStatus.name,
+            )
+            .join(Project, Task.project_id == Project.id)
+            .join(TaskType, Task.task_type_id == TaskType.id)
+            .join(TaskStatus, Task.task_status_id == TaskStatus.id)
+            .join(Entity, Task.entity_id == Entity.id)
+            .join(EntityType, Entity.entity_type_id == EntityType.id)
             .outerjoin(Sequence, Sequence.id == Entity.parent_id)
             .outerjoin(Episode, Episode.id == Sequence.parent_id)
+            .outerjoin(assignees, assignees.c.task_id == Task.id)
+            .filter(Project.project_status_id == open_status["id"])
+            .order_by(
+                Project.name,
+                TaskType.name,
+                Episode.name,
+                Sequence.name,
+                EntityType.name,
+                Entity.name,
+            )
         )
-        query = query.add_columns(
-            Project.name,
-            TaskType.name,
-            TaskStatus.name,
-            Episode.name,
-            Sequence.name,
-            EntityType.name,
-            Entity.name,
-            Person.first_name,
-            Person.last_name,
-        )
-        query = query.options(selectinload(Task.assignees))
-        query = query.filter(Project.project_status_id == open_status["id"])
-        query = query.order_by(
-            Project.name,
-            TaskType.name,
-            Episode.name,
-            Sequence.name,
-            EntityType.name,
-            Entity.name,
-        )
-
         return query
 
-    def build_row(self, task_data):
+    def build_record(self, task_data):
         (
-            task,
             project_name,
             task_type_name,
-            task_status_name,
             episode_name,
             sequence_name,
             entity_type_name,
             entity_name,
-            assigner_first_name,
-            assigner_last_name,
+            assigner_id,
+            assignee_ids,
+            duration,
+            estimation,
+            start_date,
+            due_date,
+            real_start_date,
+            end_date,
+            task_status_name,
         ) = task_data
 
-        assigner_name = ""
-        if assigner_first_name is not None and assigner_last_name is not None:
-            assigner_name = assigner_first_name + " " + assigner_last_name
-        elif assigner_first_name is not None:
-            assigner_name = assigner_first_name
-        elif assigner_last_name is not None:
-            assigner_name = assigner_last_name
-
-        persons = task.assignees_as_string()
-
-        start_date = ""
-        if task.start_date is not None:
-            start_date = task.start_date.strftime("%Y-%m-%d")
-
-        due_date = ""
-        if task.due_date is not None:
-            due_date = task.due_date.strftime("%Y-%m-%d")
-
-        real_start_date = ""
-        if task.real_start_date is not None:
-            real_start_date = task.real_start_date.strftime("%Y-%m-%d")
-
-        end_date = ""
-        if task.end_date is not None:
-            end_date = task.end_date.strftime("%Y-%m-%d")
-
         return [
             project_name,
             task_type_name,
@@ -148,13 +151,26 @@ class TasksCsvExport(BaseCsvExport):
             sequence_name,
             entity_type_name,
             entity_name,
-            assigner_name,
-            persons,
-            task.duration,
-            task.estimation,
+            self.person_names.get(assigner_id, ""),
+            ", ".join(
+                sorted(
+                    self.person_names[person_id]
+                    for person_id in assignee_ids or []
+                )
+            ),
+            duration,
+            estimation,
             start_date,
             due_date,
             real_start_date,
             end_date,
             task_status_name,
         ]
+
+    def build_row(self, task_data):
+        row = self.build_record(task_data)
+        row[10:14] = [
+            "" if date is None else date.strftime("%Y-%m-%d")
+            for date in row[10:14]
+        ]
+        return row
@@ -1,5 +1,6 @@
 from zou.app.blueprints.export.csv.base import BaseCsvExport
 from flask_jwt_extended import jwt_required
+from sqlalchemy.orm import aliased
 
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
@@ -10,11 +11,13 @@ from zou.app.models.time_spent import TimeSpent
 from zou.app.models.task import Task
 from zou.app.models.task_type import TaskType
 
-from zou.app.services import names_service, persons_service
+from zou.app.services import persons_service
 from zou.app.utils import date_helpers
 
 
 class TimeSpentsCsvExport(BaseCsvExport):
+    column_types = ["string"] * 5 + ["date", "float"]
+
     def __init__(self):
         BaseCsvExport.__init__(self)
 
@@ -58,13 +61,20 @@ class TimeSpentsCsvExport(BaseCsvExport):
         ]
 
     def build_query(self):
+        Sequence = aliased(Entity, name="sequence")
+        Episode = aliased(Entity, name="episode")
         query = (
-            TimeSpent.query.order_by(
-                TimeSpent.date,
-                Person.last_name,
+            TimeSpent.query.with_entities(
                 Project.name,
+                Person.first_name,
+                Person.last_name,
                 EntityType.name,
+                Episode.name,
+                Sequence.name,
                 Entity.name,
+                TaskType.name,
+                TimeSpent.date,
+                TimeSpent.duration,
             )
             .join(Task, TimeSpent.task_id == Task.id)
             .join(Entity, Task.entity_id == Entity.id)
@@ -73,34 +83,40 @@ class TimeSpentsCsvExport(BaseCsvExport):
             .join(ProjectStatus, Project.project_status_id == ProjectStatus.id)
             .join(TaskType, Task.task_type_id == TaskType.id)
             .join(Person, TimeSpent.person_id == Person.id)
-            .add_columns(Project.name)
-            .add_columns(EntityType.name)
-            .add_columns(Entity.id)
-            .add_columns(Entity.name)
-            .add_columns(TaskType.name)
-            .add_columns(Person.first_name)
-            .add_columns(Person.last_name)
+            .outerjoin(Sequence, Sequence.id == Entity.parent_id)
+            .outerjoin(Episode, Episode.id == Sequence.parent_id)
             .filter(ProjectStatus.name.in_(("Active", "open", "Open")))
+            .order_by(
+                TimeSpent.date,
+                Person.last_name,
+                Project.name,
+                EntityType.name,
+                Entity.name,
+            )
         )
         return query
 
-    def build_row(self, time_spent_row):
+    def build_record(self, time_spent_row):
         (
-            time_spent,
             project_name,
+            person_first_name,
+            person_last_name,
             entity_type_name,
-            entity_id,
+            episode_name,
+            sequence_name,
             entity_name,
             task_type_name,
-            person_first_name,
-            person_last_name,
+            date,
+            duration,
         ) = time_spent_row
         if entity_type_name == "Shot":
-            entity_name, _, _ = names_service.get_full_entity_name(entity_id)
-
-        date = ""
-        if time_spent.date is not None:
-            date = time_spent.date.strftime("%Y-%m-%d")
+            # Same as names_service.get_full_entity_name, from the joined
+            # parents rather than two queries per row.
+            entity_name = " / ".join(
+                name
+                for name in (episode_name, sequence_name, entity_name)
+                if name is not None
+            )
 
         person_name = f"{person_first_name} {person_last_name}"
 
@@ -111,5 +127,10 @@ class TimeSpentsCsvExport(BaseCsvExport):
             entity_name,
             task_type_name,
             date,
-            time_spent.duration,
+            duration,
         ]
+
+    def build_row(self, time_spent_row):
+        row = self.build_record(time_spent_row)
+        row[5] = row[5].strftime("%Y-%m-%d")
+        return row
@@ -0,0 +1,117 @@
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+
+from zou.app.mixin import ArgsMixin
+from zou.app.services import export_service, projects_service
+from zou.app.utils import permissions
+from zou.app.utils.flask_utils import ndjson_stream_response
+
+
+class ModelNdjsonExport(MethodView, ArgsMixin):
+
+    @jwt_required()
+    def get(self, model_name):
+        """
+        Export model rows as NDJSON
+        ---
+        tags:
+          - Export
+        description: Stream every row of given instance-wide model (persons,
+          task-types, projects...) as newline-delimited JSON, one serialized
+          row per line, relations included. Used by instance sync to pull
+          large tables with a flat memory footprint on both sides.
+        produces:
+          - application/x-ndjson
+        parameters:
+          - in: path
+            name: model_name
+            required: true
+            schema:
+              type: string
+            example: persons
+          - in: query
+            name: chunk_size
+            required: false
+            schema:
+              type: integer
+            default: 500
+            example: 500
+            description: Number of rows read from the database at once
+        responses:
+            200:
+              description: Rows streamed as NDJSON
+              content:
+                application/x-ndjson:
+                  schema:
+                    type: string
+                  example: '{"id": "a24a6ea4-ce75-4665-a070-57453082c25"}'
+            400:
+              description: Model cannot be exported as a stream
+        """
+        permissions.check_admin_permissions()
+        query = export_service.get_model_query(model_name)
+        return ndjson_stream_response(
+            export_service.stream_rows(query, chunk_size=self.get_chunk_size())
+        )
+
+    def get_chunk_size(self):
+        return max(1, min(self.get_integer_parameter("chunk_size", 500), 5000))
+
+
+class ProjectModelNdjsonExport(ModelNdjsonExport):
+
+    @jwt_required()
+    def get(self, project_id, model_name):
+        """
+        Export project model rows as NDJSON
+        ---
+        tags:
+          - Export
+        description: Stream every row of given model (tasks, comments,
+          preview-files...) belonging to given project as newline-delimited
+          JSON, one serialized row per line, relations included. Used by
+          instance sync to pull large tables with a flat memory footprint on
+          both sides.
+        produces:
+          - application/x-ndjson
+        parameters:
+          - in: path
+            name: project_id
+            required: true
+            schema:
+              type: string
+              format: uuid
+            example: a24a6ea4-ce75-4665-a070-57453082c25
+          - in: path
+            name: model_name
+            required: true
+            schema:
+              type: string
+            example: tasks
+          - in: query
+            name: chunk_size
+            required: false
+            schema:
+              type: integer
+            default: 500
+            example: 500
+            description: Number of rows read from the database at once
+        responses:
+            200:
+              description: Rows streamed as NDJSON
+              content:
+                application/x-ndjson:
+                  schema:
+                    type: string
+                  example: '{"id": "a24a6ea4-ce75-4665-a070-57453082c25"}'
+            400:
+              description: Model cannot be exported as a stream
+            404:
+              description: Project not found
+        """
+        permissions.check_admin_permissions()
+        projects_service.get_project(project_id)
+        query = export_service.get_project_model_query(project_id, model_name)
+        return ndjson_stream_response(
+            export_service.stream_rows(query, chunk_size=self.get_chunk_size())
+        )
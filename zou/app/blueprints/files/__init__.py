@@ -10,6 +10,7 @@ from zou.app.blueprints.files.resources import (
     TaskWorkingFilesResource,
     EntityWorkingFilesResource,
     EntityOutputFilePathResource,
+    ProjectFilePathsResource,
     GetNextEntityOutputFileRevisionResource,
     NewEntityOutputFileResource,
     LastEntityOutputFilesResource,
@@ -28,6 +29,7 @@ from zou.app.blueprints.files.resources import (
     FileResource,
     WorkingFileFileResource,
     GuessFromPathResource,
+    GuessFromPathsResource,
 )
 
 routes = [
@@ -90,6 +92,7 @@ routes = [
     ),
     ("/data/entities/<entity_id>/output-files", EntityOutputFilesResource),
     ("/data/projects/<project_id>/output-files", ProjectOutputFilesResource),
+    ("/data/projects/<project_id>/file-paths", ProjectFilePathsResource),
     (
         "/data/asset-instances/<asset_instance_id>/output-files",
         InstanceOutputFilesResource,
@@ -101,6 +104,7 @@ routes = [
     ("/data/entities/guess-from-path", GuessFromPathResource),
     # Deprecated snake_case alias, kept because gazu still posts it.
     ("/data/entities/guess_from_path", GuessFromPathResource),
+    ("/data/entities/guess-from-paths", GuessFromPathsResource),
     (
         "/data/working-files/<working_file_id>/file",
         WorkingFileFileResource,
@@ -8,7 +8,7 @@ from flask_fs.errors import FileNotFound
 from zou.app import config
 
 from zou.app.mixin import ArgsMixin
-from zou.app.utils import fs, date_helpers, validation
+from zou.app.utils import fs, date_helpers, permissions, validation
 from zou.app.blueprints.files.schemas import (
     WorkingFilePathSchema,
     OutputFilePathSchema,
@@ -18,6 +18,8 @@ from zou.app.blueprints.files.schemas import (
     NextRevisionSchema,
     SetTreeSchema,
     GuessFilePathSchema,
+    GuessFilePathsSchema,
+    FilePathsSchema,
 )
 from zou.app.stores import file_store
 from zou.app.services import (
@@ -385,6 +387,163 @@ class WorkingFilePathResource(MethodView, ArgsMixin):
         )
 
 
+class ProjectFilePathsResource(MethodView, ArgsMixin):
+
+    @jwt_required()
+    def post(self, project_id):
+        """
+        Generate many file paths
+        ---
+        description: Generate at once the working and output file paths of
+          many tasks of a production. An item with an output type gets the
+          output path of the entity of its task, with the task type of the
+          task. The others get the working path of their task. A revision
+          of 0 takes the next free one.
+        tags:
+        - Files
+        parameters:
+          - in: path
+            name: project_id
+            required: true
+            schema:
+              type: string
+              format: uuid
+            description: Project unique identifier
+            example: a24a6ea4-ce75-4665-a070-57453082c25
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: object
+                required:
+                  - paths
+                properties:
+                  paths:
+                    type: array
+                    items:
+                      type: object
+                      required:
+                        - task_id
+                      properties:
+                        task_id:
+                          type: string
+                          format: uuid
+                          description: Task identifier
+                          example: a24a6ea4-ce75-4665-a070-57453082c25
+                        output_type_id:
+                          type: string
+                          format: uuid
+                          description: Output type identifier, for an
+                            output path
+                          example: b35b7fb5-df86-5776-b181-68564193d36
+                        software_id:
+                          type: string
+                          format: uuid
+                          description: Software identifier
+                          example: a24a6ea4-ce75-4665-a070-57453082c25
+                        name:
+                          type: string
+                          description: File name
+                          default: main
+                          example: "main"
+                        mode:
+                          type: string
+                          description: File tree mode, working or output
+                            by default
+                          example: "working"
+                        representation:
+                          type: string
+                          description: File representation
+                          example: "abc"
+                        revision:
+                          type: integer
+                          description: File revision number, 0 for the
+                            next free one
+                          default: 0
+                          example: 3
+                  sep:
+                    type: string
+                    description: Path separator
+                    default: /
+                    example: "/"
+        responses:
+          200:
+            description: Generated paths, in the order of the items
+            content:
+              application/json:
+                schema:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      task_id:
+                        type: string
+                        format: uuid
+                        description: Task identifier
+                        example: a24a6ea4-ce75-4665-a070-57453082c25
+                      entity_id:
+                        type: string
+                        format: uuid
+                        description: Entity identifier
+                        example: b35b7fb5-df86-5776-b181-68564193d36
+                      output_type_id:
+                        type: string
+                        format: uuid
+                        description: Output type identifier
+                        example: a24a6ea4-ce75-4665-a070-57453082c25
+                      folder_path:
+                        type: string
+                        description: Generated folder path
+                        example: "/project/shots/sq01/sh01/animation"
+                      file_name:
+                        type: string
+                        description: Generated file name
+                        example: "sq01_sh01_animation_v003"
+                      revision:
+                        type: integer
+                        description: File revision number
+                        example: 3
+          400:
+            description: Malformed file tree, or unknown task, output type
+              or software
+        """
+        body = validation.validate_request_body(FilePathsSchema)
+        permissions_service.check_project_access(project_id)
+
+        items = [path.model_dump() for path in body.paths]
+        if any(
+            item["output_type_id"] is None and item["software_id"] is None
+            for item in items
+        ):
+            maxsoft = files_service.get_or_create_software(
+                "3ds Max", "max", ".max"
+            )
+            for item in items:
+                if item["output_type_id"] is None:
+                    item["software_id"] = item["software_id"] or maxsoft["id"]
+
+        try:
+            paths = file_tree_service.get_file_paths(
+                project_id, items, sep=body.sep
+            )
+        except MalformedFileTreeException as exception:
+            return (
+                {"message": str(exception), "received_data": request.json},
+                400,
+            )
+
+        entities = [
+            {"id": entity_id}
+            for entity_id in {path["entity_id"] for path in paths}
+        ]
+        if len(
+            permissions_service.keep_entities_a_vendor_reaches(entities)
+        ) < len(entities):
+            raise permissions.PermissionDenied
+        return paths
+
+
 class EntityOutputFilePathResource(MethodView, ArgsMixin):
 
     @jwt_required()
@@ -3017,3 +3176,79 @@ class GuessFromPathResource(MethodView, ArgsMixin):
             file_path=body.file_path,
             sep=body.sep,
         )
+
+
+class GuessFromPathsResource(MethodView, ArgsMixin):
+
+    @jwt_required()
+    def post(self):
+        """
+        Guess file tree templates of many paths
+        ---
+        description: Get, for each given file path, the list of possible
+          project file tree templates matching it and the data ids
+          corresponding to template tokens. The file tree is read once and
+          the tokens of all paths are looked up together, which suits
+          integrations resolving a whole publish at once.
+        tags:
+        - Files
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: object
+                required:
+                  - project_id
+                  - file_paths
+                properties:
+                  project_id:
+                    type: string
+                    format: uuid
+                    description: Project unique identifier
+                    example: a24a6ea4-ce75-4665-a070-57453082c25
+                  file_paths:
+                    type: array
+                    items:
+                      type: string
+                    maxItems: 1000
+                    description: File paths to analyze, 1000 at most
+                    example: ["/project/assets/props/tree/shaders/blender"]
+                  sep:
+                    type: string
+                    description: Path separator
+                    default: /
+                    example: "/"
+        responses:
+          200:
+            description: One list of matching templates per file path, in
+              the order of the given paths
+            content:
+              application/json:
+                schema:
+                  type: array
+                  items:
+                    type: array
+                    items:
+                      type: object
+                      properties:
+                        Template:
+                          type: string
+                          description: Template name
+                          example: asset
+                        Project:
+                          type: string
+                          format: uuid
+                          description: Project identifier
+                          example: a24a6ea4-ce75-4665-a070-57453082c25
+          400:
+            description: Invalid project ID or file paths
+        """
+        body = validation.validate_request_body(GuessFilePathsSchema)
+        permissions_service.check_project_access(body.project_id)
+
+        return file_tree_service.guess_from_paths(
+            project_id=body.project_id,
+            file_paths=body.file_paths,
+            sep=body.sep,
+        )
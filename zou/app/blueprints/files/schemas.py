@@ -2,7 +2,7 @@
 Pydantic schemas for request body validation in the files blueprint.
 """
 
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import Field
 
@@ -112,3 +112,37 @@ class GuessFilePathSchema(BaseSchema):
     project_id: str = Field(..., min_length=1)
     file_path: str = Field(..., min_length=1)
     sep: str = "/"
+
+
+class GuessFilePathsSchema(BaseSchema):
+    """
+    Body for guessing file tree templates from many paths at once.
+    """
+
+    project_id: str = Field(..., min_length=1)
+    file_paths: List[str] = Field(..., min_length=1, max_length=1000)
+    sep: str = "/"
+
+
+class FilePathItemSchema(BaseSchema):
+    """
+    One path to generate in a batch: a working path, or an output path when
+    an output type is given.
+    """
+
+    task_id: str = Field(..., min_length=1)
+    output_type_id: Optional[str] = None
+    software_id: Optional[str] = None
+    name: str = "main"
+    mode: Optional[str] = None
+    representation: str = ""
+    revision: int = Field(0, ge=0)
+
+
+class FilePathsSchema(BaseSchema):
+    """
+    Body for generating many working and output file paths at once.
+    """
+
+    paths: List[FilePathItemSchema] = Field(..., min_length=1)
+    sep: str = "/"
@@ -26,6 +26,8 @@ class NewsMixin(ArgsMixin):
             limit,
             after,
             before,
+            before_id,
+            total_mode,
         ) = self.get_arguments()
 
         current_user = persons_service.get_current_user_raw()
@@ -43,6 +45,8 @@ class NewsMixin(ArgsMixin):
             limit=limit,
             after=after,
             before=before,
+            before_id=before_id,
+            total_mode=total_mode,
             current_user=current_user,
         )
         stats = news_service.get_news_stats_for_project(
@@ -77,6 +81,8 @@ class NewsMixin(ArgsMixin):
                 {"name": "limit", "default": 50, "type": int},
                 "after",
                 "before",
+                "before_id",
+                {"name": "total", "default": "exact"},
             ],
         )
         return (
@@ -89,6 +95,8 @@ class NewsMixin(ArgsMixin):
             args["limit"],
             args["after"],
             args["before"],
+            args["before_id"],
+            args["total"],
         )
 
 
@@ -119,6 +127,26 @@ class ProjectNewsResource(MethodView, NewsMixin, ArgsMixin):
               format: date
             example: "2022-07-12"
             description: Filter news before this date
+          - in: query
+            name: before_id
+            required: false
+            schema:
+              type: string
+              format: uuid
+            example: a24a6ea4-ce75-4665-a070-57453082c25
+            description: Id of the last news of the previous page, sent
+              along with its creation date as before to get the next page
+              (see the cursor field of the response)
+          - in: query
+            name: total
+            required: false
+            schema:
+              type: string
+              enum: [exact, approximate, none]
+              default: exact
+            example: approximate
+            description: How the total is computed, a count, the estimate
+              of the database planner, or not at all
           - in: query
             name: after
             required: false
@@ -252,6 +280,26 @@ class NewsResource(MethodView, NewsMixin, ArgsMixin):
               format: date
             example: "2022-07-12"
             description: Filter news before this date
+          - in: query
+            name: before_id
+            required: false
+            schema:
+              type: string
+              format: uuid
+            example: a24a6ea4-ce75-4665-a070-57453082c25
+            description: Id of the last news of the previous page, sent
+              along with its creation date as before to get the next page
+              (see the cursor field of the response)
+          - in: query
+            name: total
+            required: false
+            schema:
+              type: string
+              enum: [exact, approximate, none]
+              default: exact
+            example: approximate
+            description: How the total is computed, a count, the estimate
+              of the database planner, or not at all
           - in: query
             name: after
             required: false
@@ -335,6 +383,10 @@ class NewsResource(MethodView, NewsMixin, ArgsMixin):
                     total:
                       type: integer
                       description: Total number of news items
+                    cursor:
+                      type: object
+                      description: before and before_id values to send to
+                        get the next page, null on the last page
         """
         open_project_ids = []
         if permissions.has_admin_permissions():
@@ -26,6 +26,8 @@ from zou.app.blueprints.previews.resources import (
     RunningPreviewFiles,
     SetMainPreviewResource,
     UpdateAnnotationsResource,
+    PatchAnnotationsResource,
+    PreviewFilesAnnotationsResource,
     UpdatePreviewPositionResource,
     ExtractFrameFromPreview,
     ExtractAnnotatedFrameFromPreview,
@@ -163,6 +165,11 @@ routes = [
         "/actions/preview-files/<preview_file_id>/update-annotations",
         UpdateAnnotationsResource,
     ),
+    (
+        "/actions/preview-files/<preview_file_id>/patch-annotations",
+        PatchAnnotationsResource,
+    ),
+    ("/data/preview-files/annotations", PreviewFilesAnnotationsResource),
     (
         "/actions/preview-files/<preview_file_id>/extract-tile",
         ExtractTileFromPreview,
@@ -14,6 +14,7 @@ from zou.app.utils import validation as validation_utils
 from zou.app.blueprints.previews.schemas import (
     AnnotationsUpdateSchema,
     ExtractAnnotatedFrameSchema,
+    PreviewFilesAnnotationsSchema,
     PreviewFileUploadSchema,
     PreviewFilePositionSchema,
 )
@@ -1725,25 +1726,7 @@ class UpdateAnnotationsResource(MethodView, ArgsMixin):
         """
         preview_file = files_service.get_preview_file(preview_file_id)
         task = tasks_service.get_task(preview_file["task_id"])
-        permissions_service.check_project_access(task["project_id"])
-        is_manager = permissions.has_manager_permissions()
-        is_client = permissions.has_client_permissions()
-        is_supervisor_allowed = False
-        if permissions.has_supervisor_permissions():
-            user_departments = persons_service.get_current_user(
-                relations=True
-            )["departments"]
-            if (
-                user_departments == []
-                or tasks_service.get_task_type(task["task_type_id"])[
-                    "department_id"
-                ]
-                in user_departments
-            ):
-                is_supervisor_allowed = True
-
-        if not (is_manager or is_client or is_supervisor_allowed):
-            raise permissions.PermissionDenied
+        check_annotations_update_access(task)
 
         body = validation_utils.validate_request_body(AnnotationsUpdateSchema)
         user = persons_service.get_current_user()
@@ -1757,6 +1740,206 @@ class UpdateAnnotationsResource(MethodView, ArgsMixin):
         )
 
 
+def check_annotations_update_access(task):
+    """
+    Managers and clients can annotate the previews of the productions they
+    belong to. Supervisors can annotate those of their departments.
+    """
+    permissions_service.check_project_access(task["project_id"])
+    is_manager = permissions.has_manager_permissions()
+    is_client = permissions.has_client_permissions()
+    is_supervisor_allowed = False
+    if permissions.has_supervisor_permissions():
+        user_departments = persons_service.get_current_user(relations=True)[
+            "departments"
+        ]
+        if (
+            user_departments == []
+            or tasks_service.get_task_type(task["task_type_id"])[
+                "department_id"
+            ]
+            in user_departments
+        ):
+            is_supervisor_allowed = True
+
+    if not (is_manager or is_client or is_supervisor_allowed):
+        raise permissions.PermissionDenied
+
+
+class PatchAnnotationsResource(MethodView, ArgsMixin):
+
+    @jwt_required()
+    def put(self, preview_file_id):
+        """
+        Patch preview annotations
+        ---
+        description: Apply the same changes as the update-annotations route,
+          but only the frames the changes name are read and written, and
+          only they are sent back, with the new annotations version. Frames
+          left without a drawing object are removed.
+        tags:
+          - Previews
+        parameters:
+          - in: path
+            name: preview_file_id
+            required: true
+            schema:
+              type: string
+              format: uuid
+            description: Preview file unique identifier
+            example: a24a6ea4-ce75-4665-a070-57453082c25
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  additions:
+                    type: array
+                    description: Frames of drawing objects to add
+                    items:
+                      type: object
+                    example: [{"time": 1.5, "drawing": {"objects": []}}]
+                  updates:
+                    type: array
+                    description: Frames of drawing objects to replace
+                    items:
+                      type: object
+                  deletions:
+                    type: array
+                    description: Frames of drawing object ids to remove
+                    items:
+                      type: object
+                    example: [{"time": 1.5, "objects": ["object-id"]}]
+        responses:
+          200:
+            description: Touched frames and new annotations version
+            content:
+              application/json:
+                schema:
+                  type: object
+                  properties:
+                    id:
+                      type: string
+                      format: uuid
+                      description: Preview file unique identifier
+                    annotations_version:
+                      type: integer
+                      description: Version of the annotations after the change
+                      example: 4
+                    frames:
+                      type: array
+                      description: Touched frames as they are now
+                      items:
+                        type: object
+                    removed_times:
+                      type: array
+                      description: Times of the frames removed
+                      items:
+                        type: number
+        """
+        versions = preview_files_service.get_annotations_versions(
+            [preview_file_id]
+        )
+        if preview_file_id not in versions:
+            raise PreviewFileNotFoundException()
+        task = tasks_service.get_task(versions[preview_file_id]["task_id"])
+        check_annotations_update_access(task)
+
+        body = validation_utils.validate_request_body(AnnotationsUpdateSchema)
+        user = persons_service.get_current_user()
+        return preview_files_service.patch_preview_file_annotations(
+            user["id"],
+            task["project_id"],
+            preview_file_id,
+            additions=body.additions,
+            updates=body.updates,
+            deletions=body.deletions,
+        )
+
+
+class PreviewFilesAnnotationsResource(MethodView, ArgsMixin):
+
+    @jwt_required()
+    def post(self):
+        """
+        Get annotations of preview files
+        ---
+        description: Return the annotations of many preview files at once.
+          Each preview file comes with the annotations version the client
+          holds, if any. Only the preview files whose version differs are
+          sent back, with their current version and annotations. Unknown
+          preview files map to null.
+        tags:
+          - Previews
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: object
+                required:
+                  - preview_files
+                properties:
+                  preview_files:
+                    type: array
+                    maxItems: 1000
+                    description: Preview files to load, 1000 at most
+                    items:
+                      type: object
+                      properties:
+                        id:
+                          type: string
+                          format: uuid
+                        annotations_version:
+                          type: integer
+                    example: [{"id": "a24a6ea4-ce75-4665-a070-57453082c25", "annotations_version": 3}]
+        responses:
+          200:
+            description: Annotations of the preview files that changed
+            content:
+              application/json:
+                schema:
+                  type: object
+                  additionalProperties:
+                    type: object
+                    properties:
+                      annotations_version:
+                        type: integer
+                      annotations:
+                        type: array
+                        items:
+                          type: object
+          400:
+            description: Invalid body
+        """
+        body = validation_utils.validate_request_body(
+            PreviewFilesAnnotationsSchema
+        )
+        versions = {
+            str(preview_file.id): preview_file.annotations_version
+            for preview_file in body.preview_files
+        }
+        current_versions = preview_files_service.get_annotations_versions(
+            list(versions)
+        )
+        task_ids_by_project = {}
+        for current in current_versions.values():
+            task_ids_by_project.setdefault(current["project_id"], set()).add(
+                current["task_id"]
+            )
+        for project_id, task_ids in task_ids_by_project.items():
+            permissions_service.resolve_project_role(project_id)
+            if permissions.has_vendor_permissions():
+                permissions_service.check_working_on_tasks(task_ids)
+            else:
+                permissions_service.check_project_access(project_id)
+        return preview_files_service.get_changed_annotations(
+            versions, current_versions
+        )
+
+
 class RunningPreviewFiles(MethodView, ArgsMixin):
     """
     Retrieve all preview files from open productions with states equals
@@ -2,7 +2,8 @@
 Pydantic schemas for request body validation in the previews blueprint.
 """
 
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
 
 from pydantic import Field
 
@@ -43,3 +44,23 @@ class AnnotationsUpdateSchema(BaseSchema):
     additions: list = Field(default_factory=list)
     updates: list = Field(default_factory=list)
     deletions: list = Field(default_factory=list)
+
+
+class AnnotationsVersionSchema(BaseSchema):
+    """
+    One preview file whose annotations are requested, with the annotations
+    version the client holds, if any.
+    """
+
+    id: UUID
+    annotations_version: Optional[int] = None
+
+
+class PreviewFilesAnnotationsSchema(BaseSchema):
+    """
+    Body for loading the annotations of many preview files at once.
+    """
+
+    preview_files: List[AnnotationsVersionSchema] = Field(
+        ..., min_length=1, max_length=1000
+    )
@@ -27,6 +27,7 @@ from zou.app.blueprints.projects.resources import (
     ProductionMilestonesResource,
     ProductionScheduleItemsResource,
     ProductionTaskTypeScheduleItemsResource,
+    ProductionAllScheduleItemsResource,
     ProductionAssetTypesScheduleItemsResource,
     ProductionEditsScheduleItemsResource,
     ProductionEpisodesScheduleItemsResource,
@@ -41,6 +42,7 @@ from zou.app.blueprints.projects.resources import (
     ProductionScheduleVersionSetTaskLinksFromTasksResource,
     ProductionScheduleVersionSetTaskLinksFromProductionScheduleVersionResource,
     ProductionScheduleVersionApplyToProductionResource,
+    ProductionScheduleVersionJobResource,
     ProductionTaskTypesTimeSpentsResource,
     ProductionDayOffsResource,
 )
@@ -139,6 +141,10 @@ routes = [
         "/data/projects/<project_id>/schedule-items/task-types",
         ProductionTaskTypeScheduleItemsResource,
     ),
+    (
+        "/data/projects/<project_id>/schedule-items/all",
+        ProductionAllScheduleItemsResource,
+    ),
     (
         "/data/projects/<project_id>/schedule-items/<task_type_id>/asset-types",
         ProductionAssetTypesScheduleItemsResource,
@@ -189,6 +195,10 @@ routes = [
         "/actions/production-schedule-versions/<production_schedule_version_id>/apply-to-production",
         ProductionScheduleVersionApplyToProductionResource,
     ),
+    (
+        "/data/production-schedule-versions/jobs/<job_id>",
+        ProductionScheduleVersionJobResource,
+    ),
 ]
 
 blueprint = Blueprint("projects", "projects")
@@ -2,6 +2,7 @@ from flask.views import MethodView
 from flask_jwt_extended import jwt_required
 
 
+from zou.app import config
 from zou.app.services import budget_service
 from zou.app.mixin import ArgsMixin
 from zou.app.services import (
@@ -1928,6 +1929,65 @@ class ProductionTaskTypeScheduleItemsResource(MethodView):
         return schedule_service.get_task_types_schedule_items(project_id)
 
 
+class ProductionAllScheduleItemsResource(MethodView, ArgsMixin):
+    """
+    Resource to retrieve the schedule items of every task type of given
+    production, with the items shown under each of them.
+    """
+
+    @jwt_required()
+    def get(self, project_id):
+        """
+        Get all production schedule items
+        ---
+        description: Retrieve the schedule items of every task type of given
+          production in a single call. Each task type item comes with the
+          items of the asset types, episodes, sequences or edits shown
+          under it in its children field, by kind. Missing items are
+          created.
+        tags:
+          - Projects
+        parameters:
+          - in: query
+            name: episode_id
+            required: false
+            schema:
+              type: string
+              format: uuid
+            description: Restrict children to the given episode
+          - in: path
+            name: project_id
+            required: true
+            schema:
+              type: string
+              format: uuid
+            description: Project unique identifier
+            example: a24a6ea4-ce75-4665-a070-57453082c25
+        responses:
+          200:
+            description: Task type schedule items with their children
+            content:
+              application/json:
+                schema:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      task_type_id:
+                        type: string
+                        format: uuid
+                      children:
+                        type: object
+                        description: Schedule items by kind (asset_types,
+                          episodes, sequences or edits), sorted by name
+        """
+        permissions_service.check_project_access(project_id)
+        permissions_service.block_access_to_vendor()
+        self.check_id_parameter(project_id)
+        episode_id = self.get_id_parameter("episode") or None
+        return schedule_service.get_all_schedule_items(project_id, episode_id)
+
+
 class ProductionAssetTypesScheduleItemsResource(MethodView, ArgsMixin):
     """
     Resource to retrieve asset types schedule items for given task type.
@@ -2833,6 +2893,42 @@ class ProductionScheduleVersionTaskLinksResource(MethodView, ArgsMixin):
         )
 
 
+def start_production_schedule_version_job(
+    operation, production_schedule_version_id
+):
+    """
+    Queue given operation on a production schedule version. Without a job
+    queue, it runs in the request and the finished job is returned.
+    """
+    user_id = persons_service.get_current_user()["id"]
+    if config.ENABLE_JOB_QUEUE:
+        return (
+            schedule_service.start_production_schedule_version_job(
+                operation, production_schedule_version_id, user_id
+            ),
+            202,
+        )
+
+    production_schedule_version = (
+        schedule_service.get_production_schedule_version(
+            production_schedule_version_id
+        )
+    )
+    result = schedule_service.operations[operation](
+        production_schedule_version_id
+    )
+    return {
+        "id": None,
+        "operation": operation,
+        "production_schedule_version_id": production_schedule_version_id,
+        "project_id": production_schedule_version["project_id"],
+        "person_id": user_id,
+        "status": "finished",
+        "progress": None,
+        "result": result,
+    }
+
+
 class ProductionScheduleVersionSetTaskLinksFromTasksResource(
     MethodView, ArgsMixin
 ):
@@ -2855,6 +2951,15 @@ class ProductionScheduleVersionSetTaskLinksFromTasksResource(
               format: uuid
             description: Production schedule version unique identifier
             example: a24a6ea4-ce75-4665-a070-57453082c25
+          - in: query
+            name: background
+            required: false
+            schema:
+              type: boolean
+              default: false
+            description: Run the operation as a job of the job queue. The
+              response is then the job, followed through the production
+              schedule version job route.
         responses:
           200:
             description: Task links created
@@ -2868,6 +2973,8 @@ class ProductionScheduleVersionSetTaskLinksFromTasksResource(
                     task_link_count:
                       type: integer
                       description: Number of task links copied
+          202:
+            description: Job queued
           400:
             description: Wrong ID format
         """
@@ -2880,6 +2987,12 @@ class ProductionScheduleVersionSetTaskLinksFromTasksResource(
             production_schedule_version["project_id"]
         )
 
+        if self.get_bool_parameter("background"):
+            return start_production_schedule_version_job(
+                "set-task-links-from-production",
+                production_schedule_version_id,
+            )
+
         return schedule_service.set_production_schedule_version_task_links_from_production(
             production_schedule_version_id
         )
@@ -2906,6 +3019,15 @@ class ProductionScheduleVersionApplyToProductionResource(
               format: uuid
             description: Production schedule version unique identifier
             example: a24a6ea4-ce75-4665-a070-57453082c25
+          - in: query
+            name: background
+            required: false
+            schema:
+              type: boolean
+              default: false
+            description: Run the operation as a job of the job queue. The
+              response is then the job, followed through the production
+              schedule version job route.
         responses:
           200:
             description: Production schedule version applied
@@ -2919,6 +3041,8 @@ class ProductionScheduleVersionApplyToProductionResource(
                     task_count:
                       type: integer
                       description: Number of tasks updated
+          202:
+            description: Job queued
           400:
             description: Wrong ID format
         """
@@ -2931,6 +3055,11 @@ class ProductionScheduleVersionApplyToProductionResource(
             production_schedule_version["project_id"]
         )
 
+        if self.get_bool_parameter("background"):
+            return start_production_schedule_version_job(
+                "apply-to-production", production_schedule_version_id
+            )
+
         return (
             schedule_service.apply_production_schedule_version_to_production(
                 production_schedule_version_id,
@@ -3212,3 +3341,58 @@ class ProductionDayOffsResource(MethodView, ArgsMixin):
             raise WrongParameterException(
                 f"Wrong date format for {start_date} and/or {end_date}"
             )
+
+
+class ProductionScheduleVersionJobResource(MethodView, ArgsMixin):
+
+    @jwt_required()
+    def get(self, job_id):
+        """
+        Get production schedule version job
+        ---
+        description: Follow a production schedule version operation running
+          in the job queue. Returns its status, the number of tasks done
+          and, once finished, its result. Only the person who started it
+          and admins can follow it.
+        tags:
+          - Projects
+        parameters:
+          - in: path
+            name: job_id
+            required: true
+            schema:
+              type: string
+            example: 0d6c5a4e-4f3e-4b38-8f0e-1d2b3c4d5e6f
+        responses:
+          200:
+            description: Production schedule version job status
+            content:
+              application/json:
+                schema:
+                  type: object
+                  properties:
+                    id:
+                      type: string
+                      example: 0d6c5a4e-4f3e-4b38-8f0e-1d2b3c4d5e6f
+                    operation:
+                      type: string
+                      example: apply-to-production
+                    status:
+                      type: string
+                      example: started
+                    progress:
+                      type: object
+                      example: {"operation": "apply-to-production", "done": 2000, "total": 20000}
+                    result:
+                      type: object
+                      description: Result of the operation once finished
+          404:
+            description: Production schedule version job not found
+        """
+        job = schedule_service.get_production_schedule_version_job(job_id)
+        if (
+            job["person_id"] != persons_service.get_current_user()["id"]
+            and not permissions.has_admin_permissions()
+        ):
+            raise permissions.PermissionDenied
+        return job
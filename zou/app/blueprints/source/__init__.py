@@ -66,7 +66,11 @@ from zou.app.blueprints.source.shotgun.team import (
 from zou.app.blueprints.source.csv.persons import PersonsCsvImportResource
 from zou.app.blueprints.source.csv.assets import AssetsCsvImportResource
 from zou.app.blueprints.source.csv.edits import EditsCsvImportResource
-from zou.app.blueprints.source.csv.shots import ShotsCsvImportResource
+from zou.app.blueprints.source.csv.base import CsvImportJobResource
+from zou.app.blueprints.source.csv.shots import (
+    ShotsCsvImportJobResource,
+    ShotsCsvImportResource,
+)
 from zou.app.blueprints.source.csv.casting import CastingCsvImportResource
 from zou.app.blueprints.source.csv.task_type_estimations import (
     TaskTypeEstimationsCsvImportResource,
@@ -144,6 +148,11 @@ routes = [
     ("/import/csv/persons", PersonsCsvImportResource),
     ("/import/csv/projects/<project_id>/assets", AssetsCsvImportResource),
     ("/import/csv/projects/<project_id>/shots", ShotsCsvImportResource),
+    (
+        "/import/csv/projects/<project_id>/shots/jobs",
+        ShotsCsvImportJobResource,
+    ),
+    ("/import/csv/jobs/<job_id>", CsvImportJobResource),
     ("/import/csv/projects/<project_id>/edits", EditsCsvImportResource),
     ("/import/csv/projects/<project_id>/casting", CastingCsvImportResource),
     (
@@ -9,14 +9,17 @@ from flask.views import MethodView
 from flask_jwt_extended import jwt_required
 
 from zou.app.mixin import ArgsMixin
-from zou.app import app
+from zou.app import app, config
 from zou.app.models.person import Person
 from zou.app.utils import permissions, string
 from zou.app.services import (
+    csv_import_service,
     permissions_service,
+    persons_service,
     projects_service,
     user_service,
 )
+from zou.app.services.exception import WrongParameterException
 
 
 class ImportRowException(Exception):
@@ -52,8 +55,11 @@ class BaseCsvImportResource(MethodView, ArgsMixin):
         file_path = os.path.join(app.config["TMP_DIR"], file_name)
         uploaded_file.save(file_path)
         self.is_update = self.get_bool_parameter("update")
+        self.is_dry_run = self.get_bool_parameter("dry_run")
 
         try:
+            if self.is_dry_run:
+                return self.run_dry_run(file_path, *args), 200
             result = self.run_import(file_path, *args)
             return result, 201
         except ImportRowException as e:
@@ -122,6 +128,13 @@ class BaseCsvImportResource(MethodView, ArgsMixin):
                     raise ImportRowException(str(e), line_number, len(result))
         return result
 
+    def run_dry_run(self, file_path, *args):
+        """
+        Tell what importing given file would do to each row, without writing
+        anything. The imports offering a dry run override this.
+        """
+        raise WrongParameterException("This import has no dry run mode.")
+
     def get_dialect(self, csvfile):
         sniffer = csv.Sniffer()
         sample = csvfile.read(8192)
@@ -226,3 +239,100 @@ class BaseCsvProjectImportResource(BaseCsvImportResource, ArgsMixin):
             for name in value.split(",")
             if name.strip() != ""
         ]
+
+
+class BaseCsvProjectImportJobResource(MethodView, ArgsMixin):
+    """
+    Import a CSV file into a production with the set-based engine of
+    csv_import_service. The file is parsed during the request, then written
+    by a job of the job queue whose progress is polled through the import
+    job route. Without a job queue, the import runs in the request.
+    """
+
+    import_type = None
+
+    @jwt_required()
+    def post(self, project_id):
+        permissions_service.check_manager_project_access(project_id)
+        uploaded_file = request.files["file"]
+        file_path = os.path.join(app.config["TMP_DIR"], f"{uuid.uuid4()}.csv")
+        uploaded_file.save(file_path)
+        try:
+            _, rows = csv_import_service.read_csv_rows(file_path)
+        except csv.Error as e:
+            current_app.logger.error(f"Import failed: {e}")
+            return {"error": True, "message": str(e)}, 400
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+        is_update = self.get_bool_parameter("update")
+        user_id = persons_service.get_current_user()["id"]
+        if config.ENABLE_JOB_QUEUE:
+            job = csv_import_service.start_import_job(
+                self.import_type, project_id, rows, is_update, user_id
+            )
+            return job, 202
+
+        report = csv_import_service.importers[self.import_type](
+            project_id, rows, is_update=is_update, user_id=user_id
+        )
+        return {
+            "id": None,
+            "import_type": self.import_type,
+            "project_id": project_id,
+            "person_id": user_id,
+            "status": "finished",
+            "progress": None,
+            "result": report,
+        }, 201
+
+
+class CsvImportJobResource(MethodView, ArgsMixin):
+    @jwt_required()
+    def get(self, job_id):
+        """
+        Get CSV import job
+        ---
+        tags:
+          - Import
+        description: Follow a CSV import running in the job queue. Returns
+          its status, the stage it reached and, once finished, its report.
+          Only the person who started it and admins can follow it.
+        parameters:
+          - in: path
+            name: job_id
+            required: true
+            schema:
+              type: string
+            example: 0d6c5a4e-4f3e-4b38-8f0e-1d2b3c4d5e6f
+        responses:
+            200:
+              description: Import job status
+              content:
+                application/json:
+                  schema:
+                    type: object
+                    properties:
+                      id:
+                        type: string
+                        example: 0d6c5a4e-4f3e-4b38-8f0e-1d2b3c4d5e6f
+                      status:
+                        type: string
+                        example: started
+                      progress:
+                        type: object
+                        example: {"stage": "write", "done": 1000, "total": 20000}
+                      result:
+                        type: object
+                        description: Report of the import once finished
+            404:
+              description: Import job not found
+        """
+        job = csv_import_service.get_import_job(job_id)
+        if (
+            job["person_id"] != persons_service.get_current_user()["id"]
+            and not permissions.has_admin_permissions()
+        ):
+            raise permissions.PermissionDenied
+        return job
@@ -1,8 +1,10 @@
 from slugify import slugify
 from zou.app.blueprints.source.csv.base import BaseCsvProjectImportResource
 
+from zou.app.models.entity import Entity, EntityLink
 from zou.app.services import (
     assets_service,
+    csv_import_service,
     projects_service,
     shots_service,
     breakdown_service,
@@ -39,12 +41,25 @@ class CastingCsvImportResource(BaseCsvProjectImportResource):
             default: false
             example: false
             description: Whether to update existing casting links
+          - in: query
+            name: dry_run
+            required: false
+            schema:
+              type: boolean
+            default: false
+            example: false
+            description: Write nothing and return, for each row, whether it
+              would create, update or leave its casting link unchanged, or
+              be skipped because its asset or target is unknown
           - in: formData
             name: file
             type: file
             required: true
             description: CSV file with casting link data
         responses:
+            200:
+              description: Dry run report, with the action of each row and
+                the number of rows per action
             201:
               description: Casting links imported successfully
               content:
@@ -130,7 +145,12 @@ class CastingCsvImportResource(BaseCsvProjectImportResource):
     def get_episode_key(self, episode):
         return f"episode{slugify(episode['name'])}"
 
-    def import_row(self, row, project_id):
+    def resolve_row(self, row):
+        """
+        Return the asset and the target (shot, asset or episode) ids given
+        row links, None when unknown, along with the occurences and label
+        of the link.
+        """
         asset_key = slugify(f"{row['Asset Type']}{row['Asset']}")
         if row.get("Episode") in ["MP", None]:
             row["Episode"] = ""
@@ -149,6 +169,95 @@ class CastingCsvImportResource(BaseCsvProjectImportResource):
                 target_id = self.episode_name_map.get(target_key, None)
 
         label = slugify(row.get("Label", "fixed"))
+        return asset_id, target_id, occurences, label
+
+    def run_dry_run(self, file_path, project_id):
+        """
+        Diff the file against the casting of the production, loaded once
+        along with the maps the import resolves names with.
+        """
+        self.prepare_import(project_id)
+        links = {
+            (str(entity_in_id), str(entity_out_id)): (nb_occurences, label)
+            for (
+                entity_in_id,
+                entity_out_id,
+                nb_occurences,
+                label,
+            ) in EntityLink.query.with_entities(
+                EntityLink.entity_in_id,
+                EntityLink.entity_out_id,
+                EntityLink.nb_occurences,
+                EntityLink.label,
+            )
+            .join(Entity, Entity.id == EntityLink.entity_in_id)
+            .filter(Entity.project_id == project_id)
+        }
+
+        _, rows = csv_import_service.read_csv_rows(file_path)
+        report = {
+            "created": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "skipped": 0,
+            "rows": [],
+            "errors": [],
+        }
+        for line_number, row in rows:
+            try:
+                asset_id, target_id, occurences, label = self.resolve_row(row)
+            except KeyError as e:
+                report["errors"].append(
+                    {
+                        "line_number": line_number,
+                        "message": f"A columns is missing: {str(e)}",
+                    }
+                )
+                continue
+            except ValueError as e:
+                report["errors"].append(
+                    {
+                        "line_number": line_number,
+                        "message": f"A value is invalid: {str(e)}",
+                    }
+                )
+                continue
+
+            if asset_id is None or target_id is None:
+                action = "skipped"
+            else:
+                key = (str(target_id), str(asset_id))
+                current = links.get(key)
+                if current is None:
+                    action = "created"
+                elif current == (occurences, label):
+                    action = "unchanged"
+                else:
+                    action = "updated"
+                # Later rows on the same link see what this one did.
+                links[key] = (occurences, label)
+
+            report[action] += 1
+            report["rows"].append(
+                {
+                    "line_number": line_number,
+                    "name": " / ".join(
+                        name
+                        for name in (
+                            row["Episode"],
+                            row["Parent"],
+                            row["Name"],
+                        )
+                        if name
+                    ),
+                    "asset": f"{row['Asset Type']} / {row['Asset']}",
+                    "action": action,
+                }
+            )
+        return report
+
+    def import_row(self, row, project_id):
+        asset_id, target_id, occurences, label = self.resolve_row(row)
 
         if asset_id is not None and target_id is not None:
             entity = entities_service.get_entity_raw(target_id)
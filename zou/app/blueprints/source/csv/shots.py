@@ -1,4 +1,5 @@
 from zou.app.blueprints.source.csv.base import (
+    BaseCsvProjectImportJobResource,
     BaseCsvProjectImportResource,
     RowException,
 )
@@ -7,6 +8,7 @@ from zou.app.models.entity import Entity
 from zou.app.models.project import ProjectTaskTypeLink
 from zou.app.models.task_type import TaskType
 from zou.app.services import (
+    csv_import_service,
     shots_service,
     projects_service,
     index_service,
@@ -53,12 +55,24 @@ class ShotsCsvImportResource(BaseCsvProjectImportResource):
             default: false
             example: false
             description: Whether to update existing shots
+          - in: query
+            name: dry_run
+            required: false
+            schema:
+              type: boolean
+            default: false
+            example: false
+            description: Write nothing and return, for each row, whether it
+              would create, update or leave its shot unchanged
           - in: formData
             name: file
             type: file
             required: true
             description: CSV file with shot data
         responses:
+            200:
+              description: Dry run report, with the action of each row and
+                the number of rows per action
             201:
               description: Shots imported successfully
               content:
@@ -347,8 +361,76 @@ class ShotsCsvImportResource(BaseCsvProjectImportResource):
 
         return entity.serialize()
 
+    def run_dry_run(self, file_path, project_id):
+        _, rows = csv_import_service.read_csv_rows(file_path)
+        plan = csv_import_service.plan_shots_import(
+            project_id, rows, self.is_update
+        )
+        return csv_import_service.get_plan_report(plan)
+
     def run_import(self, file_path, project_id):
         entities = super().run_import(file_path, project_id)
         for task_type in self.task_types_in_project_for_shots:
             create_tasks(task_type.serialize(), self.created_shots)
         return entities
+
+
+class ShotsCsvImportJobResource(BaseCsvProjectImportJobResource):
+    import_type = "shots"
+
+    def post(self, project_id):
+        """
+        Import shots csv as a job
+        ---
+        tags:
+          - Import
+        description: Import project shots from a CSV file with the set-based
+          engine, meant for large files. The columns are the ones of the
+          shots CSV import. The whole file is validated before anything is
+          written, then written in a single transaction by a job of the job
+          queue. Follow it through /import/csv/jobs/{job_id}. Without a job
+          queue, the import runs in the request and its report is returned
+          at once.
+        consumes:
+          - multipart/form-data
+        parameters:
+          - in: path
+            name: project_id
+            required: true
+            schema:
+              type: string
+              format: uuid
+            example: a24a6ea4-ce75-4665-a070-57453082c25
+          - in: query
+            name: update
+            required: false
+            schema:
+              type: boolean
+            default: false
+            example: false
+            description: Whether to update existing shots
+          - in: formData
+            name: file
+            type: file
+            required: true
+            description: CSV file with shot data
+        responses:
+            201:
+              description: Import done in the request, report included
+            202:
+              description: Import job queued
+              content:
+                application/json:
+                  schema:
+                    type: object
+                    properties:
+                      id:
+                        type: string
+                        example: 0d6c5a4e-4f3e-4b38-8f0e-1d2b3c4d5e6f
+                      status:
+                        type: string
+                        example: queued
+            400:
+              description: Unreadable CSV file
+        """
+        return super().post(project_id)
@@ -15,6 +15,7 @@ from zou.app.blueprints.source.shotgun.base import (
 from zou.app.services import (
     assets_service,
     deletion_service,
+    entities_service,
     tasks_service,
     files_service,
     persons_service,
@@ -187,6 +188,7 @@ class ImportShotgunAssetsResource(BaseImportShotgunResource):
             )
             entity.update(data)
             assets_service.clear_asset_cache(str(entity.id))
+            entities_service.clear_entity_names_cache(str(entity.id), data)
             current_app.logger.info(f"Entity updated: {entity}")
         except AssetNotFoundException:
             if data.get("entity_type_id", None) is not None:
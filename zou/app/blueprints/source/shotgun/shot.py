@@ -4,7 +4,7 @@ from flask_jwt_extended import jwt_required
 from zou.app.models.project import Project
 from zou.app.models.entity import Entity
 
-from zou.app.services import shots_service, persons_service
+from zou.app.services import entities_service, shots_service, persons_service
 
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
@@ -223,6 +223,7 @@ class ImportShotgunShotsResource(BaseImportShotgunResource):
             shot.data.update(data["data"])
             shot.save()
             shots_service.clear_shot_cache(str(shot.id))
+            entities_service.clear_entity_names_cache(str(shot.id), data)
             current_app.logger.info(f"Shot updated: {shot}")
 
         return shot
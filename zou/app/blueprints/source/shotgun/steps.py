@@ -5,7 +5,7 @@ from flask_jwt_extended import jwt_required
 from zou.app.models.department import Department
 from zou.app.models.task_type import TaskType
 from zou.app.utils import colors
-from zou.app.services import tasks_service
+from zou.app.services import playlists_service, tasks_service
 
 from zou.app.blueprints.source.shotgun.base import (
     BaseImportShotgunResource,
@@ -170,6 +170,10 @@ class ImportShotgunStepsResource(BaseImportShotgunResource):
                 data.pop("department_id", None)
             task_type.update(data)
             tasks_service.clear_task_type_cache(str(task_type.id))
+            if "name" in data or "priority" in data:
+                playlists_service.clear_task_types_playlist_payloads(
+                    [str(task_type.id)]
+                )
             current_app.logger.info(f"Task Type updated: {task_type}")
         return task_type
 
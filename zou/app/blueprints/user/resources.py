@@ -2120,6 +2120,16 @@ class NotificationsResource(MethodView, ArgsMixin):
               format: date
             description: Filter notifications before this date
             example: "2023-12-31"
+          - in: query
+            name: before_id
+            required: false
+            schema:
+              type: string
+              format: uuid
+            description: Id of the last notification of the previous page,
+              sent along with its creation date as before to get the next
+              page
+            example: c46c8gc6-eg97-6887-c292-79675204e47
           - in: query
             name: task_type_id
             required: false
@@ -2212,6 +2222,7 @@ class NotificationsResource(MethodView, ArgsMixin):
             task_type_id,
             task_status_id,
             notification_type,
+            before_id,
         ) = self.get_arguments()
 
         read = None
@@ -2228,6 +2239,7 @@ class NotificationsResource(MethodView, ArgsMixin):
             notification_type=notification_type,
             read=read,
             watching=watching,
+            before_id=before_id,
         )
         return notifications
 
@@ -2238,6 +2250,7 @@ class NotificationsResource(MethodView, ArgsMixin):
             self.get_text_parameter("task_type_id"),
             self.get_text_parameter("task_status_id"),
             self.get_text_parameter("type"),
+            self.get_text_parameter("before_id"),
         )
 
 
@@ -55,6 +55,10 @@ MEMOIZE_DB_INDEX = 1
 KV_EVENTS_DB_INDEX = 2
 KV_JOB_DB_INDEX = 3
 KV_CONFIG_DB_INDEX = 4
+KV_NOTIFICATIONS_DB_INDEX = 5
+KV_ENTITY_NAMES_DB_INDEX = 6
+KV_PLAYLIST_PAYLOADS_DB_INDEX = 7
+KV_PREVIEW_CACHE_DB_INDEX = 8
 
 JWT_BLACKLIST_ENABLED = True
 JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]
@@ -126,6 +130,10 @@ MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", 20000 * 20000))
 # can no longer fill the disk. Set to 0 to disable the limit.
 MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 10 * 1024**3)) or None
 TMP_DIR = os.getenv("TMP_DIR", os.path.join(tempfile.gettempdir(), "zou"))
+# With a remote storage, download the low def movie, the thumbnails and the
+# tile of each processed movie preview into the temporary folder of every
+# API node, before a reviewer asks for them.
+PREVIEW_CACHE_WARMUP = envtobool("PREVIEW_CACHE_WARMUP", False)
 
 EVENT_STREAM_HOST = os.getenv("EVENT_STREAM_HOST", "localhost")
 EVENT_STREAM_PORT = os.getenv("EVENT_STREAM_PORT", 5001)
@@ -7,7 +7,9 @@ from zou.app.models.base import BaseMixin
 
 class News(db.Model, BaseMixin, SerializerMixin):
     """
-    A news is created each time a comment is posted.
+    A news is created each time a comment is posted. It carries the
+    project, task type, entity and status of its task and comment, so the
+    activity feed is read from this table alone.
     """
 
     change = db.Column(db.Boolean, nullable=False, default=False)
@@ -35,19 +37,76 @@ class News(db.Model, BaseMixin, SerializerMixin):
         nullable=True,
         index=True,
     )
+    project_id = db.Column(
+        UUIDType(binary=False),
+        db.ForeignKey("project.id"),
+        nullable=True,
+        index=True,
+    )
+    task_type_id = db.Column(
+        UUIDType(binary=False),
+        db.ForeignKey("task_type.id"),
+        nullable=True,
+        index=True,
+    )
+    entity_id = db.Column(
+        UUIDType(binary=False),
+        db.ForeignKey("entity.id"),
+        nullable=True,
+        index=True,
+    )
+    task_status_id = db.Column(
+        UUIDType(binary=False),
+        db.ForeignKey("task_status.id"),
+        nullable=True,
+    )
+
+    __table_args__ = (
+        # The feed of a production is read newest first and paged by
+        # (created_at, id), so a page is a single range of this index.
+        db.Index(
+            "ix_news_project_id_created_at_id",
+            "project_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     @classmethod
-    def create_from_import(cls, data):
+    def create_from_import(cls, import_data):
         data = {
-            "id": data["id"],
-            "updated_at": data["created_at"],
-            "created_at": data["created_at"],
-            "change": data["change"],
-            "author_id": data["author_id"],
-            "comment_id": data["comment_id"],
-            "preview_file_id": data["preview_file_id"],
-            "task_id": data["task_id"],
+            "id": import_data["id"],
+            "updated_at": import_data["created_at"],
+            "created_at": import_data["created_at"],
+            "change": import_data["change"],
+            "author_id": import_data["author_id"],
+            "comment_id": import_data["comment_id"],
+            "preview_file_id": import_data["preview_file_id"],
+            "task_id": import_data["task_id"],
         }
+        task_columns = ["project_id", "task_type_id", "entity_id"]
+        if any(import_data.get(key) is None for key in task_columns):
+            from zou.app.models.task import Task
+
+            task = Task.get(data["task_id"])
+            if task is not None:
+                for key in task_columns:
+                    data[key] = getattr(task, key)
+        else:
+            for key in task_columns:
+                data[key] = import_data[key]
+        if import_data.get("task_status_id") is None:
+            from zou.app.models.comment import Comment
+
+            comment = (
+                Comment.get(data["comment_id"])
+                if data["comment_id"] is not None
+                else None
+            )
+            if comment is not None:
+                data["task_status_id"] = comment.task_status_id
+        else:
+            data["task_status_id"] = import_data["task_status_id"]
         previous_data = cls.get(data["id"])
         if previous_data is None:
             return cls.create(**data), False
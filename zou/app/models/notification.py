@@ -67,6 +67,14 @@ class Notification(db.Model, BaseMixin, SerializerMixin):
             "type",
             name="notification_uc",
         ),
+        # The feed of a person is read newest first and paged by
+        # (created_at, id), so a page is a single range of this index.
+        db.Index(
+            "ix_notification_person_id_created_at_id",
+            "person_id",
+            "created_at",
+            "id",
+        ),
     )
 
     def serialize(self, obj_type=None, relations=False, milliseconds=False):
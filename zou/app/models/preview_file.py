@@ -44,6 +44,11 @@ class PreviewFile(db.Model, BaseMixin, SerializerMixin):
         ChoiceType(VALIDATION_STATUSES), default="neutral", nullable=False
     )
     annotations = db.Column(JSONB)
+    # Bumped on each change of the annotations, so a client holding a given
+    # version can skip reloading them.
+    annotations_version = db.Column(
+        db.Integer(), default=0, server_default="0", nullable=False
+    )
     width = db.Column(db.Integer(), default=0)
     height = db.Column(db.Integer(), default=0)
     duration = db.Column(db.Float, default=0)
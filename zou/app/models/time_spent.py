@@ -1,8 +1,20 @@
+import logging
+
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy_utils import UUIDType
 from zou.app import db
 from zou.app.models.serializer import SerializerMixin
 from zou.app.models.base import BaseMixin
 
+logger = logging.getLogger(__name__)
+
+
+def _refresh_time_spent_days(time_spents):
+    # Imported here: the services import the models.
+    from zou.app.services import time_spents_service
+
+    time_spents_service.refresh_time_spent_days_of(time_spents)
+
 
 class TimeSpent(db.Model, BaseMixin, SerializerMixin):
     """
@@ -25,3 +37,96 @@ class TimeSpent(db.Model, BaseMixin, SerializerMixin):
         ),
         db.CheckConstraint("duration > 0", name="check_duration_positive"),
     )
+
+    @classmethod
+    def _get_previous_imports(cls, data_list):
+        """
+        Return the stored versions of the given imported time spents: an
+        update moves their time out of the rollups they counted in.
+        """
+        ids = [data["id"] for data in data_list if data.get("id")]
+        if len(ids) == 0:
+            return []
+        return [
+            time_spent.serialize()
+            for time_spent in cls.query.filter(cls.id.in_(ids))
+        ]
+
+    @classmethod
+    def create_from_import(cls, data):
+        """
+        Import given time spent, then refresh the daily rollups it counted
+        in and the ones it counts in now.
+        """
+        previous_time_spents = cls._get_previous_imports([data])
+        time_spent, is_update = super().create_from_import(data)
+        _refresh_time_spent_days(
+            previous_time_spents + [time_spent.serialize()]
+        )
+        return time_spent, is_update
+
+    @classmethod
+    def create_from_import_list(cls, data_list):
+        """
+        Import given time spents, then refresh their daily rollups once for
+        the whole list rather than once per row.
+        """
+        if "data" in data_list:
+            data_list = data_list["data"]
+        previous_time_spents = cls._get_previous_imports(data_list)
+        for data in data_list:
+            try:
+                super().create_from_import(data)
+            except IntegrityError:
+                logger.error(
+                    f"Failed to import {cls.__name__} {data.get('id')}",
+                    exc_info=1,
+                )
+        _refresh_time_spent_days(previous_time_spents + data_list)
+
+    @classmethod
+    def delete_from_import(cls, instance_id):
+        previous_time_spents = cls._get_previous_imports([{"id": instance_id}])
+        super().delete_from_import(instance_id)
+        _refresh_time_spent_days(previous_time_spents)
+        return instance_id
+
+
+class TimeSpentDay(db.Model, BaseMixin, SerializerMixin):
+    """
+    Sum of the time spents of a person on the tasks of a task type of a
+    project, for one day. Derived from the time spent table, which stays the
+    reference: it is kept up to date when time spents change and can be
+    rebuilt from scratch.
+    """
+
+    duration = db.Column(db.Float, nullable=False, default=0)
+    date = db.Column(db.Date, nullable=False, index=True)
+
+    person_id = db.Column(
+        UUIDType(binary=False),
+        db.ForeignKey("person.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    project_id = db.Column(
+        UUIDType(binary=False),
+        db.ForeignKey("project.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    task_type_id = db.Column(
+        UUIDType(binary=False),
+        db.ForeignKey("task_type.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "person_id",
+            "project_id",
+            "task_type_id",
+            "date",
+            name="time_spent_day_uc",
+        ),
+    )
@@ -900,6 +900,7 @@ def update_asset(asset_id, data):
         project_id=str(asset.project_id),
     )
     clear_asset_cache(asset_id)
+    entities_service.clear_entity_names_cache(asset_id, data)
 
     return asset.serialize(obj_type="Asset")
 
@@ -955,10 +956,7 @@ def remove_asset(asset_id, force=False):
         asset.delete()
         clear_asset_cache(str(asset_id))
 
-        if affected_shot_ids:
-            for shot_id in affected_shot_ids:
-                shot = shots_service.get_shot(shot_id)
-                breakdown_service.refresh_shot_casting_stats(shot)
+        breakdown_service.refresh_shots_casting_stats(list(affected_shot_ids))
     deleted_asset = asset.serialize(obj_type="Asset")
     return deleted_asset
 
@@ -1,9 +1,21 @@
 from slugify import slugify
-from sqlalchemy import desc
+from sqlalchemy import (
+    and_,
+    bindparam,
+    delete,
+    desc,
+    func,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import aliased
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.exc import StaleDataError, DetachedInstanceError
 
+from zou.app import db
 from zou.app.models.asset_instance import AssetInstance
 from zou.app.models.entity import Entity, EntityLink
 from zou.app.models.entity_type import EntityType
@@ -21,7 +33,10 @@ from zou.app.services import (
     shots_service,
     tasks_service,
 )
-from zou.app.services.exception import AssetNotFoundException
+from zou.app.services.exception import (
+    AssetNotFoundException,
+    WrongParameterException,
+)
 
 from flask import current_app
 
@@ -426,6 +441,400 @@ def _extract_removal(entity, casting):
     return assets
 
 
+def _get_shot_episode_ids(shot_ids):
+    """
+    Map each of given shots to the episode its sequence belongs to, for the
+    shots that have one.
+    """
+    Sequence = aliased(Entity, name="sequence")
+    if len(shot_ids) == 0:
+        return {}
+    return {
+        str(shot_id): str(episode_id)
+        for shot_id, episode_id in db.session.execute(
+            select(Entity.id, Sequence.parent_id)
+            .join(Sequence, Sequence.id == Entity.parent_id)
+            .where(Entity.id.in_(shot_ids))
+            .where(Sequence.parent_id.isnot(None))
+        )
+    }
+
+
+def _diff_casting_deltas(deltas):
+    """
+    Compare given deltas with the stored links of their entities and
+    return the links to create, to update and to delete. A delta with no
+    occurence removes its link. When several deltas target the same
+    couple, the last one wins.
+    """
+    wanted = {}
+    for delta in deltas:
+        key = (str(delta["entity_id"]), str(delta["asset_id"]))
+        wanted[key] = delta
+
+    entity_ids = {entity_id for entity_id, _ in wanted}
+    existing = {
+        (str(link.entity_in_id), str(link.entity_out_id)): link
+        for link in db.session.execute(
+            select(
+                EntityLink.id,
+                EntityLink.entity_in_id,
+                EntityLink.entity_out_id,
+                EntityLink.nb_occurences,
+                EntityLink.label,
+            ).where(EntityLink.entity_in_id.in_(entity_ids))
+        )
+    }
+
+    to_create, to_update, to_delete = [], [], []
+    for key, delta in wanted.items():
+        link = existing.get(key)
+        nb_occurences = delta["nb_occurences"]
+        if link is None:
+            if nb_occurences > 0:
+                to_create.append(
+                    {
+                        "id": fields.gen_uuid(),
+                        "entity_in_id": key[0],
+                        "entity_out_id": key[1],
+                        "nb_occurences": nb_occurences,
+                        "label": delta.get("label") or "",
+                    }
+                )
+        elif nb_occurences <= 0:
+            to_delete.append(link)
+        else:
+            label = delta.get("label")
+            if label is None:
+                label = link.label
+            if nb_occurences != link.nb_occurences or label != link.label:
+                to_update.append(
+                    {
+                        "link_id": link.id,
+                        "nb_occurences": nb_occurences,
+                        "label": label,
+                    }
+                )
+    return to_create, to_update, to_delete
+
+
+def patch_casting(project_id, deltas):
+    """
+    Apply given casting deltas, each made of an entity_id, an asset_id, a
+    number of occurences (0 removes the asset) and an optional label, to
+    the entities of given project. The links are diffed against the stored
+    ones, then created, updated and deleted with one statement each and a
+    single commit. Casting an asset in a shot casts it in the episode of
+    the shot, and removing it from the last shot of the episode removes it
+    from the episode, like update_casting does. The casting stats of the
+    shots are refreshed once, at the end.
+    """
+    if len(deltas) == 0:
+        return {"created": 0, "updated": 0, "deleted": 0}
+
+    entity_ids = {str(delta["entity_id"]) for delta in deltas}
+    asset_ids = {str(delta["asset_id"]) for delta in deltas}
+    entities = {
+        str(entity_id): (entity_project_id, entity_type_id)
+        for entity_id, entity_project_id, entity_type_id in db.session.execute(
+            select(Entity.id, Entity.project_id, Entity.entity_type_id).where(
+                Entity.id.in_(entity_ids)
+            )
+        )
+    }
+    episode_type_id = shots_service.get_episode_type()["id"]
+    for entity_id in entity_ids:
+        if entity_id not in entities:
+            raise WrongParameterException(f"Entity {entity_id} not found.")
+        entity_project_id, entity_type_id = entities[entity_id]
+        if str(entity_project_id) != str(project_id):
+            raise WrongParameterException(
+                f"Entity {entity_id} is not part of this project."
+            )
+        if str(entity_type_id) == episode_type_id:
+            raise WrongParameterException(
+                "Episode castings are changed through the entity casting "
+                "route."
+            )
+    found_asset_ids = db.session.scalars(
+        select(Entity.id).where(Entity.id.in_(asset_ids))
+    ).all()
+    if len(found_asset_ids) != len(asset_ids):
+        raise WrongParameterException("Some assets do not exist.")
+
+    to_create, to_update, to_delete = _diff_casting_deltas(deltas)
+
+    link_table = EntityLink.__table__
+    if len(to_create) > 0:
+        db.session.execute(insert(EntityLink), to_create)
+    if len(to_update) > 0:
+        db.session.execute(
+            update(link_table)
+            .where(link_table.c.id == bindparam("link_id"))
+            .values(
+                nb_occurences=bindparam("new_nb_occurences"),
+                label=bindparam("new_label"),
+            ),
+            [
+                {
+                    "link_id": link["link_id"],
+                    "new_nb_occurences": link["nb_occurences"],
+                    "new_label": link["label"],
+                }
+                for link in to_update
+            ],
+        )
+    if len(to_delete) > 0:
+        db.session.execute(
+            delete(EntityLink)
+            .where(EntityLink.id.in_([link.id for link in to_delete]))
+            .execution_options(synchronize_session=False)
+        )
+
+    shot_type_id = shots_service.get_shot_type()["id"]
+    shot_episode_ids = _get_shot_episode_ids(
+        [
+            entity_id
+            for entity_id, (_, entity_type_id) in entities.items()
+            if str(entity_type_id) == shot_type_id
+        ]
+    )
+    added_episode_pairs = {
+        (shot_episode_ids[link["entity_in_id"]], link["entity_out_id"])
+        for link in to_create
+        if link["entity_in_id"] in shot_episode_ids
+    }
+    removed_episode_pairs = {
+        (shot_episode_ids[str(link.entity_in_id)], str(link.entity_out_id))
+        for link in to_delete
+        if str(link.entity_in_id) in shot_episode_ids
+    } - added_episode_pairs
+
+    new_episode_links = []
+    if len(added_episode_pairs) > 0:
+        new_episode_links = db.session.execute(
+            insert(EntityLink)
+            .values(
+                [
+                    {
+                        "id": fields.gen_uuid(),
+                        "entity_in_id": episode_id,
+                        "entity_out_id": asset_id,
+                        "nb_occurences": 1,
+                        "label": "",
+                    }
+                    for episode_id, asset_id in added_episode_pairs
+                ]
+            )
+            .on_conflict_do_nothing(constraint="entity_link_uc")
+            .returning(EntityLink.entity_in_id, EntityLink.entity_out_id)
+        ).all()
+
+    removed_episode_links = []
+    if len(removed_episode_pairs) > 0:
+        Shot = aliased(Entity, name="shot")
+        Sequence = aliased(Entity, name="sequence")
+        still_cast = {
+            (str(episode_id), str(asset_id))
+            for episode_id, asset_id in db.session.execute(
+                select(Sequence.parent_id, EntityLink.entity_out_id)
+                .join(Shot, Shot.id == EntityLink.entity_in_id)
+                .join(Sequence, Sequence.id == Shot.parent_id)
+                .where(
+                    Sequence.parent_id.in_(
+                        {episode_id for episode_id, _ in removed_episode_pairs}
+                    )
+                )
+                .where(
+                    EntityLink.entity_out_id.in_(
+                        {asset_id for _, asset_id in removed_episode_pairs}
+                    )
+                )
+                .distinct()
+            )
+        }
+        unused_pairs = removed_episode_pairs - still_cast
+        if len(unused_pairs) > 0:
+            removed_episode_links = db.session.execute(
+                delete(EntityLink)
+                .where(
+                    tuple_(
+                        EntityLink.entity_in_id, EntityLink.entity_out_id
+                    ).in_(list(unused_pairs))
+                )
+                .returning(EntityLink.entity_in_id, EntityLink.entity_out_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+
+    episode_changes = {}
+    for key, links in (
+        ("added_asset_ids", new_episode_links),
+        ("removed_asset_ids", removed_episode_links),
+    ):
+        for episode_id, asset_id in links:
+            changes = episode_changes.setdefault(
+                str(episode_id),
+                {"added_asset_ids": [], "removed_asset_ids": []},
+            )
+            changes[key].append(str(asset_id))
+
+    link_count = (
+        select(func.count(EntityLink.id))
+        .where(EntityLink.entity_in_id == Entity.id)
+        .correlate(Entity)
+        .scalar_subquery()
+    )
+    nb_entities_out = {
+        str(entity_id): nb
+        for entity_id, nb in db.session.execute(
+            update(Entity)
+            .where(Entity.id.in_(entity_ids | set(episode_changes)))
+            .values(nb_entities_out=link_count)
+            .returning(Entity.id, Entity.nb_entities_out)
+            .execution_options(synchronize_session=False)
+        )
+    }
+    db.session.commit()
+
+    _publish_casting_patch(
+        project_id,
+        entities,
+        shot_type_id,
+        to_create,
+        to_update,
+        to_delete,
+        episode_changes,
+        nb_entities_out,
+    )
+    refresh_shots_casting_stats(
+        [
+            entity_id
+            for entity_id, (_, entity_type_id) in entities.items()
+            if str(entity_type_id) == shot_type_id
+        ]
+    )
+    return {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+        "nb_entities_out": nb_entities_out,
+    }
+
+
+def _publish_casting_patch(
+    project_id,
+    entities,
+    shot_type_id,
+    to_create,
+    to_update,
+    to_delete,
+    episode_changes,
+    nb_entities_out,
+):
+    """
+    Drop the caches of the entities touched by a casting patch and send its
+    events, one round trip per event name.
+    """
+    casting_changes = {}
+    for key, entity_id, asset_id in [
+        ("added_asset_ids", link["entity_in_id"], link["entity_out_id"])
+        for link in to_create
+    ] + [
+        ("removed_asset_ids", str(link.entity_in_id), str(link.entity_out_id))
+        for link in to_delete
+    ]:
+        changes = casting_changes.setdefault(
+            entity_id, {"added_asset_ids": [], "removed_asset_ids": []}
+        )
+        changes[key].append(asset_id)
+
+    for entity_id, (_, entity_type_id) in entities.items():
+        if str(entity_type_id) == shot_type_id:
+            shots_service.clear_shot_cache(entity_id)
+        else:
+            entities_service.clear_entity_cache(entity_id)
+    for episode_id in episode_changes:
+        entities_service.clear_entity_cache(episode_id)
+
+    events.emit_many(
+        "entity-link:new",
+        [
+            {
+                "entity_link_id": link["id"],
+                "entity_in_id": link["entity_in_id"],
+                "entity_out_id": link["entity_out_id"],
+                "nb_occurences": link["nb_occurences"],
+            }
+            for link in to_create
+        ],
+        project_id=project_id,
+    )
+    events.emit_many(
+        "entity-link:update",
+        [
+            {
+                "entity_link_id": link["link_id"],
+                "nb_occurences": link["nb_occurences"],
+            }
+            for link in to_update
+        ],
+        project_id=project_id,
+    )
+    events.emit_many(
+        "entity-link:delete",
+        [
+            {
+                "entity_link_id": link.id,
+                "entity_in_id": link.entity_in_id,
+                "entity_out_id": link.entity_out_id,
+            }
+            for link in to_delete
+        ],
+        project_id=project_id,
+    )
+
+    shot_events, asset_events = [], []
+    for entity_id, changes in casting_changes.items():
+        data = {"nb_entities_out": nb_entities_out[entity_id], **changes}
+        if str(entities[entity_id][1]) == shot_type_id:
+            shot_events.append({"shot_id": entity_id, **data})
+        else:
+            asset_events.append({"asset_id": entity_id, **data})
+    events.emit_many("shot:casting-update", shot_events, project_id=project_id)
+    events.emit_many(
+        "asset:casting-update", asset_events, project_id=project_id
+    )
+    events.emit_many(
+        "episode:casting-update",
+        [
+            {
+                "episode_id": episode_id,
+                "nb_entities_out": nb_entities_out[episode_id],
+                **changes,
+            }
+            for episode_id, changes in episode_changes.items()
+        ],
+        project_id=project_id,
+    )
+    # Like the casting of an episode through its shots, see
+    # _create_episode_casting_link and _detach_asset_from_episode_if_unused.
+    events.emit_many(
+        "asset:update",
+        [
+            {"asset_id": asset_id}
+            for asset_id in sorted(
+                {
+                    asset_id
+                    for changes in episode_changes.values()
+                    for asset_ids in changes.values()
+                    for asset_id in asset_ids
+                }
+            )
+        ],
+        project_id=project_id,
+    )
+
+
 def _remove_asset_from_episode_shots(asset_id, episode_id):
     """
     Drop an asset from the casting of every shot of given episode.
@@ -435,12 +844,13 @@ def _remove_asset_from_episode_shots(asset_id, episode_id):
     links = EntityLink.query.filter(
         EntityLink.entity_in_id.in_(shot_ids)
     ).filter(EntityLink.entity_out_id == asset_id)
+    updated_shot_ids = []
     for link in links:
         shot = shots_service.get_shot_raw(str(link.entity_in_id))
         shot.update({"nb_entities_out": shot.nb_entities_out - 1})
         shots_service.clear_shot_cache(str(shot.id))
-        refresh_shot_casting_stats(shot.serialize())
         link.delete()
+        updated_shot_ids.append(str(shot.id))
         events.emit(
             "shot:casting-update",
             {
@@ -451,6 +861,7 @@ def _remove_asset_from_episode_shots(asset_id, episode_id):
             },
             project_id=str(shot.project_id),
         )
+    refresh_shots_casting_stats(updated_shot_ids)
     return shots
 
 
@@ -860,46 +1271,163 @@ def get_entity_link(entity_in_id, entity_out_id):
         return None
 
 
+def _get_shot_task_type_priorities(name):
+    """
+    Subquery giving the priority of each shot task type in each project,
+    which is what orders the pipeline steps (the SQL counterpart of
+    _get_task_type_priority_map).
+    """
+    return (
+        select(
+            ProjectTaskTypeLink.project_id,
+            ProjectTaskTypeLink.task_type_id,
+            ProjectTaskTypeLink.priority,
+        )
+        .join(TaskType, TaskType.id == ProjectTaskTypeLink.task_type_id)
+        .where(TaskType.for_entity == "Shot")
+        .subquery(name)
+    )
+
+
+def _build_casting_stats_query(task_filter):
+    """
+    Subquery giving, for each task matching task_filter (a clause on the
+    shot_task alias of Task), the number of assets cast in its entity that
+    are ready for it. It follows the rules of _is_asset_ready.
+    """
+    ShotTask = aliased(Task, name="shot_task")
+    Asset = aliased(Entity, name="asset")
+    task_priority = _get_shot_task_type_priorities("task_priority")
+    ready_priority = _get_shot_task_type_priorities("ready_priority")
+    is_ready = and_(
+        func.coalesce(Asset.canceled, False) == False,
+        or_(
+            and_(
+                Asset.is_shared == True,
+                Asset.project_id != ShotTask.project_id,
+            ),
+            and_(
+                Asset.ready_for.isnot(None),
+                func.coalesce(task_priority.c.priority, 0)
+                <= func.coalesce(
+                    func.nullif(ready_priority.c.priority, 0), -1
+                ),
+            ),
+        ),
+    )
+    return (
+        select(
+            ShotTask.id.label("task_id"),
+            func.count(Asset.id).filter(is_ready).label("nb_assets_ready"),
+        )
+        .outerjoin(EntityLink, EntityLink.entity_in_id == ShotTask.entity_id)
+        .outerjoin(Asset, Asset.id == EntityLink.entity_out_id)
+        .outerjoin(
+            task_priority,
+            and_(
+                task_priority.c.project_id == ShotTask.project_id,
+                task_priority.c.task_type_id == ShotTask.task_type_id,
+            ),
+        )
+        .outerjoin(
+            ready_priority,
+            and_(
+                ready_priority.c.project_id == ShotTask.project_id,
+                ready_priority.c.task_type_id == Asset.ready_for,
+            ),
+        )
+        .where(task_filter(ShotTask))
+        .group_by(ShotTask.id)
+        .subquery("casting_stats")
+    )
+
+
+def _refresh_casting_stats(task_filter, clear_all_tasks=False):
+    """
+    Compute the number of ready assets of every task matching task_filter
+    in the database, then store it with a single UPDATE ... FROM. Only the
+    tasks whose count changed are written and announced, with one event
+    round trip per project. When clear_all_tasks is set, the whole task
+    cache is dropped at once instead of task by task.
+    """
+    stats = _build_casting_stats_query(task_filter)
+    updated_tasks = db.session.execute(
+        update(Task)
+        .values(nb_assets_ready=stats.c.nb_assets_ready)
+        .where(Task.id == stats.c.task_id)
+        .where(Task.nb_assets_ready.is_distinct_from(stats.c.nb_assets_ready))
+        .returning(Task.id, Task.project_id, Task.nb_assets_ready)
+    ).all()
+    db.session.commit()
+
+    if clear_all_tasks and len(updated_tasks) > 0:
+        tasks_service.clear_all_tasks_cache()
+    task_events = {}
+    for task_id, project_id, nb_assets_ready in updated_tasks:
+        if not clear_all_tasks:
+            tasks_service.clear_task_cache(str(task_id))
+        task_events.setdefault(str(project_id), []).append(
+            {"task_id": str(task_id), "nb_assets_ready": nb_assets_ready}
+        )
+    for project_id, data_list in task_events.items():
+        events.emit_many(
+            "task:update-casting-stats",
+            data_list,
+            persist=False,
+            project_id=project_id,
+        )
+    return len(updated_tasks)
+
+
 def refresh_casting_stats(asset):
     """
     For each shot including given asset, for all related tasks, it computes
     how many assets are available for this task and saves the result
     on the task level.
     """
-
-    cast_in = get_cast_in(asset["id"])
-    shots = [entity for entity in cast_in if "shot_id" in entity]
-    priority_map = _get_task_type_priority_map(asset["project_id"])
-    for shot in shots:
-        refresh_shot_casting_stats(
-            {"id": shot["shot_id"], "project_id": asset["project_id"]},
-            priority_map,
-        )
+    Shot = aliased(Entity, name="shot")
+    shot_ids = (
+        select(EntityLink.entity_in_id)
+        .join(Shot, Shot.id == EntityLink.entity_in_id)
+        .where(EntityLink.entity_out_id == asset["id"])
+        .where(Shot.parent_id.isnot(None))
+        .where(Shot.canceled.isnot(True))
+    )
+    _refresh_casting_stats(lambda task: task.entity_id.in_(shot_ids))
     return asset
 
 
-def refresh_shot_casting_stats(shot, priority_map=None):
+def refresh_shot_casting_stats(shot):
     """
     For all tasks related to given shot, it computes how many assets are
     available for this task and saves the result on the task level.
     """
-    if priority_map is None:
-        priority_map = _get_task_type_priority_map(shot["project_id"])
-    casting = get_entity_casting(shot["id"])
-    tasks = Task.get_all_by(entity_id=shot["id"])
-    for task in tasks:
-        nb_ready = 0
-        for asset in casting:
-            if _is_asset_ready(asset, task, priority_map):
-                nb_ready += 1
-        task.update({"nb_assets_ready": nb_ready})
-        tasks_service.clear_task_cache(str(task.id))
-        events.emit(
-            "task:update-casting-stats",
-            {"task_id": str(task.id), "nb_assets_ready": nb_ready},
-            persist=False,
-            project_id=shot["project_id"],
-        )
+    _refresh_casting_stats(lambda task: task.entity_id == shot["id"])
+
+
+def refresh_shots_casting_stats(shot_ids):
+    """
+    Same as refresh_shot_casting_stats, for all given shots at once.
+    """
+    if len(shot_ids) > 0:
+        _refresh_casting_stats(lambda task: task.entity_id.in_(shot_ids))
+
+
+def refresh_project_casting_stats(project_id):
+    """
+    For all shots of given project, it computes how many assets are
+    available. It saves the result on the task level.
+    """
+    shot_ids = select(Entity.id).where(
+        Entity.project_id == project_id,
+        Entity.entity_type_id == shots_service.get_shot_type()["id"],
+    )
+    return _refresh_casting_stats(
+        lambda task: and_(
+            task.project_id == project_id, task.entity_id.in_(shot_ids)
+        ),
+        clear_all_tasks=True,
+    )
 
 
 def refresh_all_shot_casting_stats():
@@ -908,9 +1436,7 @@ def refresh_all_shot_casting_stats():
     available. It saves the result on the task level.
     """
     for project in projects_service.open_projects():
-        priority_map = _get_task_type_priority_map(project["id"])
-        for shot in shots_service.get_shots_for_project(project["id"]):
-            refresh_shot_casting_stats(shot, priority_map)
+        refresh_project_casting_stats(project["id"])
 
 
 def _get_task_type_priority_map(project_id):
@@ -10,7 +10,6 @@ from sqlalchemy.exc import IntegrityError
 from zou.app.models.attachment_file import AttachmentFile
 from zou.app.models.comment import Comment
 from zou.app.models.department import Department
-from zou.app.models.notification import Notification
 from zou.app.models.person import Person
 from zou.app.models.project import Project
 from zou.app.models.task import Task
@@ -512,7 +511,7 @@ def move_comment_to_task(comment_id, target_task_id):
             "A comment attached to a preview revision cannot be moved."
         )
 
-    Notification.delete_all_by(comment_id=comment.id)
+    notifications_service.delete_notifications(comment_id=comment.id)
     news_service.delete_news_for_comment(comment.id)
 
     comment.update({"object_id": target_task["id"]})
@@ -810,7 +809,7 @@ def delete_reply(comment_id, reply_id):
     ]
     comment.save()
     tasks_service.clear_comment_cache(comment_id)
-    Notification.delete_all_by(reply_id=reply_id)
+    notifications_service.delete_notifications(reply_id=reply_id)
     events.emit(
         "comment:delete-reply",
         {
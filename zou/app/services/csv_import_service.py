@@ -0,0 +1,717 @@
+"""
+Set-based CSV imports, meant to run as a background job.
+
+The imports of blueprints/source/csv handle one row at a time: each row is
+looked up, committed and announced on its own. This engine works by stages
+instead:
+
+- parse: the whole file is read at once.
+- resolve: every name is resolved with one query per kind of object.
+- validate: every row is checked, and the problems are collected into a
+  report rather than raised at the first one.
+- write: a file without errors is written with chunked bulk INSERT and
+  UPDATE statements, committed once.
+- publish: the events are sent in a single round trip and the search
+  index is fed by batches.
+
+Comments and assignations asked for by the file still go through
+tasks_service and comments_service one task at a time. They trigger
+notifications and status automations that have no set-based equivalent.
+"""
+
+import csv
+
+from sqlalchemy import insert, update
+
+from zou.app import db
+from zou.app.models.entity import Entity
+from zou.app.models.person import Person
+from zou.app.models.project import ProjectTaskTypeLink
+from zou.app.models.task import Task
+from zou.app.models.task_type import TaskType
+from zou.app.services import (
+    comments_service,
+    index_service,
+    projects_service,
+    shots_service,
+    tasks_service,
+)
+from zou.app.services.exception import (
+    ImportJobNotFoundException,
+    WrongParameterException,
+)
+from zou.app.utils import date_helpers, events, fields, jobs, string
+
+CHUNK_SIZE = 1000
+
+
+def read_csv_rows(file_path):
+    """
+    Read given CSV file and return its column names and its rows, each row
+    paired with its line number in the file (header included), which is the
+    line the user sees.
+    """
+    with open(file_path, newline="", encoding="utf-8") as csvfile:
+        sample = csvfile.read(8192)
+        csvfile.seek(0)
+        dialect = csv.Sniffer().sniff(sample)
+        dialect.doublequote = True
+        reader = csv.DictReader(csvfile, dialect=dialect)
+        rows = [(reader.line_num, row) for row in reader]
+        return reader.fieldnames or [], rows
+
+
+def _notify_progress(progress, stage, done=0, total=0):
+    if progress is not None:
+        progress(stage, done, total)
+
+
+def _get_cell(row, *names):
+    """
+    Return the first non empty cell among given column names, or None.
+    """
+    for name in names:
+        value = row.get(name, None)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _get_int_cell(row, field_name, *names):
+    value = _get_cell(row, *names)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        raise WrongParameterException(
+            f"{field_name} must be an integer, got '{value}'"
+        )
+
+
+def _build_person_lookup():
+    """
+    Map every person id, lowercased full name and lowercased email to the
+    person id, so that cells written either way resolve.
+    """
+    lookup = {}
+    for person_id, first_name, last_name, email in Person.query.with_entities(
+        Person.id, Person.first_name, Person.last_name, Person.email
+    ):
+        person_id = str(person_id)
+        lookup[person_id] = person_id
+        lookup[f"{first_name} {last_name}".strip().lower()] = person_id
+        if email:
+            lookup[email.lower()] = person_id
+    return lookup
+
+
+def _get_person_id(person_lookup, value):
+    person_id = person_lookup.get(value.strip().lower())
+    if person_id is None:
+        raise WrongParameterException(f"Person not found for {value}")
+    return person_id
+
+
+def _get_descriptor_values(row, descriptor_fields, person_lookup, data):
+    """
+    Merge the metadata descriptor cells of given row into data, the way the
+    per-row import stores them.
+    """
+    for name, descriptor in descriptor_fields.items():
+        if name in row:
+            value = row[name]
+            if value not in (None, ""):
+                if descriptor["data_type"] == "boolean":
+                    try:
+                        is_true = string.strtobool(value)
+                    except ValueError as e:
+                        raise WrongParameterException(
+                            f"A value is invalid: {e}"
+                        )
+                    value = "true" if is_true else "false"
+                elif descriptor["data_type"] == "person":
+                    value = _get_person_id(person_lookup, value)
+            data[descriptor["field_name"]] = value
+    return data
+
+
+def _get_tasks_update(row, task_types, task_statuses, person_lookup):
+    """
+    Read the status, comment and assignation cells of every task type.
+    """
+    tasks_update = []
+    for task_type in task_types:
+        task_status_name = row.get(task_type["name"], None)
+        task_status_id = None
+        if task_status_name not in (None, ""):
+            task_status_id = task_statuses.get(task_status_name.lower())
+            if task_status_id is None:
+                raise WrongParameterException(
+                    f"Task status not found for {task_status_name}"
+                )
+
+        comment = row.get(f"{task_type['name']} comment", None)
+        assignations = row.get(f"{task_type['name']} assignations", None)
+        assignees = []
+        if assignations not in (None, ""):
+            assignees = [
+                _get_person_id(person_lookup, name)
+                for name in assignations.split(",")
+                if name.strip() != ""
+            ]
+
+        if (
+            task_status_id is not None
+            or comment not in (None, "")
+            or assignees
+        ):
+            tasks_update.append(
+                {
+                    "task_type_id": task_type["id"],
+                    "task_status_id": task_status_id,
+                    "comment": comment,
+                    "assignees": assignees,
+                }
+            )
+    return tasks_update
+
+
+def _get_shot_context(project_id):
+    """
+    Load, with one query per kind of object, everything a shots file refers
+    to in given project.
+    """
+    project = projects_service.get_project(project_id)
+    episode_type = shots_service.get_episode_type()
+    sequence_type = shots_service.get_sequence_type()
+    shot_type = shots_service.get_shot_type()
+
+    entities = (
+        Entity.query.with_entities(
+            Entity.id,
+            Entity.entity_type_id,
+            Entity.parent_id,
+            Entity.name,
+            Entity.description,
+            Entity.nb_frames,
+            Entity.data,
+        )
+        .filter(Entity.project_id == project_id)
+        .filter(
+            Entity.entity_type_id.in_(
+                [episode_type["id"], sequence_type["id"], shot_type["id"]]
+            )
+        )
+    )
+    episodes, sequences, shots = {}, {}, {}
+    for (
+        entity_id,
+        entity_type_id,
+        parent_id,
+        name,
+        description,
+        nb_frames,
+        data,
+    ) in entities:
+        entity_type_id = str(entity_type_id)
+        parent_id = str(parent_id) if parent_id else None
+        if entity_type_id == episode_type["id"]:
+            episodes[name] = str(entity_id)
+        elif entity_type_id == sequence_type["id"]:
+            sequences[(parent_id, name)] = str(entity_id)
+        else:
+            shots[(parent_id, name)] = {
+                "id": str(entity_id),
+                "description": description,
+                "nb_frames": nb_frames,
+                "data": dict(data or {}),
+            }
+
+    task_statuses = {}
+    for task_status in tasks_service.get_task_statuses():
+        for field in ("name", "short_name"):
+            task_statuses.setdefault(
+                task_status[field].lower(), task_status["id"]
+            )
+
+    task_types = [
+        task_type.serialize()
+        for task_type in TaskType.query.join(ProjectTaskTypeLink)
+        .filter(ProjectTaskTypeLink.project_id == project_id)
+        .filter(TaskType.for_entity == "Shot")
+    ]
+
+    return {
+        "project_id": str(project_id),
+        "is_tv_show": projects_service.is_tv_show(project),
+        "episode_type_id": episode_type["id"],
+        "sequence_type_id": sequence_type["id"],
+        "shot_type_id": shot_type["id"],
+        "episodes": episodes,
+        "sequences": sequences,
+        "shots": shots,
+        "task_statuses": task_statuses,
+        "task_types": task_types,
+        "descriptor_fields": {
+            descriptor["name"]: descriptor
+            for descriptor in projects_service.get_metadata_descriptors(
+                project_id
+            )
+            if descriptor["entity_type"] == "Shot"
+        },
+        "person_lookup": _build_person_lookup(),
+    }
+
+
+def _get_shot_values(row, context, current):
+    """
+    Compute the values a row sets on a shot, starting from the current ones.
+    """
+    values = {}
+    description = row.get("Description", None)
+    if description is not None:
+        values["description"] = description
+
+    nb_frames = _get_int_cell(row, "nb_frames", "Nb Frames", "Frames")
+    if nb_frames is not None:
+        values["nb_frames"] = nb_frames
+
+    data = dict(current["data"]) if current is not None else {}
+    frame_in = _get_int_cell(row, "frame_in", "Frame In", "In")
+    if frame_in is not None:
+        data["frame_in"] = frame_in
+    frame_out = _get_int_cell(row, "frame_out", "Frame Out", "Out")
+    if frame_out is not None:
+        data["frame_out"] = frame_out
+
+    # Keep the frame count consistent with an imported frame range when
+    # the file doesn't provide it explicitly.
+    if "nb_frames" not in values:
+        try:
+            frame_in = int(data["frame_in"])
+            frame_out = int(data["frame_out"])
+            if frame_out > frame_in:
+                values["nb_frames"] = frame_out - frame_in + 1
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    for column, field in (("FPS", "fps"), ("Resolution", "resolution")):
+        value = row.get(column, None)
+        if value is not None:
+            data[field] = value
+
+    values["data"] = _get_descriptor_values(
+        row, context["descriptor_fields"], context["person_lookup"], data
+    )
+    return values
+
+
+def _has_changes(current, values):
+    return any(current.get(field) != value for field, value in values.items())
+
+
+def plan_shots_import(project_id, rows, is_update=False, progress=None):
+    """
+    Resolve and validate the rows of a shots file against the current state
+    of given project, without writing anything. The returned plan lists what
+    each row would do (created, updated or unchanged) and the errors found,
+    each with the line number it comes from.
+    """
+    _notify_progress(progress, "resolve")
+    context = _get_shot_context(project_id)
+    plan = {
+        "context": context,
+        "episodes": {},
+        "sequences": {},
+        "shots": {},
+        "tasks_update": [],
+        "rows": [],
+        "errors": [],
+    }
+    required_columns = ["Sequence", "Name"]
+    if context["is_tv_show"]:
+        required_columns.insert(0, "Episode")
+    if len(rows) > 0:
+        missing = [name for name in required_columns if name not in rows[0][1]]
+        if missing:
+            plan["errors"].append(
+                {
+                    "line_number": 1,
+                    "message": f"A column is missing: {', '.join(missing)}",
+                }
+            )
+            return plan
+
+    episodes = dict(context["episodes"])
+    sequences = dict(context["sequences"])
+    shots = context["shots"]
+    total = len(rows)
+    for index, (line_number, row) in enumerate(rows):
+        if index % CHUNK_SIZE == 0:
+            _notify_progress(progress, "validate", index, total)
+
+        episode_id = None
+        episode_name = ""
+        if context["is_tv_show"]:
+            episode_name = row["Episode"]
+            episode_id = episodes.get(episode_name)
+            if episode_id is None:
+                episode_id = str(fields.gen_uuid())
+                episodes[episode_name] = episode_id
+                plan["episodes"][episode_id] = episode_name
+
+        sequence_key = (episode_id, row["Sequence"])
+        sequence_id = sequences.get(sequence_key)
+        if sequence_id is None:
+            sequence_id = str(fields.gen_uuid())
+            sequences[sequence_key] = sequence_id
+            plan["sequences"][sequence_id] = sequence_key
+
+        shot_key = (sequence_id, row["Name"])
+        name = " / ".join(
+            name
+            for name in (episode_name, row["Sequence"], row["Name"])
+            if name
+        )
+        planned = plan["shots"].get(shot_key)
+        current = planned["values"] if planned is not None else None
+        if current is None:
+            current = shots.get(shot_key)
+
+        try:
+            values = _get_shot_values(row, context, current)
+            tasks_update = _get_tasks_update(
+                row,
+                context["task_types"],
+                context["task_statuses"],
+                context["person_lookup"],
+            )
+        except WrongParameterException as e:
+            plan["errors"].append(
+                {"line_number": line_number, "message": str(e)}
+            )
+            continue
+
+        if current is None:
+            action = "created"
+            shot_id = str(fields.gen_uuid())
+            plan["shots"][shot_key] = {
+                "id": shot_id,
+                "action": action,
+                "values": {"description": None, "nb_frames": None, **values},
+            }
+        elif not is_update:
+            action = "unchanged"
+            shot_id = current["id"]
+            tasks_update = []
+        elif not _has_changes(current, values) and not tasks_update:
+            action = "unchanged"
+            shot_id = current["id"]
+        else:
+            action = "updated"
+            shot_id = current["id"]
+            if planned is None:
+                plan["shots"][shot_key] = {
+                    "id": shot_id,
+                    "action": action,
+                    "values": {**current, **values},
+                }
+            else:
+                planned["values"].update(values)
+
+        for task_update in tasks_update:
+            plan["tasks_update"].append(
+                {
+                    "shot_id": shot_id,
+                    "line_number": line_number,
+                    **task_update,
+                }
+            )
+        plan["rows"].append(
+            {"line_number": line_number, "name": name, "action": action}
+        )
+    _notify_progress(progress, "validate", total, total)
+    return plan
+
+
+def get_plan_report(plan):
+    """
+    Summarize given plan: the action of every row, how many rows fall under
+    each action, and the errors.
+    """
+    report = {
+        "created": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "skipped": 0,
+        "rows": plan["rows"],
+        "errors": plan["errors"],
+    }
+    for row in plan["rows"]:
+        report[row["action"]] += 1
+    return report
+
+
+def _chunks(values):
+    for index in range(0, len(values), CHUNK_SIZE):
+        yield values[index : index + CHUNK_SIZE]
+
+
+def _write_shots_plan(plan, user_id, progress=None):
+    """
+    Write given plan with bulk statements, then commit once.
+    """
+    context = plan["context"]
+    project_id = context["project_id"]
+    now = date_helpers.get_utc_now_datetime()
+    base_values = {
+        "project_id": project_id,
+        "created_by": user_id,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+    new_entities = [
+        {
+            **base_values,
+            "id": episode_id,
+            "name": name,
+            "entity_type_id": context["episode_type_id"],
+            "status": "running",
+            "description": "",
+            "data": {},
+        }
+        for episode_id, name in plan["episodes"].items()
+    ] + [
+        {
+            **base_values,
+            "id": sequence_id,
+            "name": name,
+            "entity_type_id": context["sequence_type_id"],
+            "parent_id": episode_id,
+            "description": "",
+            "data": {},
+        }
+        for sequence_id, (episode_id, name) in plan["sequences"].items()
+    ]
+    new_shots = []
+    updated_shots = []
+    for (sequence_id, name), shot in plan["shots"].items():
+        if shot["action"] == "created":
+            new_shots.append(
+                {
+                    **base_values,
+                    **shot["values"],
+                    "id": shot["id"],
+                    "name": name,
+                    "entity_type_id": context["shot_type_id"],
+                    "parent_id": sequence_id,
+                }
+            )
+        else:
+            values = dict(shot["values"])
+            values.pop("id", None)
+            updated_shots.append(
+                {**values, "id": shot["id"], "updated_at": now}
+            )
+
+    total = len(new_entities) + len(new_shots) + len(updated_shots)
+    done = 0
+    # Episodes and sequences go first since shots point at them.
+    for chunk in _chunks(new_entities + new_shots):
+        db.session.execute(insert(Entity), chunk)
+        done += len(chunk)
+        _notify_progress(progress, "write", done, total)
+    for chunk in _chunks(updated_shots):
+        db.session.execute(update(Entity), chunk)
+        done += len(chunk)
+        _notify_progress(progress, "write", done, total)
+
+    new_tasks = []
+    if new_shots and context["task_types"]:
+        task_status = tasks_service.get_default_status()
+        new_tasks = [
+            {
+                "id": str(fields.gen_uuid()),
+                "name": "main",
+                "duration": 0,
+                "estimation": 0,
+                "completion_rate": 0,
+                "project_id": project_id,
+                "task_type_id": task_type["id"],
+                "task_status_id": task_status["id"],
+                "entity_id": shot["id"],
+                "assigner_id": user_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for shot in new_shots
+            for task_type in context["task_types"]
+        ]
+        for chunk in _chunks(new_tasks):
+            db.session.execute(insert(Task), chunk)
+
+    db.session.commit()
+    return new_entities, new_shots, updated_shots, new_tasks
+
+
+def _publish_shots_import(
+    project_id, plan, new_entities, new_shots, updated_shots, new_tasks
+):
+    """
+    Send the events of a written import, one round trip per event name,
+    and index the shots it touched.
+    """
+    episode_ids = set(plan["episodes"])
+    for event, key, ids in (
+        ("episode:new", "episode_id", episode_ids),
+        (
+            "sequence:new",
+            "sequence_id",
+            [
+                entity["id"]
+                for entity in new_entities
+                if entity["id"] not in episode_ids
+            ],
+        ),
+        ("shot:new", "shot_id", [shot["id"] for shot in new_shots]),
+        ("shot:update", "shot_id", [shot["id"] for shot in updated_shots]),
+        ("task:new", "task_id", [task["id"] for task in new_tasks]),
+    ):
+        events.emit_many(
+            event, [{key: value} for value in ids], project_id=project_id
+        )
+
+    shot_ids = [shot["id"] for shot in new_shots + updated_shots]
+    for chunk in _chunks(shot_ids):
+        index_service.index_shots(
+            Entity.query.filter(Entity.id.in_(chunk)).all()
+        )
+
+
+def _apply_tasks_update(plan, user_id):
+    """
+    Post the comments and assignations asked for by the file, through the
+    regular services so that notifications and automations follow.
+    """
+    if len(plan["tasks_update"]) == 0:
+        return
+    shot_ids = {task_update["shot_id"] for task_update in plan["tasks_update"]}
+    tasks = {
+        (str(task.entity_id), str(task.task_type_id)): task
+        for task in Task.query.filter(Task.entity_id.in_(shot_ids))
+    }
+    for task_update in plan["tasks_update"]:
+        key = (task_update["shot_id"], task_update["task_type_id"])
+        task = tasks.get(key)
+        if task is None:
+            task = Task.get(
+                tasks_service.create_task(
+                    tasks_service.get_task_type(task_update["task_type_id"]),
+                    shots_service.get_shot(task_update["shot_id"]),
+                )["id"]
+            )
+            tasks[key] = task
+        already_assigned = {str(person.id) for person in task.assignees}
+        for person_id in task_update["assignees"]:
+            if person_id not in already_assigned:
+                tasks_service.assign_task(str(task.id), person_id, user_id)
+        task_status_id = str(task.task_status_id)
+        if task_update["comment"] is not None or (
+            task_update["task_status_id"] is not None
+            and task_update["task_status_id"] != task_status_id
+        ):
+            try:
+                comments_service.create_comment(
+                    user_id,
+                    str(task.id),
+                    task_update["task_status_id"] or task_status_id,
+                    task_update["comment"] or "",
+                    [],
+                    {},
+                    "",
+                )
+            except WrongParameterException:
+                pass
+
+
+def import_shots(
+    project_id, rows, is_update=False, user_id=None, progress=None
+):
+    """
+    Import the given rows of a shots file into given project. Nothing is
+    written when a row is invalid: the report then lists every error found.
+    progress is called with a stage name, the number of items done and the
+    total number of items of the stage.
+    """
+    plan = plan_shots_import(project_id, rows, is_update, progress)
+    report = get_plan_report(plan)
+    if len(plan["errors"]) > 0:
+        return report
+
+    new_entities, new_shots, updated_shots, new_tasks = _write_shots_plan(
+        plan, user_id, progress
+    )
+    _notify_progress(progress, "publish")
+    _publish_shots_import(
+        project_id, plan, new_entities, new_shots, updated_shots, new_tasks
+    )
+    _notify_progress(progress, "tasks")
+    _apply_tasks_update(plan, user_id)
+    return report
+
+
+importers = {"shots": import_shots}
+
+
+IMPORT_JOB_FIELDS = ["import_type", "project_id"]
+
+
+def start_import_job(import_type, project_id, rows, is_update, user_id):
+    """
+    Queue given import as a job. The job remembers who started it, the only
+    person allowed to follow it besides admins.
+    """
+    job = jobs.start_job(
+        run_import_job,
+        (import_type, str(project_id), rows, is_update, user_id),
+        {
+            "import_type": import_type,
+            "project_id": str(project_id),
+            "person_id": user_id,
+        },
+    )
+    return get_import_job_status(job)
+
+
+def get_import_job_status(job):
+    """
+    Return the status of given import job, its progress and, once finished,
+    its report.
+    """
+    return jobs.get_job_status(job, IMPORT_JOB_FIELDS)
+
+
+def get_import_job(job_id):
+    """
+    Return the status of the import job matching given id.
+    """
+    job = jobs.fetch_job(job_id, ImportJobNotFoundException)
+    if job.meta.get("import_type") not in importers:
+        raise ImportJobNotFoundException
+    return get_import_job_status(job)
+
+
+def run_import_job(import_type, project_id, rows, is_update, user_id):
+    """
+    Run given import as a job of the job queue. The progress is stored in
+    the job metadata, where the import job route reads it.
+    """
+    return jobs.run_job(
+        importers[import_type],
+        project_id,
+        rows,
+        is_update=is_update,
+        user_id=user_id,
+    )
@@ -85,10 +85,10 @@ def remove_comment(comment_id):
     if comment is None:
         raise CommentNotFoundException
 
+    from zou.app.services import notifications_service
+
     task = Task.get(comment.object_id)
-    notifications = Notification.query.filter_by(comment_id=comment.id)
-    for notification in notifications:
-        notification.delete()
+    notifications_service.delete_notifications(comment_id=comment.id)
 
     news_list = News.query.filter_by(comment_id=comment.id)
     for news in news_list:
@@ -128,7 +128,11 @@ def remove_task(task_id, force=False):
     Remove given task. Force deletion if the task has some comments and files
     related. This will lead to the deletion of all of them.
     """
-    from zou.app.services import tasks_service
+    from zou.app.services import (
+        notifications_service,
+        tasks_service,
+        time_spents_service,
+    )
 
     task = Task.get(task_id)
     if task is None:
@@ -145,9 +149,7 @@ def remove_task(task_id, force=False):
 
         comments = Comment.query.filter_by(object_id=task_id)
         for comment in comments:
-            notifications = Notification.query.filter_by(comment_id=comment.id)
-            for notification in notifications:
-                notification.delete()
+            notifications_service.delete_notifications(comment_id=comment.id)
             news_list = News.query.filter_by(comment_id=comment.id)
             for news in news_list:
                 news.delete()
@@ -161,13 +163,19 @@ def remove_task(task_id, force=False):
         for preview_file in preview_files:
             remove_preview_file(preview_file)
 
-        time_spents = TimeSpent.query.filter_by(task_id=task_id)
+        time_spents = TimeSpent.query.filter_by(task_id=task_id).all()
         for time_spent in time_spents:
             time_spent.delete()
+        if len(time_spents) > 0:
+            dates = [time_spent.date for time_spent in time_spents]
+            time_spents_service.refresh_time_spent_days(
+                project_id=task.project_id,
+                task_type_id=task.task_type_id,
+                start_date=min(dates),
+                end_date=max(dates),
+            )
 
-        notifications = Notification.query.filter_by(task_id=task_id)
-        for notification in notifications:
-            notification.delete()
+        notifications_service.delete_notifications(task_id=task_id)
 
         news_list = News.query.filter_by(task_id=task.id)
         for news in news_list:
@@ -240,7 +248,11 @@ def remove_preview_file(preview_file, force=False):
     news = News.get_by(preview_file_id=preview_file.id)
 
     if entity.preview_file_id == preview_file.id:
+        from zou.app.services import entities_service
+
         entity.update({"preview_file_id": None})
+        entities_service.clear_entity_cache(entity.id)
+        entities_service.clear_entity_names_cache(entity.id)
 
     if news is not None:
         news.update({"preview_file_id": None})
@@ -257,6 +269,7 @@ def remove_preview_file(preview_file, force=False):
     from zou.app.services import files_service
 
     files_service.clear_preview_file_cache(preview_file_id)
+    files_service.clear_playlist_payloads_for_task(task.id)
 
     # Remove the physical files only once the DB row is gone: if the
     # delete fails, the row must not end up pointing at missing files.
@@ -556,7 +569,11 @@ def remove_production_schedule_versions_for_project(project_id):
     if not version_ids:
         return
 
-    # Break self-references so the rows can be deleted in any order.
+    # Break self-references so the rows can be deleted in any order, and
+    # forget the version the project was last scheduled from.
+    Project.query.filter(
+        Project.from_schedule_version_id.in_(version_ids)
+    ).update({"from_schedule_version_id": None}, synchronize_session=False)
     ProductionScheduleVersion.query.filter(
         ProductionScheduleVersion.production_schedule_from.in_(version_ids)
     ).update({"production_schedule_from": None}, synchronize_session=False)
@@ -574,6 +591,8 @@ def remove_person(person_id, force=True):
     first: comments, notifications, logs, subscriptions, time spents, team
     memberships and task assignations.
     """
+    from zou.app.services import notifications_service
+
     person = Person.get(person_id)
     if person.email in config.PROTECTED_ACCOUNTS:
         raise PersonInProtectedAccounts(
@@ -593,8 +612,8 @@ def remove_person(person_id, force=True):
             ]
             comment.save()
         ApiEvent.delete_all_by(user_id=person_id)
-        Notification.delete_all_by(person_id=person_id)
-        Notification.delete_all_by(author_id=person_id)
+        notifications_service.delete_notifications(person_id=person_id)
+        notifications_service.delete_notifications(author_id=person_id)
         SearchFilterGroup.delete_all_by(person_id=person_id)
         SearchFilter.delete_all_by(person_id=person_id)
         DesktopLoginLog.delete_all_by(person_id=person_id)
@@ -654,14 +673,26 @@ def remove_old_notifications(days_old=90):
     """
     Remove notifications older than *days_old*.
     """
-    _remove_older_than(Notification, Notification.created_at, days_old)
+    from zou.app.services import notifications_service
+
+    limit_date = date_helpers.get_utc_now_datetime() - datetime.timedelta(
+        days=days_old
+    )
+    notifications_service.delete_notifications(
+        Notification.created_at < limit_date
+    )
 
 
 def remove_episode(episode_id, force=False):
     """
     Remove an episode and all related sequences and shots.
     """
-    from zou.app.services import shots_service, assets_service, tasks_service
+    from zou.app.services import (
+        assets_service,
+        playlists_service,
+        shots_service,
+        tasks_service,
+    )
 
     episode = shots_service.get_episode_raw(episode_id)
     if force:
@@ -673,6 +704,8 @@ def remove_episode(episode_id, force=False):
         for task in tasks:
             remove_task(task.id, force=True)
             tasks_service.clear_task_cache(str(task.id))
+        for playlist in Playlist.get_all_by(episode_id=episode_id):
+            playlists_service.clear_playlist_payloads(playlist.id)
         Playlist.delete_all_by(episode_id=episode_id)
         ScheduleItem.delete_all_by(object_id=episode_id)
         EntityVersion.delete_all_by(entity_id=episode_id)
@@ -377,6 +377,7 @@ def update_edit(edit_id, data_dict):
     edit = get_edit_raw(edit_id)
     edit.update(data_dict)
     clear_edit_cache(edit_id)
+    entities_service.clear_entity_names_cache(edit_id, data_dict)
     events.emit(
         "edit:update", {"edit_id": edit_id}, project_id=str(edit.project_id)
     )
@@ -23,6 +23,7 @@ from zou.app.models.entity_type import EntityType
 from zou.app.models.preview_file import PreviewFile
 from zou.app.models.project import Project
 from zou.app.models.task import Task, TaskPersonLink
+from zou.app.stores import entity_names_store
 
 from zou.app import db
 
@@ -46,28 +47,45 @@ TEMPORAL_ENTITY_TYPE_NAMES = [
 ]
 
 
+# The fields the stored full names are built from.
+NAME_FIELDS = {
+    "name",
+    "parent_id",
+    "source_id",
+    "entity_type_id",
+    "preview_file_id",
+}
+
+
 def clear_entity_cache(entity_id):
     """
-    Drop the memoized serialization and full name of given entity.
+    Drop the memoized serialization of given entity.
     """
-    # Deferred import: names_service imports entities_service. Renaming a
-    # parent (sequence, episode) still leaves children names cached up to
-    # their TTL; only the entity's own name is invalidated here.
-    from zou.app.services import names_service
+    cache.cache.delete_memoized(_get_entity_cached, str(entity_id))
 
-    entity_id = str(entity_id)
-    cache.cache.delete_memoized(_get_entity_cached, entity_id)
-    cache.cache.delete_memoized(names_service.get_full_entity_name, entity_id)
+
+def clear_entity_names_cache(entity_id, data=None):
+    """
+    Drop the stored full names of the project of given entity when given
+    data, the changed fields, touches one they are built from. Without
+    data, they are dropped anyway. The names of its children depend on its
+    own, so the whole project goes.
+    """
+    if data is None or not NAME_FIELDS.isdisjoint(data):
+        entity_names_store.drop_entity(str(entity_id))
 
 
 def clear_entity_type_cache(entity_type_id):
     """
     Drop the memoized serializations of given entity type. The by-name
-    lookups are flushed whole, since the name is not known here.
+    lookups and the stored full names are flushed whole, since the name is
+    not known here.
     """
     cache.cache.delete_memoized(_get_entity_type_cached, str(entity_type_id))
     cache.cache.delete_memoized(get_entity_type_by_name)
     cache.cache.delete_memoized(get_entity_type_by_name_or_not_found)
+    # Asset type names are part of the full names of every project.
+    entity_names_store.clear()
 
 
 def get_temporal_entity_type_by_name(name):
@@ -179,6 +197,7 @@ def update_entity_preview(entity_id, preview_file_id):
     except IntegrityError:
         raise PreviewFileNotFoundException
     clear_entity_cache(entity_id)
+    clear_entity_names_cache(entity_id)
     events.emit(
         "preview-file:set-main",
         {"entity_id": entity_id, "preview_file_id": preview_file_id},
@@ -379,3 +379,11 @@ class ProductionScheduleVersionNotFoundException(NotFound):
 
 class BackupFailedException(Exception):
     pass
+
+
+class ImportJobNotFoundException(NotFound):
+    pass
+
+
+class ProductionScheduleVersionJobNotFoundException(NotFound):
+    pass
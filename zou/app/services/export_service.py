@@ -0,0 +1,209 @@
+"""
+Raw model exports streamed one row at a time, as newline-delimited JSON.
+
+Rows are serialized the way the CRUD routes serialize them with
+relations, so another instance can import them with
+create_from_import_list. The queries are walked by chunks of rows ordered
+by id (keyset pagination) rather than through yield_per: several models
+load collections eagerly with joins, which yield_per refuses, and the
+relations of a chunk are loaded with one query per relationship instead
+of one query per row. Neither side ever holds more than a chunk.
+"""
+
+from sqlalchemy import orm
+
+from zou.app.models.attachment_file import AttachmentFile
+from zou.app.models.build_job import BuildJob
+from zou.app.models.comment import Comment
+from zou.app.models.custom_action import CustomAction
+from zou.app.models.day_off import DayOff
+from zou.app.models.department import Department
+from zou.app.models.entity import Entity, EntityLink
+from zou.app.models.entity_type import EntityType
+from zou.app.models.event import ApiEvent
+from zou.app.models.metadata_descriptor import MetadataDescriptor
+from zou.app.models.milestone import Milestone
+from zou.app.models.news import News
+from zou.app.models.notification import Notification
+from zou.app.models.organisation import Organisation
+from zou.app.models.person import Person
+from zou.app.models.playlist import Playlist
+from zou.app.models.preview_file import PreviewFile
+from zou.app.models.project import Project
+from zou.app.models.project_status import ProjectStatus
+from zou.app.models.schedule_item import ScheduleItem
+from zou.app.models.search_filter import SearchFilter
+from zou.app.models.search_filter_group import SearchFilterGroup
+from zou.app.models.status_automation import StatusAutomation
+from zou.app.models.studio import Studio
+from zou.app.models.subscription import Subscription
+from zou.app.models.task import Task
+from zou.app.models.task_status import TaskStatus
+from zou.app.models.task_type import TaskType
+from zou.app.models.time_spent import TimeSpent
+
+from zou.app.services import (
+    assets_service,
+    concepts_service,
+    shots_service,
+)
+from zou.app.services.exception import WrongParameterException
+from zou.app.utils.fields import serialize_value
+
+models = {
+    "custom-actions": CustomAction,
+    "day-offs": DayOff,
+    "departments": Department,
+    "entity-types": EntityType,
+    "events": ApiEvent,
+    "organisations": Organisation,
+    "persons": Person,
+    "projects": Project,
+    "project-status": ProjectStatus,
+    "search-filters": SearchFilter,
+    "search-filter-groups": SearchFilterGroup,
+    "status-automations": StatusAutomation,
+    "studios": Studio,
+    "task-status": TaskStatus,
+    "task-types": TaskType,
+}
+
+
+def _get_entities_query(project_id, entity_type):
+    return Entity.query.filter(Entity.project_id == project_id).filter(
+        Entity.entity_type_id == entity_type["id"]
+    )
+
+
+def _get_assets_query(project_id):
+    return Entity.query.filter(Entity.project_id == project_id).filter(
+        assets_service.build_asset_type_filter()
+    )
+
+
+def _get_task_children_query(model, foreign_key, project_id):
+    return model.query.join(Task, Task.id == foreign_key).filter(
+        Task.project_id == project_id
+    )
+
+
+project_queries = {
+    "episodes": lambda project_id: _get_entities_query(
+        project_id, shots_service.get_episode_type()
+    ),
+    "sequences": lambda project_id: _get_entities_query(
+        project_id, shots_service.get_sequence_type()
+    ),
+    "assets": _get_assets_query,
+    "shots": lambda project_id: _get_entities_query(
+        project_id, shots_service.get_shot_type()
+    ),
+    "concepts": lambda project_id: _get_entities_query(
+        project_id, concepts_service.get_concept_type()
+    ),
+    "tasks": lambda project_id: Task.query.filter(
+        Task.project_id == project_id
+    ),
+    "preview-files": lambda project_id: _get_task_children_query(
+        PreviewFile, PreviewFile.task_id, project_id
+    ),
+    "time-spents": lambda project_id: _get_task_children_query(
+        TimeSpent, TimeSpent.task_id, project_id
+    ),
+    "playlists": lambda project_id: Playlist.query.filter(
+        Playlist.project_id == project_id
+    ),
+    "build-jobs": lambda project_id: BuildJob.query.join(
+        Playlist, Playlist.id == BuildJob.playlist_id
+    ).filter(Playlist.project_id == project_id),
+    "comments": lambda project_id: _get_task_children_query(
+        Comment, Comment.object_id, project_id
+    ),
+    "attachment-files": lambda project_id: AttachmentFile.query.join(
+        Comment, Comment.id == AttachmentFile.comment_id
+    )
+    .join(Task, Task.id == Comment.object_id)
+    .filter(Task.project_id == project_id),
+    "metadata-descriptors": lambda project_id: MetadataDescriptor.query.filter(
+        MetadataDescriptor.project_id == project_id
+    ),
+    "schedule-items": lambda project_id: ScheduleItem.query.filter(
+        ScheduleItem.project_id == project_id
+    ),
+    "subscriptions": lambda project_id: _get_task_children_query(
+        Subscription, Subscription.task_id, project_id
+    ),
+    "notifications": lambda project_id: _get_task_children_query(
+        Notification, Notification.task_id, project_id
+    ),
+    "entity-links": lambda project_id: EntityLink.query.join(
+        Entity, Entity.id == EntityLink.entity_in_id
+    ).filter(Entity.project_id == project_id),
+    "news": lambda project_id: _get_task_children_query(
+        News, News.task_id, project_id
+    ),
+    "milestones": lambda project_id: Milestone.query.filter(
+        Milestone.project_id == project_id
+    ),
+}
+
+
+def get_model_query(model_name):
+    """
+    Return the query listing every row of the instance-wide model exposed
+    under given name.
+    """
+    if model_name not in models:
+        raise WrongParameterException(
+            f"{model_name} cannot be exported as a stream."
+        )
+    return models[model_name].query
+
+
+def get_project_model_query(project_id, model_name):
+    """
+    Return the query listing the rows of given model that belong to given
+    project.
+    """
+    if model_name not in project_queries:
+        raise WrongParameterException(
+            f"{model_name} cannot be exported as a stream."
+        )
+    return project_queries[model_name](project_id)
+
+
+def serialize_row(instance):
+    """
+    Serialize a row the way the CRUD routes do for an admin asking for the
+    relations. Persons keep their password hash, needed to log in on the
+    importing instance, but never their 2FA secrets.
+    """
+    if isinstance(instance, Person):
+        row = instance.serialize_safe(relations=True)
+        row["password"] = serialize_value(instance.password)
+    else:
+        row = instance.serialize(relations=True)
+    if isinstance(instance, Entity):
+        row["type"] = shots_service.get_base_entity_type_name(row)
+    return row
+
+
+def stream_rows(query, chunk_size=500):
+    """
+    Generate the serialized rows of given query, walking it by chunks of
+    chunk_size rows ordered by id. The relationships of each chunk are
+    loaded with one query per relationship.
+    """
+    model = query.column_descriptions[0]["entity"]
+    query = query.options(orm.selectinload("*")).order_by(model.id)
+    last_id = None
+    while True:
+        chunk_query = query
+        if last_id is not None:
+            chunk_query = chunk_query.filter(model.id > last_id)
+        instances = chunk_query.limit(chunk_size).all()
+        for instance in instances:
+            yield serialize_row(instance)
+        if len(instances) < chunk_size:
+            break
+        last_id = instances[-1].id
@@ -3,16 +3,24 @@ import re
 import orjson as json
 
 from collections import OrderedDict
+from functools import lru_cache
 from slugify import slugify
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from zou.app import db
 
 from zou.app.models.asset_instance import AssetInstance
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
+from zou.app.models.output_file import OutputFile
 from zou.app.models.output_type import OutputType
+from zou.app.models.software import Software
 from zou.app.models.task_type import TaskType
 from zou.app.models.task import Task
 from zou.app.models.department import Department
 from zou.app.models.project import Project
+from zou.app.models.working_file import WorkingFile
 
 from zou.app.services import (
     assets_service,
@@ -23,8 +31,12 @@ from zou.app.services import (
     tasks_service,
 )
 from zou.app.services.exception import (
+    DepartmentNotFoundException,
+    EpisodeNotFoundException,
     MalformedFileTreeException,
+    SequenceNotFoundException,
     WrongFileTreeFileException,
+    WrongParameterException,
     WrongPathFormatException,
     TaskNotFoundException,
 )
@@ -318,6 +330,287 @@ def get_instance_folder_path(
     return join_path(root_path, folder_path, "")
 
 
+def get_file_paths(project_id, items, sep=os.sep):
+    """
+    Render the file paths of many tasks of given project at once. Each item
+    gives a task_id and, optionally, an output_type_id, a software_id, a
+    name, a mode, a representation and a revision. An item with an output
+    type gets the output path of the entity of its task, with the task type
+    of the task, the others get the working path of their task. A revision
+    of 0 takes the next free one.
+
+    The tasks, their entities up to the episode, their task types and
+    departments, the output types and the softwares are loaded with one
+    query each, then every path is rendered in memory. The result lists,
+    in the order of the items, their task, entity, folder path, file name
+    and revision.
+    """
+    project = projects_service.get_project(project_id)
+    tree = get_tree_from_project(project)
+    hierarchies = _get_path_hierarchies(
+        project, {str(item["task_id"]) for item in items}
+    )
+    output_types = _get_serialized_rows(
+        OutputType, {item.get("output_type_id") for item in items}
+    )
+    softwares = _get_serialized_rows(
+        Software, {item.get("software_id") for item in items}
+    )
+    next_revisions = _get_next_revisions(items, hierarchies)
+
+    paths = []
+    for item in items:
+        task_id = str(item["task_id"])
+        hierarchy = hierarchies[task_id]
+        task = hierarchy["task"]
+        entity = hierarchy["entity"]
+        output_type = output_types.get(str(item.get("output_type_id")))
+        name = item.get("name", "main")
+        revision = (
+            item.get("revision")
+            or next_revisions[_get_revision_key(item, hierarchy)]
+        )
+        mode = item.get("mode") or (
+            "working" if output_type is None else "output"
+        )
+        root_path = get_root_path(tree, mode, sep)
+        software = softwares.get(str(item.get("software_id")))
+        if software is None and _is_token_used(tree, mode, "Software"):
+            # The token falls back to a default software: read it once for
+            # the whole batch rather than once per path.
+            if None not in softwares:
+                softwares[None] = files_service.get_or_create_software(
+                    "3dsmax", "max", ".max"
+                )
+            software = softwares[None]
+
+        variables = {
+            "entity": entity,
+            "software": software,
+            "name": name,
+            "revision": revision,
+            "hierarchy": hierarchy,
+        }
+        if output_type is None:
+            file_name_variables = dict(variables, task=task)
+            folder_variables = file_name_variables
+        else:
+            file_name_variables = dict(
+                variables,
+                task_type=hierarchy["task_type"],
+                output_type=output_type,
+            )
+            folder_variables = dict(
+                file_name_variables,
+                representation=item.get("representation", ""),
+            )
+
+        style = tree[mode]["folder_path"].get("style", "")
+        folder_path = update_variable(
+            get_folder_path_template(tree, mode, entity),
+            style=style,
+            **folder_variables,
+        )
+        folder_path = join_path(
+            root_path, change_folder_path_separators(folder_path, sep), ""
+        )
+        paths.append(
+            {
+                "task_id": task_id,
+                "entity_id": entity["id"],
+                "output_type_id": item.get("output_type_id"),
+                "folder_path": folder_path,
+                "file_name": get_file_name_root(
+                    tree, mode, **file_name_variables
+                ),
+                "revision": revision,
+            }
+        )
+    return paths
+
+
+def _is_token_used(tree, mode, token):
+    """
+    Tell whether a folder or file name template of given mode names given
+    token.
+    """
+    return any(
+        f"<{token}" in template
+        for section in ["folder_path", "file_name"]
+        for template in tree[mode][section].values()
+    )
+
+
+def _get_path_hierarchies(project, task_ids):
+    """
+    Load in a couple of queries what the tokens of a path need for each of
+    given tasks: the task, its entity, the parent and grand parent of the
+    entity (sequence and episode of a shot), its entity type, its task type
+    and the department of it. Tasks missing or outside given project are
+    refused.
+    """
+    Parent = aliased(Entity, name="parent")
+    GrandParent = aliased(Entity, name="grand_parent")
+    rows = (
+        db.session.execute(
+            select(Task, Entity, Parent, GrandParent)
+            .join(Entity, Entity.id == Task.entity_id)
+            .outerjoin(Parent, Parent.id == Entity.parent_id)
+            .outerjoin(GrandParent, GrandParent.id == Parent.parent_id)
+            .where(Task.id.in_(task_ids))
+            .where(Task.project_id == project["id"])
+        )
+        .unique()
+        .all()
+    )
+    if len(rows) != len(task_ids):
+        raise WrongParameterException(
+            "Some tasks do not exist or are not part of this project."
+        )
+
+    task_types = {
+        str(task_type.id): (
+            task_type.serialize(),
+            None if department is None else department.serialize(),
+        )
+        for task_type, department in db.session.execute(
+            select(TaskType, Department)
+            .outerjoin(Department, Department.id == TaskType.department_id)
+            .where(TaskType.id.in_({row[0].task_type_id for row in rows}))
+        )
+    }
+
+    hierarchies = {}
+    for task, entity, parent, grand_parent in rows:
+        task_type, department = task_types[str(task.task_type_id)]
+        hierarchies[str(task.id)] = {
+            "project": project,
+            "task": task.serialize(),
+            "entity": entity.serialize(),
+            "parent": None if parent is None else parent.serialize(),
+            "grand_parent": (
+                None if grand_parent is None else grand_parent.serialize()
+            ),
+            "entity_type": entities_service.get_entity_type(
+                entity.entity_type_id
+            ),
+            "task_type": task_type,
+            "department": department,
+        }
+    return hierarchies
+
+
+def _get_serialized_rows(model, ids):
+    """
+    Return the rows of given model matching given ids, serialized and keyed
+    by id. None ids are skipped, unknown ones are refused.
+    """
+    ids = {str(row_id) for row_id in ids if row_id is not None}
+    if len(ids) == 0:
+        return {}
+    rows = {
+        str(row.id): row.serialize()
+        for row in db.session.scalars(select(model).where(model.id.in_(ids)))
+    }
+    if len(rows) != len(ids):
+        raise WrongParameterException(
+            f"Some of the {model.__tablename__} ids do not exist."
+        )
+    return rows
+
+
+def _get_revision_key(item, hierarchy):
+    """
+    Return what the next revision of given item is counted on: the task and
+    name for a working file, the entity, output type, task type and name for
+    an output file, as get_next_working_file_revision and
+    get_next_output_file_revision do.
+    """
+    name = item.get("name", "main")
+    if item.get("output_type_id") is None:
+        return (hierarchy["task"]["id"], name)
+    return (
+        hierarchy["entity"]["id"],
+        str(item["output_type_id"]),
+        hierarchy["task_type"]["id"],
+        name,
+    )
+
+
+def _get_next_revisions(items, hierarchies):
+    """
+    Compute the next free revision of the items asking for one, with one
+    grouped query for the working files and one for the output files.
+    """
+    keys = {
+        _get_revision_key(item, hierarchies[str(item["task_id"])])
+        for item in items
+        if not item.get("revision")
+    }
+    working_keys = {key for key in keys if len(key) == 2}
+    output_keys = keys - working_keys
+
+    last_revisions = {}
+    if len(working_keys) > 0:
+        last_revisions.update(
+            {
+                (str(task_id), name): revision
+                for task_id, name, revision in db.session.execute(
+                    select(
+                        WorkingFile.task_id,
+                        WorkingFile.name,
+                        func.max(WorkingFile.revision),
+                    )
+                    .where(
+                        WorkingFile.task_id.in_(
+                            {task_id for task_id, _ in working_keys}
+                        )
+                    )
+                    .group_by(WorkingFile.task_id, WorkingFile.name)
+                )
+            }
+        )
+    if len(output_keys) > 0:
+        last_revisions.update(
+            {
+                (
+                    str(entity_id),
+                    str(output_type_id),
+                    str(task_type_id),
+                    name,
+                ): revision
+                for (
+                    entity_id,
+                    output_type_id,
+                    task_type_id,
+                    name,
+                    revision,
+                ) in db.session.execute(
+                    select(
+                        OutputFile.entity_id,
+                        OutputFile.output_type_id,
+                        OutputFile.task_type_id,
+                        OutputFile.name,
+                        func.max(OutputFile.revision),
+                    )
+                    .where(
+                        OutputFile.entity_id.in_(
+                            {key[0] for key in output_keys}
+                        )
+                    )
+                    .where(OutputFile.revision > 0)
+                    .group_by(
+                        OutputFile.entity_id,
+                        OutputFile.output_type_id,
+                        OutputFile.task_type_id,
+                        OutputFile.name,
+                    )
+                )
+            }
+        )
+    return {key: (last_revisions.get(key) or 0) + 1 for key in keys}
+
+
 def get_project(entity):
     """
     Return the project given entity belongs to.
@@ -419,6 +712,7 @@ def get_file_name_root(
     asset_instance=None,
     asset=None,
     revision=1,
+    hierarchy=None,
 ):
     """
     Render the file name template of given tree and slugify the result with
@@ -442,6 +736,7 @@ def get_file_name_root(
         asset_instance=asset_instance,
         asset=asset,
         revision=revision,
+        hierarchy=hierarchy,
     )
     style = tree[mode]["file_name"].get("style", "")
     uuids = UUID_PATTERN.findall(file_name)
@@ -500,12 +795,14 @@ def update_variable(
     representation="",
     revision=1,
     style="lowercase",
+    hierarchy=None,
 ):
     """
     Replace every <Token> of a template by its value. A token may name the
     field to read, as in <Shot.id>; an unknown field falls back to name. Every
     value is slugified and styled, except an id, which has to stay verbatim to
-    remain usable.
+    remain usable. A hierarchy preloaded by get_file_paths answers the tokens
+    that would otherwise be read from the database.
     """
     variables = re.findall(r"<([\w\.]*)>", template)
 
@@ -534,6 +831,7 @@ def update_variable(
             representation=representation,
             revision=revision,
             field=field,
+            hierarchy=hierarchy,
         )
 
         if data is not None:
@@ -556,13 +854,16 @@ def get_folder_from_datatype(
     representation="",
     revision=1,
     field="name",
+    hierarchy=None,
 ):
     """
     Return the value a template token stands for. This is the dispatch of the
     whole file tree rendering: every <Token> the templates accept is resolved
     here, and an unknown one makes the tree malformed.
     """
-    if datatype == "Project":
+    if hierarchy is not None and datatype in _HIERARCHY_DATATYPES:
+        folder = get_folder_from_hierarchy(datatype, entity, hierarchy, field)
+    elif datatype == "Project":
         folder = get_folder_from_project(entity, field)
     elif datatype == "Task":
         folder = get_folder_from_task(task, field)
@@ -610,6 +911,71 @@ def get_folder_from_datatype(
     return folder
 
 
+_HIERARCHY_DATATYPES = {
+    "Project",
+    "TaskType",
+    "Department",
+    "Sequence",
+    "Episode",
+    "TemporalEntity",
+    "TemporalEntityType",
+    "AssetType",
+}
+
+
+def get_folder_from_hierarchy(datatype, entity, hierarchy, field="name"):
+    """
+    Value of the tokens read on the context of an entity, taken from a
+    hierarchy preloaded by get_file_paths instead of the database. It
+    follows the get_folder_from_* function of each token.
+    """
+    if datatype == "Project":
+        return hierarchy["project"][field]
+    elif datatype == "TaskType":
+        return hierarchy["task_type"][field]
+    elif datatype == "Department":
+        if hierarchy["department"] is None:
+            raise DepartmentNotFoundException
+        return hierarchy["department"][field]
+    elif datatype == "TemporalEntity":
+        return entity[field]
+    elif datatype == "TemporalEntityType":
+        return hierarchy["entity_type"][field].lower()
+    elif datatype == "AssetType":
+        return hierarchy["entity_type"][field]
+
+    sequence = None
+    if shots_service.is_shot(entity) or shots_service.is_scene(entity):
+        sequence = hierarchy["parent"]
+        if sequence is None:
+            raise SequenceNotFoundException("Wrong parent_id for given shot.")
+    elif shots_service.is_sequence(entity):
+        sequence = entity
+
+    if datatype == "Sequence":
+        sequence_name = "" if sequence is None else sequence[field]
+        return _format_sequence_name(sequence_name)
+
+    if shots_service.is_episode(entity):
+        episode = entity
+    elif sequence is None:
+        episode = None
+    else:
+        episode = (
+            hierarchy["parent"]
+            if sequence is entity
+            else hierarchy["grand_parent"]
+        )
+        if episode is None:
+            raise EpisodeNotFoundException(
+                "Wrong parent_id for given sequence."
+            )
+    try:
+        return episode[field]
+    except Exception:
+        return "e001"
+
+
 def get_folder_from_project(entity, field="name"):
     """
     Value of the <Project> token: read on the project of given entity, not on
@@ -698,7 +1064,14 @@ def get_folder_from_sequence(entity, field="name"):
         sequence_name = entity[field]
     else:
         sequence_name = ""
+    return _format_sequence_name(sequence_name)
 
+
+def _format_sequence_name(sequence_name):
+    """
+    Rewrite a sequence name carrying "Seq" as S plus the number padded to
+    three digits.
+    """
     if "Seq" in sequence_name:
         sequence_number = sequence_name[3:]
         sequence_name = f"S{sequence_number.zfill(3)}"
@@ -1005,168 +1378,26 @@ def get_path_folders(project, file_path, mode="working", sep="/"):
     return file_path.split(sep)
 
 
-def _get_child_by_name(name, entity_type_id, constraints, parent_token):
-    """
-    Return the entity of given type named by a path token, narrowed by its
-    parent when the path already resolved one.
-    """
-    if not constraints.get(PathTokens.PROJECT):
-        return None
-
-    criterions = {
-        "entity_type_id": entity_type_id,
-        "project_id": constraints[PathTokens.PROJECT],
-    }
-    if constraints.get(parent_token):
-        criterions["parent_id"] = constraints[parent_token]
-
-    return Entity.get_by(Entity.name.ilike(name), **criterions)
-
-
 def get_data_from_token(type_token, value_token, constraints=None):
     """
     Get the first corresponding data using the given type and value tokens.
     """
     if not constraints:
         constraints = {}
-    data = None
-
-    if type_token == PathTokens.ASSET:
-        # An asset depends on a project and an asset type
-        if not constraints.get(PathTokens.PROJECT) or not constraints.get(
-            PathTokens.ASSET_TYPE
-        ):
-            return None
-
-        data = Entity.get_by(
-            Entity.name.ilike(value_token),
-            entity_type_id=constraints[PathTokens.ASSET_TYPE],
-            project_id=constraints[PathTokens.PROJECT],
-        )
-
-    elif type_token == PathTokens.ASSET_TYPE:
-        data = EntityType.get_by(EntityType.name.ilike(value_token))
-
-    elif type_token == PathTokens.DEPARTMENT:
-        data = Department.get_by(Department.name.ilike(value_token))
-
-    elif type_token == PathTokens.EPISODE:
-        # An episode depends on a project
-        if not constraints.get(PathTokens.PROJECT):
-            return None
-
-        data = Entity.get_by(
-            Entity.name.ilike(value_token),
-            entity_type_id=shots_service.get_episode_type()["id"],
-            project_id=constraints[PathTokens.PROJECT],
-        )
-
-    elif type_token == PathTokens.SEQUENCE:
-        # A sequence depends on a project, and on an episode only in a
-        # production that has any: the episode narrows the search when the
-        # path carried one. Requiring it made every path of a flat
-        # production stop here, since neither shipped tree puts an
-        # <Episode> token in front of the sequence.
-        data = _get_child_by_name(
-            value_token,
-            shots_service.get_sequence_type()["id"],
-            constraints,
-            parent_token=PathTokens.EPISODE,
-        )
-
-    elif type_token == PathTokens.SCENE:
-        # A scene depends on a project, and on the sequence it sits in when
-        # the path carried one.
-        data = _get_child_by_name(
-            value_token,
-            shots_service.get_scene_type()["id"],
-            constraints,
-            parent_token=PathTokens.SEQUENCE,
-        )
-
-    elif type_token == PathTokens.OUTPUT_TYPE:
-        data = OutputType.get_by(OutputType.name.ilike(value_token))
-
-    elif type_token == PathTokens.SHOT:
-        # A shot depends on a project and a sequence
-        if not constraints.get(PathTokens.PROJECT) or not constraints.get(
-            PathTokens.SEQUENCE
-        ):
-            return None
-
-        data = Entity.get_by(
-            Entity.name.ilike(value_token),
-            entity_type_id=shots_service.get_shot_type()["id"],
-            parent_id=constraints[PathTokens.SEQUENCE],
-            project_id=constraints[PathTokens.PROJECT],
-        )
-
-    elif type_token == PathTokens.TASK:
-        # A task depends on a project, a task type and an entity
-        if not constraints.get(PathTokens.PROJECT) or not constraints.get(
-            PathTokens.TASK_TYPE
-        ):
-            return None
-
-        name_filter = Task.name.ilike(value_token)
-        kwargs = {
-            "task_type_id": constraints[PathTokens.TASK_TYPE],
-            "project_id": constraints[PathTokens.PROJECT],
-        }
-
-        for entity in [PathTokens.SCENE, PathTokens.ASSET, PathTokens.SHOT]:
-            if constraints.get(entity):
-                kwargs["entity_id"] = constraints[entity]
-                break
-        else:
-            return None
-
-        data = Task.get_by(name_filter, **kwargs)
-
-    elif type_token == PathTokens.TASK_TYPE:
-        data = TaskType.get_by(TaskType.name.ilike(value_token))
-
-    elif type_token == PathTokens.PROJECT:
-        data = Project.get_by(Project.name.ilike(value_token))
-
-    elif type_token == PathTokens.NAME:
-        data = value_token
-
-    elif type_token == PathTokens.REPRESENTATION:
-        data = value_token
 
+    if type_token in [PathTokens.NAME, PathTokens.REPRESENTATION]:
+        return value_token
     elif type_token == PathTokens.VERSION:
         try:
-            data = int(value_token)
+            return int(value_token)
         except ValueError:
             return None
 
-    elif type_token == PathTokens.ENTITY_TYPE:
-        data = EntityType.get_by(EntityType.name.ilike(value_token))
-
-    elif type_token == PathTokens.ENTITY:
-        # An entity depends on a project and an entity type
-        if not constraints.get(PathTokens.PROJECT) or not constraints.get(
-            PathTokens.ENTITY_TYPE
-        ):
-            return None
-
-        data = Entity.get_by(
-            Entity.name.ilike(value_token),
-            entity_type_id=constraints[PathTokens.ENTITY_TYPE],
-            project_id=constraints[PathTokens.PROJECT],
-        )
-
-    elif type_token == PathTokens.INSTANCE:
-        if not constraints.get(PathTokens.EPISODE):
-            return None
-
-        data = AssetInstance.get_by(
-            AssetInstance.name.ilike(value_token),
-            episode_id=constraints.get(PathTokens.EPISODE),
-        )
-
-    return data
+    lookup = _get_token_lookup(type_token, constraints)
+    if lookup is None:
+        return None
+    model, filters = lookup
+    return model.get_by(model.name.ilike(value_token), **filters)
 
 
 def guess_shot(project, episode_name, sequence_name, shot_name):
@@ -1278,102 +1509,331 @@ def guess_task(entity, task_type, task_name):
         return task
 
 
-def guess_from_path(project_id, file_path, sep="/"):
-    """
-    Get list of possible project file tree templates matching a file path
-    and data ids corresponding to template tokens.
+_TOKEN_PATTERN = re.compile(r"(?P<prefix>\w*)<(?P<token>\w*)>(?P<suffix>\w*)")
+_TOKEN_REFERENCE_PATTERN = re.compile(r"<(\w*)>")
+_VALUE_TOKENS = {
+    PathTokens.NAME,
+    PathTokens.REPRESENTATION,
+    PathTokens.VERSION,
+}
 
-    Example:
-        .. code-block:: text
 
-        [
-            {
-                'Asset': '<asset_id>',
-                'Project': '<project_id>',
-                'Template': 'asset'
-            },
-            {
-                'Project': '<project_id>',
-                'Template': 'instance'
-            },
-            ...
-        ]
+def _compile_template_element(element):
     """
-    matching_templates = []
-    project = projects_service.get_project(project_id)
-    tree = get_tree_from_project(project)
+    Parse a folder of a template once: its token, the length of the prefix
+    and suffix around it, and every token it names. A folder without token
+    is a literal the path has to repeat.
+    """
+    token = _TOKEN_PATTERN.search(element)
+    return {
+        "text": element,
+        "token": None if token is None else token.group("token"),
+        "prefix": 0 if token is None else len(token.group("prefix")),
+        "suffix": 0 if token is None else len(token.group("suffix")),
+        "references": set(_TOKEN_REFERENCE_PATTERN.findall(element)),
+    }
 
+
+@lru_cache(maxsize=64)
+def _compile_file_tree(tree_json, sep):
+    """
+    Turn the folder templates of a file tree into, for each mode, its style,
+    its styled root and its templates split into parsed folders. Templates
+    naming no token can't match anything and are left out. The tree is
+    given as JSON so that each version of a tree is compiled only once.
+    """
+    tree = json.loads(tree_json)
+    modes = []
     for mode in tree.keys():
-        # Apply mode style to file path
-        style = tree[mode]["folder_path"].get("style", "")
+        folder_paths = tree[mode]["folder_path"]
+        style = folder_paths.get("style", "")
         root = apply_style(get_root_path(tree, mode, sep), style)
-        styled_path = apply_style(file_path, style)
-
-        if not styled_path.startswith(root):
+        templates = []
+        for template, template_path in folder_paths.items():
+            template_elements = [
+                _compile_template_element(element)
+                for element in template_path.split(sep)
+            ]
+            if any(
+                template_element["token"] is not None
+                for template_element in template_elements
+            ):
+                templates.append((template, template_elements))
+        modes.append((style, root, templates))
+    return modes
+
+
+def _match_compiled_template(elements, template_elements):
+    """
+    Read the token values of a path with a compiled template, the way
+    extract_variable_values_from_path does, and return the (token, value)
+    lookups to run in template order. None means the path doesn't match.
+    """
+    tokens = {}
+    for element, template_element in zip(elements, template_elements):
+        token = template_element["token"]
+        if token is None:
+            if element != template_element["text"]:
+                return None
             continue
+        value = element.replace("_", " ")
+        value = value[
+            template_element["prefix"] : len(value)
+            - template_element["suffix"]
+        ]
+        if not tokens.get(token):
+            tokens[token] = value
 
-        styled_path = styled_path[len(root) :]
+    if not tokens:
+        return None
 
-        # Try to get template data from path
-        for template, template_path in tree[mode]["folder_path"].items():
-            template_elements = template_path.split(sep)
-            elements = styled_path.split(sep)
+    steps = []
+    for template_element in template_elements:
+        for token, value in tokens.items():
+            if token in template_element["references"]:
+                steps.append((token, value))
+                break
+    return steps
+
+
+def _get_token_lookup(token, constraints):
+    """
+    Return the model a path token names and the columns, beside its name,
+    the row is narrowed by, given the data already read from the path. None
+    means the token can't be looked up, as in get_data_from_token.
+    """
+    project_id = constraints.get(PathTokens.PROJECT)
+    if token in [PathTokens.ASSET_TYPE, PathTokens.ENTITY_TYPE]:
+        return EntityType, {}
+    elif token == PathTokens.DEPARTMENT:
+        return Department, {}
+    elif token == PathTokens.OUTPUT_TYPE:
+        return OutputType, {}
+    elif token == PathTokens.TASK_TYPE:
+        return TaskType, {}
+    elif token == PathTokens.PROJECT:
+        return Project, {}
+    elif token == PathTokens.INSTANCE:
+        if not constraints.get(PathTokens.EPISODE):
+            return None
+        return AssetInstance, {"episode_id": constraints[PathTokens.EPISODE]}
+    elif not project_id:
+        return None
 
-            # Case when template doesn't match given file path content
-            try:
-                tokens = extract_variable_values_from_path(
-                    elements, template_elements
-                )
-            except WrongPathFormatException:
-                continue
+    if token in [PathTokens.ASSET, PathTokens.ENTITY]:
+        entity_type_token = (
+            PathTokens.ASSET_TYPE
+            if token == PathTokens.ASSET
+            else PathTokens.ENTITY_TYPE
+        )
+        if not constraints.get(entity_type_token):
+            return None
+        return Entity, {
+            "entity_type_id": constraints[entity_type_token],
+            "project_id": project_id,
+        }
+    elif token == PathTokens.EPISODE:
+        return Entity, {
+            "entity_type_id": shots_service.get_episode_type()["id"],
+            "project_id": project_id,
+        }
+    elif token in [PathTokens.SEQUENCE, PathTokens.SCENE]:
+        if token == PathTokens.SEQUENCE:
+            entity_type_id = shots_service.get_sequence_type()["id"]
+            parent_token = PathTokens.EPISODE
+        else:
+            entity_type_id = shots_service.get_scene_type()["id"]
+            parent_token = PathTokens.SEQUENCE
+        filters = {"entity_type_id": entity_type_id, "project_id": project_id}
+        if constraints.get(parent_token):
+            filters["parent_id"] = constraints[parent_token]
+        return Entity, filters
+    elif token == PathTokens.SHOT:
+        if not constraints.get(PathTokens.SEQUENCE):
+            return None
+        return Entity, {
+            "entity_type_id": shots_service.get_shot_type()["id"],
+            "parent_id": constraints[PathTokens.SEQUENCE],
+            "project_id": project_id,
+        }
+    elif token == PathTokens.TASK:
+        if not constraints.get(PathTokens.TASK_TYPE):
+            return None
+        for entity_token in [
+            PathTokens.SCENE,
+            PathTokens.ASSET,
+            PathTokens.SHOT,
+        ]:
+            if constraints.get(entity_token):
+                return Task, {
+                    "task_type_id": constraints[PathTokens.TASK_TYPE],
+                    "project_id": project_id,
+                    "entity_id": constraints[entity_token],
+                }
+        return None
+    return None
 
-            if not tokens:
-                continue
 
-            template_data = {
-                "Template": template,
-            }
+def _get_value_from_token(token, value):
+    """
+    Return the data of a token that is read from the path itself.
+    """
+    if token == PathTokens.VERSION:
+        try:
+            version = int(value)
+        except ValueError:
+            return None
+        return str(version) if version else None
+    return value
 
-            # Fill template data dictionary following tokens order in
-            # template path (left to right): some data needs a previous data
-            # to be found.
-            # This prevents getting wrong data in database, like a data
-            # with same name in other project.
-            for template_element in template_elements:
-                # Get template_element corresponding token.
-                # Some template_element don't have a corresponding token,
-                # like "05_publish" folder, for example.
-                for token, token_value in tokens.items():
-                    if f"<{token}>" in template_element:
-                        break
-                else:
-                    continue
 
-                # Try to get data from database using token and its value
-                data = get_data_from_token(token, token_value, template_data)
+def _find_named_rows(model, columns, lookups):
+    """
+    Fetch in one query the rows of given model matching any of given
+    (lowered name, column values) lookups. Names are compared without case.
+    Return the id of the first row found for each lookup.
+    """
+    name = func.lower(model.name)
+    query = select(
+        model.id, name, *[getattr(model, column) for column in columns]
+    ).where(name.in_({lookup_name for lookup_name, _ in lookups}))
+    for index, column in enumerate(columns):
+        query = query.where(
+            getattr(model, column).in_(
+                {values[index] for _, values in lookups}
+            )
+        )
+
+    rows = {}
+    for row_id, row_name, *values in db.session.execute(query):
+        key = (row_name, tuple(str(value) for value in values))
+        if key in lookups and key not in rows:
+            rows[key] = str(row_id)
+    return rows
 
-                # Stop trying to get data from given template on latest valid
-                # data found.
-                if not data:
-                    break
 
+def _resolve_path_tokens(project_id, matches):
+    """
+    Fill the data of given matches with the ids their tokens name. Lookups
+    are run one template folder at a time for all matches together, each
+    depending on the data of the folders before it: every level costs a
+    query per model and filter set, whatever the number of paths. A match
+    stops at its first token that names nothing.
+    """
+    step = 0
+    while len(matches) > 0:
+        lookups = {}
+        waiting = []
+        for match in matches:
+            if step >= len(match["steps"]):
+                continue
+            token, value = match["steps"][step]
+            if token in _VALUE_TOKENS:
+                data = _get_value_from_token(token, value)
+                if data:
+                    match["data"][token] = data
+                    waiting.append((match, None, None))
+                continue
+
+            lookup = _get_token_lookup(token, match["data"])
+            if lookup is None:
+                continue
+            model, filters = lookup
+            columns = tuple(sorted(filters))
+            key = (value.lower(), tuple(str(filters[c]) for c in columns))
+            lookups.setdefault((model, columns), set()).add(key)
+            waiting.append((match, (model, columns), key))
+
+        found = {
+            group: _find_named_rows(group[0], group[1], group_lookups)
+            for group, group_lookups in lookups.items()
+        }
+
+        matches = []
+        for match, group, key in waiting:
+            if group is not None:
+                token = match["steps"][step][0]
+                data_id = found[group].get(key)
                 # The production is the one the caller named, and the one
                 # the route checked their permission against. A path naming
                 # another production is a path for someone else: it must
                 # not come back filled with that production's ids.
-                if token == PathTokens.PROJECT and str(data.id) != str(
-                    project["id"]
+                if data_id is None or (
+                    token == PathTokens.PROJECT and data_id != str(project_id)
                 ):
-                    break
+                    continue
+                match["data"][token] = data_id
+            matches.append(match)
+        step += 1
 
-                if isinstance(data, str):
-                    template_data[token] = data
-                elif isinstance(data, int):
-                    template_data[token] = str(data)
-                else:
-                    template_data[token] = data.serialize()["id"]
 
-            if template_data not in matching_templates:
-                matching_templates.append(template_data)
+def guess_from_paths(project_id, file_paths, sep="/"):
+    """
+    Guess the templates matching each of given file paths, as
+    guess_from_path does, and return one list of matches per path, in the
+    order of the paths. The file tree of the project is compiled once and
+    the tokens of all paths are resolved together, so a whole publish can
+    be read with a handful of queries.
+    """
+    project = projects_service.get_project(project_id)
+    tree = get_tree_from_project(project)
+    compiled_tree = _compile_file_tree(json.dumps(tree), sep)
+
+    matches_by_path = []
+    for file_path in file_paths:
+        path_matches = []
+        for style, root, templates in compiled_tree:
+            # Apply mode style to file path
+            styled_path = apply_style(file_path, style)
+            if not styled_path.startswith(root):
+                continue
+            elements = styled_path[len(root) :].split(sep)
+            for template, template_elements in templates:
+                steps = _match_compiled_template(elements, template_elements)
+                if steps is not None:
+                    path_matches.append(
+                        {"data": {"Template": template}, "steps": steps}
+                    )
+        matches_by_path.append(path_matches)
+
+    _resolve_path_tokens(
+        project["id"],
+        [match for path_matches in matches_by_path for match in path_matches],
+    )
+
+    results = []
+    for path_matches in matches_by_path:
+        matching_templates = []
+        for match in path_matches:
+            if match["data"] not in matching_templates:
+                matching_templates.append(match["data"])
+        results.append(matching_templates)
+    return results
+
+
+def guess_from_path(project_id, file_path, sep="/"):
+    """
+    Get list of possible project file tree templates matching a file path
+    and data ids corresponding to template tokens.
+
+    Example:
+        .. code-block:: text
 
-    return matching_templates
+        [
+            {
+                'Asset': '<asset_id>',
+                'Project': '<project_id>',
+                'Template': 'asset'
+            },
+            {
+                'Project': '<project_id>',
+                'Template': 'instance'
+            },
+            ...
+        ]
+
+    Tokens are filled following their order in the template path (left to
+    right): some data needs a previous data to be found, which prevents
+    getting a data with the same name in another project.
+    """
+    return guess_from_paths(project_id, [file_path], sep=sep)[0]
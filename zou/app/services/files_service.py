@@ -12,6 +12,7 @@ from zou.app.models.preview_background_file import PreviewBackgroundFile
 from zou.app.models.software import Software
 from zou.app.models.task import Task
 from zou.app.models.working_file import WorkingFile
+from zou.app.stores import playlist_payloads_store
 
 
 from zou.app.services import entities_service
@@ -46,6 +47,16 @@ def clear_preview_file_cache(preview_file_id):
     cache.cache.delete_memoized(get_preview_file_for_access, preview_file_id)
 
 
+def clear_playlist_payloads_for_task(task_id):
+    """
+    Invalidate the stored payloads of the playlists showing the entity of
+    given task, after a change on one of its preview files.
+    """
+    task = Task.get(task_id)
+    if task is not None:
+        playlist_payloads_store.bump_entity_playlists([task.entity_id])
+
+
 def clear_output_file_cache(output_file_id):
     """
     Drop the memoized serialization of given output file.
@@ -857,7 +868,7 @@ def create_preview_file_raw(
     Insert a preview file row and return the active record. No event, no
     task update: the callers own those.
     """
-    return PreviewFile.create(
+    preview_file = PreviewFile.create(
         name=name,
         revision=revision,
         source=source,
@@ -867,6 +878,8 @@ def create_preview_file_raw(
         position=position,
         status="processing",
     )
+    clear_playlist_payloads_for_task(task_id)
+    return preview_file
 
 
 def create_preview_file(
@@ -982,6 +995,7 @@ def remove_preview_file(preview_file_id):
     preview_file = get_preview_file_raw(preview_file_id)
     preview_file.delete()
     clear_preview_file_cache(str(preview_file_id))
+    clear_playlist_payloads_for_task(preview_file.task_id)
     task = Task.get(preview_file.task_id)
     events.emit(
         "preview-file:delete",
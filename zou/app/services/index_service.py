@@ -399,6 +399,26 @@ def index_shot(shot):
     return _index_entry(get_shot_index, prepare_shot, shot)
 
 
+def index_shots(shots):
+    """
+    Register given shots into the index with a single request. Documents
+    sharing an id with indexed ones replace them.
+    """
+    if len(shots) == 0:
+        return []
+    try:
+        documents = [prepare_shot(shot) for shot in shots]
+        indexing.index_documents(get_shot_index(), documents)
+        return documents
+    except indexing.IndexerNotInitializedError:
+        pass
+    except Exception:
+        current_app.logger.error(
+            "Indexer is not reachable, indexation failed."
+        )
+    return []
+
+
 def prepare_asset(asset):
     """
     Prepare a indexation document from given asset.
@@ -2,23 +2,48 @@ import slugify
 
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
-from zou.app.utils import cache
+from zou.app.stores import entity_names_store
 
 from zou.app.services import (
-    entities_service,
     files_service,
     projects_service,
     tasks_service,
     shots_service,
     persons_service,
 )
+from zou.app.services.exception import EntityNotFoundException
+
+ENTITY_COLUMNS = [
+    Entity.id,
+    Entity.name,
+    Entity.parent_id,
+    Entity.entity_type_id,
+    Entity.source_id,
+    Entity.preview_file_id,
+]
+
+
+def _row_to_entity(row):
+    """
+    Turn a row of the entity columns needed to build names into a dict.
+    """
+    return {
+        "id": str(row.id),
+        "name": row.name,
+        "parent_id": None if row.parent_id is None else str(row.parent_id),
+        "entity_type_id": str(row.entity_type_id),
+        "source_id": None if row.source_id is None else str(row.source_id),
+        "preview_file_id": (
+            None if row.preview_file_id is None else str(row.preview_file_id)
+        ),
+    }
 
 
 def _load_entities(entity_ids, *already_loaded):
     """
-    Return the serialized entities for given ids, keyed by id. Entities
-    present in the already loaded maps are reused, only the rest is queried.
-    The maps are searched in order, so the first one wins.
+    Return the entities for given ids, keyed by id. Entities present in the
+    already loaded maps are reused, only the rest is queried. The maps are
+    searched in order, so the first one wins.
     """
     entities = {}
     missing = {str(entity_id) for entity_id in entity_ids}
@@ -28,8 +53,10 @@ def _load_entities(entity_ids, *already_loaded):
         missing -= entities.keys()
 
     if missing:
-        for entity in Entity.query.filter(Entity.id.in_(list(missing))).all():
-            entities[str(entity.id)] = entity.serialize()
+        for row in Entity.query.filter(
+            Entity.id.in_(list(missing))
+        ).with_entities(*ENTITY_COLUMNS):
+            entities[str(row.id)] = _row_to_entity(row)
     return entities
 
 
@@ -44,50 +71,115 @@ def _collect_parent_ids(entities_map):
     }
 
 
-@cache.memoize_function(1200)
-def get_full_entity_name(entity_id):
+def _get_temporal_type_ids():
     """
-    Get full entity name whether it's an asset or a shot. If it's a shot
-    the result is "Episode name / Sequence name / Shot name". If it's an
-    asset the result is "Asset type name / Asset name".
+    Return the ids of the shot, episode and sequence entity types.
+    """
+    return (
+        shots_service.get_shot_type()["id"],
+        shots_service.get_episode_type()["id"],
+        shots_service.get_sequence_type()["id"],
+    )
+
+
+def _get_asset_type_names(entities_map, temporal_type_ids):
     """
-    entity = entities_service.get_entity(entity_id)
+    Return the names of the entity types of the assets of given entities,
+    keyed by entity type id. Anything that is not a shot, an episode or a
+    sequence is an asset, so its type has to be resolved to build the name.
+    """
+    asset_type_ids = {
+        entity["entity_type_id"]
+        for entity in entities_map.values()
+        if entity["entity_type_id"] not in temporal_type_ids
+    }
+    if not asset_type_ids:
+        return {}
+    return {
+        str(entity_type_id): name
+        for entity_type_id, name in EntityType.query.filter(
+            EntityType.id.in_(list(asset_type_ids))
+        ).with_entities(EntityType.id, EntityType.name)
+    }
+
+
+def _build_full_entity_name(
+    entity, all_entities, asset_type_names, temporal_type_ids
+):
+    """
+    Build the (full name, episode id, preview file id) tuple of given
+    entity, its parents and asset type names being read from given maps.
+    """
+    shot_type_id, episode_type_id, sequence_type_id = temporal_type_ids
     episode_id = None
-    if shots_service.is_shot(entity):
-        sequence = entities_service.get_entity(entity["parent_id"])
-        if sequence["parent_id"] is None:
-            name = f"{sequence['name']} / {entity['name']}"
+    entity_type_id = entity["entity_type_id"]
+
+    if entity_type_id == shot_type_id:
+        parent = all_entities.get(entity["parent_id"])
+        if parent is None:
+            name = entity["name"]
+        elif parent["parent_id"] is None:
+            name = f"{parent['name']} / {entity['name']}"
         else:
-            episode = entities_service.get_entity(sequence["parent_id"])
-            episode_id = episode["id"]
-            name = f"{episode['name']} / {sequence['name']} / {entity['name']}"
-    elif shots_service.is_episode(entity):
-        name = entity["name"]
-    elif shots_service.is_sequence(entity):
+            grandparent = all_entities.get(parent["parent_id"])
+            if grandparent:
+                episode_id = grandparent["id"]
+                name = (
+                    f"{grandparent['name']} / {parent['name']} / "
+                    f"{entity['name']}"
+                )
+            else:
+                name = f"{parent['name']} / {entity['name']}"
+    elif entity_type_id == episode_type_id:
         name = entity["name"]
-        if entity["parent_id"] is not None:
-            episode = entities_service.get_entity(entity["parent_id"])
-            episode_id = episode["id"]
-            name = f"{episode['name']} / {entity['name']}"
+    elif entity_type_id == sequence_type_id:
+        parent = all_entities.get(entity["parent_id"])
+        if parent is None:
+            name = entity["name"]
+        else:
+            episode_id = parent["id"]
+            name = f"{parent['name']} / {entity['name']}"
     else:
-        asset_type = entities_service.get_entity_type(entity["entity_type_id"])
+        asset_type_name = asset_type_names.get(entity_type_id)
         episode_id = entity["source_id"]
-        name = f"{asset_type['name']} / {entity['name']}"
+        if asset_type_name:
+            name = f"{asset_type_name} / {entity['name']}"
+        else:
+            name = entity["name"]
+
     return name, episode_id, entity["preview_file_id"]
 
 
-def get_full_entity_names(entity_ids):
+def build_project_entity_names(project_id):
     """
-    Batch version of get_full_entity_name. Takes a list of entity IDs
-    and returns a dict mapping entity_id -> (name, episode_id,
-    preview_file_id). Uses 2-3 queries instead of N.
+    Return the full names of all the entities of given project, keyed by
+    entity id, and store them for the next lookups. It costs one query for
+    the entities and one for the asset types.
     """
-    if not entity_ids:
-        return {}
+    all_entities = {
+        str(row.id): _row_to_entity(row)
+        for row in Entity.query.filter(
+            Entity.project_id == project_id
+        ).with_entities(*ENTITY_COLUMNS)
+    }
+    temporal_type_ids = _get_temporal_type_ids()
+    asset_type_names = _get_asset_type_names(all_entities, temporal_type_ids)
+    names = {
+        entity_id: _build_full_entity_name(
+            entity, all_entities, asset_type_names, temporal_type_ids
+        )
+        for entity_id, entity in all_entities.items()
+    }
+    entity_names_store.set_project_names(project_id, names)
+    return names
 
-    unique_ids = list(set(entity_ids))
 
-    entities_map = _load_entities(unique_ids)
+def _query_full_entity_names(entity_ids):
+    """
+    Build the full names of given entities from the database, walking up to
+    their sequences and episodes. Uses 3 or 4 queries.
+    """
+    entities_map = _load_entities(entity_ids)
     parent_ids = _collect_parent_ids(entities_map)
     parents_map = _load_entities(parent_ids, entities_map)
     # Grandparents are the episodes of the sequences.
@@ -100,79 +192,63 @@ def get_full_entity_names(entity_ids):
     all_entities.update(grandparents_map)
     all_entities.update(parents_map)
     all_entities.update(entities_map)
+    temporal_type_ids = _get_temporal_type_ids()
+    asset_type_names = _get_asset_type_names(entities_map, temporal_type_ids)
+    return {
+        entity_id: _build_full_entity_name(
+            entity, all_entities, asset_type_names, temporal_type_ids
+        )
+        for entity_id, entity in entities_map.items()
+    }
 
-    # Get type IDs for classification
-    shot_type = shots_service.get_shot_type()
-    episode_type = shots_service.get_episode_type()
-    sequence_type = shots_service.get_sequence_type()
 
-    # Anything that is not a shot, an episode or a sequence is an asset, so
-    # its entity type has to be resolved to build the name.
-    asset_type_ids = {
-        entity["entity_type_id"]
-        for entity in entities_map.values()
-        if str(entity["entity_type_id"])
-        not in (shot_type["id"], episode_type["id"], sequence_type["id"])
-    }
-    asset_types_map = {}
-    if asset_type_ids:
-        asset_types_map = {
-            str(entity_type.id): entity_type.serialize()
-            for entity_type in EntityType.query.filter(
-                EntityType.id.in_(list(asset_type_ids))
-            ).all()
-        }
+def get_full_entity_name(entity_id):
+    """
+    Get full entity name whether it's an asset or a shot. If it's a shot
+    the result is "Episode name / Sequence name / Shot name". If it's an
+    asset the result is "Asset type name / Asset name".
+    """
+    names = get_full_entity_names([entity_id])
+    if str(entity_id) not in names:
+        raise EntityNotFoundException
+    return names[str(entity_id)]
 
-    # Build names
-    result = {}
-    for eid in unique_ids:
-        str_eid = str(eid)
-        entity = entities_map.get(str_eid)
-        if entity is None:
-            continue
-
-        episode_id = None
-        etype = str(entity["entity_type_id"])
-
-        if etype == shot_type["id"]:
-            parent = all_entities.get(str(entity["parent_id"]))
-            if parent is None:
-                name = entity["name"]
-            elif parent["parent_id"] is None:
-                name = f"{parent['name']} / {entity['name']}"
-            else:
-                grandparent = all_entities.get(str(parent["parent_id"]))
-                if grandparent:
-                    episode_id = grandparent["id"]
-                    name = (
-                        f"{grandparent['name']} / {parent['name']} / "
-                        f"{entity['name']}"
-                    )
-                else:
-                    name = f"{parent['name']} / {entity['name']}"
-        elif etype == episode_type["id"]:
-            name = entity["name"]
-        elif etype == sequence_type["id"]:
-            if entity["parent_id"] is None:
-                name = entity["name"]
-            else:
-                parent = all_entities.get(str(entity["parent_id"]))
-                if parent:
-                    episode_id = parent["id"]
-                    name = f"{parent['name']} / {entity['name']}"
-                else:
-                    name = entity["name"]
-        else:
-            asset_type = asset_types_map.get(str(entity["entity_type_id"]))
-            episode_id = entity["source_id"]
-            if asset_type:
-                name = f"{asset_type['name']} / {entity['name']}"
-            else:
-                name = entity["name"]
 
-        result[str_eid] = name, episode_id, entity["preview_file_id"]
+def get_full_entity_names(entity_ids):
+    """
+    Batch version of get_full_entity_name. Takes a list of entity IDs
+    and returns a dict mapping entity_id -> (name, episode_id,
+    preview_file_id).
 
-    return result
+    Names are read from the entity names store, which holds every entity of
+    a project once one of them was asked for, so a warm lookup runs no
+    query. The projects of the entities missing from the store are rebuilt
+    as a whole. When the store is unavailable, the names are built from the
+    database.
+    """
+    if not entity_ids:
+        return {}
+
+    unique_ids = {str(entity_id) for entity_id in entity_ids}
+    names = entity_names_store.get_names(unique_ids)
+    if names is None:
+        return _query_full_entity_names(unique_ids)
+
+    missing = unique_ids - names.keys()
+    if missing:
+        project_ids = {
+            project_id
+            for (project_id,) in Entity.query.filter(
+                Entity.id.in_(list(missing))
+            )
+            .with_entities(Entity.project_id)
+            .distinct()
+        }
+        for project_id in project_ids:
+            project_names = build_project_entity_names(project_id)
+            for entity_id in missing & project_names.keys():
+                names[entity_id] = project_names[entity_id]
+    return names
 
 
 def get_preview_file_name(preview_file_id):
@@ -1,17 +1,18 @@
 import math
 
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import aliased
 
-from zou.app.models.comment import Comment
 from zou.app.models.entity import Entity
 from zou.app.models.news import News
 from zou.app.models.preview_file import PreviewFile
-from zou.app.models.project import Project
-from zou.app.models.task import Task
+from zou.app.models.project import Project, ProjectPersonLink
 
 from zou.app.utils import cache, events, fields
 from zou.app.services import names_service, persons_service, tasks_service
+from zou.app.services.exception import WrongParameterException
+
+TOTAL_MODES = ["exact", "approximate", "none"]
 
 
 def _apply_news_filters(
@@ -28,31 +29,41 @@ def _apply_news_filters(
     after=None,
 ):
     """
-    Apply the filters shared by the news list and the news stats.
+    Apply the filters shared by the news list and the news stats. They only
+    read the columns of the news table, except the episode filter which
+    needs the sequence of the entity.
 
     project_ids is a scoping allowlist, distinct from the project_id the
     caller asked for. When it is empty the query falls back to the projects
     the current user belongs to, admins excepted.
     """
     if project_id is not None:
-        query = query.filter(Task.project_id == project_id)
+        query = query.filter(News.project_id == project_id)
 
     if project_ids and len(project_ids) > 0:
-        query = query.filter(Project.id.in_(project_ids))
+        query = query.filter(News.project_id.in_(project_ids))
     elif current_user is not None and current_user.role.code != "admin":
-        query = query.filter(Project.team.contains(current_user))
+        query = query.filter(
+            News.project_id.in_(
+                ProjectPersonLink.query.filter(
+                    ProjectPersonLink.person_id == current_user.id
+                ).with_entities(ProjectPersonLink.project_id)
+            )
+        )
 
     if episode_id is not None:
         Sequence = aliased(Entity, name="sequence")
-        query = query.join(Sequence, Entity.parent_id == Sequence.id).filter(
-            Sequence.parent_id == episode_id
+        query = (
+            query.join(Entity, News.entity_id == Entity.id)
+            .join(Sequence, Entity.parent_id == Sequence.id)
+            .filter(Sequence.parent_id == episode_id)
         )
 
     if task_status_id is not None:
-        query = query.filter(Comment.task_status_id == task_status_id)
+        query = query.filter(News.task_status_id == task_status_id)
 
     if task_type_id is not None:
-        query = query.filter(Task.task_type_id == task_type_id)
+        query = query.filter(News.task_type_id == task_type_id)
 
     if author_id is not None:
         query = query.filter(News.author_id == author_id)
@@ -73,18 +84,45 @@ def _apply_news_filters(
     return query
 
 
-def _get_news_total(query, limit):
+def _get_news_total(query, limit, total_mode="exact"):
     """
     Return the number of news matching given query, and the page count.
+    With the approximate mode, the total is the row estimate of the query
+    planner, which costs no scan. With the none mode, nothing is counted
+    and both values are None.
     """
-    # count() wraps the whole 5-join select in a subquery; counting the
-    # news column over the same joins gives the same total without
-    # materializing the select (order_by must go, aggregates forbid it).
-    total = query.order_by(None).with_entities(func.count(News.id)).scalar()
+    if total_mode == "none":
+        return None, None
+    query = query.order_by(None)
+    if total_mode == "approximate":
+        total = _get_planner_row_estimate(query)
+    else:
+        total = query.with_entities(func.count(News.id)).scalar()
     nb_pages = int(math.ceil(total / float(limit)))
     return total, nb_pages
 
 
+def _get_planner_row_estimate(query):
+    """
+    Return the number of rows the Postgres planner expects given query to
+    return, read from EXPLAIN without running the query.
+    """
+    from zou.app import db
+
+    statement = query.statement.compile(
+        dialect=db.engine.dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    plan = (
+        db.session.connection()
+        .exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement.string}", statement.params
+        )
+        .scalar()
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 def create_news(
     comment_id=None,
     author_id=None,
@@ -92,16 +130,28 @@ def create_news(
     preview_file_id=None,
     change=False,
     created_at=None,
+    task_status_id=None,
 ):
     """
-    Create a new news for given person and comment.
+    Create a new news for given person and comment. The project, task type
+    and entity of the task, and the status set by the comment, are copied
+    on the news for the activity feed.
     """
+    task = tasks_service.get_task(task_id)
+    if task_status_id is None and comment_id is not None:
+        task_status_id = tasks_service.get_comment_raw(
+            comment_id
+        ).task_status_id
     news = News.create(
         change=change,
         author_id=author_id,
         comment_id=comment_id,
         preview_file_id=preview_file_id,
         task_id=task_id,
+        project_id=task["project_id"],
+        task_type_id=task["task_type_id"],
+        entity_id=task["entity_id"],
+        task_status_id=task_status_id,
         created_at=created_at,
     )
     return news.serialize()
@@ -120,6 +170,7 @@ def create_news_for_task_and_comment(
         preview_file_id=comment["preview_file_id"],
         author_id=comment["person_id"],
         task_id=comment["object_id"],
+        task_status_id=comment["task_status_id"],
         change=change,
         created_at=created_at,
     )
@@ -135,6 +186,20 @@ def create_news_for_task_and_comment(
     return news
 
 
+def update_news_status_for_comment(comment_id, task_status_id):
+    """
+    Set the status copied on the news of given comment, after the status of
+    the comment was changed.
+    """
+    news_list = News.query.filter(News.comment_id == comment_id).all()
+    for news in news_list:
+        news.update({"task_status_id": task_status_id})
+        cache.cache.delete_memoized(
+            get_news, str(news.project_id), str(news.id)
+        )
+    return fields.serialize_list(news_list)
+
+
 def delete_news_for_comment(comment_id):
     """
     Delete all news related to comment. It's mandatory to be able to delete the
@@ -170,27 +235,38 @@ def get_last_news_for_project(
     after=None,
     episode_id=None,
     current_user=None,
+    before_id=None,
+    total_mode="exact",
 ):
     """
     Return last 50 news for given project. Add related information to make it
     displayable.
+
+    To get the next page without an offset, give the creation date and the
+    id of the last news received as before and before_id (the cursor field
+    of the result): news created at the same time are told apart by their
+    id, so none is skipped or repeated. total_mode tells how the total is
+    obtained: exact (a count), approximate (the planner estimate) or none.
     """
+    if total_mode not in TOTAL_MODES:
+        raise WrongParameterException(
+            f"total must be one of {', '.join(TOTAL_MODES)}."
+        )
+    if before_id is not None:
+        if before is None or not fields.is_valid_id(before_id):
+            raise WrongParameterException(
+                "before_id must be a valid id, sent along with before."
+            )
+        page = 1
     offset = (page - 1) * limit
 
-    query = (
-        News.query.order_by(News.created_at.desc())
-        .join(Task, News.task_id == Task.id)
-        .join(Project)
-        .join(Entity, Task.entity_id == Entity.id)
-        .outerjoin(Comment, News.comment_id == Comment.id)
-        .outerjoin(PreviewFile, News.preview_file_id == PreviewFile.id)
-    )
+    query = News.query.order_by(News.created_at.desc(), News.id.desc())
 
     if news_id is not None:
         query = query.filter(News.id == news_id)
 
     if entity_id is not None:
-        query = query.filter(Entity.id == entity_id)
+        query = query.filter(News.entity_id == entity_id)
 
     query = _apply_news_filters(
         query,
@@ -202,57 +278,42 @@ def get_last_news_for_project(
         author_id=author_id,
         episode_id=episode_id,
         only_preview=only_preview,
-        before=before,
+        before=before if before_id is None else None,
         after=after,
     )
 
-    total, nb_pages = _get_news_total(query, limit)
-
-    query = query.add_columns(
-        Project.id,
-        Project.name,
-        Task.task_type_id,
-        Comment.id,
-        Comment.task_status_id,
-        Task.entity_id,
-        PreviewFile.extension,
-        PreviewFile.annotations,
-        PreviewFile.revision,
-        Entity.preview_file_id,
-    )
-
-    query = query.limit(limit)
-    query = query.offset(offset)
-    news_list = query.all()
-    result = []
+    total, nb_pages = _get_news_total(query, limit, total_mode)
 
-    entity_ids = list(
-        set(
-            task_entity_id
-            for (_, _, _, _, _, _, task_entity_id, _, _, _, _) in news_list
+    if before_id is not None:
+        # A row comparison, so the whole bound is read off the
+        # (project_id, created_at, id) index.
+        query = query.filter(
+            tuple_(News.created_at, News.id)
+            < tuple_(
+                func.cast(before, News.created_at.type),
+                func.cast(before_id, News.id.type),
+            )
         )
+
+    news_list = query.limit(limit).offset(offset).all()
+
+    # What the news point to is loaded once for the whole page.
+    entity_names_map = names_service.get_full_entity_names(
+        list({news.entity_id for news in news_list})
+    )
+    project_names = _get_project_names({news.project_id for news in news_list})
+    preview_files = _get_preview_file_infos(
+        {news.preview_file_id for news in news_list} - {None}
     )
-    entity_names_map = names_service.get_full_entity_names(entity_ids)
-
-    for (
-        news,
-        project_id,
-        project_name,
-        task_type_id,
-        comment_id,
-        task_status_id,
-        task_entity_id,
-        preview_file_extension,
-        preview_file_annotations,
-        preview_file_revision,
-        entity_preview_file_id,
-    ) in news_list:
-        entity_name_data = entity_names_map.get(str(task_entity_id))
-        if entity_name_data:
-            full_entity_name, episode_id, _ = entity_name_data
-        else:
-            full_entity_name, episode_id = "", None
 
+    result = []
+    for news in news_list:
+        full_entity_name, episode_id, entity_preview_file_id = (
+            entity_names_map.get(str(news.entity_id), ("", None, None))
+        )
+        preview_file_extension, preview_file_revision = preview_files.get(
+            news.preview_file_id, (None, None)
+        )
         result.append(
             fields.serialize_dict(
                 {
@@ -261,14 +322,14 @@ def get_last_news_for_project(
                     "author_id": news.author_id,
                     "comment_id": news.comment_id,
                     "task_id": news.task_id,
-                    "task_type_id": task_type_id,
-                    "task_status_id": task_status_id,
-                    "task_entity_id": task_entity_id,
+                    "task_type_id": news.task_type_id,
+                    "task_status_id": news.task_status_id,
+                    "task_entity_id": news.entity_id,
                     "preview_file_id": news.preview_file_id,
                     "preview_file_extension": preview_file_extension,
                     "preview_file_revision": preview_file_revision,
-                    "project_id": project_id,
-                    "project_name": project_name,
+                    "project_id": news.project_id,
+                    "project_name": project_names.get(news.project_id),
                     "created_at": news.created_at,
                     "change": news.change,
                     "full_entity_name": full_entity_name,
@@ -309,6 +370,17 @@ def get_last_news_for_project(
             key = f"{entry['task_id']}-{entry['preview_file_revision']}"
             entry["preview_files"] = preview_files_map.get(key, [])
 
+    cursor = None
+    if len(result) == limit:
+        # The serialized date is cut to the second, which would skip the
+        # news of a bulk change made within the same second.
+        cursor = {
+            "before": fields.serialize_value(
+                news_list[-1].created_at, milliseconds=True
+            ),
+            "before_id": result[-1]["id"],
+        }
+
     return {
         "data": result,
         "total": total,
@@ -316,6 +388,37 @@ def get_last_news_for_project(
         "limit": limit,
         "offset": offset,
         "page": page,
+        "cursor": cursor,
+    }
+
+
+def _get_project_names(project_ids):
+    """
+    Return a map of the names of given projects, by project id.
+    """
+    if len(project_ids) == 0:
+        return {}
+    return dict(
+        Project.query.filter(Project.id.in_(project_ids)).with_entities(
+            Project.id, Project.name
+        )
+    )
+
+
+def _get_preview_file_infos(preview_file_ids):
+    """
+    Return a map of the extension and revision of given preview files, by
+    preview file id.
+    """
+    if len(preview_file_ids) == 0:
+        return {}
+    return {
+        preview_file_id: (extension, revision)
+        for preview_file_id, extension, revision in PreviewFile.query.filter(
+            PreviewFile.id.in_(preview_file_ids)
+        ).with_entities(
+            PreviewFile.id, PreviewFile.extension, PreviewFile.revision
+        )
     }
 
 
@@ -338,15 +441,8 @@ def get_news_stats_for_project(
     if project_ids is None:
         project_ids = []
     query = (
-        News.query.join(Task, News.task_id == Task.id)
-        .join(Project)
-        .join(Comment)
-        .join(Entity, Task.entity_id == Entity.id)
-        .outerjoin(PreviewFile, News.preview_file_id == PreviewFile.id)
-        .with_entities(Comment.task_status_id, func.count(Entity.id))
-        .group_by(
-            Comment.task_status_id,
-        )
+        News.query.with_entities(News.task_status_id, func.count(News.id))
+        .group_by(News.task_status_id)
         .filter(News.change == True)
     )
 
@@ -1,3 +1,4 @@
+from sqlalchemy import and_, or_, select
 from sqlalchemy.exc import StatementError
 from sqlalchemy.sql import func
 
@@ -18,6 +19,7 @@ from zou.app.services import (
 from zou.app.services.exception import PersonNotFoundException
 from zou.app.utils import date_helpers, events, fields, query as query_utils
 
+from zou.app.stores import notification_counts_store
 from zou.app.utils import cache
 
 
@@ -34,6 +36,27 @@ def _emit_notification(notification, recipient_id, project_id):
     )
 
 
+def _emit_notifications(notifications, project_id):
+    """
+    Same as _emit_notification for a list of notifications, published to the
+    event stream in a single round trip.
+    """
+    if len(notifications) == 0:
+        return
+    events.emit_many(
+        "notification:new",
+        [
+            {
+                "notification_id": notification["id"],
+                "person_id": notification["person_id"],
+            }
+            for notification in notifications
+        ],
+        project_id=project_id,
+        persist=False,
+    )
+
+
 def _get_subscription_raw(**criterions):
     """
     Return the subscription matching given criterions as an active record,
@@ -82,21 +105,155 @@ def create_notification(
         type=type,
         created_at=creation_date,
     )
+    if not read:
+        notification_counts_store.increment([person_id])
     return notification.serialize()
 
 
+def create_notifications(
+    person_ids,
+    comment_id=None,
+    author_id=None,
+    task_id=None,
+    reply_id=None,
+    read=False,
+    change=False,
+    type="comment",
+    created_at=None,
+    playlist_id=None,
+):
+    """
+    Create the same notification for every given person, in one insert.
+    Ids matching no person are skipped, and a person listed twice is
+    notified once.
+    """
+    person_ids = list(
+        dict.fromkeys(str(person_id) for person_id in person_ids)
+    )
+    if len(person_ids) == 0:
+        return []
+    existing_ids = {
+        str(person_id)
+        for (person_id,) in Person.query.with_entities(Person.id).filter(
+            Person.id.in_(person_ids)
+        )
+    }
+    creation_date = fields.get_default_date_object(created_at)
+    notifications = [
+        Notification.create_no_commit(
+            read=read,
+            change=change,
+            person_id=person_id,
+            author_id=author_id,
+            task_id=task_id,
+            comment_id=comment_id,
+            reply_id=reply_id,
+            playlist_id=playlist_id,
+            type=type,
+            created_at=creation_date,
+        )
+        for person_id in person_ids
+        if person_id in existing_ids
+    ]
+    Notification.commit()
+    if not read:
+        notification_counts_store.increment(
+            [notification.person_id for notification in notifications]
+        )
+    return fields.serialize_list(notifications)
+
+
+def delete_notifications(*criterions, **kwargs):
+    """
+    Delete the notifications matching given filters, and lower the unread
+    notification count of every person who loses unread notifications.
+    """
+    unread_counts = (
+        Notification.query.with_entities(
+            Notification.person_id, func.count(Notification.id)
+        )
+        .filter(*criterions)
+        .filter_by(read=False, **kwargs)
+        .group_by(Notification.person_id)
+        .all()
+    )
+    result = Notification.delete_all_by(*criterions, **kwargs)
+    person_ids_by_count = {}
+    for person_id, count in unread_counts:
+        person_ids_by_count.setdefault(count, []).append(str(person_id))
+    for count, person_ids in person_ids_by_count.items():
+        notification_counts_store.decrement(person_ids, count)
+    return result
+
+
+def get_unread_notifications_count(person_id):
+    """
+    Return the number of unread notifications of given person. It is read
+    from the key value store, and computed from the database only when the
+    store does not know it yet.
+    """
+    count = notification_counts_store.get(person_id)
+    if count is None:
+        count = Notification.query.filter_by(
+            person_id=person_id, read=False
+        ).count()
+        notification_counts_store.set_counts({person_id: count})
+    return count
+
+
+def reconcile_unread_notifications_counts():
+    """
+    Recompute from the database the unread notification count of every
+    person, and store it. Meant to run periodically, it corrects the counts
+    that drifted, for instance when notifications were deleted along with
+    their comment.
+    """
+    counts = {
+        str(person_id): 0
+        for (person_id,) in Person.query.with_entities(Person.id)
+    }
+    unread_counts = (
+        Notification.query.with_entities(
+            Notification.person_id, func.count(Notification.id)
+        )
+        .filter(Notification.read == False)
+        .group_by(Notification.person_id)
+    )
+    for person_id, count in unread_counts:
+        counts[str(person_id)] = count
+    notification_counts_store.set_counts(counts)
+    return counts
+
+
 def get_notification_recipients(task, replies=None):
     """
     Get the list of notification recipients for given task: assignees and
-    every people who commented the task.
+    every people who commented the task. The task and sequence subscribers
+    are read with a single query.
     """
     if replies is None:
         replies = []
     recipients = set(task["assignees"])
-    for subscription in get_task_subscriptions(task):
-        recipients.add(str(subscription.person_id))
-    for subscription in get_sequence_subscriptions(task):
-        recipients.add(str(subscription.person_id))
+    sequence_id = (
+        select(Entity.parent_id)
+        .where(Entity.id == task["entity_id"])
+        .scalar_subquery()
+    )
+    subscriber_ids = (
+        Subscription.query.with_entities(Subscription.person_id)
+        .filter(
+            or_(
+                Subscription.task_id == task["id"],
+                and_(
+                    Subscription.task_type_id == task["task_type_id"],
+                    Subscription.entity_id == sequence_id,
+                ),
+            )
+        )
+        .distinct()
+    )
+    for (person_id,) in subscriber_ids:
+        recipients.add(str(person_id))
     for reply in replies:
         recipients.add(reply["person_id"])
     return recipients
@@ -134,39 +291,43 @@ def create_notifications_for_task_and_comment(task, comment, change=False):
     author_id = comment["person_id"]
     task = tasks_service.get_task(comment["object_id"])
 
-    for recipient_id in recipient_ids:
+    notifications = create_notifications(
+        recipient_ids,
+        comment_id=comment["id"],
+        author_id=author_id,
+        task_id=task["id"],
+        read=False,
+        change=change,
+        type="comment",
+    )
+    for notification in notifications:
         try:
-            notification = create_notification(
-                recipient_id,
-                comment_id=comment["id"],
-                author_id=author_id,
-                task_id=task["id"],
-                read=False,
-                change=change,
-                type="comment",
-            )
             emails_service.send_comment_notification(
-                recipient_id, author_id, comment, task
+                notification["person_id"], author_id, comment, task
             )
-            _emit_notification(notification, recipient_id, task["project_id"])
         except PersonNotFoundException:
             pass
 
-    mentions = get_mentioned_people(task["project_id"], comment)
-    for recipient_id in mentions:
-        if recipient_id != comment["person_id"]:
-            notification = create_notification(
-                recipient_id,
-                comment_id=comment["id"],
-                author_id=comment["person_id"],
-                task_id=comment["object_id"],
-                type="mention",
-            )
-            emails_service.send_mention_notification(
-                recipient_id, author_id, comment, task
-            )
-            _emit_notification(notification, recipient_id, task["project_id"])
+    mentions = [
+        recipient_id
+        for recipient_id in get_mentioned_people(task["project_id"], comment)
+        if recipient_id != comment["person_id"]
+    ]
+    mention_notifications = create_notifications(
+        mentions,
+        comment_id=comment["id"],
+        author_id=comment["person_id"],
+        task_id=comment["object_id"],
+        type="mention",
+    )
+    for notification in mention_notifications:
+        emails_service.send_mention_notification(
+            notification["person_id"], author_id, comment, task
+        )
 
+    _emit_notifications(
+        notifications + mention_notifications, task["project_id"]
+    )
     return recipient_ids
 
 
@@ -199,42 +360,46 @@ def create_notifications_for_task_and_reply(task, comment, reply):
     if author_id != comment["person_id"]:
         recipient_ids.add(comment["person_id"])
     task = tasks_service.get_task(comment["object_id"])
-    for recipient_id in recipient_ids:
+    notifications = create_notifications(
+        recipient_ids,
+        comment_id=comment["id"],
+        author_id=author_id,
+        task_id=task["id"],
+        reply_id=reply["id"],
+        read=False,
+        type="reply",
+        created_at=reply["created_at"],
+    )
+    for notification in notifications:
         try:
-            notification = create_notification(
-                recipient_id,
-                comment_id=comment["id"],
-                author_id=author_id,
-                task_id=task["id"],
-                reply_id=reply["id"],
-                read=False,
-                type="reply",
-                created_at=reply["created_at"],
-            )
             emails_service.send_reply_notification(
-                recipient_id, author_id, comment, task, reply
+                notification["person_id"], author_id, comment, task, reply
             )
-            _emit_notification(notification, recipient_id, task["project_id"])
         except PersonNotFoundException:
             pass
 
-    mentions = get_mentioned_people(task["project_id"], reply)
-    for recipient_id in mentions:
-        if recipient_id != reply["person_id"]:
-            notification = create_notification(
-                recipient_id,
-                comment_id=comment["id"],
-                author_id=reply["person_id"],
-                task_id=task["id"],
-                reply_id=reply["id"],
-                read=False,
-                type="reply-mention",
-            )
-            emails_service.send_mention_notification(
-                recipient_id, author_id, comment, task
-            )
-            _emit_notification(notification, recipient_id, task["project_id"])
+    mentions = [
+        recipient_id
+        for recipient_id in get_mentioned_people(task["project_id"], reply)
+        if recipient_id != reply["person_id"]
+    ]
+    mention_notifications = create_notifications(
+        mentions,
+        comment_id=comment["id"],
+        author_id=reply["person_id"],
+        task_id=task["id"],
+        reply_id=reply["id"],
+        read=False,
+        type="reply-mention",
+    )
+    for notification in mention_notifications:
+        emails_service.send_mention_notification(
+            notification["person_id"], author_id, comment, task
+        )
 
+    _emit_notifications(
+        notifications + mention_notifications, task["project_id"]
+    )
     return recipient_ids
 
 
@@ -248,7 +413,7 @@ def reset_notifications_for_mentions(comment):
     # raised by the replies of that comment belong to the replies, which
     # clean up after themselves in delete_reply, and nothing here would
     # bring them back.
-    Notification.delete_all_by(type="mention", comment_id=comment["id"])
+    delete_notifications(type="mention", comment_id=comment["id"])
     notifications = []
     task = tasks_service.get_task(comment["object_id"])
     author_id = comment["person_id"]
@@ -406,10 +571,11 @@ def delete_notifications_for_comment(comment_id):
     Delete every notification tied to given comment. Mandatory before the
     comment itself can be deleted.
     """
-    notifications = Notification.get_all_by(comment_id=comment_id)
-    for notification in notifications:
-        notification.delete()
-    return fields.serialize_list(notifications)
+    notifications = fields.serialize_list(
+        Notification.get_all_by(comment_id=comment_id)
+    )
+    delete_notifications(comment_id=comment_id)
+    return notifications
 
 
 def get_last_notifications(notification_type=None):
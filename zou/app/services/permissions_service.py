@@ -141,6 +141,25 @@ def has_project_access(project_id):
     )
 
 
+def check_working_on_tasks(task_ids):
+    """
+    Return True if user has all given tasks assigned.
+    """
+    task_ids = set(str(task_id) for task_id in task_ids)
+    current_user = persons_service.get_current_user_raw()
+    assigned_ids = {
+        str(task_id)
+        for (task_id,) in Task.query.with_entities(Task.id)
+        .filter(Task.assignees.contains(current_user))
+        .filter(Task.id.in_(task_ids))
+        .all()
+    }
+    if assigned_ids != task_ids:
+        raise permissions.PermissionDenied
+
+    return True
+
+
 def check_project_access(project_id):
     """
     Return true if current user is a manager or has a task assigned for this
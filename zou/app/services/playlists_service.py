@@ -13,14 +13,15 @@ from zipfile import ZipFile
 
 from flask_fs.errors import FileNotFound
 from slugify import slugify
-from sqlalchemy import or_
-from sqlalchemy.orm import defer, joinedload
+from sqlalchemy import or_, select
+from sqlalchemy.orm import aliased, defer, joinedload
 
-from zou.app import config
-from zou.app.stores import config_store, file_store
+from zou.app import config, db
+from zou.app.stores import config_store, file_store, playlist_payloads_store
 
 from zou.app.models.build_job import BuildJob
-from zou.app.models.notification import Notification
+from zou.app.models.entity import Entity
+from zou.app.models.entity_type import EntityType
 from zou.app.models.playlist import Playlist
 from zou.app.models.playlist_share_link import PlaylistShareLink
 from zou.app.models.preview_file import PreviewFile
@@ -33,7 +34,6 @@ from zou.app.utils import query as query_utils
 from zou.app.stores.redis_lock import with_playlist_lock
 
 from zou.app.services import (
-    assets_service,
     base_service,
     edits_service,
     entities_service,
@@ -43,6 +43,7 @@ from zou.app.services import (
     shots_service,
     tasks_service,
     names_service,
+    notifications_service,
     persons_service,
     templates_service,
 )
@@ -51,6 +52,7 @@ from zou.app.services.exception import (
     BuildJobNotFoundException,
     PlaylistLockTimeoutException,
     PlaylistNotFoundException,
+    TaskNotFoundException,
 )
 
 logger = logging.getLogger(__name__)
@@ -233,7 +235,22 @@ def get_playlist_with_preview_file_revisions(
     response: they are the heaviest part of a playlist and the web client
     loads them on demand. Callers that have no lazy-loading (e.g. the shared
     guest player) keep the default and receive annotations inline.
-    """
+
+    The built payload is stored under the current revision of the playlist,
+    which is bumped by playlist edits and by changes on the previews of its
+    entities: only the first open after a change builds it.
+    """
+    # The revision is read before anything else: a change committed while
+    # the payload is built bumps it, so the payload is stored under a
+    # revision that is already stale and never served.
+    revision = playlist_payloads_store.get_revision(playlist_id)
+    if revision is not None:
+        playlist_dict = playlist_payloads_store.get_payload(
+            playlist_id, revision, with_annotations
+        )
+        if playlist_dict is not None:
+            return playlist_dict
+
     # Eager load build_jobs to avoid N+1 when building build_jobs list
     playlist = (
         Playlist.query.options(joinedload(Playlist.build_jobs))
@@ -249,6 +266,16 @@ def get_playlist_with_preview_file_revisions(
 
     if playlist_dict["shots"] is None:
         playlist_dict["shots"] = []
+    if revision is not None:
+        # Before the previews are read, so that a preview added meanwhile
+        # either is read or bumps the revision.
+        playlist_payloads_store.register_entities(
+            playlist_id,
+            [
+                shot.get("id") or shot.get("shot_id") or shot.get("entity_id")
+                for shot in playlist_dict["shots"]
+            ],
+        )
     playlist_dict, preview_file_map = set_preview_files_for_entities(
         playlist_dict, with_annotations=with_annotations
     )
@@ -280,9 +307,38 @@ def get_playlist_with_preview_file_revisions(
                 shot.get("id"),
                 e,
             )
+    if revision is not None:
+        playlist_payloads_store.set_payload(
+            playlist_id, revision, with_annotations, playlist_dict
+        )
     return playlist_dict
 
 
+def clear_playlist_payloads(playlist_id):
+    """
+    Invalidate the stored payloads of given playlist.
+    """
+    playlist_payloads_store.bump_playlists([playlist_id])
+
+
+def clear_task_types_playlist_payloads(task_type_ids):
+    """
+    Invalidate the stored payloads of the playlists of every production
+    with tasks of given task types. Their previews are sorted by task type
+    priority and name, so renaming or reordering a task type changes them.
+    """
+    project_ids = (
+        select(Task.project_id)
+        .where(Task.task_type_id.in_(task_type_ids))
+        .distinct()
+    )
+    playlist_ids = db.session.scalars(
+        select(Playlist.id).where(Playlist.project_id.in_(project_ids))
+    ).all()
+    if len(playlist_ids) > 0:
+        playlist_payloads_store.bump_playlists(playlist_ids)
+
+
 def _add_build_job_infos_to_playlist_dict(playlist, playlist_dict):
     """
     Add the state of the last build job to a playlist dict, so the client
@@ -330,6 +386,7 @@ def set_preview_files_for_entities(playlist_dict, with_annotations=True):
         PreviewFile.status,
         PreviewFile.created_at,
         PreviewFile.task_id,
+        PreviewFile.annotations_version,
         Task.task_type_id,
         Task.entity_id,
     ]
@@ -370,6 +427,7 @@ def set_preview_files_for_entities(playlist_dict, with_annotations=True):
             "status": str(row.status),
             "created_at": fields.serialize_value(row.created_at),
             "task_id": str(row.task_id),
+            "annotations_version": row.annotations_version,
         }  # Do not add too much field to avoid building too big responses
         if with_annotations:
             light_preview_file["annotations"] = row.annotations
@@ -401,9 +459,19 @@ def get_preview_files_for_entity(entity_id):
     """
     Get all preview files available for given shot.
     """
+    return get_preview_files_for_entities([entity_id]).get(str(entity_id), {})
+
+
+def get_preview_files_for_entities(entity_ids):
+    """
+    Get all preview files available for given entities, grouped by entity
+    then by task type, with a single query.
+    """
     previews = {}
+    if len(entity_ids) == 0:
+        return previews
     query = (
-        Task.query.filter_by(entity_id=entity_id)
+        Task.query.filter(Task.entity_id.in_(entity_ids))
         .add_columns(
             PreviewFile.id,
             PreviewFile.revision,
@@ -428,6 +496,7 @@ def get_preview_files_for_entity(entity_id):
     )
 
     task_previews = {}
+    task_entities = {}
     for (
         task,
         preview_file_id,
@@ -447,6 +516,7 @@ def get_preview_files_for_entity(entity_id):
         task_id = str(task.id)
         if task_id not in task_previews:
             task_previews[task_id] = []
+            task_entities[task_id] = str(task.entity_id)
         data = preview_file_data or {}
         task_previews[task_id].append(
             fields.serialize_dict(
@@ -478,7 +548,8 @@ def get_preview_files_for_entity(entity_id):
 
         if len(preview_files) > 0:
             preview_files = mix_preview_file_revisions(preview_files)
-            previews[task_type_id] = [
+            entity_previews = previews.setdefault(task_entities[task_id], {})
+            entity_previews[task_type_id] = [
                 {
                     "id": preview_file["id"],
                     "revision": preview_file["revision"],
@@ -648,6 +719,8 @@ def add_entities_to_playlist(playlist_id, entities):
             playlist.update({"shots": shots})
         playlist_dict = playlist.serialize()
 
+    if added_shots:
+        clear_playlist_payloads(playlist_id)
     for shot in added_shots:
         events.emit(
             "playlist:add_entity",
@@ -918,6 +991,7 @@ def start_build_job(playlist):
     job = BuildJob.create(
         status="running", job_type="movie", playlist_id=playlist["id"]
     )
+    clear_playlist_payloads(playlist["id"])
     events.emit(
         "build-job:new",
         {
@@ -943,6 +1017,7 @@ def end_build_job(playlist, job, success):
     build_job = BuildJob.get(job["id"])
     if build_job is not None:
         build_job.end(status=status)
+    clear_playlist_payloads(playlist["id"])
     events.emit(
         "build-job:update",
         {
@@ -1054,9 +1129,7 @@ def remove_playlist(playlist_id):
     """
     playlist = get_playlist_raw(playlist_id)
     playlist_dict = playlist.serialize()
-    notifications = Notification.query.filter_by(playlist_id=playlist_id).all()
-    for notification in notifications:
-        notification.delete()
+    notifications_service.delete_notifications(playlist_id=playlist_id)
     jobs = BuildJob.query.filter_by(playlist_id=playlist_id).all()
     for job in jobs:
         _remove_build_job_impl(playlist_dict, job.serialize())
@@ -1066,6 +1139,7 @@ def remove_playlist(playlist_id):
     for share_link in share_links:
         share_link.delete()
     playlist.delete()
+    clear_playlist_payloads(playlist_id)
     events.emit(
         "playlist:delete",
         {"playlist_id": playlist_dict["id"]},
@@ -1093,6 +1167,7 @@ def _remove_build_job_impl(playlist, job_dict):
     job = BuildJob.get(build_job_id)
     if job is not None:
         job.delete()
+    clear_playlist_payloads(playlist["id"])
     events.emit(
         "build-job:delete",
         {"build_job_id": build_job_id, "playlist_id": playlist["id"]},
@@ -1145,11 +1220,9 @@ def generate_temp_playlist(task_ids, sort=True):
     task_type_links = projects_service.get_task_type_links(
         task["project_id"], for_entity
     )
-    entities = []
-
-    for task_id in task_ids:
-        entity = generate_playlisted_entity_from_task(task_id, task_type_links)
-        entities.append(entity)
+    entities = generate_playlisted_entities_from_tasks(
+        task_ids, task_type_links
+    )
     if len(entities) > 0:
         if not sort:
             return entities
@@ -1177,22 +1250,135 @@ def generate_playlisted_entity_from_task(task_id, task_type_links):
     Generate the data structure of a playlisted shot for a given task. It
     doesn't persist anything.
     """
-    task = tasks_service.get_task(task_id)
-    entity = entities_service.get_entity(task["entity_id"])
-    if shots_service.is_shot(entity):
-        playlisted_entity = get_base_shot_for_playlist(entity, task_id)
-    elif shots_service.is_sequence(entity):
-        playlisted_entity = get_base_sequence_for_playlist(entity, task_id)
-    elif shots_service.is_episode(entity):
-        playlisted_entity = get_base_episode_for_playlist(entity, task_id)
-    elif edits_service.is_edit(entity):
-        playlisted_entity = get_base_edit_for_playlist(entity, task_id)
-    else:
-        playlisted_entity = get_base_asset_for_playlist(entity, task_id)
+    return generate_playlisted_entities_from_tasks([task_id], task_type_links)[
+        0
+    ]
+
+
+def generate_playlisted_entities_from_tasks(task_ids, task_type_links):
+    """
+    Generate the data structure of a playlisted entity for each given task,
+    in the same order. It doesn't persist anything. The tasks, their
+    entities with their parent, and the preview files of these entities
+    are loaded with one query each, whatever the number of tasks.
+    """
+    tasks = _get_playlisted_tasks(task_ids)
+    entities = _get_playlisted_entities(
+        {entity_id for entity_id, _ in tasks.values()}
+    )
+    preview_files_by_entity = get_preview_files_for_entities(list(entities))
+
+    playlisted_entities = []
+    for task_id in task_ids:
+        task_id = str(task_id)
+        entity_id, task_type_id = tasks[task_id]
+        playlisted_entity = _build_playlisted_entity(
+            entities[entity_id]["entity"],
+            task_id,
+            **entities[entity_id]["parent"],
+        )
+        preview_files = preview_files_by_entity.get(entity_id, {})
+        _set_playlisted_entity_preview_file(
+            playlisted_entity, preview_files, task_type_id, task_type_links
+        )
+        playlisted_entity["preview_files"] = preview_files
+        playlisted_entities.append(playlisted_entity)
+    return playlisted_entities
+
+
+def _get_playlisted_tasks(task_ids):
+    """
+    Map each of given tasks to its entity and task type ids, with a single
+    query.
+    """
+    ids = {str(task_id) for task_id in task_ids}
+    tasks = {
+        str(task_id): (str(entity_id), str(task_type_id))
+        for task_id, entity_id, task_type_id in db.session.execute(
+            select(Task.id, Task.entity_id, Task.task_type_id).where(
+                Task.id.in_([i for i in ids if fields.is_valid_id(i)])
+            )
+        )
+    }
+    if len(tasks) != len(ids):
+        raise TaskNotFoundException
+    return tasks
+
 
-    task_type_id = task["task_type_id"]
-    preview_files = get_preview_files_for_entity(entity["id"])
+def _get_playlisted_entities(entity_ids):
+    """
+    Load given entities with their parent and entity type, with a single
+    query. Each entity comes with the parent fields of its playlist entry:
+    the sequence of a shot, the episode of a sequence or an edit, the type
+    of an asset.
+    """
+    if len(entity_ids) == 0:
+        return {}
+    Parent = aliased(Entity, name="parent")
+    query = (
+        select(
+            Entity.id,
+            Entity.name,
+            Entity.entity_type_id,
+            Parent.id,
+            Parent.name,
+            Parent.entity_type_id,
+            EntityType.name,
+        )
+        .outerjoin(Parent, Parent.id == Entity.parent_id)
+        .join(EntityType, EntityType.id == Entity.entity_type_id)
+        .where(Entity.id.in_(entity_ids))
+    )
+    entities = {}
+    for (
+        entity_id,
+        name,
+        entity_type_id,
+        parent_id,
+        parent_name,
+        parent_type_id,
+        entity_type_name,
+    ) in db.session.execute(query):
+        entity = {"entity_type_id": str(entity_type_id)}
+        parent = {}
+        if shots_service.is_shot(entity):
+            if parent_id is not None:
+                parent = {
+                    "parent_name": parent_name,
+                    "sequence_id": str(parent_id),
+                    "sequence_name": parent_name,
+                }
+        elif shots_service.is_sequence(entity) or edits_service.is_edit(
+            entity
+        ):
+            if parent_id is not None and shots_service.is_episode(
+                {"entity_type_id": str(parent_type_id)}
+            ):
+                parent = {
+                    "parent_name": parent_name,
+                    "episode_id": str(parent_id),
+                    "episode_name": parent_name,
+                }
+        elif not shots_service.is_episode(entity):
+            parent = {
+                "parent_name": entity_type_name,
+                "asset_type_id": str(entity_type_id),
+                "asset_type_name": entity_type_name,
+            }
+        entities[str(entity_id)] = {
+            "entity": {"id": str(entity_id), "name": name},
+            "parent": parent,
+        }
+    return entities
 
+
+def _set_playlisted_entity_preview_file(
+    playlisted_entity, preview_files, task_type_id, task_type_links
+):
+    """
+    Set on given playlist entry the latest preview of given task type, or
+    of the first task type of the project that has one.
+    """
     preview_file = None
     if task_type_id in preview_files and len(preview_files[task_type_id]) > 0:
         preview_file = preview_files[task_type_id][0]
@@ -1221,8 +1407,6 @@ def generate_playlisted_entity_from_task(task_id, task_type_links):
                 "preview_file_previews": preview_file["previews"],
             }
         )
-    playlisted_entity["preview_files"] = preview_files
-    return playlisted_entity
 
 
 def _build_playlisted_entity(entity, task_id, parent_name="", **extra):
@@ -1248,92 +1432,6 @@ def _build_playlisted_entity(entity, task_id, parent_name="", **extra):
     return entry
 
 
-def get_base_episode_for_playlist(entity, task_id):
-    """
-    Build the playlist entry of an episode: it has no parent to show.
-    """
-    episode = shots_service.get_episode(entity["id"])
-    return _build_playlisted_entity(episode, task_id)
-
-
-def get_base_sequence_for_playlist(entity, task_id):
-    """
-    Build the playlist entry of a sequence, showing its episode as parent.
-    """
-    sequence = shots_service.get_sequence(entity["id"])
-    episode = None
-    try:
-        episode = shots_service.get_episode(sequence["parent_id"])
-    except Exception as e:
-        logger.debug(
-            "No episode for sequence parent_id=%s: %s",
-            sequence.get("parent_id"),
-            e,
-        )
-    if episode is None:
-        return _build_playlisted_entity(sequence, task_id)
-    return _build_playlisted_entity(
-        sequence,
-        task_id,
-        parent_name=episode["name"],
-        episode_id=episode["id"],
-        episode_name=episode["name"],
-    )
-
-
-def get_base_shot_for_playlist(entity, task_id):
-    """
-    Build the playlist entry of a shot, showing its sequence as parent.
-    """
-    shot = shots_service.get_shot(entity["id"])
-    sequence = shots_service.get_sequence(shot["parent_id"])
-    return _build_playlisted_entity(
-        shot,
-        task_id,
-        parent_name=sequence["name"],
-        sequence_id=sequence["id"],
-        sequence_name=sequence["name"],
-    )
-
-
-def get_base_edit_for_playlist(entity, task_id):
-    """
-    Build the playlist entry of an edit, showing its episode as parent.
-    """
-    edit = edits_service.get_edit(entity["id"])
-    episode = None
-    try:
-        episode = shots_service.get_episode(edit["parent_id"])
-    except Exception as e:
-        logger.debug(
-            f"No episode for edit parent_id={edit.get('parent_id')}: {e}"
-        )
-    if episode is None:
-        return _build_playlisted_entity(edit, task_id)
-    return _build_playlisted_entity(
-        edit,
-        task_id,
-        parent_name=episode["name"],
-        episode_id=episode["id"],
-        episode_name=episode["name"],
-    )
-
-
-def get_base_asset_for_playlist(entity, task_id):
-    """
-    Build the playlist entry of an asset, showing its type as parent.
-    """
-    asset = assets_service.get_asset(entity["id"])
-    asset_type = assets_service.get_asset_type(asset["entity_type_id"])
-    return _build_playlisted_entity(
-        asset,
-        task_id,
-        parent_name=asset_type["name"],
-        asset_type_id=asset_type["id"],
-        asset_type_name=asset_type["name"],
-    )
-
-
 def get_preview_files_for_task(task_id):
     """
     Return all preview file active records for given task.
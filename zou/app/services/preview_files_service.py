@@ -3,18 +3,24 @@ import math
 import os
 import re
 import shutil
+import socket
 import tempfile
+import threading
 import time
+import uuid
 import zipfile
 
 import ffmpeg
+from flask_fs.errors import FileNotFound
 from PIL import Image
 
+from sqlalchemy import Text, column, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import aliased
 from sqlalchemy.orm.exc import ObjectDeletedError, StaleDataError
 
-from zou.app import config
-from zou.app.stores import config_store, file_store
+from zou.app import config, db
+from zou.app.stores import config_store, file_store, preview_cache_store
 from zou.app.stores.redis_lock import with_preview_file_lock
 
 from zou.app.models.entity import Entity
@@ -34,6 +40,7 @@ from zou.app.services import (
 from zou.utils import movie
 from zou.app.utils import (
     annotations as annotations_renderer,
+    batch,
     events,
     fields,
     remote_job,
@@ -206,6 +213,7 @@ def update_preview_file_raw(preview_file, data, silent=False):
         )
 
     files_service.clear_preview_file_cache(preview_file_id)
+    files_service.clear_playlist_payloads_for_task(preview_file.task_id)
     if not silent:
         task = Task.get(preview_file.task_id)
         events.emit(
@@ -355,6 +363,7 @@ def prepare_and_store_movie(
         normalized_movie_path = None
         normalized_movie_low_path = None
         original_picture_path = None
+        tile_layout = None
         try:
             project = get_project_from_preview_file(preview_file_id)
             entity = get_entity_from_preview_file(preview_file_id)
@@ -527,9 +536,13 @@ def prepare_and_store_movie(
 
                 # Build tiles
                 try:
-                    tile_path = movie.generate_tile(normalized_movie_path)
+                    layout = movie.get_tile_layout(normalized_movie_path)
+                    tile_path = movie.generate_tile(
+                        normalized_movie_path, layout=layout
+                    )
                     file_store.add_picture("tiles", preview_file_id, tile_path)
                     os.remove(tile_path)
+                    tile_layout = layout
                     current_app.logger.info(f"tile created {tile_path}")
                 except Exception:
                     current_app.logger.error(
@@ -571,17 +584,20 @@ def prepare_and_store_movie(
             preview_file_raw = files_service.get_preview_file_raw(
                 preview_file_id
             )
-            preview_file = update_preview_file_raw(
-                preview_file_raw,
-                {
-                    "status": "ready",
-                    "file_size": file_size,
-                    "width": width,
-                    "height": height,
-                    "duration": duration,
-                },
-            )
+            data = {
+                "status": "ready",
+                "file_size": file_size,
+                "width": width,
+                "height": height,
+                "duration": duration,
+            }
+            if tile_layout is not None:
+                data["data"] = _get_data_with_tile_layout(
+                    preview_file_raw, tile_layout
+                )
+            preview_file = update_preview_file_raw(preview_file_raw, data)
             tasks_service.update_preview_file_info(preview_file)
+            request_preview_cache_warmup(preview_file_id)
             return preview_file
         except PreviewFileNotFoundException:
             current_app.logger.warning(
@@ -665,6 +681,107 @@ def clear_variant_from_cache(preview_file_id, prefix, extension="png"):
     return preview_file_id
 
 
+# Files downloaded by a cache warmup: the low def movie (with the same
+# fallback as the lowdef movie route), the thumbnails and the tile.
+WARMUP_MOVIE_PREFIXES = ["lowdef", "previews"]
+WARMUP_PICTURE_PREFIXES = ["thumbnails", "thumbnails-square", "tiles"]
+
+
+def request_preview_cache_warmup(preview_file_id):
+    """
+    Ask the API nodes to download the files of given preview file into
+    their cache, when the warmup is enabled and the storage is remote.
+    """
+    if config.PREVIEW_CACHE_WARMUP and config.FS_BACKEND != "local":
+        preview_cache_store.broadcast_warmup(preview_file_id)
+
+
+def warm_preview_cache(preview_file_id):
+    """
+    Download the files reviewers ask first for given preview file into the
+    local cache, the way the preview routes do. Missing files are skipped.
+    Return the paths of the cached files.
+    """
+    if config.FS_BACKEND == "local":
+        return []
+    files = [
+        (
+            file_store.get_local_movie_path,
+            file_store.open_movie,
+            prefix,
+            "mp4",
+        )
+        for prefix in WARMUP_MOVIE_PREFIXES
+    ] + [
+        (
+            file_store.get_local_picture_path,
+            file_store.open_picture,
+            prefix,
+            "png",
+        )
+        for prefix in WARMUP_PICTURE_PREFIXES
+    ]
+    file_paths = []
+    for get_local_path, open_file, prefix, extension in files:
+        if prefix == "previews" and len(file_paths) > 0:
+            # The lowdef movie is there, no need for its fallback.
+            continue
+        try:
+            file_paths.append(
+                fs.get_file_path_and_file(
+                    config,
+                    get_local_path,
+                    open_file,
+                    prefix,
+                    preview_file_id,
+                    extension,
+                )
+            )
+        except FileNotFound:
+            pass
+        except Exception:
+            from zou.app import app as current_app
+
+            current_app.logger.warning(
+                "Failed to warm up %s-%s", prefix, preview_file_id, exc_info=1
+            )
+    return file_paths
+
+
+def handle_preview_cache_warmup(host, preview_file_id):
+    """
+    Warm up the cache of given preview file if given host did not claim it
+    yet. When no file could be cached, the claim is dropped so the next
+    broadcast retries. Return the paths of the cached files.
+    """
+    if not preview_cache_store.claim_warmup(host, preview_file_id):
+        return []
+    file_paths = warm_preview_cache(preview_file_id)
+    if len(file_paths) == 0:
+        preview_cache_store.release_warmup(host, preview_file_id)
+    return file_paths
+
+
+def start_preview_cache_warmup_listener(app):
+    """
+    Warm up the cache of the preview files broadcast by the other nodes in
+    a daemon thread bound to given application. Only one process per host
+    downloads a given preview file. Returns the event that stops it.
+    """
+    stop_event = threading.Event()
+    host = socket.gethostname()
+
+    def handle_warmup(preview_file_id):
+        handle_preview_cache_warmup(host, preview_file_id)
+
+    def run():
+        with app.app_context():
+            preview_cache_store.listen(handle_warmup, stop_event)
+
+    threading.Thread(target=run, daemon=True).start()
+    return stop_event
+
+
 def update_preview_file_position(preview_file_id, position):
     """
     Change positions for preview files of given task and revision.
@@ -684,6 +801,7 @@ def update_preview_file_position(preview_file_id, position):
         for i, preview in enumerate(tmp_list):
             preview.update({"position": i + 1})
             files_service.clear_preview_file_cache(str(preview.id))
+        files_service.clear_playlist_payloads_for_task(task_id)
         # The list was read in the order the positions used to be in, so it
         # has to follow the move to answer the revision in its new order.
         preview_files = tmp_list
@@ -709,7 +827,34 @@ def update_preview_file_annotations(
     deletions=None,
 ):
     """
-    Update annotations for given preview file.
+    Update annotations for given preview file and return the preview file.
+    See patch_preview_file_annotations.
+    """
+    patch_preview_file_annotations(
+        person_id,
+        project_id,
+        preview_file_id,
+        additions=additions,
+        updates=updates,
+        deletions=deletions,
+    )
+    return files_service.get_preview_file(preview_file_id)
+
+
+def patch_preview_file_annotations(
+    person_id,
+    project_id,
+    preview_file_id,
+    additions=None,
+    updates=None,
+    deletions=None,
+):
+    """
+    Apply annotation changes to given preview file. Only the frames the
+    changes name, by their time, are read and written back: the rest of the
+    annotations never leave the database. Return the new annotations
+    version, the touched frames as they are now and the times of the frames
+    left empty, hence removed.
     Uses a Redis lock to prevent race conditions when multiple processes update
     annotations on the same preview file concurrently.
     """
@@ -719,6 +864,7 @@ def update_preview_file_annotations(
         updates = []
     if deletions is None:
         deletions = []
+    times = [change["time"] for change in additions + updates + deletions]
     with with_preview_file_lock(
         preview_file_id, timeout=30, wait_timeout=35
     ) as acquired:
@@ -726,27 +872,205 @@ def update_preview_file_annotations(
             raise AnnotationLockTimeoutException(
                 "Could not acquire annotation lock for preview file"
             )
-        preview_file = files_service.get_preview_file_raw(preview_file_id)
-        previous_annotations = copy.deepcopy(preview_file.annotations or [])
-        annotations = _clean_annotations(previous_annotations)
-        annotations = _apply_annotation_additions(
-            previous_annotations, additions
-        )
+        frames = _get_annotation_frames(preview_file_id, times)
+        annotations = _clean_annotations([frame for _, frame in frames])
+        annotations = _apply_annotation_additions(annotations, additions)
         annotations = _apply_annotation_updates(annotations, updates)
         annotations = _apply_annotation_deletions(annotations, deletions)
-        preview_file.update({"annotations": annotations})
-        files_service.clear_preview_file_cache(preview_file_id)
-        preview_file = files_service.get_preview_file(preview_file_id)
-        events.emit(
-            "preview-file:annotation-update",
-            {
-                "preview_file_id": preview_file_id,
-                "person_id": person_id,
-                "updated_at": preview_file["updated_at"],
-            },
-            project_id=project_id,
+        row = _write_annotation_frames(preview_file_id, frames, annotations)
+    files_service.clear_preview_file_cache(preview_file_id)
+    files_service.clear_playlist_payloads_for_task(row.task_id)
+    updated_at = fields.serialize_value(row.updated_at)
+    events.emit(
+        "preview-file:annotation-update",
+        {
+            "preview_file_id": preview_file_id,
+            "person_id": person_id,
+            "updated_at": updated_at,
+        },
+        project_id=project_id,
+    )
+    kept_times = {annotation["time"] for annotation in annotations}
+    return {
+        "id": preview_file_id,
+        "annotations_version": row.annotations_version,
+        "updated_at": updated_at,
+        "frames": annotations,
+        "removed_times": [
+            frame["time"]
+            for _, frame in frames
+            if frame["time"] not in kept_times
+        ],
+    }
+
+
+def _get_annotation_frames(preview_file_id, times):
+    """
+    Return the (index, frame) couples of the annotations of given preview
+    file whose time is one of given times.
+    """
+    # Not through get_preview_file_raw, which loads every annotation.
+    if not fields.is_valid_id(preview_file_id) or (
+        db.session.scalar(
+            select(PreviewFile.id).where(PreviewFile.id == preview_file_id)
+        )
+        is None
+    ):
+        raise PreviewFileNotFoundException()
+    if len(times) == 0:
+        return []
+    frames = (
+        func.jsonb_array_elements(
+            func.coalesce(PreviewFile.annotations, literal([], JSONB))
+        )
+        .table_valued(column("value", JSONB), with_ordinality="position")
+        .render_derived()
+    )
+    return [
+        (position - 1, frame)
+        for position, frame in db.session.execute(
+            select(frames.c.position, frames.c.value)
+            .select_from(PreviewFile)
+            .join(frames, true())
+            .where(PreviewFile.id == preview_file_id)
+            .where(
+                literal(times, JSONB).contains(
+                    func.jsonb_build_array(frames.c.value.op("->")("time"))
+                )
+            )
+            .order_by(frames.c.position)
+        )
+    ]
+
+
+def _write_annotation_frames(preview_file_id, frames, annotations):
+    """
+    Write back the frames read by _get_annotation_frames once changed:
+    frames still there are replaced in place, frames left empty are
+    removed and frames at new times are appended. The annotations version
+    is bumped in the same statement.
+    """
+    changed = {annotation["time"]: annotation for annotation in annotations}
+    value = func.coalesce(PreviewFile.annotations, literal([], JSONB))
+    removed_indexes = []
+    for index, frame in frames:
+        if frame["time"] in changed:
+            value = func.jsonb_set(
+                value,
+                literal([str(index)], ARRAY(Text)),
+                literal(changed.pop(frame["time"]), JSONB),
+                type_=JSONB,
+            )
+        else:
+            removed_indexes.append(index)
+    # From the end, so the indexes left to remove do not move.
+    for index in sorted(removed_indexes, reverse=True):
+        value = value.op("-", return_type=JSONB)(index)
+    if len(changed) > 0:
+        value = value.op("||", return_type=JSONB)(
+            literal(list(changed.values()), JSONB)
+        )
+    row = db.session.execute(
+        update(PreviewFile)
+        .where(PreviewFile.id == preview_file_id)
+        .values(
+            annotations=value,
+            annotations_version=PreviewFile.annotations_version + 1,
+        )
+        .returning(
+            PreviewFile.task_id,
+            PreviewFile.annotations_version,
+            PreviewFile.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    ).one()
+    db.session.commit()
+    return row
+
+
+def get_annotations_versions(preview_file_ids):
+    """
+    Return a dict mapping given preview file ids to their task id, project
+    id and annotations version. Unknown ids are left out.
+    """
+    return {
+        str(preview_file_id): {
+            "task_id": str(task_id),
+            "project_id": str(project_id),
+            "annotations_version": annotations_version,
+        }
+        for (
+            preview_file_id,
+            task_id,
+            project_id,
+            annotations_version,
+        ) in db.session.execute(
+            select(
+                PreviewFile.id,
+                PreviewFile.task_id,
+                Task.project_id,
+                PreviewFile.annotations_version,
+            )
+            .join(Task, Task.id == PreviewFile.task_id)
+            .where(
+                PreviewFile.id.in_(
+                    [
+                        preview_file_id
+                        for preview_file_id in preview_file_ids
+                        if fields.is_valid_id(preview_file_id)
+                    ]
+                )
+            )
         )
-        return preview_file
+    }
+
+
+def get_changed_annotations(versions, current_versions=None):
+    """
+    Take a dict mapping preview file ids to the annotations version a client
+    holds (None when it holds none) and return a dict mapping the ids of
+    the preview files whose version differs to their current version and
+    annotations. Ids of unknown preview files map to None. The current
+    versions, as returned by get_annotations_versions, are read when not
+    given. Valid ids are answered in their canonical lowercase form.
+    """
+    versions = {
+        (
+            str(uuid.UUID(str(preview_file_id)))
+            if fields.is_valid_id(preview_file_id)
+            else preview_file_id
+        ): annotations_version
+        for preview_file_id, annotations_version in versions.items()
+    }
+    if current_versions is None:
+        current_versions = get_annotations_versions(list(versions))
+    result = {
+        preview_file_id: None
+        for preview_file_id in versions
+        if preview_file_id not in current_versions
+    }
+    changed_ids = [
+        preview_file_id
+        for preview_file_id, current in current_versions.items()
+        if current["annotations_version"] != versions[preview_file_id]
+    ]
+    if len(changed_ids) > 0:
+        for (
+            preview_file_id,
+            annotations_version,
+            annotations,
+        ) in db.session.execute(
+            select(
+                PreviewFile.id,
+                PreviewFile.annotations_version,
+                PreviewFile.annotations,
+            ).where(PreviewFile.id.in_(changed_ids))
+        ):
+            result[str(preview_file_id)] = {
+                "annotations_version": annotations_version,
+                "annotations": annotations or [],
+            }
+    return result
 
 
 def _ensure_object_id(drawing_object):
@@ -993,8 +1317,14 @@ def normalize_preview_file_annotation_times(preview_file):
         preview_file.annotations, fps
     )
     if changed:
-        preview_file.update({"annotations": annotations})
+        preview_file.update(
+            {
+                "annotations": annotations,
+                "annotations_version": preview_file.annotations_version + 1,
+            }
+        )
         files_service.clear_preview_file_cache(str(preview_file.id))
+        files_service.clear_playlist_payloads_for_task(preview_file.task_id)
     return changed
 
 
@@ -1451,6 +1781,23 @@ def _bundle_annotated_frames_into_pdf(entries):
     return pdf_path
 
 
+def _get_data_with_tile_layout(preview_file, layout):
+    return {**(preview_file.data or {}), "tile": layout}
+
+
+def save_tile_layout(preview_file, layout):
+    """
+    Store the layout of the tile sheet of given preview file in its data:
+    the players read the frame index there instead of guessing which frames
+    a long movie was subsampled to.
+    """
+    return update_preview_file_raw(
+        preview_file,
+        {"data": _get_data_with_tile_layout(preview_file, layout)},
+        silent=True,
+    )
+
+
 def extract_tile_from_preview_file(preview_file):
     """
     Build the tile sheet of a movie preview, the strip of thumbnails the
@@ -1468,7 +1815,13 @@ def extract_tile_from_preview_file(preview_file):
             preview_file["id"],
             "mp4",
         )
-        extracted_tile_path = movie.generate_tile(preview_file_path)
+        layout = movie.get_tile_layout(preview_file_path)
+        extracted_tile_path = movie.generate_tile(
+            preview_file_path, layout=layout
+        )
+        save_tile_layout(
+            files_service.get_preview_file_raw(preview_file["id"]), layout
+        )
         return extracted_tile_path
     else:
         raise WrongParameterException("Preview file is not a movie")
@@ -1567,10 +1920,15 @@ def generate_preview_extra(
     with_tiles=False,
     with_metadata=False,
     with_thumbnails=False,
+    processes=1,
+    priority=None,
+    checkpoint_path=None,
 ):
     """
     Generate tiles for all movie previews and reset previews file size
-    informations of open projects.
+    informations of open projects. With more than one process, the preview
+    files are handled by a pool of worker processes. With a checkpoint
+    file, the previews done by a previous run are skipped.
     """
     if episodes is None:
         episodes = []
@@ -1626,54 +1984,170 @@ def generate_preview_extra(
             )
         )
 
+    order_by = get_preview_files_priority_order(priority)
+    if order_by is not None:
+        query = query.order_by(*order_by)
     total = query.count()
     print(f"{total} previews found.")
-    for index, preview_file in enumerate(query.all()):
-        try:
-            preview_file_id = str(preview_file.id)
-        except ObjectDeletedError:
-            continue
-        prefix = "previews" if preview_file.extension == "mp4" else "original"
-        if config.FS_BACKEND != "local":
-            preview_file_already_in_cache = os.path.isfile(
-                os.path.join(
-                    config.TMP_DIR,
-                    f"cache-{prefix}-{preview_file_id}.{preview_file.extension}",
-                )
+    checkpoint = batch.Checkpoint(checkpoint_path)
+    options = {
+        "with_tiles": with_tiles,
+        "with_metadata": with_metadata,
+        "with_thumbnails": with_thumbnails,
+        "force_regenerate_tiles": force_regenerate_tiles,
+    }
+    items = [
+        (str(preview_file_id), index + 1, total, options)
+        for index, (preview_file_id,) in enumerate(
+            query.with_entities(PreviewFile.id)
+        )
+        if preview_file_id not in checkpoint
+    ]
+    if len(items) < total:
+        print(f"{total - len(items)} previews already done, skipped.")
+
+    throughput = batch.Throughput()
+    for result in batch.run_in_pool(
+        (
+            _generate_preview_file_extra_in_worker
+            if processes > 1
+            else _generate_preview_file_extra_from_id
+        ),
+        items,
+        processes=processes,
+    ):
+        throughput.add(result["stages"])
+        if result["success"]:
+            checkpoint.add(result["id"])
+        if throughput.nb_items % batch.REPORT_EVERY == 0:
+            throughput.print_report()
+
+    throughput.print_report()
+    print("Extra information generated.")
+    return total
+
+
+def get_preview_files_priority_order(priority=None):
+    """
+    Return the order in which the batch commands walk the preview files:
+    "recent" puts first the ones whose task was commented last, the ones
+    reviewers are watching, falling back on the creation date of the
+    preview. "oldest" walks them by creation date. None keeps the database
+    order.
+    """
+    if priority == "recent":
+        last_comment_date = (
+            select(Task.last_comment_date)
+            .where(Task.id == PreviewFile.task_id)
+            .scalar_subquery()
+        )
+        return [
+            func.coalesce(last_comment_date, PreviewFile.created_at).desc(),
+            PreviewFile.created_at.desc(),
+        ]
+    elif priority == "oldest":
+        return [PreviewFile.created_at.asc()]
+    elif priority is None:
+        return None
+    raise WrongParameterException(f"Unknown priority: {priority}")
+
+
+def _generate_preview_file_extra_in_worker(item):
+    """
+    Generate the extras of one preview file from a worker process, in an
+    application context of its own.
+    """
+    from zou.app import app as current_app
+
+    with current_app.app_context():
+        return _generate_preview_file_extra_from_id(item)
+
+
+def _generate_preview_file_extra_from_id(item):
+    """
+    Load the preview file of given work item and generate its extras.
+    """
+    preview_file_id, index, total, options = item
+    timer = batch.StageTimer()
+    success = False
+    preview_file = db.session.get(PreviewFile, preview_file_id)
+    if preview_file is not None:
+        success = _generate_preview_file_extra(
+            preview_file, index, total, timer=timer, **options
+        )
+    return {"id": preview_file_id, "success": success, "stages": timer.stages}
+
+
+def _generate_preview_file_extra(
+    preview_file,
+    index,
+    total,
+    with_tiles=False,
+    with_metadata=False,
+    with_thumbnails=False,
+    force_regenerate_tiles=False,
+    timer=None,
+):
+    """
+    Retrieve one preview file and generate the requested extras from it.
+    With a remote storage, the local copy is removed afterwards unless it
+    was already cached. Return True if every step succeeded.
+    """
+    if timer is None:
+        timer = batch.StageTimer()
+    try:
+        preview_file_id = str(preview_file.id)
+    except ObjectDeletedError:
+        return False
+    prefix = "previews" if preview_file.extension == "mp4" else "original"
+    if config.FS_BACKEND != "local":
+        preview_file_already_in_cache = os.path.isfile(
+            os.path.join(
+                config.TMP_DIR,
+                f"cache-{prefix}-{preview_file_id}.{preview_file.extension}",
             )
-        try:
+        )
+    preview_file_path = None
+    success = True
+    try:
+        with timer.stage("retrieve"):
             preview_file_path = _retrieve_preview_file(
                 config, file_store, prefix, preview_file
             )
-            if with_tiles:
-                _generate_tiles(
+        if preview_file_path is None:
+            return False
+        timer.add_size("retrieve", fs.get_file_size(preview_file_path))
+        if with_tiles:
+            with timer.stage("tiles"):
+                success &= _generate_tiles(
                     file_store,
                     preview_file,
                     preview_file_path,
                     total,
-                    index + 1,
+                    index,
                     force=force_regenerate_tiles,
                 )
-            if with_metadata:
-                _reset_preview_file_metadata(
-                    preview_file, preview_file_path, total, index + 1
+        if with_metadata:
+            with timer.stage("metadata"):
+                success &= _reset_preview_file_metadata(
+                    preview_file, preview_file_path, total, index
                 )
-            if with_thumbnails:
-                _generate_thumbnails(
-                    preview_file, preview_file_path, total, index + 1
+        if with_thumbnails:
+            with timer.stage("thumbnails"):
+                success &= _generate_thumbnails(
+                    preview_file, preview_file_path, total, index
                 )
-        finally:
-            if (
-                config.FS_BACKEND != "local"
-                and not preview_file_already_in_cache
-            ):
-                try:
-                    os.remove(preview_file_path)
-                except OSError:
-                    pass
-
-    print("Extra information generated.")
-    return total
+    finally:
+        if (
+            config.FS_BACKEND != "local"
+            and not preview_file_already_in_cache
+            and preview_file_path is not None
+        ):
+            try:
+                os.remove(preview_file_path)
+            except OSError:
+                pass
+    return success
 
 
 def _retrieve_preview_file(config, file_store, prefix, preview_file):
@@ -1707,6 +2181,7 @@ def _retrieve_preview_file(config, file_store, prefix, preview_file):
 def _generate_thumbnails(preview_file, preview_file_path, total, index):
     """
     Regenerate the thumbnail variants of one preview and store them.
+    Return False if it failed.
     """
     try:
         original_picture_path = preview_file_path
@@ -1720,22 +2195,27 @@ def _generate_thumbnails(preview_file, preview_file_path, total, index):
         )
     except Exception as e:
         print(f"Failed to generate thumbnails for {preview_file.id}: {e}.")
+        return False
+    return True
 
 
 def _generate_tiles(
     file_store, preview_file, preview_file_path, total, index, force=False
 ):
     """
-    Regenerate the tile sheet of one movie preview and store it.
+    Regenerate the tile sheet of one movie preview and store it. Return
+    False if it failed.
     """
     try:
         if preview_file.extension == "mp4" and (
             force
             or not file_store.exists_picture("tiles", str(preview_file.id))
         ):
-            tile_path = movie.generate_tile(preview_file_path)
+            layout = movie.get_tile_layout(preview_file_path)
+            tile_path = movie.generate_tile(preview_file_path, layout=layout)
             file_store.add_picture("tiles", preview_file.id, tile_path)
             os.remove(tile_path)
+            save_tile_layout(preview_file, layout)
             print(
                 f"{index:0{len(str(total))}}/{total} Tile "
                 + f"generated for {preview_file.id}.",
@@ -1744,6 +2224,8 @@ def _generate_tiles(
         print(
             f"Failed to generate tile for preview file {preview_file.id}: {e}."
         )
+        return False
+    return True
 
 
 def _reset_preview_file_metadata(
@@ -1751,7 +2233,7 @@ def _reset_preview_file_metadata(
 ):
     """
     Recompute the width, height, duration and file size of one preview
-    from the file on disk.
+    from the file on disk. Return False if it failed.
     """
     try:
         if preview_file.extension == "mp4":
@@ -1780,6 +2262,8 @@ def _reset_preview_file_metadata(
         print(
             f"Failed to store information for preview file {preview_file.id}: {e}.",
         )
+        return False
+    return True
 
 
 def copy_preview_file_on_storage(
@@ -1,7 +1,7 @@
 from datetime import date, timedelta
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import aliased
-from sqlalchemy import Text, and_, cast, delete, func, literal, select, update
+from sqlalchemy import and_, delete, func, literal, select, update
 
 
 from zou.app.models.entity import Entity
@@ -15,7 +15,8 @@ from zou.app.models.production_schedule_version import (
     ProductionScheduleVersionTaskLink,
     ProductionScheduleVersionTaskLinkPersonLink,
 )
-from zou.app.utils import events, fields, cache
+from zou.app.utils import events, fields, cache, jobs
+from zou.app.utils import query as query_utils
 from zou.app.services import (
     assets_service,
     base_service,
@@ -27,10 +28,13 @@ from zou.app.services import (
 from zou.app import db
 
 from zou.app.services.exception import (
+    ProductionScheduleVersionJobNotFoundException,
     ProductionScheduleVersionNotFoundException,
     WrongParameterException,
 )
 
+TASK_LINKS_CHUNK_SIZE = 2000
+
 
 def clear_production_schedule_version_cache(production_schedule_version_id):
     """
@@ -301,6 +305,203 @@ def get_entity_schedule_items(
     return sorted(results, key=lambda x: x["name"])
 
 
+def _get_schedule_item_kinds(task_type, is_tvshow):
+    """
+    Return the kinds of objects the schedule shows under given task type:
+    asset types for asset tasks, sequences (and episodes for a TV show)
+    for shot and sequence tasks, episodes and edits for theirs.
+    """
+    for_entity = task_type["for_entity"]
+    if for_entity == "Asset":
+        return ["asset_types"]
+    elif for_entity == "Episode":
+        return ["episodes"]
+    elif for_entity == "Edit":
+        return ["edits"]
+    elif is_tvshow:
+        return ["episodes", "sequences"]
+    else:
+        return ["sequences"]
+
+
+def _get_schedule_item_objects(project_id, episode_id=None):
+    """
+    Return the names of the objects that get a schedule item, keyed by
+    object id, for each kind: the asset types of the assets of the
+    project, its episodes, its sequences and its edits (canceled ones
+    excepted). With an episode, they are restricted to that episode the
+    way the per kind routes do it. Two flat queries are run.
+    """
+    episode_type_id = shots_service.get_episode_type()["id"]
+    sequence_type_id = shots_service.get_sequence_type()["id"]
+    edit_type_id = edits_service.get_edit_type()["id"]
+    objects = {
+        "asset_types": {},
+        "episodes": {},
+        "sequences": {},
+        "edits": {},
+    }
+
+    asset_types_query = (
+        EntityType.query.join(Entity, Entity.entity_type_id == EntityType.id)
+        .filter(Entity.project_id == project_id)
+        .filter(assets_service.build_asset_type_filter())
+        .with_entities(EntityType.id, EntityType.name)
+        .distinct()
+    )
+    if episode_id is not None:
+        asset_types_query = asset_types_query.filter(
+            Entity.source_id == episode_id
+        )
+    for asset_type_id, name in asset_types_query:
+        objects["asset_types"][str(asset_type_id)] = name
+
+    kinds = {
+        episode_type_id: "episodes",
+        sequence_type_id: "sequences",
+        edit_type_id: "edits",
+    }
+    entities_query = (
+        Entity.query.filter(Entity.project_id == project_id)
+        .filter(Entity.entity_type_id.in_(list(kinds.keys())))
+        .with_entities(
+            Entity.id,
+            Entity.name,
+            Entity.entity_type_id,
+            Entity.parent_id,
+            Entity.canceled,
+        )
+    )
+    for entity_id, name, entity_type_id, parent_id, canceled in entities_query:
+        kind = kinds[str(entity_type_id)]
+        if kind == "edits" and canceled:
+            continue
+        if episode_id is not None:
+            if kind == "episodes" and str(entity_id) != str(episode_id):
+                continue
+            if kind != "episodes" and str(parent_id) != str(episode_id):
+                continue
+        objects[kind][str(entity_id)] = name
+    return objects
+
+
+def _get_schedule_item_key(schedule_item):
+    """
+    Return the (task type id, object id) key of given schedule item, the
+    object id being None for the item of the task type itself.
+    """
+    return (
+        str(schedule_item.task_type_id),
+        (
+            None
+            if schedule_item.object_id is None
+            else str(schedule_item.object_id)
+        ),
+    )
+
+
+def _create_schedule_items(project_id, keys):
+    """
+    Create the schedule items of given (task type id, object id) keys in a
+    single statement, and announce them. Object items created meanwhile by
+    another request are skipped. Task type items are not: their object id
+    is NULL, which never conflicts on schedule_item_uc, so two requests
+    racing on a new task type can both create one. Return the created items.
+    """
+    if len(keys) == 0:
+        return []
+    today = date.today()
+    rows = [
+        {
+            "id": fields.gen_uuid(),
+            "project_id": project_id,
+            "task_type_id": task_type_id,
+            "object_id": object_id,
+            "start_date": today,
+            "end_date": today + timedelta(days=1),
+        }
+        for task_type_id, object_id in keys
+    ]
+    created_ids = [
+        row.id
+        for row in db.session.execute(
+            insert(ScheduleItem)
+            .values(rows)
+            .on_conflict_do_nothing(constraint="schedule_item_uc")
+            .returning(ScheduleItem.id)
+        )
+    ]
+    db.session.commit()
+    if len(created_ids) == 0:
+        return []
+    events.emit_many(
+        "schedule-item:new",
+        [
+            {"schedule_item_id": str(schedule_item_id)}
+            for schedule_item_id in created_ids
+        ],
+        project_id=project_id,
+    )
+    return ScheduleItem.query.filter(ScheduleItem.id.in_(created_ids)).all()
+
+
+def get_all_schedule_items(project_id, episode_id=None):
+    """
+    Return the schedule items of every task type of given project, each
+    with the items of the objects shown under it (see
+    _get_schedule_item_kinds) in a children dict, by kind. The missing
+    items are created, all at once. It gives in one pass what the task type
+    route and one per kind route per task type give.
+    """
+    project = projects_service.get_project(project_id)
+    is_tvshow = project["production_type"] == "tvshow"
+    task_types = [
+        task_type
+        for task_type in tasks_service.get_task_types_for_project(project_id)
+        if task_type["for_entity"]
+        in ["Asset", "Shot", "Sequence", "Episode", "Edit"]
+    ]
+    objects = _get_schedule_item_objects(project_id, episode_id)
+
+    schedule_items = {}
+    for schedule_item in ScheduleItem.query.filter(
+        ScheduleItem.project_id == project_id
+    ):
+        schedule_items.setdefault(
+            _get_schedule_item_key(schedule_item), schedule_item
+        )
+
+    wanted_keys = []
+    for task_type in task_types:
+        wanted_keys.append((task_type["id"], None))
+        for kind in _get_schedule_item_kinds(task_type, is_tvshow):
+            for object_id in objects[kind]:
+                wanted_keys.append((task_type["id"], object_id))
+    for schedule_item in _create_schedule_items(
+        project_id, [key for key in wanted_keys if key not in schedule_items]
+    ):
+        schedule_items[_get_schedule_item_key(schedule_item)] = schedule_item
+
+    results = []
+    for task_type in task_types:
+        schedule_item = schedule_items.get((task_type["id"], None))
+        if schedule_item is None:
+            continue
+        result = schedule_item.present()
+        result["children"] = {}
+        for kind in _get_schedule_item_kinds(task_type, is_tvshow):
+            children = []
+            for object_id, name in objects[kind].items():
+                child = schedule_items.get((task_type["id"], object_id))
+                if child is not None:
+                    children.append(dict(child.present(), name=name))
+            result["children"][kind] = sorted(
+                children, key=lambda x: x["name"]
+            )
+        results.append(result)
+    return sorted(results, key=lambda x: x["start_date"])
+
+
 def get_milestones_for_project(project_id):
     """
     Return all milestones related to given project.
@@ -372,22 +573,11 @@ def update_production_schedule_version(production_schedule_version_id, data):
 
 def _generate_task_link_id():
     """
-    Per-row UUID expression for the INSERT ... SELECT copies. gen_random_uuid()
-    is a core built-in only from PostgreSQL 13 (the CI matrix still covers
-    PostgreSQL 12), and a Python-side default (fields.gen_uuid) is evaluated
-    once per from_select batch, so every row would share the same primary key.
-    md5(text) has been core since well before any PostgreSQL version we
-    support, and applied to random() || clock_timestamp() it yields a
-    distinct uuid per row.
-    """
-    return cast(
-        func.md5(
-            func.concat(
-                cast(func.random(), Text),
-                cast(func.clock_timestamp(), Text),
-            )
-        ),
-        ProductionScheduleVersionTaskLink.id.type,
+    Per-row UUID expression for the INSERT ... SELECT copies of the task
+    links.
+    """
+    return query_utils.get_random_uuid_expression(
+        ProductionScheduleVersionTaskLink.id.type
     )
 
 
@@ -458,45 +648,97 @@ def _build_task_links_summary(task_link_count):
     return {"success": True, "task_link_count": task_link_count}
 
 
+def _chunks(values):
+    for index in range(0, len(values), TASK_LINKS_CHUNK_SIZE):
+        yield values[index : index + TASK_LINKS_CHUNK_SIZE]
+
+
+def _notify_task_links_progress(
+    production_schedule_version, operation, done, total, progress=None
+):
+    """
+    Tell the clients (and the job running the operation, through progress)
+    how many tasks of given operation are done. These events are not stored:
+    only the final task updates matter once the operation is over.
+    """
+    events.emit(
+        "production_schedule_version:progress",
+        {
+            "production_schedule_version_id": production_schedule_version[
+                "id"
+            ],
+            "operation": operation,
+            "done": done,
+            "total": total,
+        },
+        persist=False,
+        project_id=production_schedule_version["project_id"],
+    )
+    if progress is not None:
+        progress(operation, done, total)
+
+
 def set_production_schedule_version_task_links_from_production(
-    production_schedule_version_id,
+    production_schedule_version_id, progress=None
 ):
     """
     Set task links for given production schedule version from tasks in the
-    production.
+    production. The tasks are copied by chunks, each committed on its own,
+    so the locks taken on the task links stay short.
     """
     production_schedule_version = get_production_schedule_version(
         production_schedule_version_id
     )
+    task_ids = db.session.scalars(
+        select(Task.id)
+        .where(Task.project_id == production_schedule_version["project_id"])
+        .order_by(Task.id)
+    ).all()
 
     tl = ProductionScheduleVersionTaskLink
-    copied_count = _upsert_task_links_from_select(
-        select(
-            _generate_task_link_id(),
-            literal(
-                production_schedule_version_id,
-                tl.production_schedule_version_id.type,
-            ),
-            Task.id,
-            Task.start_date,
-            Task.due_date,
-            Task.estimation,
-        ).where(Task.project_id == production_schedule_version["project_id"])
-    )
+    copied_count = 0
+    done = 0
+    for chunk in _chunks(task_ids):
+        copied_count += _upsert_task_links_from_select(
+            select(
+                _generate_task_link_id(),
+                literal(
+                    production_schedule_version_id,
+                    tl.production_schedule_version_id.type,
+                ),
+                Task.id,
+                Task.start_date,
+                Task.due_date,
+                Task.estimation,
+            ).where(Task.id.in_(chunk))
+        )
 
-    # Every project task is a copy source, so all target links are refreshed.
-    _replace_task_link_assignees(
-        select(tl.id).where(
-            tl.production_schedule_version_id == production_schedule_version_id
-        ),
-        select(tl.id, TaskPersonLink.person_id)
-        .join(TaskPersonLink, TaskPersonLink.task_id == tl.task_id)
-        .where(
-            tl.production_schedule_version_id == production_schedule_version_id
-        ),
-    )
+        # Every task of the chunk is a copy source, so all its target links
+        # are refreshed.
+        _replace_task_link_assignees(
+            select(tl.id).where(
+                tl.production_schedule_version_id
+                == production_schedule_version_id,
+                tl.task_id.in_(chunk),
+            ),
+            select(tl.id, TaskPersonLink.person_id)
+            .join(TaskPersonLink, TaskPersonLink.task_id == tl.task_id)
+            .where(
+                tl.production_schedule_version_id
+                == production_schedule_version_id,
+                tl.task_id.in_(chunk),
+            ),
+        )
 
-    db.session.commit()
+        db.session.commit()
+        done += len(chunk)
+        _notify_task_links_progress(
+            production_schedule_version,
+            "set-task-links-from-production",
+            done,
+            len(task_ids),
+            progress,
+        )
 
     return _build_task_links_summary(copied_count)
 
@@ -571,42 +813,66 @@ def set_production_schedule_version_task_links_from_production_schedule_version(
 
 
 def apply_production_schedule_version_to_production(
-    production_schedule_version_id,
+    production_schedule_version_id, progress=None
 ):
     """
-    Apply production schedule version to production.
+    Apply production schedule version to production. The task dates and
+    estimations are written by chunks of UPDATE ... FROM statements, each
+    committed on its own, so the tasks are never locked all at once.
     """
-    stmt = (
-        update(Task)
-        .values(
-            start_date=ProductionScheduleVersionTaskLink.start_date,
-            due_date=ProductionScheduleVersionTaskLink.due_date,
-            estimation=ProductionScheduleVersionTaskLink.estimation,
-        )
-        .where(Task.id == ProductionScheduleVersionTaskLink.task_id)
+    production_schedule_version = get_production_schedule_version(
+        production_schedule_version_id
+    )
+    tl = ProductionScheduleVersionTaskLink
+    task_ids = db.session.scalars(
+        select(tl.task_id)
         .where(
-            ProductionScheduleVersionTaskLink.production_schedule_version_id
-            == production_schedule_version_id
+            tl.production_schedule_version_id == production_schedule_version_id
         )
-        .returning(Task.id, Task.project_id)
-    )
-
-    updated_tasks = db.session.execute(stmt).all()
-
-    db.session.commit()
-
-    for task_id, project_id in updated_tasks:
-        # The dates and estimation are written by a bulk UPDATE that the ORM
-        # never sees, so the memoized tasks must be dropped by hand. The event
-        # below makes every client refetch at once: without this they would
-        # all cache the pre-schedule dates for the rest of the TTL.
-        tasks_service.clear_task_cache(str(task_id))
-        events.emit(
-            "task:update",
-            {"task_id": str(task_id)},
-            project_id=str(project_id),
+        .order_by(tl.task_id)
+    ).all()
+
+    updated_tasks = {}
+    done = 0
+    for chunk in _chunks(task_ids):
+        stmt = (
+            update(Task)
+            .values(
+                start_date=tl.start_date,
+                due_date=tl.due_date,
+                estimation=tl.estimation,
+            )
+            .where(Task.id == tl.task_id)
+            .where(
+                tl.production_schedule_version_id
+                == production_schedule_version_id
+            )
+            .where(tl.task_id.in_(chunk))
+            .returning(Task.id, Task.project_id)
+        )
+        for task_id, project_id in db.session.execute(stmt):
+            updated_tasks.setdefault(str(project_id), []).append(
+                {"task_id": str(task_id)}
+            )
+        db.session.commit()
+        done += len(chunk)
+        _notify_task_links_progress(
+            production_schedule_version,
+            "apply-to-production",
+            done,
+            len(task_ids),
+            progress,
         )
 
+    # The dates and estimation are written by bulk UPDATEs that the ORM
+    # never sees, so the memoized tasks must be dropped by hand: all at once,
+    # rather than one cache call per task. The events below make every
+    # client refetch: without them they would all keep the pre-schedule
+    # dates for the rest of the TTL.
+    tasks_service.clear_all_tasks_cache()
+    for project_id, task_events in updated_tasks.items():
+        events.emit_many("task:update", task_events, project_id=project_id)
+
     production_schedule_version = update_production_schedule_version(
         production_schedule_version_id, {"locked": True}
     )
@@ -616,4 +882,83 @@ def apply_production_schedule_version_to_production(
         {"from_schedule_version_id": production_schedule_version_id},
     )
 
-    return {"success": True, "task_count": len(updated_tasks)}
+    return {
+        "success": True,
+        "task_count": sum(
+            len(task_events) for task_events in updated_tasks.values()
+        ),
+    }
+
+
+operations = {
+    "apply-to-production": apply_production_schedule_version_to_production,
+    "set-task-links-from-production": (
+        set_production_schedule_version_task_links_from_production
+    ),
+}
+
+
+PRODUCTION_SCHEDULE_VERSION_JOB_FIELDS = [
+    "operation",
+    "production_schedule_version_id",
+    "project_id",
+]
+
+
+def start_production_schedule_version_job(
+    operation, production_schedule_version_id, user_id
+):
+    """
+    Queue given operation on given production schedule version as a job.
+    The job remembers who started it, the only person allowed to follow it
+    besides admins.
+    """
+    production_schedule_version = get_production_schedule_version(
+        production_schedule_version_id
+    )
+    job = jobs.start_job(
+        run_production_schedule_version_job,
+        (operation, str(production_schedule_version_id)),
+        {
+            "operation": operation,
+            "production_schedule_version_id": str(
+                production_schedule_version_id
+            ),
+            "project_id": production_schedule_version["project_id"],
+            "person_id": user_id,
+        },
+    )
+    return get_production_schedule_version_job_status(job)
+
+
+def get_production_schedule_version_job_status(job):
+    """
+    Return the status of given production schedule version job, its progress
+    and, once finished, its result.
+    """
+    return jobs.get_job_status(job, PRODUCTION_SCHEDULE_VERSION_JOB_FIELDS)
+
+
+def get_production_schedule_version_job(job_id):
+    """
+    Return the status of the production schedule version job matching given
+    id.
+    """
+    job = jobs.fetch_job(job_id, ProductionScheduleVersionJobNotFoundException)
+    if job.meta.get("operation") not in operations:
+        raise ProductionScheduleVersionJobNotFoundException
+    return get_production_schedule_version_job_status(job)
+
+
+def run_production_schedule_version_job(
+    operation, production_schedule_version_id
+):
+    """
+    Run given operation as a job of the job queue. The progress is stored in
+    the job metadata, where the job route reads it.
+    """
+    return jobs.run_job(
+        operations[operation],
+        production_schedule_version_id,
+        progress_key="operation",
+    )
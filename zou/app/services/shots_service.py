@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from operator import itemgetter
 from sqlalchemy.orm import aliased
 from sqlalchemy.exc import IntegrityError, StatementError
-from sqlalchemy import cast, func, or_, Text
+from sqlalchemy import cast, func, Text
 
 from zou.app.utils import (
     cache,
@@ -1267,6 +1267,7 @@ def update_shot(shot_id, data_dict):
     index_service.remove_shot_index(shot.id)
     index_service.index_shot(shot)
     clear_shot_cache(shot_id)
+    entities_service.clear_entity_names_cache(shot_id, data_dict)
     events.emit(
         "shot:update", {"shot_id": shot_id}, project_id=str(shot.project_id)
     )
@@ -1330,22 +1331,35 @@ def get_weighted_quotas(
     (real_end_date), if feedback is set to False, it uses the approval date
     (done_date).
     """
+    from zou.app import db
+
     fps = projects_service.get_project_fps(project_id)
     timezone = user_service.get_timezone()
     shot_type = get_shot_type()
     quotas = {}
+
+    # Frames weighted by the share of the task time spent each day, summed
+    # per entry and day by the database.
+    entry_column = TimeSpent.person_id
+    if person_id is not None:
+        # We get quotas for a specific person split by task types
+        entry_column = Task.task_type_id
+    share = TimeSpent.duration / Task.duration
     query = (
-        Task.query.filter(Entity.entity_type_id == shot_type["id"])
-        .filter(Task.project_id == project_id)
-        .join(Entity, Entity.id == Task.entity_id)
-        .join(Project, Project.id == Task.project_id)
-        .join(TimeSpent, Task.id == TimeSpent.task_id)
-        .add_columns(
-            Entity.nb_frames,
+        db.session.query(
+            entry_column,
             TimeSpent.date,
-            TimeSpent.duration,
-            TimeSpent.person_id,
+            func.sum(func.round(func.coalesce(Entity.nb_frames, 0) * share)),
+            func.sum(func.round(func.coalesce(Task.nb_drawings, 0) * share)),
+            func.count(),
         )
+        .select_from(Task)
+        .join(Entity, Entity.id == Task.entity_id)
+        .join(TimeSpent, Task.id == TimeSpent.task_id)
+        .filter(Task.project_id == project_id)
+        .filter(Entity.entity_type_id == shot_type["id"])
+        .filter(Task.duration > 0)
+        .group_by(entry_column, TimeSpent.date)
     )
 
     if task_type_id is not None:
@@ -1360,49 +1374,32 @@ def get_weighted_quotas(
         query = query.filter(Task.done_date != None)
 
     if studio_id is not None:
-        persons_from_studio = Person.query.filter(
-            Person.studio_id == studio_id
-        ).all()
-        query = query.filter(
-            or_(*[Task.assignees.contains(p) for p in persons_from_studio])
-        )
-    result = query.all()
-
-    for task, nb_frames, date, duration, task_person_id in result:
-        task_person_id = str(task_person_id)
-        nb_drawings = task.nb_drawings or 0
-        nb_frames = nb_frames or 0
-        if task.duration > 0:
-            nb_frames = round(nb_frames * (duration / task.duration))
-            nb_drawings = round(nb_drawings * (duration / task.duration))
-            entry_id = str(task_person_id)
-            # We get quotas for a specific person split by task types
-            if person_id is not None:
-                entry_id = str(task.task_type_id)
-            for entry in [entry_id, "total"]:
-                _add_quota_entry(
-                    quotas, entry, date, timezone, nb_frames, nb_drawings, fps
-                )
+        query = query.filter(_get_studio_tasks_filter(studio_id))
+    _add_quota_rows(quotas, query.all(), fps)
 
+    # Without time spent, the work is spread over the business days between
+    # the wip date and the feedback (or approval) date, which stays a loop.
     query = (
-        Task.query.filter(Task.project_id == project_id)
+        Task.query.with_entities(
+            Task.task_type_id,
+            Task.real_start_date,
+            Task.end_date if feedback else Task.done_date,
+            Task.nb_drawings,
+            Entity.nb_frames,
+            TaskPersonLink.person_id,
+        )
+        .join(Entity, Entity.id == Task.entity_id)
+        .join(TaskPersonLink, TaskPersonLink.task_id == Task.id)
+        .outerjoin(TimeSpent, Task.id == TimeSpent.task_id)
+        .filter(Task.project_id == project_id)
         .filter(Entity.entity_type_id == shot_type["id"])
         .filter(Task.task_type_id == task_type_id)
         .filter(Task.real_start_date != None)
         .filter(TimeSpent.id == None)
-        .join(Entity, Entity.id == Task.entity_id)
-        .join(Project, Project.id == Task.project_id)
-        .outerjoin(TimeSpent, Task.id == TimeSpent.task_id)
-        .join(Task.assignees)
-        .add_columns(Entity.nb_frames, Person.id)
     )
 
-    if task_type_id is not None:
-        query = query.filter(Task.task_type_id == task_type_id)
-
     if person_id is not None:
-        person = persons_service.get_person_raw(person_id)
-        query = query.filter(Task.assignees.contains(person))
+        query = query.filter(_get_person_tasks_filter(person_id))
 
     if feedback:
         query = query.filter(Task.end_date != None)
@@ -1410,32 +1407,32 @@ def get_weighted_quotas(
         query = query.filter(Task.done_date != None)
 
     if studio_id is not None:
-        query = query.filter(
-            or_(*[Task.assignees.contains(p) for p in persons_from_studio])
-        )
-    result = query.all()
-
-    for task, nb_frames, task_person_id in result:
-        date = task.done_date
-        if feedback:
-            date = task.end_date
-
+        query = query.filter(_get_studio_tasks_filter(studio_id))
+
+    for (
+        task_task_type_id,
+        real_start_date,
+        date,
+        nb_drawings,
+        nb_frames,
+        task_person_id,
+    ) in query.all():
         business_days = (
-            date_helpers.get_business_days(task.real_start_date, date) + 1
+            date_helpers.get_business_days(real_start_date, date) + 1
         )
         if nb_frames is not None:
             nb_frames = round(nb_frames / business_days) or 0
         else:
             nb_frames = 0
 
-        nb_drawings = task.nb_drawings or 0
+        nb_drawings = nb_drawings or 0
 
-        for x in range((date - task.real_start_date).days + 1):
+        for x in range((date - real_start_date).days + 1):
             if date.weekday() < 5:
                 entry_id = str(task_person_id)
                 # We get quotas for a specific person split by task types
                 if person_id is not None:
-                    entry_id = str(task.task_type_id)
+                    entry_id = str(task_task_type_id)
 
                 for entry in [entry_id, "total"]:
                     _add_quota_entry(
@@ -1466,25 +1463,40 @@ def get_raw_quotas(
     It considers that all the work was done at the end date.
     It computes the shot count and the number of seconds too.
     """
+    from zou.app import db
+
     fps = projects_service.get_project_fps(project_id)
     timezone = user_service.get_timezone()
     shot_type = get_shot_type()
     quotas = {}
+
+    entry_column = TaskPersonLink.person_id
+    if person_id is not None:
+        entry_column = Task.task_type_id
+    day = _get_local_day(
+        Task.end_date if feedback else Task.done_date, timezone
+    )
     query = (
-        Task.query.filter(Task.project_id == project_id)
-        .filter(Entity.entity_type_id == shot_type["id"])
+        db.session.query(
+            entry_column,
+            day,
+            func.sum(func.coalesce(Entity.nb_frames, 0)),
+            func.sum(func.coalesce(Task.nb_drawings, 0)),
+            func.count(),
+        )
+        .select_from(Task)
         .join(Entity, Entity.id == Task.entity_id)
-        .join(Project, Project.id == Task.project_id)
-        .join(Task.assignees)
-        .add_columns(Entity.nb_frames, Person.id)
+        .join(TaskPersonLink, TaskPersonLink.task_id == Task.id)
+        .filter(Task.project_id == project_id)
+        .filter(Entity.entity_type_id == shot_type["id"])
+        .group_by(entry_column, day)
     )
 
     if task_type_id is not None:
         query = query.filter(Task.task_type_id == task_type_id)
 
     if person_id is not None:
-        person = persons_service.get_person_raw(person_id)
-        query = query.filter(Task.assignees.contains(person))
+        query = query.filter(_get_person_tasks_filter(person_id))
 
     if feedback:
         query = query.filter(Task.end_date != None)
@@ -1492,43 +1504,72 @@ def get_raw_quotas(
         query = query.filter(Task.done_date != None)
 
     if studio_id is not None:
-        persons_from_studio = Person.query.filter(
-            Person.studio_id == studio_id
-        ).all()
-        query = query.filter(
-            or_(*[Task.assignees.contains(p) for p in persons_from_studio])
-        )
+        query = query.filter(_get_studio_tasks_filter(studio_id))
+
+    _add_quota_rows(quotas, query.all(), fps)
+    return quotas
 
-    result = query.all()
 
-    for task, nb_frames, task_person_id in result:
-        date = task.done_date
-        if feedback:
-            date = task.end_date
+def _get_local_day(column, timezone):
+    """
+    SQL expression of the day given UTC datetime column falls on in given
+    timezone.
+    """
+    return func.date(func.timezone(timezone, func.timezone("UTC", column)))
 
-        if nb_frames is None:
-            nb_frames = 0
 
-        nb_drawings = task.nb_drawings or 0
+def _get_person_tasks_filter(person_id):
+    """
+    Filter on the tasks given person is assigned to.
+    """
+    from zou.app import db
+
+    return Task.id.in_(
+        db.session.query(TaskPersonLink.task_id).filter(
+            TaskPersonLink.person_id == person_id
+        )
+    )
+
+
+def _get_studio_tasks_filter(studio_id):
+    """
+    Filter on the tasks assigned to at least one person of given studio.
+    """
+    from zou.app import db
+
+    return Task.id.in_(
+        db.session.query(TaskPersonLink.task_id)
+        .join(Person, Person.id == TaskPersonLink.person_id)
+        .filter(Person.studio_id == studio_id)
+    )
 
-        entry_id = str(task_person_id)
-        if person_id is not None:
-            entry_id = str(task.task_type_id)
 
-        for entry in [entry_id, "total"]:
+def _add_quota_rows(quotas, rows, fps):
+    """
+    Add the (entry id, local day, frames, drawings, shot count) rows summed
+    by the database to the quotas of their entry and to the total.
+    """
+    for entry_id, day, nb_frames, nb_drawings, count in rows:
+        for entry in [str(entry_id), "total"]:
             _add_quota_entry(
-                quotas, entry, date, timezone, nb_frames, nb_drawings, fps
+                quotas,
+                entry,
+                day,
+                None,
+                int(nb_frames),
+                int(nb_drawings),
+                fps,
+                count=count,
             )
-    return quotas
 
 
 def _add_quota_entry(
-    quotas, entry_id, date, timezone, nb_frames, nb_drawings, fps
+    quotas, entry_id, date, timezone, nb_frames, nb_drawings, fps, count=1
 ):
     """
-    Add one shot to the quotas of a person, counted at once on its day,
-    its week and its month. Seconds are derived from the frame count and
-    the project fps.
+    Add count shots to the quotas of a person, counted at once on their
+    day, their week and their month. Seconds are derived from the frame
+    count and the project fps.
     """
     nb_seconds = nb_frames / fps
     # TimeSpent dates are plain calendar days, already the user's working
@@ -1554,19 +1595,19 @@ def _add_quota_entry(
     quotas[entry_id]["day"]["frames"][date_str] += nb_frames
     quotas[entry_id]["day"]["seconds"][date_str] += nb_seconds
     quotas[entry_id]["day"]["drawings"][date_str] += nb_drawings
-    quotas[entry_id]["day"]["count"][date_str] += 1
+    quotas[entry_id]["day"]["count"][date_str] += count
     quotas[entry_id]["week"]["frames"][week] += nb_frames
     quotas[entry_id]["week"]["seconds"][week] += nb_seconds
     quotas[entry_id]["week"]["drawings"][week] += nb_drawings
-    quotas[entry_id]["week"]["count"][week] += 1
+    quotas[entry_id]["week"]["count"][week] += count
     quotas[entry_id]["month"]["frames"][month] += nb_frames
     quotas[entry_id]["month"]["seconds"][month] += nb_seconds
     quotas[entry_id]["month"]["drawings"][month] += nb_drawings
-    quotas[entry_id]["month"]["count"][month] += 1
+    quotas[entry_id]["month"]["count"][month] += count
     quotas[entry_id]["year"]["frames"][year] += nb_frames
     quotas[entry_id]["year"]["drawings"][year] += nb_drawings
     quotas[entry_id]["year"]["seconds"][year] += nb_seconds
-    quotas[entry_id]["year"]["count"][year] += 1
+    quotas[entry_id]["year"]["count"][year] += count
 
 
 def _init_quota_date(quotas, entry_id, date_str, week, month):
@@ -11,9 +11,11 @@ partial download never lands in the store.
 """
 
 import datetime
+import json
 import logging
 import os
 import sys
+import threading
 import time
 import traceback
 import requests
@@ -21,6 +23,8 @@ import requests
 import gazu
 import sqlalchemy
 
+from collections import OrderedDict
+from flask import current_app
 from flask_fs.backends.local import LocalBackend
 from http.client import responses as http_responses
 from threading import RLock
@@ -70,7 +74,7 @@ from zou.app.models.working_file import WorkingFile
 from zou.app.services import deletion_service, tasks_service, projects_service
 from zou.app.stores import file_store
 from zou.app.utils import events, date_helpers
-from zou.app import config
+from zou.app import config, db
 
 logger = logging.getLogger()
 logger.setLevel(os.environ.get("LOGLEVEL", "INFO").upper())
@@ -80,6 +84,28 @@ console_handler.setFormatter(formatter)
 logger.addHandler(console_handler)
 lock = RLock()
 
+_QUEUE_DEPTH = _LAG = _APPLIED = None
+
+if getattr(config, "PROMETHEUS_METRICS_ENABLED", False):
+    try:
+        from prometheus_client import Counter, Gauge
+
+        _QUEUE_DEPTH = Gauge(
+            "zou_sync_queue_depth",
+            "Changes received from the source instance and not applied yet",
+        )
+        _LAG = Gauge(
+            "zou_sync_lag_seconds",
+            "Age of the oldest change of the last applied batch",
+        )
+        _APPLIED = Counter(
+            "zou_sync_applied_changes_total",
+            "Changes applied from the source instance by event and action",
+            ["event", "action"],
+        )
+    except (ImportError, ValueError):
+        _QUEUE_DEPTH = _LAG = _APPLIED = None
+
 
 preview_folder = config.PREVIEW_FOLDER
 local_picture = LocalBackend(
@@ -751,10 +777,80 @@ def sync_event(event):
         model.delete_from_import(instance_id)
 
 
+def fetch_ndjson(path, params=None):
+    """
+    Generate the rows of an NDJSON route of the source instance as they
+    arrive, without ever holding the whole response. Raises
+    RouteNotFoundException when the source predates the route, and
+    ParameterException when it does not stream given model.
+    """
+    client = gazu.client.default_client
+    path = gazu.client.build_path_with_params(path, params)
+    retry = True
+    while retry:
+        response = client.session.get(
+            gazu.client.get_full_url(path, client=client),
+            headers=gazu.client.make_auth_header(client=client),
+            stream=True,
+        )
+        _, retry = gazu.client.check_status(response, path, client=client)
+    with response:
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+
+
+def import_ndjson(path, model, batch_size=500, row_filter=None):
+    """
+    Import the rows streamed by given NDJSON route of the source instance,
+    batch_size rows at a time. Returns the number of imported rows.
+    """
+    total = 0
+    batch = []
+    for row in fetch_ndjson(path):
+        if row_filter is not None and not row_filter(row):
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            model.create_from_import_list(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        model.create_from_import_list(batch)
+        total += len(batch)
+    return total
+
+
+def _is_not_concept_status(task_status):
+    return not task_status["for_concept"]
+
+
 def sync_entries(model_name, model, project=None):
     """
-    Retrieve cross-projects data from source instance.
+    Retrieve cross-projects data from source instance. The rows are streamed
+    when the source serves NDJSON exports, paginated otherwise.
     """
+    is_project_scoped = project is not None and model_name in [
+        "projects",
+        "search-filters",
+        "search-filter-groups",
+    ]
+    if not is_project_scoped:
+        row_filter = None
+        if model_name == "task-status":
+            row_filter = _is_not_concept_status
+        try:
+            total = import_ndjson(
+                f"export/ndjson/{model_name}", model, row_filter=row_filter
+            )
+            logger.info(f"{total} {model_name} synced.")
+            return
+        except (
+            gazu.exception.RouteNotFoundException,
+            gazu.exception.ParameterException,
+        ):
+            pass  # The source predates the streamed exports.
+
     instances = []
 
     page = 1
@@ -795,8 +891,21 @@ def sync_entries(model_name, model, project=None):
 
 def sync_project_entries(project, model_name, model):
     """
-    Retrieve all project data from source instance.
+    Retrieve all project data from source instance. The rows are streamed
+    when the source serves NDJSON exports, paginated otherwise.
     """
+    try:
+        total = import_ndjson(
+            f"export/ndjson/projects/{project['id']}/{model_name}", model
+        )
+        logger.info(f"    {total} {model_name} synced.")
+        return
+    except (
+        gazu.exception.RouteNotFoundException,
+        gazu.exception.ParameterException,
+    ):
+        pass  # The source predates the streamed exports.
+
     instances = []
     page = 1
     init = True
@@ -871,24 +980,24 @@ def sync_entity_thumbnails(project, model_name):
     logger.info(f"    {total} {model_name} thumbnails synced.")
 
 
-def add_main_sync_listeners(event_client):
+def add_main_sync_listeners(event_client, buffer=None):
     """
     Add listeners to manage CRUD events related to general data.
     """
     for event in main_events:
         path = event_name_model_path_map[event]
         model = event_name_model_map[event]
-        add_sync_listeners(event_client, path, event, model)
+        add_sync_listeners(event_client, path, event, model, buffer=buffer)
 
 
-def add_project_sync_listeners(event_client):
+def add_project_sync_listeners(event_client, buffer=None):
     """
     Add listeners to manage CRUD events related to open projects data.
     """
     for event in project_events:
         path = event_name_model_path_map[event]
         model = event_name_model_map[event]
-        add_sync_listeners(event_client, path, event, model)
+        add_sync_listeners(event_client, path, event, model, buffer=buffer)
 
 
 def add_special_sync_listeners(event_client):
@@ -899,11 +1008,23 @@ def add_special_sync_listeners(event_client):
         gazu.events.add_listener(event_client, event, forward_event(event))
 
 
-def add_sync_listeners(event_client, model_name, event_name, model):
+def add_sync_listeners(
+    event_client, model_name, event_name, model, buffer=None
+):
     """
     Add Create, Update and Delete event listeners for givent model name to given
-    event client.
-    """
+    event client. When a buffer is given, the listeners only queue the
+    changes: the buffer fetches and applies them by batches.
+    """
+    if buffer is not None:
+        for event_type in ["new", "update", "delete"]:
+            gazu.events.add_listener(
+                event_client,
+                f"{event_name}:{event_type}",
+                buffer_entry(buffer, event_name, event_type),
+            )
+        return
+
     gazu.events.add_listener(
         event_client,
         f"{event_name}:new",
@@ -971,6 +1092,253 @@ def delete_entry(model_name, event_name, model):
     return delete
 
 
+def buffer_entry(buffer, event_name, event_type):
+    """
+    Generate a function that queues the change described by an event in
+    given buffer instead of applying it right away.
+    It's useful to generate callbacks for event listener.
+    """
+
+    def push(data):
+        if data.get("sync", False):
+            return
+        buffer.push(event_name, event_type, data)
+
+    return push
+
+
+class SyncEventBuffer:
+    """
+    Changes received from the source instance, waiting to be applied
+    locally. Changes are deduplicated by object: ten updates of the same
+    task before a flush cost a single fetch. The buffer is flushed when it
+    holds batch_size objects, and at least every flush_interval seconds.
+    Once it holds max_size objects, push blocks until the next flush,
+    which stops the listener from reading the socket and lets the
+    backpressure reach the source instead of growing the queue.
+    """
+
+    def __init__(self, batch_size=200, flush_interval=1.0, max_size=5000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.changes = OrderedDict()
+        self.condition = threading.Condition()
+        self.nb_received = 0
+
+    def __len__(self):
+        return len(self.changes)
+
+    def push(self, event_name, event_type, data):
+        model = event_name_model_map[event_name]
+        model_id = data[event_name.replace("-", "_") + "_id"]
+        key = (model.__tablename__, model_id)
+        with self.condition:
+            while len(self.changes) >= self.max_size and (
+                key not in self.changes
+            ):
+                self.condition.wait()
+            previous = self.changes.pop(key, None)
+            if previous is None:
+                received_at = time.monotonic()
+            else:
+                received_at = previous["received_at"]
+                if previous["event_type"] == "new" and event_type == "update":
+                    # Still a creation from the point of view of this
+                    # instance, only with more recent data.
+                    event_type = "new"
+            self.changes[key] = {
+                "event_name": event_name,
+                "event_type": event_type,
+                "id": model_id,
+                "data": data,
+                "received_at": received_at,
+            }
+            self.nb_received += 1
+            if _QUEUE_DEPTH is not None:
+                _QUEUE_DEPTH.set(len(self.changes))
+            if len(self.changes) >= self.batch_size:
+                self.condition.notify_all()
+
+    def pop_batch(self, timeout=None):
+        """
+        Wait until a batch is ready or the timeout expires, then return the
+        pending changes and empty the buffer.
+        """
+        with self.condition:
+            deadline = time.monotonic() + (
+                self.flush_interval if timeout is None else timeout
+            )
+            while len(self.changes) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            changes = list(self.changes.values())
+            self.changes.clear()
+            if _QUEUE_DEPTH is not None:
+                _QUEUE_DEPTH.set(0)
+            self.condition.notify_all()
+            return changes
+
+    def run(self, stop_event=None):
+        """
+        Apply the buffered changes batch after batch until stop_event is
+        set. Errors are logged with the changes they lost: one bad batch
+        must not stop the daemon.
+        """
+        while stop_event is None or not stop_event.is_set():
+            changes = self.pop_batch()
+            if not changes:
+                continue
+            try:
+                apply_sync_changes(changes)
+            except Exception:
+                db.session.rollback()
+                logger.error(
+                    f"Failed to apply {_describe_changes(changes)}",
+                    exc_info=1,
+                )
+
+    def start(self):
+        """
+        Run the flush loop in a daemon thread bound to the current
+        application. Returns the event that stops it.
+        """
+        app = current_app._get_current_object()
+        stop_event = threading.Event()
+
+        def run():
+            with app.app_context():
+                self.run(stop_event)
+
+        threading.Thread(target=run, daemon=True).start()
+        return stop_event
+
+
+def _get_sync_event_rank(event_name):
+    """
+    Models are applied in the order of the event lists, so the rows a change
+    points to (project, entity, task...) are written before it.
+    """
+    event_names = main_events + project_events
+    if event_name in event_names:
+        return event_names.index(event_name)
+    return len(event_names)
+
+
+def fetch_instances(event_name, instance_ids, chunk_size=100):
+    """
+    Retrieve the instances matching given ids from the source instance
+    through the list route of their model, chunk_size ids per request.
+    Assets, shots and other entities are all read from the entity route.
+    """
+    model = event_name_model_map[event_name]
+    path = event_name_model_path_map[event_name]
+    if model is Entity:
+        path = "entities"
+    instances = []
+    for index in range(0, len(instance_ids), chunk_size):
+        chunk = instance_ids[index : index + chunk_size]
+        instances += gazu.client.fetch_all(
+            path, params={"id": json.dumps(chunk), "relations": "true"}
+        )
+    return instances
+
+
+def _describe_changes(changes):
+    """
+    List the changes of a batch as "event_name:event_type id", for logs.
+    """
+    return ", ".join(
+        f"{change['event_name']}:{change['event_type']} {change['id']}"
+        for change in changes
+    )
+
+
+def apply_sync_changes(changes):
+    """
+    Apply a batch of changes coming from a SyncEventBuffer: one fetch per
+    model for the creations and updates, one statement per model for the
+    deletions, then forward the applied changes to the local event
+    broadcaster. A model that fails is logged and skipped, its changes are
+    not forwarded, and the other models of the batch are still applied.
+    """
+    upserts = {}
+    deletions = {}
+    for change in changes:
+        if change["event_type"] == "delete":
+            group = deletions
+        else:
+            group = upserts
+        group.setdefault(change["event_name"], []).append(change)
+
+    applied = []
+    for event_name in sorted(upserts, key=_get_sync_event_rank):
+        event_changes = upserts[event_name]
+        model = event_name_model_map[event_name]
+        ids = [change["id"] for change in event_changes]
+        try:
+            instances = fetch_instances(event_name, ids)
+            model.create_from_import_list(instances)
+        except gazu.exception.RouteNotFoundException as e:
+            logger.error(f"Route not found: {e}")
+            logger.error(f"Fail {event_name} created/updated {len(ids)}")
+            continue
+        except Exception:
+            db.session.rollback()
+            logger.error(
+                f"Failed to apply {_describe_changes(event_changes)}",
+                exc_info=1,
+            )
+            continue
+        fetched_ids = set(instance["id"] for instance in instances)
+        for change in event_changes:
+            if change["id"] not in fetched_ids:
+                logger.warning(
+                    f"{event_name} {change['id']} not found on source."
+                )
+        applied += event_changes
+
+    for event_name in sorted(
+        deletions, key=_get_sync_event_rank, reverse=True
+    ):
+        event_changes = deletions[event_name]
+        model = event_name_model_map[event_name]
+        ids = [change["id"] for change in event_changes]
+        try:
+            if event_name == "comment":
+                for comment_id in ids:
+                    comment = deletion_service.remove_comment(comment_id)
+                    tasks_service.reset_task_data(comment["object_id"])
+            else:
+                model.delete_all_by(model.id.in_(ids))
+        except Exception:
+            db.session.rollback()
+            logger.error(
+                f"Failed to apply {_describe_changes(event_changes)}",
+                exc_info=1,
+            )
+            continue
+        applied += event_changes
+
+    now = time.monotonic()
+    for change in applied:
+        event_name = change["event_name"]
+        event_type = change["event_type"]
+        forward_base_event(event_name, event_type, change["data"])
+        if _APPLIED is not None:
+            _APPLIED.labels(event=event_name, action=event_type).inc()
+    lag = now - min(change["received_at"] for change in changes)
+    if _LAG is not None:
+        _LAG.set(lag)
+    logger.info(
+        f"Applied {len(applied)} of {len(changes)} changes "
+        f"({len(upserts)} models updated, {len(deletions)} models "
+        f"with deletions), lag {lag:.2f}s."
+    )
+
+
 def forward_local_event(event_name, data):
     """
     Forward an event of the source instance to the local broadcaster. What
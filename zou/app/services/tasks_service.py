@@ -87,6 +87,7 @@ from zou.app.services import (
     projects_service,
     shots_service,
     permissions_service,
+    time_spents_service,
     user_service,
 )
 
@@ -131,6 +132,14 @@ def clear_task_cache(task_id):
     cache.cache.delete_memoized(get_task, task_id, True)
 
 
+def clear_all_tasks_cache():
+    """
+    Drop the memoized serialization of every task in one cache operation.
+    Meant for bulk updates that touch too many tasks to drop them one by one.
+    """
+    cache.cache.delete_memoized(get_task)
+
+
 def clear_comment_cache(comment_id):
     """
     Drop every memoized serialization of given comment.
@@ -1724,6 +1733,13 @@ def create_or_update_time_spent(task_id, person_id, date, duration, add=False):
         for time_spent in TimeSpent.get_all_by(task_id=task_id)
     )
     task.save()
+    time_spents_service.refresh_time_spent_days(
+        person_id=person_id,
+        project_id=project_id,
+        task_type_id=task.task_type_id,
+        start_date=time_spent.date,
+        end_date=time_spent.date,
+    )
     clear_task_cache(task_id)
     events.emit("task:update", {"task_id": task_id}, project_id=project_id)
 
@@ -1761,6 +1777,13 @@ def delete_time_spent(task_id, person_id, date):
         for time_spent in TimeSpent.get_all_by(task_id=task_id)
     )
     task.save()
+    time_spents_service.refresh_time_spent_days(
+        person_id=person_id,
+        project_id=project_id,
+        task_type_id=task.task_type_id,
+        start_date=time_spent.date,
+        end_date=time_spent.date,
+    )
     clear_task_cache(task_id)
     events.emit("task:update", {"task_id": task_id}, project_id=project_id)
 
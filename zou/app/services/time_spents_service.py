@@ -3,21 +3,23 @@ import datetime
 from dateutil import relativedelta
 from collections import defaultdict
 
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import DataError
 from sqlalchemy.orm import aliased
 
+from zou.app import db
 from zou.app.models.day_off import DayOff
-from zou.app.models.department import Department
 from zou.app.models.project import Project
 from zou.app.models.task import Task
 from zou.app.models.task_type import TaskType
-from zou.app.models.time_spent import TimeSpent
+from zou.app.models.time_spent import TimeSpent, TimeSpentDay
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
 from zou.app.models.person import Person
 
 from zou.app.utils import fields, date_helpers
+from zou.app.utils import query as query_utils
 
 from zou.app.services import user_service, projects_service
 from zou.app.services.exception import WrongDateFormatException
@@ -143,15 +145,20 @@ def get_day_table(
     Return a table giving time spent by user and by day for given year and
     month.
     """
-    time_spents = get_time_spents_for_month(
-        year,
-        month,
+    month_int = int(month)
+    if month_int < 1 or month_int > 12:
+        raise WrongDateFormatException
+    date = datetime.date(int(year), month_int, 1)
+    next_month = date + relativedelta.relativedelta(months=1)
+    return _get_time_spent_day_table(
+        "day",
+        TimeSpentDay.date >= date,
+        TimeSpentDay.date < next_month,
         person_id=person_id,
         project_id=project_id,
         department_ids=department_ids,
         studio_id=studio_id,
     )
-    return get_table_from_time_spents(time_spents, "day")
 
 
 def get_yearly_table(
@@ -167,14 +174,201 @@ def get_yearly_table(
     year. Week or month detail level can be selected through *detail_level*
     argument.
     """
-    time_spents = get_time_spents_for_year(
-        year=year,
+    filters = []
+    if year is not None:
+        filters.append(
+            TimeSpentDay.date.between(
+                datetime.date(int(year), 1, 1),
+                datetime.date(int(year), 12, 31),
+            )
+        )
+    return _get_time_spent_day_table(
+        detail_level,
+        *filters,
         person_id=person_id,
         project_id=project_id,
         department_ids=department_ids,
         studio_id=studio_id,
     )
-    return get_table_from_time_spents(time_spents, detail_level)
+
+
+def _get_time_spent_day_table(
+    detail_level,
+    *filters,
+    person_id=None,
+    project_id=None,
+    department_ids=None,
+    studio_id=None,
+):
+    """
+    Sum the daily rollups matching given filters by person and by day,
+    (ISO) week, month or year, depending on detail_level.
+    """
+    units = {"day": "day", "week": "week", "year": "year"}
+    unit = func.extract(units.get(detail_level, "month"), TimeSpentDay.date)
+    query = (
+        db.session.query(
+            unit, TimeSpentDay.person_id, func.sum(TimeSpentDay.duration)
+        )
+        .filter(*filters)
+        .group_by(unit, TimeSpentDay.person_id)
+    )
+
+    if person_id is not None:
+        query = query.filter(TimeSpentDay.person_id == person_id)
+
+    if project_id is not None:
+        if isinstance(project_id, list):
+            query = query.filter(TimeSpentDay.project_id.in_(project_id))
+        else:
+            query = query.filter(TimeSpentDay.project_id == project_id)
+
+    if department_ids:
+        query = query.join(
+            TaskType, TaskType.id == TimeSpentDay.task_type_id
+        ).filter(TaskType.department_id.in_(department_ids))
+
+    if studio_id is not None:
+        query = query.join(Person, Person.id == TimeSpentDay.person_id).filter(
+            Person.studio_id == studio_id
+        )
+
+    result = {}
+    for unit_value, time_spent_person_id, duration in query.all():
+        result.setdefault(str(int(unit_value)), {})[
+            str(time_spent_person_id)
+        ] = duration
+    return result
+
+
+def refresh_time_spent_days(
+    person_id=None,
+    project_id=None,
+    task_type_id=None,
+    start_date=None,
+    end_date=None,
+):
+    """
+    Recompute from the time spents the daily rollups matching given filters,
+    every rollup when none is given. Dates are inclusive. Rollups whose time
+    spents are all gone are removed.
+    """
+    day_filters = []
+    filters = [TimeSpent.person_id != None]
+    if person_id is not None:
+        day_filters.append(TimeSpentDay.person_id == person_id)
+        filters.append(TimeSpent.person_id == person_id)
+    if project_id is not None:
+        day_filters.append(TimeSpentDay.project_id == project_id)
+        filters.append(Task.project_id == project_id)
+    if task_type_id is not None:
+        day_filters.append(TimeSpentDay.task_type_id == task_type_id)
+        filters.append(Task.task_type_id == task_type_id)
+    if start_date is not None:
+        start_date = func.cast(start_date, TimeSpent.date.type)
+        day_filters.append(TimeSpentDay.date >= start_date)
+        filters.append(TimeSpent.date >= start_date)
+    if end_date is not None:
+        end_date = func.cast(end_date, TimeSpent.date.type)
+        day_filters.append(TimeSpentDay.date <= end_date)
+        filters.append(TimeSpent.date <= end_date)
+
+    TimeSpentDay.query.filter(*day_filters).delete(synchronize_session=False)
+    now = func.timezone("UTC", func.now())
+    sums = (
+        select(
+            query_utils.get_random_uuid_expression(TimeSpentDay.id.type),
+            TimeSpent.person_id,
+            Task.project_id,
+            Task.task_type_id,
+            TimeSpent.date,
+            func.sum(TimeSpent.duration),
+            now,
+            now,
+        )
+        .join(Task, Task.id == TimeSpent.task_id)
+        .filter(*filters)
+        .group_by(
+            TimeSpent.person_id,
+            Task.project_id,
+            Task.task_type_id,
+            TimeSpent.date,
+        )
+    )
+    statement = insert(TimeSpentDay).from_select(
+        [
+            "id",
+            "person_id",
+            "project_id",
+            "task_type_id",
+            "date",
+            "duration",
+            "created_at",
+            "updated_at",
+        ],
+        sums,
+    )
+    # A concurrent refresh of the same days may have written them since
+    # the delete above.
+    statement = statement.on_conflict_do_update(
+        constraint="time_spent_day_uc",
+        set_={
+            "duration": statement.excluded.duration,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    db.session.execute(statement)
+    db.session.commit()
+
+
+def refresh_time_spent_day_of(time_spent):
+    """
+    Recompute the daily rollup given time spent (serialized) counts in.
+    """
+    refresh_time_spent_days_of([time_spent])
+
+
+def refresh_time_spent_days_of(time_spents):
+    """
+    Recompute the daily rollups given time spents (serialized) count in:
+    one refresh per person, project and task type, over the dates they
+    span.
+    """
+    time_spents = [
+        time_spent
+        for time_spent in time_spents
+        if time_spent.get("person_id") is not None
+        and time_spent.get("task_id") is not None
+        and time_spent.get("date") is not None
+    ]
+    if len(time_spents) == 0:
+        return
+    tasks = {
+        str(task_id): (project_id, task_type_id)
+        for task_id, project_id, task_type_id in Task.query.filter(
+            Task.id.in_(
+                {str(time_spent["task_id"]) for time_spent in time_spents}
+            )
+        ).with_entities(Task.id, Task.project_id, Task.task_type_id)
+    }
+    spans = {}
+    for time_spent in time_spents:
+        task = tasks.get(str(time_spent["task_id"]))
+        if task is None:
+            continue
+        key = (str(time_spent["person_id"]),) + task
+        date = str(time_spent["date"])[:10]
+        start_date, end_date = spans.get(key, (date, date))
+        spans[key] = (min(start_date, date), max(end_date, date))
+    for key, (start_date, end_date) in spans.items():
+        person_id, project_id, task_type_id = key
+        refresh_time_spent_days(
+            person_id=person_id,
+            project_id=project_id,
+            task_type_id=task_type_id,
+            start_date=start_date,
+            end_date=end_date,
+        )
 
 
 def get_time_spents_for_year(
@@ -570,27 +764,31 @@ def get_timezoned_interval(start, end):
 def get_project_month_time_spents(project_id, timezone=None):
     """
     Get aggregated time spents by department by person by month for given
-    project.
+    project, from the daily rollups. Time spent dates are calendar days,
+    which no timezone shifts: timezone is only kept for the callers.
     """
     data = {}
+    month = func.to_char(TimeSpentDay.date, "YYYY-MM")
     query = (
-        TimeSpent.query.join(Task)
-        .join(TaskType, TaskType.id == Task.task_type_id)
-        .join(Department, Department.id == TaskType.department_id)
-        .filter(Task.project_id == project_id)
-        .add_columns(Department.id)
-        .order_by(TimeSpent.date)
+        db.session.query(
+            TaskType.department_id,
+            TimeSpentDay.person_id,
+            month,
+            func.sum(TimeSpentDay.duration),
+        )
+        .join(TaskType, TaskType.id == TimeSpentDay.task_type_id)
+        .filter(TimeSpentDay.project_id == project_id)
+        .filter(TaskType.department_id != None)
+        .group_by(TaskType.department_id, TimeSpentDay.person_id, month)
+        .order_by(month)
     )
 
-    for time_spent, department_id in query.all():
-        date_key = date_helpers.get_simple_string_with_timezone_from_date(
-            time_spent.date, timezone
-        )[0:7]
+    for department_id, person_id, date_key, duration in query.all():
         department = data.setdefault(department_id, {"total": 0})
-        person = department.setdefault(time_spent.person_id, {"total": 0})
-        person[date_key] = person.get(date_key, 0) + time_spent.duration
-        person["total"] += time_spent.duration
-        department["total"] += time_spent.duration
+        person = department.setdefault(person_id, {"total": 0})
+        person[date_key] = duration
+        person["total"] += duration
+        department["total"] += duration
     return data
 
 
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import aliased
-from sqlalchemy import func, or_, and_
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy import func, or_, and_, tuple_
 from sqlalchemy.exc import DataError
 
 from zou.app.models.comment import Comment
@@ -36,6 +36,7 @@ from zou.app.services.exception import (
     NotificationNotFoundException,
     WrongParameterException,
 )
+from zou.app.stores import notification_counts_store
 from zou.app.utils import cache, fields, permissions, events
 
 
@@ -863,7 +864,13 @@ def update_notification(notification_id, read):
     )
     if notification is None:
         raise NotificationNotFoundException
+    was_read = notification.read
     notification.update({"read": read})
+    if was_read != read:
+        if read:
+            notification_counts_store.decrement([current_user["id"]])
+        else:
+            notification_counts_store.increment([current_user["id"]])
     if read:
         events.emit(
             "notification:read",
@@ -888,9 +895,9 @@ def get_unread_notifications_count(notification_id=None):
     Return the number of unread notifications.
     """
     current_user = persons_service.get_current_user()
-    return Notification.query.filter_by(
-        person_id=current_user["id"], read=False
-    ).count()
+    return notifications_service.get_unread_notifications_count(
+        current_user["id"]
+    )
 
 
 def get_last_notifications(
@@ -902,9 +909,13 @@ def get_last_notifications(
     notification_type=None,
     read=None,
     watching=None,
+    before_id=None,
 ):
     """
-    Return last 100 user notifications.
+    Return last 100 user notifications, newest first. To get the next page,
+    give the creation date and the id of the last notification received as
+    before and before_id: notifications created at the same time are told
+    apart by their id, so none is skipped or repeated.
     """
     # These reach the query as raw values, so the driver is the one that
     # rejects them: a malformed id raises a StatementError while binding,
@@ -913,6 +924,7 @@ def get_last_notifications(
         ("notification_id", notification_id),
         ("task_type_id", task_type_id),
         ("task_status_id", task_status_id),
+        ("before_id", before_id),
     ):
         if value is not None and not fields.is_valid_id(value):
             raise WrongParameterException(
@@ -925,7 +937,7 @@ def get_last_notifications(
     result = []
     query = (
         Notification.query.filter_by(person_id=current_user["id"])
-        .order_by(Notification.created_at.desc())
+        .order_by(Notification.created_at.desc(), Notification.id.desc())
         .join(Author, Author.id == Notification.author_id)
         .outerjoin(Task, Task.id == Notification.task_id)
         .outerjoin(Project, Project.id == Task.project_id)
@@ -960,7 +972,17 @@ def get_last_notifications(
             > func.cast(after, Notification.created_at.type)
         )
 
-    if before is not None:
+    if before is not None and before_id is not None:
+        # A row comparison, so the whole bound is read off the
+        # (person_id, created_at, id) index.
+        query = query.filter(
+            tuple_(Notification.created_at, Notification.id)
+            < tuple_(
+                func.cast(before, Notification.created_at.type),
+                func.cast(before_id, Notification.id.type),
+            )
+        )
+    elif before is not None:
         query = query.filter(
             Notification.created_at
             < func.cast(before, Notification.created_at.type)
@@ -991,6 +1013,26 @@ def get_last_notifications(
     except DataError:
         raise WrongParameterException("Wrong date format for after or before.")
 
+    # Everything the rows point to is loaded once for the whole page rather
+    # than once per notification.
+    entity_names = names_service.get_full_entity_names(
+        [row[8] for row in notifications if row[8] is not None]
+    )
+    comment_ids = [row[4] for row in notifications if row[4] is not None]
+    comments = {}
+    if len(comment_ids) > 0:
+        comments = {
+            comment.id: comment
+            for comment in Comment.query.filter(
+                Comment.id.in_(comment_ids)
+            ).options(
+                selectinload(Comment.previews),
+                selectinload(Comment.mentions),
+                selectinload(Comment.department_mentions),
+            )
+        }
+    playlists = {}
+
     for (
         notification,
         project_id,
@@ -1011,10 +1053,14 @@ def get_last_notifications(
         playlist_is_for_all = False
         if notification.playlist_id is None:
             full_entity_name, episode_id, entity_preview_file_id = (
-                names_service.get_full_entity_name(task_entity_id)
+                entity_names.get(str(task_entity_id), ("", None, None))
             )
         else:
-            playlist = playlists_service.get_playlist(notification.playlist_id)
+            if notification.playlist_id not in playlists:
+                playlists[notification.playlist_id] = (
+                    playlists_service.get_playlist(notification.playlist_id)
+                )
+            playlist = playlists[notification.playlist_id]
             episode_id = playlist.get("episode_id", None)
             project = projects_service.get_project(playlist["project_id"])
             project_id = project["id"]
@@ -1029,7 +1075,7 @@ def get_last_notifications(
         reply_mentions = []
         reply_department_mentions = []
         if comment_id is not None:
-            comment = Comment.get(comment_id)
+            comment = comments[comment_id]
             if len(comment.previews) > 0:
                 preview_file_id = comment.previews[0].id
             mentions = comment.mentions or []
@@ -1079,7 +1125,12 @@ def get_last_notifications(
                     "project_name": project_name,
                     "comment_text": comment_text,
                     "reply_text": reply_text,
-                    "created_at": notification.created_at,
+                    # Kept to the microsecond: it is the cursor sent back
+                    # as before, and notifications of one comment share
+                    # the same second.
+                    "created_at": fields.serialize_value(
+                        notification.created_at, milliseconds=True
+                    ),
                     "read": notification.read,
                     "change": notification.change,
                     "full_entity_name": full_entity_name,
@@ -1115,6 +1166,7 @@ def mark_notifications_as_read():
 
     db.session.execute(update_stmt)
     db.session.commit()
+    notification_counts_store.set_counts({current_user["id"]: 0})
     events.emit("notification:all-read", {"person_id": current_user["id"]})
     return True
 
@@ -0,0 +1,130 @@
+"""
+Full names of the entities of each project, kept in Redis so that the
+breadcrumbs of the news feed, the notifications, the playlists and the
+exports are resolved without reaching the database.
+
+Each project has a hash mapping its entity ids to their full name, their
+episode id and their preview file id. A second hash maps every entity id
+to its project, so a batch of ids can be resolved without knowing their
+projects. A project hash is rebuilt as a whole: a change to a field the
+names are built from (name, parent, type, preview file) drops it, and the
+next read rebuilds it from the database. Project hashes expire after an hour
+so a change made without dropping them is eventually picked up.
+"""
+
+import json
+import logging
+
+import redis
+
+from zou.app import config
+from zou.app.stores import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "entity-names:"
+PROJECTS_KEY = "entity-names-projects"
+TTL = 3600
+
+# Lazily connected: the pool opens on the first command, not at import.
+entity_names_store = redis_client.get_client(config.KV_ENTITY_NAMES_DB_INDEX)
+
+
+def _get_key(project_id):
+    return f"{KEY_PREFIX}{project_id}"
+
+
+def get_names(entity_ids):
+    """
+    Return a dict mapping the given entity ids that are stored to their
+    (full name, episode id, preview file id) tuple. Ids whose project is not
+    stored, or that are not part of it, are left out. None is returned when
+    Redis is unavailable.
+    """
+    entity_ids = [str(entity_id) for entity_id in entity_ids]
+    try:
+        project_ids = entity_names_store.hmget(PROJECTS_KEY, entity_ids)
+        ids_by_project = {}
+        for entity_id, project_id in zip(entity_ids, project_ids):
+            if project_id is not None:
+                ids_by_project.setdefault(project_id, []).append(entity_id)
+        if len(ids_by_project) == 0:
+            return {}
+        pipeline = entity_names_store.pipeline(transaction=False)
+        for project_id, project_entity_ids in ids_by_project.items():
+            pipeline.hmget(_get_key(project_id), project_entity_ids)
+        values = pipeline.execute()
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while reading entity names")
+        return None
+
+    names = {}
+    for project_entity_ids, project_values in zip(
+        ids_by_project.values(), values
+    ):
+        for entity_id, value in zip(project_entity_ids, project_values):
+            if value is not None:
+                names[entity_id] = tuple(json.loads(value))
+    return names
+
+
+def set_project_names(project_id, names):
+    """
+    Replace the stored names of given project with given dict mapping
+    entity ids to their (full name, episode id, preview file id) tuple.
+    """
+    key = _get_key(project_id)
+    try:
+        pipeline = entity_names_store.pipeline(transaction=True)
+        pipeline.delete(key)
+        if len(names) > 0:
+            pipeline.hset(
+                key,
+                mapping={
+                    entity_id: json.dumps(value)
+                    for entity_id, value in names.items()
+                },
+            )
+            pipeline.expire(key, TTL)
+            pipeline.hset(
+                PROJECTS_KEY,
+                mapping={entity_id: str(project_id) for entity_id in names},
+            )
+        pipeline.execute()
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while storing entity names")
+
+
+def drop_project(project_id):
+    """
+    Forget the stored names of given project.
+    """
+    try:
+        entity_names_store.delete(_get_key(project_id))
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while dropping entity names")
+
+
+def drop_entity(entity_id):
+    """
+    Forget the stored names of the project of given entity: the names of
+    its children depend on its own.
+    """
+    try:
+        project_id = entity_names_store.hget(PROJECTS_KEY, str(entity_id))
+        if project_id is not None:
+            entity_names_store.delete(_get_key(project_id))
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while dropping entity names")
+
+
+def clear():
+    """
+    Forget every stored name.
+    """
+    try:
+        for key in entity_names_store.scan_iter(f"{KEY_PREFIX}*"):
+            entity_names_store.delete(key)
+        entity_names_store.delete(PROJECTS_KEY)
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while clearing entity names")
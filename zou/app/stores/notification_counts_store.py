@@ -0,0 +1,111 @@
+"""
+Per-person count of unread notifications, kept in Redis so that clients
+polling for it never reach the database.
+
+A count only exists once it has been computed from the database: a missing
+key means unknown, never zero. Increments and decrements therefore leave
+missing keys alone, and each key expires after a day so a count that
+drifted (notifications removed along with their comment, for instance) is
+eventually recomputed. The reconcile command rewrites every count from the
+database.
+"""
+
+import logging
+
+import redis
+
+from zou.app import config
+from zou.app.stores import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "notifications:unread:"
+TTL = 24 * 3600
+
+# Lazily connected: the pool opens on the first command, not at import.
+notification_counts_store = redis_client.get_client(
+    config.KV_NOTIFICATIONS_DB_INDEX
+)
+
+
+def _get_key(person_id):
+    return f"{KEY_PREFIX}{person_id}"
+
+
+def get(person_id):
+    """
+    Return the unread notification count of given person, or None when it
+    is unknown or Redis is unavailable.
+    """
+    try:
+        value = notification_counts_store.get(_get_key(person_id))
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while reading a notification count")
+        return None
+    return None if value is None else max(int(value), 0)
+
+
+def set_counts(counts):
+    """
+    Store the unread notification count of every person of given dict.
+    """
+    if len(counts) == 0:
+        return
+    try:
+        pipeline = notification_counts_store.pipeline(transaction=False)
+        for person_id, count in counts.items():
+            pipeline.set(_get_key(person_id), count, ex=TTL)
+        pipeline.execute()
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while storing notification counts")
+
+
+def increment(person_ids, amount=1):
+    """
+    Add amount to the known counts of given persons, atomically. Counts
+    never go below zero.
+    """
+    keys = [_get_key(person_id) for person_id in set(person_ids)]
+    if len(keys) == 0:
+        return
+
+    def update_counts(pipeline):
+        values = zip(keys, pipeline.mget(keys))
+        known = [
+            (key, int(value)) for key, value in values if value is not None
+        ]
+        pipeline.multi()
+        for key, value in known:
+            if value + amount < 0:
+                pipeline.set(key, 0, keepttl=True)
+            else:
+                pipeline.incrby(key, amount)
+
+    try:
+        notification_counts_store.transaction(update_counts, *keys)
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while updating notification counts")
+
+
+def decrement(person_ids, amount=1):
+    """
+    Remove amount from the known counts of given persons.
+    """
+    increment(person_ids, -amount)
+
+
+def keys():
+    """
+    Get all the count keys available in the store.
+    """
+    return [
+        key for key in notification_counts_store.scan_iter(f"{KEY_PREFIX}*")
+    ]
+
+
+def clear():
+    """
+    Forget every stored count.
+    """
+    for key in keys():
+        notification_counts_store.delete(key)
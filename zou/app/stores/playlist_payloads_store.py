@@ -0,0 +1,145 @@
+"""
+Built payloads of the playlists, kept in Redis so that opening a playlist
+does not rebuild its whole preview tree each time.
+
+Each playlist has a revision counter. A payload is stored under the
+revision read before it was built, so bumping the counter is enough to
+invalidate it: the next read misses and rebuilds it under the new revision.
+The counter is bumped when the playlist is edited and when a preview file of
+one of its entities changes. To find the playlists of an entity, each stored
+payload registers its playlist in a set per entity.
+
+Payloads expire after an hour, counters and entity sets after a day and
+their expiry is pushed back on each write: a counter is never forgotten
+while a payload stored under it is still there.
+"""
+
+import logging
+
+import orjson as json
+import redis
+
+from zou.app import config
+from zou.app.stores import redis_client
+
+logger = logging.getLogger(__name__)
+
+REVISION_PREFIX = "playlist-revision:"
+PAYLOAD_PREFIX = "playlist-payload:"
+ENTITY_PREFIX = "playlist-entity:"
+PAYLOAD_TTL = 3600
+REVISION_TTL = 86400
+
+# Lazily connected: the pool opens on the first command, not at import.
+playlist_payloads_store = redis_client.get_client(
+    config.KV_PLAYLIST_PAYLOADS_DB_INDEX
+)
+
+
+def _get_revision_key(playlist_id):
+    return f"{REVISION_PREFIX}{playlist_id}"
+
+
+def _get_payload_key(playlist_id, revision, with_annotations):
+    annotations = "annotations" if with_annotations else "light"
+    return f"{PAYLOAD_PREFIX}{playlist_id}:{revision}:{annotations}"
+
+
+def _get_entity_key(entity_id):
+    return f"{ENTITY_PREFIX}{entity_id}"
+
+
+def get_revision(playlist_id):
+    """
+    Return the current revision of given playlist, 0 if it was never bumped.
+    None is returned when Redis is unavailable.
+    """
+    try:
+        revision = playlist_payloads_store.get(_get_revision_key(playlist_id))
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while reading playlist revision")
+        return None
+    return int(revision or 0)
+
+
+def get_payload(playlist_id, revision, with_annotations):
+    """
+    Return the payload stored for given playlist revision, or None when it
+    is not stored.
+    """
+    try:
+        payload = playlist_payloads_store.get(
+            _get_payload_key(playlist_id, revision, with_annotations)
+        )
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while reading playlist payload")
+        return None
+    if payload is None:
+        return None
+    return json.loads(payload)
+
+
+def set_payload(playlist_id, revision, with_annotations, payload):
+    """
+    Store the payload built for given playlist revision.
+    """
+    try:
+        pipeline = playlist_payloads_store.pipeline(transaction=False)
+        pipeline.set(
+            _get_payload_key(playlist_id, revision, with_annotations),
+            json.dumps(payload),
+            ex=PAYLOAD_TTL,
+        )
+        pipeline.expire(_get_revision_key(playlist_id), REVISION_TTL)
+        pipeline.execute()
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while storing playlist payload")
+
+
+def register_entities(playlist_id, entity_ids):
+    """
+    Link given playlist to given entities, so a change on the previews of
+    one of them bumps the playlist. It must be done before the previews are
+    read to build the payload.
+    """
+    try:
+        pipeline = playlist_payloads_store.pipeline(transaction=False)
+        for entity_id in set(entity_ids) - {None}:
+            key = _get_entity_key(entity_id)
+            pipeline.sadd(key, str(playlist_id))
+            pipeline.expire(key, REVISION_TTL)
+        pipeline.execute()
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while registering playlist")
+
+
+def bump_playlists(playlist_ids):
+    """
+    Increment the revision of given playlists, which invalidates their
+    stored payloads.
+    """
+    try:
+        pipeline = playlist_payloads_store.pipeline(transaction=False)
+        for playlist_id in set(playlist_ids):
+            key = _get_revision_key(playlist_id)
+            pipeline.incr(key)
+            pipeline.expire(key, REVISION_TTL)
+        pipeline.execute()
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while bumping playlists")
+
+
+def bump_entity_playlists(entity_ids):
+    """
+    Increment the revision of the playlists showing one of given entities.
+    """
+    try:
+        pipeline = playlist_payloads_store.pipeline(transaction=False)
+        for entity_id in set(entity_ids):
+            pipeline.smembers(_get_entity_key(entity_id))
+        playlist_ids = set().union(*pipeline.execute())
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while bumping playlists")
+        return
+    if len(playlist_ids) > 0:
+        bump_playlists(playlist_ids)
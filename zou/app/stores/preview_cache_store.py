@@ -0,0 +1,97 @@
+"""
+Broadcast of the preview files whose caches have to be warmed up.
+
+With a remote storage, each API node keeps the preview files it serves in
+its own temporary folder. Once a movie preview is processed, its id is
+published on a Redis channel: every node listening downloads the files
+reviewers are about to ask for, so the first one to open it is served from
+the local disk.
+
+Several processes of the same host share the same temporary folder: the
+first one to claim a preview file is the only one to download it.
+"""
+
+import logging
+
+import redis
+
+from zou.app import config
+from zou.app.stores import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "preview-cache-warmup"
+CLAIM_PREFIX = "preview-cache-warmup:"
+CLAIM_TTL = 3600
+
+# Lazily connected: the pool opens on the first command, not at import.
+preview_cache_store = redis_client.get_client(config.KV_PREVIEW_CACHE_DB_INDEX)
+
+
+def _get_claim_key(host, preview_file_id):
+    return f"{CLAIM_PREFIX}{host}:{preview_file_id}"
+
+
+def broadcast_warmup(preview_file_id):
+    """
+    Ask every listening node to warm up the cache of given preview file.
+    """
+    try:
+        preview_cache_store.publish(CHANNEL, str(preview_file_id))
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while broadcasting cache warmup")
+
+
+def claim_warmup(host, preview_file_id):
+    """
+    Return True if the caller is the first process of given host to claim
+    the warmup of given preview file.
+    """
+    try:
+        return bool(
+            preview_cache_store.set(
+                _get_claim_key(host, preview_file_id),
+                "1",
+                nx=True,
+                ex=CLAIM_TTL,
+            )
+        )
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while claiming cache warmup")
+        return False
+
+
+def release_warmup(host, preview_file_id):
+    """
+    Drop the claim of given host on the warmup of given preview file, so
+    that a failed warmup is retried on the next broadcast.
+    """
+    try:
+        preview_cache_store.delete(_get_claim_key(host, preview_file_id))
+    except redis.ConnectionError:
+        logger.warning("Redis unavailable while releasing cache warmup")
+
+
+def listen(handler, stop_event, timeout=1.0):
+    """
+    Run handler on each preview file id broadcast, until stop_event is set.
+    The subscription is renewed when the connection drops.
+    """
+    pubsub = None
+    while not stop_event.is_set():
+        try:
+            if pubsub is None:
+                pubsub = preview_cache_store.pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(CHANNEL)
+            message = pubsub.get_message(timeout=timeout)
+        except redis.ConnectionError:
+            logger.warning("Redis unavailable while listening for warmups")
+            pubsub = None
+            stop_event.wait(timeout)
+            continue
+        if message is not None and message["type"] == "message":
+            handler(message["data"])
+    if pubsub is not None:
+        pubsub.close()
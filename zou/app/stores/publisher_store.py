@@ -1,3 +1,5 @@
+import logging
+
 import redis
 
 from flask_socketio import SocketIO
@@ -5,7 +7,10 @@ from flask_socketio import SocketIO
 from zou.app import config
 from zou.app.utils.redis import get_redis_url
 
+logger = logging.getLogger(__name__)
+
 socketio = None
+publisher_store = None
 
 
 def publish(event, data):
@@ -13,13 +18,60 @@ def publish(event, data):
         socketio.emit(event, data, namespace="/events")
 
 
+def _get_emit_message(manager, event, data):
+    """
+    Build the message the Socket.IO manager publishes for an emit of given
+    event to every client of the events namespace.
+    """
+    return {
+        "method": "emit",
+        "event": event,
+        "data": [data],
+        "binary": False,
+        "namespace": "/events",
+        "room": None,
+        "skip_sid": None,
+        "callback": None,
+        "host_id": manager.host_id,
+    }
+
+
+def publish_many(messages):
+    """
+    Publish a list of (event, data) pairs in a single Redis round trip. The
+    messages are built the way the Socket.IO manager builds them, so the
+    event stream reads them as separate emits, then sent through a pipeline
+    of this store: the connection of the manager is left to the others.
+    """
+    if socketio is None:
+        return
+    if publisher_store is None:
+        for event, data in messages:
+            publish(event, data)
+        return
+
+    manager = socketio.server.manager
+    pipeline = publisher_store.pipeline(transaction=False)
+    for event, data in messages:
+        pipeline.publish(
+            manager.channel,
+            manager.json.dumps(_get_emit_message(manager, event, data)),
+        )
+    try:
+        pipeline.execute()
+    except redis.ConnectionError:
+        logger.warning(
+            "Redis unavailable while publishing %s events", len(messages)
+        )
+
+
 def init():
     """
     Initialize key value store that will be used for the event publishing.
     That way the main API takes advantage of Redis pub/sub capabilities to push
     events to the event stream API.
     """
-    global socketio
+    global socketio, publisher_store
 
     try:
         publisher_store = redis.StrictRedis(
@@ -36,6 +88,6 @@ def init():
             cors_credentials=False,
         )
     except redis.ConnectionError:
-        pass
+        publisher_store = None
 
     return socketio
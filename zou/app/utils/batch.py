@@ -0,0 +1,145 @@
+"""
+Helpers for the commands that walk many preview files one by one: a pool of
+worker processes, a checkpoint file so that a restarted run skips the files
+already done, and a throughput report per processing stage.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from zou.app import db
+
+# Number of files between two throughput reports of the batch commands.
+REPORT_EVERY = 50
+
+
+def init_worker():
+    """
+    Give a forked worker process its own database connections: the ones of
+    the parent process must not be shared.
+    """
+    db.engine.dispose(close=False)
+
+
+def run_in_pool(function, items, processes=1, initializer=init_worker):
+    """
+    Call function on each item and yield the results as they come. With
+    more than one process, the items are submitted in the given order to a
+    pool of forked worker processes: function, items and results must be
+    picklable.
+    """
+    if processes <= 1:
+        for item in items:
+            yield function(item)
+        return
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=initializer,
+    ) as executor:
+        futures = [executor.submit(function, item) for item in items]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class Checkpoint:
+    """
+    Ids of the items a run is done with, appended to a file as soon as each
+    one is, so that a restarted run skips them. Without a path, nothing is
+    kept.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.done = set()
+        if path is not None and os.path.exists(path):
+            with open(path) as checkpoint_file:
+                self.done = {
+                    line.strip() for line in checkpoint_file if line.strip()
+                }
+
+    def __contains__(self, item_id):
+        return str(item_id) in self.done
+
+    def __len__(self):
+        return len(self.done)
+
+    def add(self, item_id):
+        self.done.add(str(item_id))
+        if self.path is not None:
+            with open(self.path, "a") as checkpoint_file:
+                checkpoint_file.write(f"{item_id}\n")
+
+
+class StageTimer:
+    """
+    Time and bytes spent on each processing stage of one item. Its stages
+    dict is what a worker sends back to be summed by a Throughput.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds, size = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (seconds + time.perf_counter() - start, size)
+
+    def add_size(self, name, size):
+        seconds, total_size = self.stages.get(name, (0.0, 0))
+        self.stages[name] = (seconds, total_size + (size or 0))
+
+
+class Throughput:
+    """
+    Sum of the stage timings of every item of a run.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.nb_items = 0
+        self.stages = {}
+
+    def add(self, stages):
+        self.nb_items += 1
+        for name, (seconds, size) in stages.items():
+            count, total_seconds, total_size = self.stages.get(
+                name, (0, 0.0, 0)
+            )
+            self.stages[name] = (
+                count + 1,
+                total_seconds + seconds,
+                total_size + size,
+            )
+
+    def report(self):
+        """
+        Return one line per stage, then one for the whole run. The stage
+        rates are those of a single process: with a pool, the run rate is
+        the one that grows with the number of processes.
+        """
+        lines = []
+        for name, (count, seconds, size) in self.stages.items():
+            line = f"{name}: {count} files in {seconds:.1f}s"
+            if seconds > 0:
+                line += f", {count / seconds:.2f} files/s"
+                if size > 0:
+                    line += f", {size / seconds / 1024**2:.1f} MB/s"
+            lines.append(line)
+        elapsed = time.perf_counter() - self.start
+        line = f"total: {self.nb_items} files in {elapsed:.1f}s"
+        if elapsed > 0:
+            line += f", {self.nb_items / elapsed:.2f} files/s"
+        lines.append(line)
+        return lines
+
+    def print_report(self):
+        for line in self.report():
+            print(f"Throughput - {line}")
@@ -10,7 +10,7 @@ import orjson as json
 
 from tabulate import tabulate
 from ldap3 import Server, Connection, ALL, NTLM, SIMPLE
-from zou.app.utils import thumbnail as thumbnail_utils, auth
+from zou.app.utils import thumbnail as thumbnail_utils, auth, batch
 from zou.app.stores import auth_tokens_store, file_store, queue_store
 from zou.app.services import (
     assets_service,
@@ -19,12 +19,14 @@ from zou.app.services import (
     deletion_service,
     edits_service,
     index_service,
+    notifications_service,
     persons_service,
     preview_files_service,
     projects_service,
     shots_service,
     sync_service,
     tasks_service,
+    time_spents_service,
 )
 from zou.app.models.entity import Entity
 from zou.app.models.person import Person
@@ -751,18 +753,39 @@ def push_project_to_target(
         )
 
 
-def run_sync_change_daemon(event_source, source, login, password, logs_dir):
+def run_sync_change_daemon(
+    event_source,
+    source,
+    login,
+    password,
+    logs_dir,
+    batch_size=200,
+    flush_interval=1.0,
+    max_queue_size=5000,
+    metrics_port=None,
+):
     """
-    Listen to event websocket. Each time a change occurs, it retrieves the
-    related data and save it in the current instance.
+    Listen to event websocket. Changes are queued, deduplicated and applied
+    by batches: the related data is retrieved in bulk and saved in the
+    current instance.
     """
     with app.app_context():
+        if metrics_port is not None:
+            from prometheus_client import start_http_server
+
+            start_http_server(metrics_port)
         event_client = sync_service.init_events_listener(
             source, event_source, login, password, logs_dir
         )
-        sync_service.add_main_sync_listeners(event_client)
-        sync_service.add_project_sync_listeners(event_client)
+        buffer = sync_service.SyncEventBuffer(
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_size=max_queue_size,
+        )
+        sync_service.add_main_sync_listeners(event_client, buffer=buffer)
+        sync_service.add_project_sync_listeners(event_client, buffer=buffer)
         sync_service.add_special_sync_listeners(event_client)
+        buffer.start()
         print("Start listening.")
         sync_service.run_listeners(event_client)
 
@@ -897,6 +920,20 @@ def remove_old_data(days_old=90):
         print("Old data removed.")
 
 
+def reconcile_notifications_counts():
+    with app.app_context():
+        print("Recomputing unread notification counts.")
+        counts = notifications_service.reconcile_unread_notifications_counts()
+        print(f"Unread notification counts stored for {len(counts)} people.")
+
+
+def rebuild_time_spent_days():
+    with app.app_context():
+        print("Rebuilding daily time spent rollups.")
+        time_spents_service.refresh_time_spent_days()
+        print("Daily time spent rollups rebuilt.")
+
+
 def reset_search_index():
     with app.app_context():
         print("Resetting search index.")
@@ -924,6 +961,9 @@ def generate_preview_extra(
     with_tiles=False,
     with_metadata=False,
     with_thumbnails=False,
+    processes=1,
+    priority=None,
+    checkpoint_path=None,
 ):
     if episodes is None:
         episodes = []
@@ -938,6 +978,9 @@ def generate_preview_extra(
             with_thumbnails=with_thumbnails,
             with_metadata=with_metadata,
             with_tiles=with_tiles,
+            processes=processes,
+            priority=priority,
+            checkpoint_path=checkpoint_path,
         )
 
 
@@ -996,6 +1039,9 @@ def renormalize_movie_preview_files(
     days=None,
     hours=None,
     minutes=None,
+    processes=1,
+    priority="oldest",
+    checkpoint_path=None,
 ):
     with app.app_context():
         if isinstance(preview_file_id, str):
@@ -1013,7 +1059,9 @@ def renormalize_movie_preview_files(
             )
             sys.exit(1)
 
-        query = PreviewFile.query.order_by(PreviewFile.created_at.asc())
+        query = PreviewFile.query.order_by(
+            *preview_files_service.get_preview_files_priority_order(priority)
+        )
 
         if not preview_file_id:
             query = query.filter(PreviewFile.extension == "mp4")
@@ -1044,95 +1092,139 @@ def renormalize_movie_preview_files(
         if selected_statuses:
             query = query.filter(PreviewFile.status.in_(selected_statuses))
 
-        preview_files = query.all()
+        preview_files = query.with_entities(
+            PreviewFile.id, PreviewFile.extension
+        ).all()
         len_preview_files = len(preview_files)
         if len_preview_files == 0:
             print("No preview files found.")
             sys.exit(1)
+
+        checkpoint = batch.Checkpoint(checkpoint_path)
+        if checkpoint_path is not None and config.ENABLE_JOB_QUEUE:
+            print(
+                "The normalizations are queued: the checkpoint file does "
+                "not record them."
+            )
+        items = [
+            (str(preview_file.id), preview_file.extension, i + 1)
+            for i, preview_file in enumerate(preview_files)
+            if preview_file.id not in checkpoint
+        ]
+        if len(items) < len_preview_files:
+            print(
+                f"{len_preview_files - len(items)} preview files already "
+                "renormalized, skipped."
+            )
+
+        throughput = batch.Throughput()
+        for result in batch.run_in_pool(
+            (
+                _renormalize_movie_preview_file_in_worker
+                if processes > 1
+                else _renormalize_movie_preview_file
+            ),
+            [item + (len_preview_files,) for item in items],
+            processes=processes,
+        ):
+            throughput.add(result["stages"])
+            if result["success"]:
+                checkpoint.add(result["id"])
+            if throughput.nb_items % batch.REPORT_EVERY == 0:
+                throughput.print_report()
+        throughput.print_report()
+
+
+def _renormalize_movie_preview_file_in_worker(item):
+    """
+    Renormalize one preview file from a worker process, in an application
+    context of its own.
+    """
+    with app.app_context():
+        return _renormalize_movie_preview_file(item)
+
+
+def _renormalize_movie_preview_file(item):
+    """
+    Download the source movie of one preview file, then normalize it again
+    or queue its normalization. The preview file is marked as missing when
+    its source is gone, as broken on any other failure. Only a file
+    normalized here is reported as a success, for the checkpoint: a queued
+    normalization may still fail.
+    """
+    preview_file_id, extension, index, total = item
+    timer = batch.StageTimer()
+    result = {"id": preview_file_id, "success": False, "stages": timer.stages}
+    try:
+        print(
+            f"Renormalizing preview file {preview_file_id} ({index}/{total})."
+        )
+        uploaded_movie_path = os.path.join(
+            config.TMP_DIR,
+            f"{preview_file_id}.{extension}.tmp",
+        )
+        with timer.stage("download"):
+            if not file_store.exists_movie("source", preview_file_id):
+                raise _SourceMovieMissing(
+                    f"Source movie missing in storage for preview "
+                    f"{preview_file_id}; skipping renormalization."
+                )
+            if config.FS_BACKEND == "local":
+                shutil.copyfile(
+                    file_store.get_local_movie_path("source", preview_file_id),
+                    uploaded_movie_path,
+                )
+            else:
+                sync_service.download_file(
+                    uploaded_movie_path,
+                    "source",
+                    file_store.open_movie,
+                    str(preview_file_id),
+                )
+        if (
+            not os.path.exists(uploaded_movie_path)
+            or os.path.getsize(uploaded_movie_path) == 0
+        ):
+            raise RuntimeError(
+                f"Local copy of source movie is missing or "
+                f"empty at {uploaded_movie_path}; skipping "
+                f"renormalization of {preview_file_id}."
+            )
+        timer.add_size("download", os.path.getsize(uploaded_movie_path))
+        if config.ENABLE_JOB_QUEUE:
+            with timer.stage("enqueue"):
+                queue_store.job_queue.enqueue(
+                    preview_files_service.prepare_and_store_movie,
+                    args=(
+                        preview_file_id,
+                        uploaded_movie_path,
+                        True,
+                        False,
+                    ),
+                    job_timeout=int(config.JOB_QUEUE_TIMEOUT),
+                )
         else:
-            for i, preview_file in enumerate(preview_files):
-                try:
-                    preview_file_id = str(preview_file.id)
-                    print(
-                        f"Renormalizing preview file {preview_file_id} ({i+1}/{len_preview_files})."
-                    )
-                    extension = preview_file.extension
-                    uploaded_movie_path = os.path.join(
-                        config.TMP_DIR,
-                        f"{preview_file_id}.{extension}.tmp",
-                    )
-                    if not file_store.exists_movie("source", preview_file_id):
-                        raise _SourceMovieMissing(
-                            f"Source movie missing in storage for preview "
-                            f"{preview_file_id}; skipping renormalization."
-                        )
-                    if config.FS_BACKEND == "local":
-                        shutil.copyfile(
-                            file_store.get_local_movie_path(
-                                "source", preview_file_id
-                            ),
-                            uploaded_movie_path,
-                        )
-                    else:
-                        sync_service.download_file(
-                            uploaded_movie_path,
-                            "source",
-                            file_store.open_movie,
-                            str(preview_file_id),
-                        )
-                    if (
-                        not os.path.exists(uploaded_movie_path)
-                        or os.path.getsize(uploaded_movie_path) == 0
-                    ):
-                        raise RuntimeError(
-                            f"Local copy of source movie is missing or "
-                            f"empty at {uploaded_movie_path}; skipping "
-                            f"renormalization of {preview_file_id}."
-                        )
-                    if config.ENABLE_JOB_QUEUE:
-                        queue_store.job_queue.enqueue(
-                            preview_files_service.prepare_and_store_movie,
-                            args=(
-                                preview_file_id,
-                                uploaded_movie_path,
-                                True,
-                                False,
-                            ),
-                            job_timeout=int(config.JOB_QUEUE_TIMEOUT),
-                        )
-                    else:
-                        preview_files_service.prepare_and_store_movie(
-                            preview_file_id,
-                            uploaded_movie_path,
-                            normalize=True,
-                            add_source_to_file_store=False,
-                        )
-                except _SourceMovieMissing as e:
-                    print(
-                        f"Renormalization of preview file {preview_file_id} failed: {e}"
-                    )
-                    try:
-                        preview_files_service.set_preview_file_as_missing(
-                            preview_file_id
-                        )
-                    except Exception as mark_err:
-                        print(
-                            f"Could not mark {preview_file_id} as missing: {mark_err}"
-                        )
-                    continue
-                except Exception as e:
-                    print(
-                        f"Renormalization of preview file {preview_file_id} failed: {e}"
-                    )
-                    try:
-                        preview_files_service.set_preview_file_as_broken(
-                            preview_file_id
-                        )
-                    except Exception as mark_err:
-                        print(
-                            f"Could not mark {preview_file_id} as broken: {mark_err}"
-                        )
-                    continue
+            with timer.stage("normalize"):
+                preview_files_service.prepare_and_store_movie(
+                    preview_file_id,
+                    uploaded_movie_path,
+                    normalize=True,
+                    add_source_to_file_store=False,
+                )
+            result["success"] = True
+    except _SourceMovieMissing as e:
+        print(f"Renormalization of preview file {preview_file_id} failed: {e}")
+        try:
+            preview_files_service.set_preview_file_as_missing(preview_file_id)
+        except Exception as mark_err:
+            print(f"Could not mark {preview_file_id} as missing: {mark_err}")
+    except Exception as e:
+        print(f"Renormalization of preview file {preview_file_id} failed: {e}")
+        try:
+            preview_files_service.set_preview_file_as_broken(preview_file_id)
+        except Exception as mark_err:
+            print(f"Could not mark {preview_file_id} as broken: {mark_err}")
+    return result
 
 
 def normalize_annotation_times(project_id=None, dry_run=False):
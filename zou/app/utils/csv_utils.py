@@ -1,4 +1,5 @@
 import csv
+import zlib
 
 from io import StringIO
 from flask import Response, make_response, stream_with_context
@@ -17,30 +18,59 @@ def build_csv_response(csv_content, file_name="export"):
     return csv_response
 
 
-def build_csv_stream_response(row_generator, file_name="export"):
+def build_csv_stream_response(
+    row_generator, file_name="export", compress=False, chunk_size=500
+):
     """
     Construct a streaming Flask response from a row generator.
-    Each row is written and flushed immediately to avoid buffering
-    the entire CSV in memory.
+    Rows are written and flushed by chunks of chunk_size rows to avoid
+    buffering the entire CSV in memory. When compress is set, the stream
+    is gzipped on the fly and sent with a gzip Content-Encoding.
     """
     file_name = build_csv_file_name(file_name)
 
-    def generate():
-        for row in row_generator:
-            buf = StringIO()
-            csv.writer(buf, delimiter=";").writerow(row)
+    def generate_chunks():
+        buf = StringIO()
+        writer = csv.writer(buf, delimiter=";")
+        for index, row in enumerate(row_generator, 1):
+            writer.writerow(row)
+            if index % chunk_size == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        if buf.tell() > 0:
             yield buf.getvalue()
 
+    def generate_gzip_chunks():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in generate_chunks():
+            yield compressor.compress(chunk.encode("utf-8")) + (
+                compressor.flush(zlib.Z_SYNC_FLUSH)
+            )
+        yield compressor.flush()
+
     response = Response(
-        stream_with_context(generate()),
+        stream_with_context(
+            generate_gzip_chunks() if compress else generate_chunks()
+        ),
         mimetype="text/csv",
     )
     response.headers["Content-Disposition"] = (
         f"attachment; filename={file_name}.csv"
     )
+    if compress:
+        response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
     return response
 
 
+def accepts_gzip(request):
+    """
+    Tell if the client of given request accepts gzipped responses.
+    """
+    return request.accept_encodings["gzip"] > 0
+
+
 def build_csv_file_name(file_name):
     """
     Add application name as prefix of the file name.
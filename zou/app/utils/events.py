@@ -1,6 +1,8 @@
 from collections import OrderedDict
+from contextlib import contextmanager
 
-from flask import current_app
+from flask import current_app, g
+from sqlalchemy import insert
 
 from zou.app.stores import publisher_store
 from zou.app.models.event import ApiEvent
@@ -75,7 +77,36 @@ def emit(event, data=None, persist=True, project_id=None):
         # the data so that it can be read by the handlers.
         api_event = save_event(event, data, project_id=project_id)
         data["id"] = str(api_event.id)
+    _run_handlers(event, event_handlers, data)
 
+
+def emit_many(event, data_list, persist=True, project_id=None):
+    """
+    Emit given event once per payload of data_list, like emit does, but
+    publish every payload to the other services in a single round trip.
+    """
+    event = event.lower()
+    event_handlers = handlers.get(event, {})
+    payloads = []
+    for data in data_list:
+        if project_id is not None:
+            data["project_id"] = project_id
+        payloads.append(fields.serialize_dict(data))
+    publisher_store.publish_many([(event, data) for data in payloads])
+    if persist:
+        for data, api_event_id in zip(
+            payloads, save_events(event, payloads, project_id=project_id)
+        ):
+            data["id"] = str(api_event_id)
+    for data in payloads:
+        _run_handlers(event, event_handlers, data)
+
+
+def _run_handlers(event, event_handlers, data):
+    """
+    Run the handlers registered for given event, through the job queue when
+    it is enabled.
+    """
     from zou.app.config import ENABLE_JOB_QUEUE
 
     for func in event_handlers.values():
@@ -94,27 +125,84 @@ def emit(event, data=None, persist=True, project_id=None):
                 )
 
 
-def save_event(event, data, project_id=None):
+@contextmanager
+def event_user(user_id):
     """
-    Store event information in the database.
+    Save the events emitted within the block as done by given user. Meant
+    for the code run outside of a request, like jobs, where no user is
+    logged in. Needs an application context.
     """
+    previous_user_id = g.get("event_user_id")
+    g.event_user_id = user_id
+    try:
+        yield
+    finally:
+        g.event_user_id = previous_user_id
+
+
+def _get_event_user_id():
+    if g.get("event_user_id") is not None:
+        return g.event_user_id
     try:
         from zou.app.services.persons_service import (
             get_current_user_raw,
         )
 
         person = get_current_user_raw()
-        person_id = person.id
+        return person.id
     except Exception:
-        person_id = None
+        return None
+
 
+def save_event(event, data, project_id=None):
+    """
+    Store event information in the database.
+    """
     if project_id == "None":
         project_id = None
 
     api_event = ApiEvent.create(
-        name=event, data=data, user_id=person_id, project_id=project_id
+        name=event,
+        data=data,
+        user_id=_get_event_user_id(),
+        project_id=project_id,
     )
+    _invalidate_event_names_cache(event)
+    return api_event
+
+
+def save_events(event, data_list, project_id=None):
+    """
+    Store one event per payload of data_list in the database with a single
+    INSERT, and return the ids of the new events in the same order.
+    """
+    from zou.app import db
+
+    if project_id == "None":
+        project_id = None
 
+    user_id = _get_event_user_id()
+    api_event_ids = [fields.gen_uuid() for _ in data_list]
+    if len(data_list) > 0:
+        db.session.execute(
+            insert(ApiEvent),
+            [
+                {
+                    "id": api_event_id,
+                    "name": event,
+                    "data": data,
+                    "user_id": user_id,
+                    "project_id": project_id,
+                }
+                for api_event_id, data in zip(api_event_ids, data_list)
+            ],
+        )
+        db.session.commit()
+        _invalidate_event_names_cache(event)
+    return api_event_ids
+
+
+def _invalidate_event_names_cache(event):
     try:
         from zou.app.services.events_service import (
             invalidate_event_names_cache,
@@ -128,4 +216,3 @@ def save_event(event, data, project_id=None):
         current_app.logger.warning(
             "Could not invalidate the event name list cache.", exc_info=1
         )
-    return api_event
@@ -2,7 +2,7 @@ from ua_parser import user_agent_parser
 from werkzeug.user_agent import UserAgent
 from werkzeug.utils import cached_property
 from flask.json.provider import JSONProvider
-from flask import Response, request, abort
+from flask import Response, request, abort, stream_with_context
 
 import orjson
 
@@ -79,6 +79,22 @@ def rows_response(header, rows, stream=False):
     return Response(generate(), mimetype="application/x-ndjson")
 
 
+def ndjson_stream_response(rows):
+    """
+    Answer a listing as NDJSON, one row per line, written as the rows are
+    generated. The request context is kept alive for the generator, which
+    usually reads the database while the response is being sent.
+    """
+
+    def generate():
+        for row in rows:
+            yield orjson.dumps(row, option=orjson_options) + b"\n"
+
+    return Response(
+        stream_with_context(generate()), mimetype="application/x-ndjson"
+    )
+
+
 def wrong_auth_handler(identity_user=None):
     if request.path not in ["/auth/login", "/auth/logout"]:
         abort(401)
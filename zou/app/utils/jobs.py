@@ -0,0 +1,93 @@
+"""
+Helpers for the operations run as jobs of the job queue. A job keeps in its
+metadata what it runs, who started it and its progress: the job routes read
+them from there to let that person follow it.
+"""
+
+from zou.app.utils import events
+
+JOB_TTL = 24 * 3600
+
+
+def start_job(function, args, meta):
+    """
+    Queue a job running function with given args. Its result and its
+    failure are kept for a day, for the person who started it to read.
+    """
+    from zou.app import config
+    from zou.app.stores import queue_store
+
+    return queue_store.job_queue.enqueue(
+        function,
+        args=args,
+        job_timeout=int(config.JOB_QUEUE_TIMEOUT),
+        result_ttl=JOB_TTL,
+        failure_ttl=JOB_TTL,
+        meta=meta,
+    )
+
+
+def get_job_status(job, meta_keys):
+    """
+    Return the status of given job, the metadata listed in meta_keys, its
+    progress and, once finished, its result.
+    """
+    status = job.get_status(refresh=False)
+    job_status = {"id": job.id}
+    for key in meta_keys:
+        job_status[key] = job.meta.get(key)
+    job_status.update(
+        {
+            "person_id": job.meta.get("person_id"),
+            "status": str(
+                status.value if hasattr(status, "value") else status
+            ),
+            "progress": job.meta.get("progress"),
+            "result": job.return_value(refresh=False),
+        }
+    )
+    return job_status
+
+
+def fetch_job(job_id, not_found_exception):
+    """
+    Return the job matching given id. Raise given exception when there is
+    no job queue or no such job.
+    """
+    from rq.exceptions import NoSuchJobError
+    from rq.job import Job
+
+    from zou.app.stores import queue_store
+
+    if queue_store.queue_store is None:
+        raise not_found_exception
+    try:
+        return Job.fetch(job_id, connection=queue_store.queue_store)
+    except NoSuchJobError:
+        raise not_found_exception
+
+
+def run_job(function, *args, progress_key="stage", **kwargs):
+    """
+    Run function inside the job being run by the worker. It gets a progress
+    callback storing its progress in the job metadata, and the events it
+    emits are saved as done by the person who started the job.
+    """
+    from rq import get_current_job
+
+    from zou.app import app
+
+    job = get_current_job()
+    person_id = job.meta.get("person_id") if job is not None else None
+
+    def progress(name, done=0, total=0):
+        if job is not None:
+            job.meta["progress"] = {
+                progress_key: name,
+                "done": done,
+                "total": total,
+            }
+            job.save_meta()
+
+    with app.app_context(), events.event_user(person_id):
+        return function(*args, progress=progress, **kwargs)
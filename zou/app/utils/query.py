@@ -7,7 +7,7 @@ import sqlalchemy.orm as orm
 from zou.app import config
 from zou.app.utils import fields, string
 from zou.app.services.exception import WrongParameterException
-from sqlalchemy import func, types as sa_types
+from sqlalchemy import Text, cast, func, types as sa_types
 from sqlalchemy.inspection import inspect
 
 # Some criterions accept sentinel values that are not UUIDs (e.g. "all" or
@@ -214,3 +214,25 @@ def cast_value(value, field_key):
         return func.cast(value, field_key.type)
     else:
         return func.cast(value, field_key.type)
+
+
+def get_random_uuid_expression(uuid_type):
+    """
+    Per-row UUID expression for the INSERT ... SELECT statements, cast to
+    given column type. gen_random_uuid() is a core built-in only from
+    PostgreSQL 13 (the CI matrix still covers PostgreSQL 12), and a
+    Python-side default (fields.gen_uuid) is evaluated once per from_select
+    batch, so every row would share the same primary key. md5(text) has
+    been core since well before any PostgreSQL version we support, and
+    applied to random() || clock_timestamp() it yields a distinct uuid per
+    row.
+    """
+    return cast(
+        func.md5(
+            func.concat(
+                cast(func.random(), Text),
+                cast(func.clock_timestamp(), Text),
+            )
+        ),
+        uuid_type,
+    )
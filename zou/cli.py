@@ -777,7 +777,45 @@ def sync_full_files(
 @click.option("--event-source", default="http://localhost:8080")
 @click.option("--source", default="http://localhost:8080/api")
 @click.option("--logs-directory", default=None)
-def sync_changes(event_source, source, logs_directory):
+@click.option(
+    "--batch-size",
+    default=200,
+    show_default=True,
+    type=int,
+    help="Number of changed objects applied together.",
+)
+@click.option(
+    "--flush-interval",
+    default=1.0,
+    show_default=True,
+    type=float,
+    help="Maximum number of seconds a change waits before being applied.",
+)
+@click.option(
+    "--max-queue-size",
+    default=5000,
+    show_default=True,
+    type=int,
+    help="Number of pending changes above which the listener waits.",
+)
+@click.option(
+    "--metrics-port",
+    default=None,
+    type=int,
+    help=(
+        "Serve the queue depth and lag as Prometheus metrics on this port "
+        "(requires PROMETHEUS_METRICS_ENABLED)."
+    ),
+)
+def sync_changes(
+    event_source,
+    source,
+    logs_directory,
+    batch_size,
+    flush_interval,
+    max_queue_size,
+    metrics_port,
+):
     """
     Run a daemon that import data related to any change happening on source
     instance. It expects that credentials to connect to source instance are
@@ -788,7 +826,15 @@ def sync_changes(event_source, source, logs_directory):
     login = os.getenv("SYNC_LOGIN")
     password = os.getenv("SYNC_PASSWORD")
     commands.run_sync_change_daemon(
-        event_source, source, login, password, logs_directory
+        event_source,
+        source,
+        login,
+        password,
+        logs_directory,
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+        max_queue_size=max_queue_size,
+        metrics_port=metrics_port,
     )
 
 
@@ -907,6 +953,28 @@ def remove_old_data(days):
     commands.remove_old_data(days)
 
 
+@cli.command()
+def reconcile_notifications_counts():
+    """
+    Recompute from the database the unread notification counts served to
+    the clients. Meant to be run periodically, from a cron job for instance.
+    """
+    from zou.app.utils import commands
+
+    commands.reconcile_notifications_counts()
+
+
+@cli.command()
+def rebuild_time_spent_days():
+    """
+    Recompute from the time spents the daily rollups the timesheet tables
+    are read from.
+    """
+    from zou.app.utils import commands
+
+    commands.rebuild_time_spent_days()
+
+
 @cli.command()
 def reset_search_index():
     """
@@ -942,6 +1010,25 @@ def search_asset(query):
 @click.option(
     "--force-regenerate-tiles", is_flag=True, default=False, show_default=True
 )
+@click.option(
+    "--processes",
+    default=1,
+    show_default=True,
+    type=int,
+    help="Number of worker processes handling the previews.",
+)
+@click.option(
+    "--priority",
+    type=click.Choice(["recent", "oldest"]),
+    default=None,
+    help="Handle first the previews of the last commented tasks (recent) "
+    "or the oldest previews (oldest).",
+)
+@click.option(
+    "--checkpoint-file",
+    default=None,
+    help="File listing the previews done, skipped when the run restarts.",
+)
 def generate_preview_extra(
     project,
     entity_id,
@@ -952,6 +1039,9 @@ def generate_preview_extra(
     with_metadata,
     with_thumbnails,
     force_regenerate_tiles,
+    processes,
+    priority,
+    checkpoint_file,
 ):
     """
     Generate tiles, thumbnails and metadata for all previews.
@@ -968,6 +1058,9 @@ def generate_preview_extra(
         with_tiles=with_tiles,
         with_metadata=with_metadata,
         with_thumbnails=with_thumbnails,
+        processes=processes,
+        priority=priority,
+        checkpoint_path=checkpoint_file,
     )
 
 
@@ -1053,6 +1146,29 @@ def create_bot(
 @click.option("--days", type=int, default=None, show_default=True)
 @click.option("--hours", type=int, default=None, show_default=True)
 @click.option("--minutes", type=int, default=None, show_default=True)
+@click.option(
+    "--processes",
+    default=1,
+    show_default=True,
+    type=int,
+    help="Number of worker processes handling the previews.",
+)
+@click.option(
+    "--priority",
+    type=click.Choice(["recent", "oldest"]),
+    default="oldest",
+    show_default=True,
+    help="Handle first the previews of the last commented tasks (recent) "
+    "or the oldest previews (oldest).",
+)
+@click.option(
+    "--checkpoint-file",
+    default=None,
+    help=(
+        "File listing the previews done, skipped when the run restarts. "
+        "Normalizations sent to the job queue are not recorded."
+    ),
+)
 def renormalize_movie_preview_files(
     preview_file_id,
     project_id,
@@ -1062,6 +1178,9 @@ def renormalize_movie_preview_files(
     days=None,
     hours=None,
     minutes=None,
+    processes=1,
+    priority="oldest",
+    checkpoint_file=None,
 ):
     """
     Renormalize all preview files.
@@ -1077,6 +1196,9 @@ def renormalize_movie_preview_files(
         days=days,
         hours=hours,
         minutes=minutes,
+        processes=processes,
+        priority=priority,
+        checkpoint_path=checkpoint_file,
     )
 
 
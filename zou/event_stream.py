@@ -28,7 +28,7 @@ from flask_socketio import SocketIO, disconnect, join_room, leave_room, emit
 from zou.app import config, create_app
 from zou.app.utils.redis import get_redis_url
 
-app = create_app()
+app = create_app(with_preview_cache_warmup=False)
 
 from zou.app.services.playlists_service import get_playlist
 from zou.app.services.permissions_service import check_project_access
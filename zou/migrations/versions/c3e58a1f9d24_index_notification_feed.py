@@ -0,0 +1,46 @@
+"""Index the notification feed by person, creation date and id
+
+Revision ID: c3e58a1f9d24
+Revises: b7d419c25e08
+Create Date: 2026-10-18
+
+The bell menu reads the notifications of one person newest first and pages
+them by (created_at, id). With the person_id index alone, Postgres fetched
+every notification of the person and sorted them, which grows with years of
+history. With this index, each page is a single range scan.
+
+notification is one of the largest tables, so the index is built
+CONCURRENTLY to keep writes going. That forbids a surrounding transaction,
+hence the autocommit block.
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3e58a1f9d24"
+down_revision = "b7d419c25e08"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notification_person_id_created_at_id",
+            "notification",
+            ["person_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_notification_person_id_created_at_id",
+            table_name="notification",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
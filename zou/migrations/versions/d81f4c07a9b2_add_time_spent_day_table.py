@@ -0,0 +1,114 @@
+"""Add the daily time spent rollup table
+
+Revision ID: d81f4c07a9b2
+Revises: c3e58a1f9d24
+Create Date: 2026-10-18
+
+The timesheet tables summed the raw time_spent rows, joined to their task,
+on every view. time_spent_day holds those sums by person, project, task
+type and day. The services keep it up to date and the
+rebuild-time-spent-days command recomputes it. It is filled here from the
+existing time spents. The ids are built from md5 rather than
+gen_random_uuid(), which PostgreSQL 12 does not ship.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils
+import uuid
+
+# revision identifiers, used by Alembic.
+revision = "d81f4c07a9b2"
+down_revision = "c3e58a1f9d24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "time_spent_day",
+        sa.Column("duration", sa.Float(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column(
+            "person_id",
+            sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "project_id",
+            sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "task_type_id",
+            sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "id",
+            sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+            default=uuid.uuid4,
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["person_id"], ["person.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["project_id"], ["project.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["task_type_id"], ["task_type.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "person_id",
+            "project_id",
+            "task_type_id",
+            "date",
+            name="time_spent_day_uc",
+        ),
+    )
+    with op.batch_alter_table("time_spent_day", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_time_spent_day_date"), ["date"], unique=False
+        )
+        batch_op.create_index(
+            batch_op.f("ix_time_spent_day_project_id"),
+            ["project_id"],
+            unique=False,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_time_spent_day_task_type_id"),
+            ["task_type_id"],
+            unique=False,
+        )
+
+    op.execute("""
+        INSERT INTO time_spent_day (
+            id, person_id, project_id, task_type_id, date, duration,
+            created_at, updated_at
+        )
+        SELECT
+            md5(random()::text || clock_timestamp()::text)::uuid,
+            time_spent.person_id, task.project_id,
+            task.task_type_id, time_spent.date, SUM(time_spent.duration),
+            timezone('UTC', now()), timezone('UTC', now())
+        FROM time_spent
+        JOIN task ON task.id = time_spent.task_id
+        WHERE time_spent.person_id IS NOT NULL
+        GROUP BY
+            time_spent.person_id, task.project_id, task.task_type_id,
+            time_spent.date
+        """)
+
+
+def downgrade():
+    with op.batch_alter_table("time_spent_day", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_time_spent_day_task_type_id"))
+        batch_op.drop_index(batch_op.f("ix_time_spent_day_project_id"))
+        batch_op.drop_index(batch_op.f("ix_time_spent_day_date"))
+
+    op.drop_table("time_spent_day")
@@ -0,0 +1,165 @@
+"""Copy the project, task type, entity and status on the news
+
+Revision ID: e4a92c6b1d37
+Revises: d81f4c07a9b2
+Create Date: 2026-10-18
+
+The activity feed joined news with task, project, entity, comment and
+preview file to filter and display each entry, and counted the same join
+for its total. News now carry the project, task type and entity of their
+task and the status set by their comment, and an index on (project_id,
+created_at, id) lets a page be read by keyset. The new columns are filled
+here from the existing tasks and comments.
+
+news is one of the largest tables, so the index is built CONCURRENTLY to
+keep writes going. That forbids a surrounding transaction, hence the
+autocommit block.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils
+
+# revision identifiers, used by Alembic.
+revision = "e4a92c6b1d37"
+down_revision = "d81f4c07a9b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("news", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "project_id",
+                sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+                nullable=True,
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "task_type_id",
+                sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+                nullable=True,
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "entity_id",
+                sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+                nullable=True,
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "task_status_id",
+                sqlalchemy_utils.types.uuid.UUIDType(binary=False),
+                nullable=True,
+            )
+        )
+        batch_op.create_foreign_key(
+            batch_op.f("news_project_id_fkey"),
+            "project",
+            ["project_id"],
+            ["id"],
+        )
+        batch_op.create_foreign_key(
+            batch_op.f("news_task_type_id_fkey"),
+            "task_type",
+            ["task_type_id"],
+            ["id"],
+        )
+        batch_op.create_foreign_key(
+            batch_op.f("news_entity_id_fkey"), "entity", ["entity_id"], ["id"]
+        )
+        batch_op.create_foreign_key(
+            batch_op.f("news_task_status_id_fkey"),
+            "task_status",
+            ["task_status_id"],
+            ["id"],
+        )
+
+    op.execute("""
+        UPDATE news
+        SET
+            project_id = task.project_id,
+            task_type_id = task.task_type_id,
+            entity_id = task.entity_id
+        FROM task
+        WHERE task.id = news.task_id
+        """)
+    op.execute("""
+        UPDATE news
+        SET task_status_id = comment.task_status_id
+        FROM comment
+        WHERE comment.id = news.comment_id
+        """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_news_project_id",
+            "news",
+            ["project_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_news_task_type_id",
+            "news",
+            ["task_type_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_news_entity_id",
+            "news",
+            ["entity_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_news_project_id_created_at_id",
+            "news",
+            ["project_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for index_name in [
+            "ix_news_project_id_created_at_id",
+            "ix_news_entity_id",
+            "ix_news_task_type_id",
+            "ix_news_project_id",
+        ]:
+            op.drop_index(
+                index_name,
+                table_name="news",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    with op.batch_alter_table("news", schema=None) as batch_op:
+        batch_op.drop_constraint(
+            batch_op.f("news_task_status_id_fkey"), type_="foreignkey"
+        )
+        batch_op.drop_constraint(
+            batch_op.f("news_entity_id_fkey"), type_="foreignkey"
+        )
+        batch_op.drop_constraint(
+            batch_op.f("news_task_type_id_fkey"), type_="foreignkey"
+        )
+        batch_op.drop_constraint(
+            batch_op.f("news_project_id_fkey"), type_="foreignkey"
+        )
+        batch_op.drop_column("task_status_id")
+        batch_op.drop_column("entity_id")
+        batch_op.drop_column("task_type_id")
+        batch_op.drop_column("project_id")
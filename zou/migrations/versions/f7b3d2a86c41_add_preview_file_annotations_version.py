@@ -0,0 +1,38 @@
+"""Add a version to the annotations of the preview files
+
+Revision ID: f7b3d2a86c41
+Revises: e4a92c6b1d37
+Create Date: 2026-10-19
+
+Clients loading the annotations of many previews at once send the version
+they hold for each, and only the annotations whose version differs are
+sent back. The version is bumped by every annotation change. The server
+default fills the existing rows without rewriting the table.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "f7b3d2a86c41"
+down_revision = "e4a92c6b1d37"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("preview_file", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "annotations_version",
+                sa.Integer(),
+                server_default="0",
+                nullable=False,
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("preview_file", schema=None) as batch_op:
+        batch_op.drop_column("annotations_version")
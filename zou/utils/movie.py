@@ -105,31 +105,64 @@ def extract_frame_from_movie(movie_path, frame_number, movie_fps):
     return file_target_path
 
 
-def generate_tile(movie_path):
+TILE_COLUMNS = 8
+TILE_MAX_ROWS = 480
+TILE_HEIGHT = 100
+
+
+def get_tile_layout(movie_path=None, video_track=None):
     """
-    Generates a tile from a movie.
+    Returns the layout of the tile sheet of a movie: the size of one frame,
+    the number of columns and rows, and the index of the movie frames it
+    shows. Frame i of the sheet, read left to right and top to bottom, is
+    frame i * frame_step of the movie. Long movies are subsampled so the
+    sheet does not exceed TILE_MAX_ROWS rows.
     """
-    file_source_name = os.path.basename(movie_path)
-    file_target_name = f"{file_source_name[:-4]}_tile_{uuid.uuid4().hex}.png"
-    file_target_path = os.path.join(tempfile.gettempdir(), file_target_name)
-    video_track = get_video_track(movie_path, "generate_tile")
+    if video_track is None:
+        video_track = get_video_track(movie_path, "get_tile_layout")
     duration = get_movie_duration(video_track=video_track)
     fps = get_movie_fps(video_track=video_track)
     duration_in_frames = int(duration * fps)
-    rows = min(math.ceil(duration_in_frames / 8), 480)
-    ratio = get_movie_display_aspect_ratio(video_track=video_track)
-    height = 100
-    width = math.ceil(height * ratio)
-    if rows == 480:
-        select = (
-            rf"select='not(mod(n\,{math.ceil(duration_in_frames/3840)}))',"
+    rows = min(math.ceil(duration_in_frames / TILE_COLUMNS), TILE_MAX_ROWS)
+    frame_step = 1
+    if rows == TILE_MAX_ROWS:
+        frame_step = math.ceil(
+            duration_in_frames / (TILE_COLUMNS * TILE_MAX_ROWS)
         )
+    ratio = get_movie_display_aspect_ratio(video_track=video_track)
+    return {
+        "columns": TILE_COLUMNS,
+        "rows": rows,
+        "width": math.ceil(TILE_HEIGHT * ratio),
+        "height": TILE_HEIGHT,
+        "frame_step": frame_step,
+        "nb_frames": min(
+            math.ceil(duration_in_frames / frame_step), TILE_COLUMNS * rows
+        ),
+    }
+
+
+def generate_tile(movie_path, layout=None):
+    """
+    Generates a tile from a movie, in a single decoding pass: the frames are
+    selected, scaled and laid out by one filter graph.
+    """
+    file_source_name = os.path.basename(movie_path)
+    file_target_name = f"{file_source_name[:-4]}_tile_{uuid.uuid4().hex}.png"
+    file_target_path = os.path.join(tempfile.gettempdir(), file_target_name)
+    if layout is None:
+        layout = get_tile_layout(movie_path)
+    if layout["rows"] == TILE_MAX_ROWS:
+        select = rf"select='not(mod(n\,{layout['frame_step']}))',"
     else:
         select = ""
     try:
         ffmpeg.input(movie_path).output(
             file_target_path,
-            vf=f"{select}scale={width}:{height},tile=8x{rows}",
+            vf=(
+                f"{select}scale={layout['width']}:{layout['height']},"
+                f"tile={layout['columns']}x{layout['rows']}"
+            ),
         ).overwrite_output().run(quiet=True)
     except ffmpeg._run.Error as e:
         log_ffmpeg_error(e, "An error occured while generating the tile.")